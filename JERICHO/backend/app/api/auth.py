@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+from typing import Optional
 
-from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash, verify_token
+from app.core.database import get_async_db
+from app.core.principals import Principal, cache_principal, get_cached_principal
+from app.core.security import create_access_token, verify_password_async, get_password_hash_async, verify_token
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, Token, TokenData
 from app.models.user import User
 
@@ -14,7 +17,7 @@ router = APIRouter()
 security = HTTPBearer()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)) -> Principal:
     """Get current authenticated user"""
     if credentials is None:
         raise HTTPException(
@@ -33,22 +36,56 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+    # Principal cache avoids a users-table round-trip per request
+    principal = get_cached_principal(int(user_id))
+    if principal is None:
+        user = await db.get(User, int(user_id))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = cache_principal(user)
+    
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Inactive user",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    return user
+    return principal
+
+
+async def limit_email_attempts(request: Request, email: str):
+    """Charge an attempt to the account's rate limit before any password hashing"""
+    auth_limits = getattr(request.app.state, "auth_limits", None)
+    if auth_limits is not None:
+        await auth_limits.check_email(email)
+
+
+async def authenticate_token(token: Optional[str], db: AsyncSession) -> Optional[Principal]:
+    """Resolve a bearer token to its active principal, or None; for streams that cannot hold a request-scoped session"""
+    user_id = verify_token(token) if token else None
+    if user_id is None:
+        return None
+    principal = get_cached_principal(int(user_id))
+    if principal is None:
+        user = await db.get(User, int(user_id))
+        if user is None:
+            return None
+        principal = cache_principal(user)
+    return principal if principal.is_active else None
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """User registration endpoint"""
+    await limit_email_attempts(request, user.email)
+    
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,26 +93,29 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         email=user.email,
         password_hash=hashed_password
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """User login endpoint"""
+    await limit_email_attempts(request, user.email)
+    
     # Authenticate user
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalars().first()
     
-    if not db_user or not verify_password(user.password, db_user.password_hash):
+    if not db_user or not await verify_password_async(user.password, db_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -103,13 +143,13 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Get current user information"""
     return current_user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user: User = Depends(get_current_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_user)):
     """Token refresh endpoint"""
     access_token_expires = timedelta(minutes=60)
     access_token = create_access_token(
@@ -1,11 +1,83 @@
-from fastapi import APIRouter
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.auth import get_current_user
+from app.core.database import get_async_db
+from app.core.principals import Principal
+from app.core.responses import PreparedJSONResponse, dumps, row_dicts
+from app.core.timekeys import now_day_key
+from app.models.user import Cycle
+from app.schemas.blocks import (
+    BlockPage, BlockResponse, CycleSummaryResponse, MaterializedCycleResponse, ThroughputResponse,
+)
+from app.services.blocks import decode_cursor, list_blocks, stream_blocks_ndjson
+from app.services.materializer import materialize_cycle, project_days
+from app.services.rollups import daily_series, rollup_totals
+from app.services.summaries import read_cycle_summary
 
 router = APIRouter()
 
-@router.get("/")
-async def get_blocks():
-    """Get all blocks for user"""
-    return {"message": "Blocks endpoint - to be implemented"}
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+@router.get("/", response_model=BlockPage)
+async def get_blocks(
+    request: Request,
+    day_from: Optional[date] = Query(None, description="First day_key (inclusive)"),
+    day_to: Optional[date] = Query(None, description="Last day_key (inclusive)"),
+    cycle_id: Optional[int] = None,
+    block_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get the user's blocks in day order; format=ndjson streams every match"""
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    filters = {
+        "day_from": day_from.isoformat() if day_from else None,
+        "day_to": day_to.isoformat() if day_to else None,
+        "cycle_id": cycle_id,
+        "status": block_status,
+    }
+
+    if format == "ndjson" or (format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")):
+        return StreamingResponse(
+            stream_blocks_ndjson(current_user.id, after=after, **filters), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    page = await list_blocks(db, current_user.id, limit, after=after, **filters)
+    return PreparedJSONResponse(dumps({
+        "blocks": row_dicts(BlockResponse, page["blocks"]),
+        "next_cursor": page["next_cursor"],
+    }))
+
+@router.get("/throughput", response_model=ThroughputResponse)
+async def get_throughput(
+    day_to: Optional[date] = Query(None, description="Last day_key (inclusive, default today)"),
+    days: int = Query(90, ge=1, le=366),
+    goal_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Planned and completed totals per day and per practice, from the daily rollups"""
+    last_day = day_to.isoformat() if day_to else now_day_key()
+    first_day = (date.fromisoformat(last_day) - timedelta(days=days - 1)).isoformat()
+    series = await daily_series(db, current_user.id, first_day, last_day, goal_id=goal_id)
+    practices = await rollup_totals(db, current_user.id, first_day, last_day, goal_id=goal_id, group_by="practice")
+    return {
+        "day_from": first_day,
+        "day_to": last_day,
+        "days": series,
+        "practices": [{"practice": practice, **totals} for practice, totals in sorted(practices.items())],
+    }
 
 @router.post("/")
 async def create_block():
@@ -15,4 +87,37 @@ async def create_block():
 @router.put("/{block_id}")
 async def update_block(block_id: str):
     """Update block"""
-    return {"message": f"Update block {block_id} endpoint - to be implemented"}
\ No newline at end of file
+    return {"message": f"Update block {block_id} endpoint - to be implemented"}
+
+@router.get("/cycles/{cycle_id}/materialized", response_model=MaterializedCycleResponse)
+async def get_materialized_cycle(
+    cycle_id: int,
+    today: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Block projection for a cycle, folded from its execution events"""
+    cycle = await db.get(Cycle, cycle_id)
+    if cycle is None or cycle.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cycle not found")
+
+    state = await materialize_cycle(db, cycle_id, current_user.id)
+    return {
+        "cycle_id": cycle_id,
+        "last_event_id": state.last_event_id,
+        "event_count": state.event_count,
+        **project_days(state, today),
+    }
+
+@router.get("/cycles/{cycle_id}/summary", response_model=CycleSummaryResponse)
+async def get_cycle_summary(
+    cycle_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Cycle totals kept current on every block and event write"""
+    cycle = await db.get(Cycle, cycle_id)
+    if cycle is None or cycle.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cycle not found")
+
+    return await read_cycle_summary(db, cycle)
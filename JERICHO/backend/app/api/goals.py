@@ -1,4 +1,26 @@
-from fastapi import APIRouter
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.auth import get_current_user
+from app.core.database import get_async_db
+from app.core.principals import Principal
+from app.core.timekeys import now_day_key
+from app.models.user import Goal
+from app.schemas.goals import (
+    GoalBatchValidationRequest,
+    GoalDeadlineResponse,
+    GoalPlanResponse,
+    GoalProbabilityResponse,
+    GoalValidationRequest,
+    GoalValidationResponse,
+)
+from app.services.admission import validate_contracts
+from app.services.goals import goals_due_between
+from app.services.planner import PlanInputError, plan_for_goal
+from app.services.probability import score_goals
 
 router = APIRouter()
 
@@ -12,7 +34,60 @@ async def create_goal():
     """Create new goal"""
     return {"message": "Create goal endpoint - to be implemented"}
 
-@router.post("/validate")
-async def validate_goal():
+@router.post("/validate", response_model=GoalValidationResponse)
+async def validate_goal(
+    request: GoalValidationRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     """Validate goal admission"""
-    return {"message": "Goal validation endpoint - to be implemented"}
\ No newline at end of file
+    results = await validate_contracts(db, current_user.id, [request.goal_execution_contract])
+    return results[0]
+
+@router.post("/validate/batch", response_model=List[GoalValidationResponse])
+async def validate_goals(
+    request: GoalBatchValidationRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Validate the admission of many goal execution contracts, in request order"""
+    return await validate_contracts(db, current_user.id, request.contracts)
+
+@router.get("/due", response_model=List[GoalDeadlineResponse])
+async def get_goals_due(
+    deadline_type: Optional[str] = Query(None, pattern="^(HARD|SOFT)$"),
+    start: Optional[date] = Query(None, description="First day (default: today)"),
+    end: Optional[date] = Query(None, description="Last day (default: six days after start)"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get goals whose contract deadline falls in a day range"""
+    start = start or date.fromisoformat(now_day_key())
+    end = end or start + timedelta(days=6)
+    return await goals_due_between(db, current_user.id, start.isoformat(), end.isoformat(), deadline_type)
+
+
+@router.get("/probability", response_model=List[GoalProbabilityResponse])
+async def get_goal_probabilities(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get the success probability of each active goal"""
+    return await score_goals(db, user_id=current_user.id)
+
+
+@router.get("/{goal_id}/plan", response_model=GoalPlanResponse)
+async def get_goal_plan(
+    goal_id: int,
+    mode: str = Query("REGENERATE", pattern="^(REGENERATE|REBASE_FROM_TODAY)$"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Deterministic block plan for a goal, served from the plan cache when possible"""
+    goal = await db.get(Goal, goal_id)
+    if goal is None or goal.user_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Goal not found")
+    try:
+        return await plan_for_goal(db, goal, mode)
+    except PlanInputError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
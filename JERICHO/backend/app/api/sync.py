@@ -1,13 +1,192 @@
-from fastapi import APIRouter
+import asyncio
+import json
+from typing import Optional, Tuple
 
-router = APIRouter()
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 
-@router.get("/pull")
-async def pull_sync():
-    """Pull latest data from server"""
-    return {"message": "Pull sync endpoint - to be implemented"}
+from app.api.auth import authenticate_token, get_current_user
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.principals import Principal
+from app.core.pubsub import Subscription
+from app.core.security import decode_token
+from app.core.responses import row_dicts
+from app.core.wire import WireRoute, negotiated_response
+from app.schemas.sync import (
+    LedgerVerifyResponse, SyncBlock, SyncCycle, SyncEvent, SyncGoal, SyncPullResponse, SyncPushRequest, SyncPushResponse,
+)
+from app.services.events import ingest_events
+from app.services.ledger import verify_ledger
+from app.services.sync import latest_sync_seq, pull_changes, pull_etag
+from app.services.sync_push import REVOKED, hello_message, sse_event, sync_hub
 
-@router.post("/push")
-async def push_sync():
-    """Push local changes to server"""
-    return {"message": "Push sync endpoint - to be implemented"}
\ No newline at end of file
+router = APIRouter(route_class=WireRoute)
+
+PULL_SCHEMAS = {"goals": SyncGoal, "cycles": SyncCycle, "blocks": SyncBlock, "events": SyncEvent}
+
+# EventSource and browser WebSockets cannot set headers, so streams also take the JWT as a query parameter
+optional_bearer = HTTPBearer(auto_error=False)
+SSE_RETRY_MS = 5000
+
+@router.get("/pull", response_model=SyncPullResponse)
+async def pull_sync(
+    request: Request,
+    cursor: int = Query(0, ge=0, description="Highest sync_seq the client has applied"),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Pull rows changed since the client's cursor"""
+    last_seq = await latest_sync_seq(db, current_user.id)
+    etag = pull_etag(current_user.id, last_seq, cursor, limit)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    # Weak comparison (W/ ignored): the tag covers the page in every negotiated format and encoding
+    if etag.removeprefix("W/") in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=cache_headers)
+
+    if cursor >= last_seq:
+        changes = {"cursor": cursor, "has_more": False}
+    else:
+        changes = await pull_changes(db, current_user.id, cursor, limit)
+
+    # Pages can hold thousands of rows: encode them straight from the loaded rows
+    body = {"cursor": changes["cursor"], "has_more": changes["has_more"]}
+    for key, schema in PULL_SCHEMAS.items():
+        body[key] = row_dicts(schema, changes.get(key, []))
+    return negotiated_response(request, body, headers=cache_headers)
+
+@router.post("/push", response_model=SyncPushResponse)
+async def push_sync(
+    payload: SyncPushRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Push local changes to server (bulk execution-event ingest)"""
+    return await ingest_events(db, current_user.id, payload.events, atomic=payload.atomic)
+
+@router.post("/verify", response_model=LedgerVerifyResponse)
+async def verify_sync_ledger(
+    cycle_id: Optional[int] = Query(None, description="Verify a single cycle"),
+    full: bool = Query(False, description="Replay from the first event instead of the newest checkpoint"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Verify the execution-event hash chain for the user's cycles"""
+    return await verify_ledger(db, current_user.id, cycle_id=cycle_id, full=full)
+
+async def open_change_feed(token: Optional[str]) -> Tuple[Subscription, int]:
+    """Authenticate, subscribe and read the feed head on a session closed before the stream starts.
+
+    Subscribing comes first, so a write committed while the head is read is
+    still announced. The subscription expires with the token. Raises 401 for a
+    bad token and 503 when the hub is full.
+    """
+    async with AsyncSessionLocal() as db:
+        user = await authenticate_token(token, db)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        subscription = sync_hub.subscribe(user.id)
+        if subscription is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many push connections",
+                headers={"Retry-After": "5"},
+            )
+        subscription.expires_at = (decode_token(token) or {}).get("exp")
+        try:
+            return subscription, await latest_sync_seq(db, user.id)
+        except Exception:
+            subscription.close()
+            raise
+
+@router.get("/events")
+async def sync_events(
+    access_token: Optional[str] = Query(None, description="JWT, for clients that cannot send an Authorization header"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+):
+    """Server-sent events announcing new changes to pull (hello, changes, resync, revoked)"""
+    subscription, last_seq = await open_change_feed(credentials.credentials if credentials else access_token)
+
+    async def stream():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n" + sse_event(hello_message(last_seq))
+            while True:
+                left = subscription.seconds_left()
+                heartbeat = settings.sync_push_heartbeat_seconds
+                message = await subscription.get(timeout=heartbeat if left is None else min(heartbeat, left))
+                if message is None and (subscription.closed or subscription.seconds_left() == 0):
+                    # Draining or the token expired; the client reconnects after `retry`, authenticating again
+                    break
+                yield sse_event(message) if message is not None else ": keepalive\n\n"
+                if message == REVOKED:
+                    break
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def sync_socket(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None, description="JWT, for clients that cannot send an Authorization header"),
+):
+    """WebSocket carrying the same messages as /events; messages from the client are ignored"""
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and credentials:
+        token = credentials
+    try:
+        subscription, last_seq = await open_change_feed(token)
+    except HTTPException as exc:
+        unauthorized = exc.status_code == status.HTTP_401_UNAUTHORIZED
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION if unauthorized else status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    # An idle socket is this coroutine waiting on receive(); a sender task exists only while messages are queued
+    sender: Optional[asyncio.Task] = None
+
+    async def send_queued():
+        try:
+            while (message := subscription.get_nowait()) is not None:
+                if message == REVOKED:
+                    subscription.close()
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User deactivated")
+                    return
+                await websocket.send_text(json.dumps(message, separators=(",", ":")))
+        except Exception:
+            subscription.close()
+
+    def on_ready():
+        nonlocal sender
+        if sender is None or sender.done():
+            sender = asyncio.create_task(send_queued())
+
+    try:
+        await websocket.accept()
+        await websocket.send_text(json.dumps(hello_message(last_seq), separators=(",", ":")))
+        subscription.on_ready = on_ready
+        if subscription.pending():
+            on_ready()
+        while True:
+            left = subscription.seconds_left()
+            try:
+                message = await websocket.receive() if left is None else await asyncio.wait_for(websocket.receive(), left)
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Token expired")
+                break
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        subscription.close()
+        if sender is not None:
+            sender.cancel()
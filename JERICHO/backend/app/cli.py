@@ -0,0 +1,167 @@
+"""
+Command-line maintenance tasks.
+
+Usage:
+    python -m app.cli create-schema
+    python -m app.cli verify-ledger [--user-id N] [--cycle-id N] [--full]
+    python -m app.cli score-goals [--user-id N]
+    python -m app.cli rollover [--chunk-size N] [--workers N]
+    python -m app.cli rebuild-summaries [--user-id N] [--cycle-id N]
+    python -m app.cli check-summaries [--user-id N] [--cycle-id N]
+    python -m app.cli rebuild-rollups [--user-id N]
+    python -m app.cli compact-rollups [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+
+from sqlalchemy import inspect
+
+from app.core.database import AsyncSessionLocal
+
+# Services are imported by the commands that use them, so each command only loads what it runs
+
+
+async def create_schema_command(args) -> int:
+    from app.core.database import Base, async_engine
+    import app.models.user  # noqa: F401  (registers the tables on Base.metadata)
+
+    async with async_engine.begin() as conn:
+        existing = set(await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names()))
+        await conn.run_sync(Base.metadata.create_all)
+    created = [table for table in Base.metadata.tables if table not in existing]
+    print(json.dumps({"created": created, "existing": len(Base.metadata.tables) - len(created)}, indent=2))
+    return 0
+
+
+async def verify_ledger_command(args) -> int:
+    from app.services.ledger import verify_ledger
+
+    async with AsyncSessionLocal() as db:
+        report = await verify_ledger(db, user_id=args.user_id, cycle_id=args.cycle_id, full=args.full)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+async def score_goals_command(args) -> int:
+    from app.services.probability import score_goals
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        results = await score_goals(db, user_id=args.user_id)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output)
+    statuses = Counter(result["status"] for result in results)
+    print(json.dumps({
+        "goals": len(results),
+        "statuses": dict(sorted(statuses.items())),
+        "seconds": round(time.perf_counter() - started, 3),
+    }, indent=2))
+    return 0
+
+
+async def rollover_command(args) -> int:
+    from app.services.rollover import sweep_overdue_blocks
+    from app.services.sync_push import sync_hub
+
+    # Connected clients are told about the missed blocks through the push hub's backend
+    await sync_hub.start()
+    try:
+        metrics = await sweep_overdue_blocks(chunk_size=args.chunk_size, workers=args.workers)
+    finally:
+        await sync_hub.stop()
+    print(json.dumps(metrics, indent=2))
+    return 0
+
+
+async def rebuild_summaries_command(args) -> int:
+    from app.services.summaries import rebuild_summaries
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        result = await rebuild_summaries(db, user_id=args.user_id, cycle_id=args.cycle_id)
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 3)}, indent=2))
+    return 0
+
+
+async def check_summaries_command(args) -> int:
+    from app.services.summaries import check_summaries
+
+    async with AsyncSessionLocal() as db:
+        report = await check_summaries(db, user_id=args.user_id, cycle_id=args.cycle_id)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+async def rebuild_rollups_command(args) -> int:
+    from app.services.rollups import rebuild_rollups, compact_rollups
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        result = await rebuild_rollups(db, user_id=args.user_id)
+        result["compaction"] = await compact_rollups(db)
+    print(json.dumps({**result, "seconds": round(time.perf_counter() - started, 3)}, indent=2))
+    return 0
+
+
+async def compact_rollups_command(args) -> int:
+    from app.services.rollups import compact_rollups
+
+    async with AsyncSessionLocal() as db:
+        result = await compact_rollups(db, batch_size=args.batch_size)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="JERICHO backend maintenance tasks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    schema = commands.add_parser("create-schema", help="Create missing tables from the models (development databases)")
+    schema.set_defaults(handler=create_schema_command)
+
+    verify = commands.add_parser("verify-ledger", help="Verify execution-event hash chains")
+    verify.add_argument("--user-id", type=int, help="Only this user's cycles (default: all users)")
+    verify.add_argument("--cycle-id", type=int, help="Only this cycle")
+    verify.add_argument("--full", action="store_true", help="Replay from the first event instead of the newest checkpoint")
+    verify.set_defaults(handler=verify_ledger_command)
+
+    score = commands.add_parser("score-goals", help="Re-score goal-success probabilities in one batch")
+    score.add_argument("--user-id", type=int, help="Only this user's goals (default: all users)")
+    score.add_argument("--output", help="Write every result to this JSON file")
+    score.set_defaults(handler=score_goals_command)
+
+    rollover = commands.add_parser("rollover", help="Mark blocks left open on past days missed")
+    rollover.add_argument("--chunk-size", type=int, help="Blocks claimed per transaction")
+    rollover.add_argument("--workers", type=int, help="Chunks processed concurrently (SQLite uses 1)")
+    rollover.set_defaults(handler=rollover_command)
+
+    rebuild = commands.add_parser("rebuild-summaries", help="Recompute cycle summaries from blocks and events")
+    rebuild.add_argument("--user-id", type=int, help="Only this user's cycles (default: all users)")
+    rebuild.add_argument("--cycle-id", type=int, help="Only this cycle")
+    rebuild.set_defaults(handler=rebuild_summaries_command)
+
+    check = commands.add_parser("check-summaries", help="Compare cycle summaries with blocks and events")
+    check.add_argument("--user-id", type=int, help="Only this user's cycles (default: all users)")
+    check.add_argument("--cycle-id", type=int, help="Only this cycle")
+    check.set_defaults(handler=check_summaries_command)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="Recompute daily rollups and their buckets from blocks and events")
+    rebuild.add_argument("--user-id", type=int, help="Only this user (default: all users)")
+    rebuild.set_defaults(handler=rebuild_rollups_command)
+
+    compact = commands.add_parser("compact-rollups", help="Fold changed daily rollups into week/month buckets")
+    compact.add_argument("--batch-size", type=int, help="Dirty days per transaction")
+    compact.set_defaults(handler=compact_rollups_command)
+
+    args = parser.parse_args(argv)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
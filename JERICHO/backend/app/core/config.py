@@ -1,16 +1,119 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
     # Database - SQLite for development, PostgreSQL for production
     database_url: str = "sqlite:///./jericho_dev.db"
     
+    # Connection pool (ignored for in-memory SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # PostgreSQL statement_timeout, 0 = off
+    
+    # SQLite pragmas applied on every new connection
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 268435456  # 256 MiB
+    sqlite_cache_size_kib: int = 65536
+    
     # Security
     jwt_secret: str = "your-super-secret-jwt-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expiration: int = 86400  # 24 hours
     
+    # Password hashing worker pool (0 workers = min(4, CPU count))
+    password_workers: int = 0
+    password_executor: str = "thread"  # thread, process
+    
+    # Authenticated-principal cache for get_current_user
+    principal_cache_size: int = 10000
+    principal_cache_ttl: int = 60  # seconds
+    
+    # Goal admission: CPU-bound contract checks fan out to a process pool
+    admission_workers: int = 0  # 0 = CPU count
+    admission_executor: str = "process"  # process, thread
+    admission_parallel_threshold: int = 64  # smaller batches are validated inline
+    admission_cache_size: int = 10000
+    
+    # Deterministic plans held in memory in front of the plan_cache table
+    plan_cache_size: int = 10000
+    
+    # Day keys are computed in the app time zone (mirrors src/state/time/time.ts)
+    app_time_zone: str = "America/Chicago"
+    
+    # Execution-event materializer: persist a cycle checkpoint every N new events
+    materializer_checkpoint_interval: int = 500
+    
+    # Execution-event ledger: record a verified Merkle checkpoint every N events per cycle
+    ledger_checkpoint_interval: int = 1024
+    
+    # Nightly rollover of overdue blocks to `missed`
+    rollover_enabled: bool = False  # run the in-process scheduler; otherwise use `python -m app.cli rollover`
+    rollover_chunk_size: int = 5000
+    rollover_workers: int = 4  # concurrent chunks (SQLite always uses 1)
+    rollover_delay_seconds: int = 300  # after app-time-zone midnight
+    
+    # Daily rollups: background compaction of changed days into week/month buckets
+    rollup_compaction_enabled: bool = False  # run in the API process; otherwise use `python -m app.cli compact-rollups`
+    rollup_compaction_interval_seconds: int = 300
+    rollup_compaction_batch_size: int = 5000  # dirty days per transaction
+    
+    # Server push of sync notifications (/api/sync/events, /api/sync/ws)
+    sync_push_backend: str = "auto"  # auto (postgres for PostgreSQL databases, else memory), memory, postgres
+    sync_push_channel: str = "jericho_sync"  # LISTEN/NOTIFY channel
+    sync_push_buffer_size: int = 32  # queued messages per connection before the oldest are dropped
+    sync_push_max_connections: int = 20000  # per process, 0 = unlimited
+    sync_push_heartbeat_seconds: float = 25.0  # SSE keep-alive comment interval
+    
+    # Sync wire formats (/api/sync/pull, /api/sync/push): MessagePack and gzip, negotiated per request
+    sync_compression_min_bytes: int = 1024  # smaller responses are sent uncompressed
+    sync_compression_level: int = 6  # gzip level, 1 (fastest) to 9 (smallest)
+    sync_max_body_bytes: int = 16 * 1024 * 1024  # decompressed request body limit
+    
+    # Request metrics (/metrics) and per-request database query accounting
+    metrics_enabled: bool = True
+    metrics_query_threshold: int = 20  # requests issuing more queries are flagged as query-heavy
+    
+    # Goal-success probability: completed-block evidence window, in workable days
+    probability_window_days: int = 7
+    
+    # App startup: import each API router on the first request under its prefix
+    lazy_routers: bool = False
+    
+    # Production server (python -m app.server): preforked uvicorn workers
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = CPU count
+    server_backlog: int = 2048
+    server_max_requests: int = 10000  # requests before a worker is recycled, 0 = never
+    server_max_requests_jitter: int = 1000  # random extra per worker, so they do not recycle together
+    server_max_memory_mb: int = 0  # recycle a worker whose RSS grows past this, 0 = never
+    server_memory_check_seconds: float = 10.0
+    server_graceful_timeout: int = 30  # seconds a draining worker waits for in-flight requests
+    
+    # Auth admission control: per-route concurrency gates and token-bucket rate limits
+    auth_concurrency_limits: Dict[str, int] = {  # requests running at once per process, 0 = ungated
+        "/api/auth/login": 8,
+        "/api/auth/register": 4,
+        "/api/auth/refresh": 32,
+    }
+    auth_queue_size: int = 32  # requests waiting per route; beyond this they get 503 at once
+    auth_queue_timeout_seconds: float = 1.0  # longest wait for a slot before 503
+    auth_retry_after_seconds: int = 1  # Retry-After on 503
+    auth_rate_limit_backend: str = "memory"  # memory (per process), database (shared by every worker)
+    auth_rate_limit_max_keys: int = 100000  # memory backend: least recently used buckets beyond this are dropped
+    auth_rate_limit_pool_size: int = 2  # database backend: connections of its own, apart from the app's pool
+    auth_rate_limit_timeout_seconds: float = 0.25  # database backend: wait for one before letting the request through
+    auth_ip_burst: int = 60  # per client IP across the auth routes, 0 = unlimited
+    auth_ip_per_minute: float = 300
+    auth_email_burst: int = 20  # per account for login and register, 0 = unlimited
+    auth_email_per_minute: float = 10
+    
     # CORS
     cors_origins: List[str] = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -21,4 +124,9 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+# Bound once per process when app.core.database builds its engines; set them through the environment
+DATABASE_SETTINGS = ("database_url",) + tuple(
+    name for name in Settings.model_fields if name.startswith(("db_", "sqlite_"))
+)
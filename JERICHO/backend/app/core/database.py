@@ -1,13 +1,112 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine, request_metrics
+
+# Async drivers for each sync URL scheme accepted by Settings.database_url
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite/asyncpg)"""
+    scheme, sep, rest = database_url.partition("://")
+    if not sep:
+        return database_url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def is_sqlite(database_url: str) -> bool:
+    return database_url.startswith("sqlite")
+
+
+def is_memory_sqlite(database_url: str) -> bool:
+    return is_sqlite(database_url) and (":memory:" in database_url or database_url.rstrip("/").endswith("sqlite:"))
+
+
+def engine_options(database_url: str, use_async: bool = False) -> dict:
+    """Pool and connect options for create_engine/create_async_engine"""
+    options = {}
+    connect_args = {}
+
+    if not is_memory_sqlite(database_url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+        if use_async and is_sqlite(database_url):
+            # aiosqlite defaults to NullPool, which spawns a connection thread per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+
+    if is_sqlite(database_url):
+        connect_args["check_same_thread"] = False
+        connect_args["timeout"] = settings.sqlite_busy_timeout_ms / 1000.0
+    elif settings.db_statement_timeout_ms:
+        if use_async:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    options["connect_args"] = connect_args
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection: WAL, sync level, busy timeout, mmap, cache"""
+    cursor = dbapi_connection.cursor()
+    try:
+        if not is_memory_sqlite(settings.database_url):
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}")
+    finally:
+        cursor.close()
+
+
+def pool_status(engine) -> dict:
+    """Live pool counters for /health (pools without counters report their class only)"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            status[name] = counter()
+    return status
+
 
 # Database engine
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {})
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+
+# Async engine on the same database, used by the request handlers
+async_engine = create_async_engine(
+    to_async_url(settings.database_url), **engine_options(settings.database_url, use_async=True)
+)
+
+if is_sqlite(settings.database_url):
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
 
-# Session factory
+if settings.metrics_enabled:
+    instrument_engine(engine, request_metrics)
+    instrument_engine(async_engine.sync_engine, request_metrics)
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
@@ -19,4 +118,15 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def dialect_insert(connection):
+    """The INSERT construct with ON CONFLICT support for a connection's (or engine's) dialect"""
+    return postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+
+
+async def get_async_db():
+    """Dependency to get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,231 @@
+"""
+Admission control: concurrency gates, token-bucket rate limits and load shedding.
+
+A ConcurrencyLimiter lets `limit` requests run at once and queues up to
+`queue_size` more for at most `timeout` seconds; anything beyond that is
+refused at once instead of piling up behind a saturated resource (bcrypt
+workers, database connections). Requests are gated before the endpoint runs,
+so a queued request holds no database connection or executor slot.
+
+A RateLimiter takes tokens from per-key buckets holding up to `burst` tokens
+and refilling at `per_minute`. Buckets live in a pluggable backend:
+MemoryRateLimitBackend keeps them in this process (bounded, least recently
+used keys are forgotten first; a bucket idle long enough to refill is full
+anyway), and the database backend in app.services.auth_limits shares them
+between workers and hosts.
+
+LoadSheddingMiddleware applies both to a set of paths: a per-client-IP rate
+limit (429) and then the path's gate (503), each with Retry-After.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from starlette.responses import JSONResponse
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Token bucket shape: `burst` requests at once, refilled at `per_minute`; burst 0 disables it"""
+    burst: int
+    per_minute: float
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class ConcurrencyLimiter:
+    """At most `limit` holders at once; up to `queue_size` more wait up to `timeout` seconds, in order"""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected = 0  # queue full
+        self.timed_out = 0  # queued, but no slot freed in time
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in line if needed; False when the request should be shed"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.queue_size or self.timeout <= 0:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # handed a slot just as we gave up: pass it on
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(exc, asyncio.TimeoutError):
+                self.timed_out += 1
+                return False
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """Free a slot, handing it straight to the longest-waiting request"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class MemoryRateLimitBackend:
+    """Token buckets in this process, keeping at most `max_keys` of them"""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: Limit, now: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens; 0 when granted, else seconds until enough have refilled"""
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + max(0.0, now - updated_at) * limit.per_second)
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / limit.per_second if limit.per_second > 0 else math.inf
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "keys": len(self._buckets)}
+
+
+class RateLimiter:
+    """Token-bucket rate limits over a backend; a failing backend lets requests through"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    async def hit(self, key: str, limit: Limit, cost: float = 1.0) -> float:
+        """Charge one request to `key`; 0 when allowed, else seconds the client should wait"""
+        if limit.burst <= 0:
+            return 0.0
+        try:
+            # Wall-clock time, so buckets shared between processes and hosts agree
+            retry_after = await self.backend.take(key, limit, time.time(), cost)
+        except Exception as exc:
+            self.errors += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return 0.0
+        if retry_after > 0:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            **self.backend.stats(),
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(min(seconds, 86400))))}
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware rate limiting and gating requests to the paths in `gates` (a None gate only rate limits)"""
+
+    def __init__(
+        self,
+        app,
+        gates: Dict[str, Optional[ConcurrencyLimiter]],
+        rate_limiter: Optional[RateLimiter] = None,
+        client_limit: Optional[Limit] = None,
+        retry_after_seconds: int = 1,
+    ):
+        self.app = app
+        self.gates = gates
+        self.rate_limiter = rate_limiter
+        self.client_limit = client_limit
+        self.retry_after_seconds = retry_after_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.gates:
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates[scope["path"]]
+
+        if self.rate_limiter is not None and self.client_limit is not None:
+            client = scope.get("client")
+            # One bucket per client across every gated path
+            retry_after = await self.rate_limiter.hit(f"ip:{client[0] if client else 'unknown'}", self.client_limit)
+            if retry_after > 0:
+                response = JSONResponse(
+                    {"detail": "Too many requests"}, status_code=429, headers=retry_after_header(retry_after)
+                )
+                await response(scope, receive, send)
+                return
+
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        if not await gate.acquire():
+            response = JSONResponse(
+                {"detail": "Server busy, retry later"},
+                status_code=503,
+                headers=retry_after_header(self.retry_after_seconds),
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,262 @@
+"""
+Request and database metrics, exposed in Prometheus text format at /metrics.
+
+MetricsMiddleware times every HTTP request and records, per method and route
+template (/api/goals/{goal_id}, never the raw path): a latency histogram,
+status-code counts and the number in flight. instrument_engine hooks an
+engine's before/after_cursor_execute events; queries issued while a request is
+being handled are counted against it (the request's stats travel in a
+ContextVar, which SQLAlchemy's async greenlets inherit), so each route also
+gets histograms of queries and database time per request.
+
+A request issuing more than `query_threshold` queries is counted in
+jericho_http_query_heavy_requests_total and kept, with its most repeated
+statement, in the recent list reported by /health: a lazy-loaded
+User.goals/cycles/blocks relationship inside a loop shows up there as one
+SELECT repeated once per row.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+UNMATCHED_ROUTE = "unmatched"
+RECENT_QUERY_HEAVY = 20
+MAX_STATEMENT_CHARS = 200
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestStats:
+    """Database work attributed to one in-flight request"""
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Per-route request metrics and process-wide query totals"""
+
+    def __init__(self, query_threshold: int = 20):
+        self.query_threshold = query_threshold
+        self._lock = threading.Lock()
+        self.requests: Dict[tuple, int] = {}
+        self.latency: Dict[tuple, Histogram] = {}
+        self.request_queries: Dict[tuple, Histogram] = {}
+        self.request_db_seconds: Dict[tuple, Histogram] = {}
+        self.in_flight: Dict[tuple, int] = {}
+        self.query_heavy: Dict[tuple, int] = {}
+        self.recent_query_heavy: deque = deque(maxlen=RECENT_QUERY_HEAVY)
+        self.queries_total = 0
+        self.query_seconds_total = 0.0
+
+    def start_request(self, method: str, route: str):
+        with self._lock:
+            self.in_flight[(method, route)] = self.in_flight.get((method, route), 0) + 1
+
+    def finish_request(self, method: str, route: str, path: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.in_flight[key] -= 1
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            for series, buckets, value in (
+                (self.latency, LATENCY_BUCKETS, seconds),
+                (self.request_queries, QUERY_COUNT_BUCKETS, stats.queries),
+                (self.request_db_seconds, LATENCY_BUCKETS, stats.db_seconds),
+            ):
+                histogram = series.get(key)
+                if histogram is None:
+                    histogram = series[key] = Histogram(buckets)
+                histogram.observe(value)
+            if stats.queries > self.query_threshold:
+                self.query_heavy[key] = self.query_heavy.get(key, 0) + 1
+                statement, repeats = stats.statements.most_common(1)[0]
+                self.recent_query_heavy.append({
+                    "method": method,
+                    "route": route,
+                    "path": path,
+                    "status": status,
+                    "queries": stats.queries,
+                    "db_ms": round(stats.db_seconds * 1000, 2),
+                    "duration_ms": round(seconds * 1000, 2),
+                    "top_statement": " ".join(statement.split())[:MAX_STATEMENT_CHARS],
+                    "top_statement_count": repeats,
+                })
+
+    def record_query(self, statement: str, seconds: float):
+        with self._lock:
+            self.queries_total += 1
+            self.query_seconds_total += seconds
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+            stats.statements[statement] += 1
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Prometheus text exposition (format 0.0.4) of every series, plus extra unlabelled gauges"""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histograms(name: str, help_text: str, series: Dict[tuple, Histogram]):
+            family(name, "histogram", help_text)
+            for key in sorted(series):
+                histogram = series[key]
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(('method', 'route', 'le'), (*key, le))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(('method', 'route'), key)} {_number(histogram.sum)}")
+                lines.append(f"{name}_count{_labels(('method', 'route'), key)} {histogram.count}")
+
+        with self._lock:
+            family("jericho_http_requests_total", "counter", "HTTP requests by method, route template and status.")
+            for key in sorted(self.requests):
+                lines.append(f"jericho_http_requests_total{_labels(('method', 'route', 'status'), key)} {self.requests[key]}")
+            family("jericho_http_requests_in_flight", "gauge", "HTTP requests being handled.")
+            for key in sorted(self.in_flight):
+                lines.append(f"jericho_http_requests_in_flight{_labels(('method', 'route'), key)} {self.in_flight[key]}")
+            histograms("jericho_http_request_duration_seconds", "HTTP request latency.", self.latency)
+            histograms("jericho_http_request_db_queries", "Database queries issued per HTTP request.", self.request_queries)
+            histograms("jericho_http_request_db_seconds", "Database time per HTTP request.", self.request_db_seconds)
+            family(
+                "jericho_http_query_heavy_requests_total", "counter",
+                f"HTTP requests issuing more than {self.query_threshold} database queries.",
+            )
+            for key in sorted(self.query_heavy):
+                lines.append(f"jericho_http_query_heavy_requests_total{_labels(('method', 'route'), key)} {self.query_heavy[key]}")
+            family("jericho_db_queries_total", "counter", "Database queries, including background jobs.")
+            lines.append(f"jericho_db_queries_total {self.queries_total}")
+            family("jericho_db_query_seconds_total", "counter", "Database time, including background jobs.")
+            lines.append(f"jericho_db_query_seconds_total {_number(self.query_seconds_total)}")
+
+        for name, value in (gauges or {}).items():
+            family(name, "gauge", name.replace("_", " ") + ".")
+            lines.append(f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": sum(self.requests.values()),
+                "in_flight": sum(self.in_flight.values()),
+                "db_queries": self.queries_total,
+                "query_threshold": self.query_threshold,
+                "query_heavy_requests": sum(self.query_heavy.values()),
+                "recent_query_heavy": list(self.recent_query_heavy),
+            }
+
+
+request_metrics = MetricsRegistry(query_threshold=settings.metrics_query_threshold)
+
+
+def route_template(scope) -> str:
+    """The path template of the route that will handle the request, or "unmatched" """
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording each HTTP request into a MetricsRegistry"""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+        self.registry.start_request(method, route)
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            current_request.reset(token)
+            self.registry.finish_request(
+                method, route, scope["path"], status, time.perf_counter() - started, stats
+            )
+
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def instrument_engine(engine, registry: MetricsRegistry):
+    """Count every query run on `engine` (pass async_engine.sync_engine for an async engine)"""
+
+    def query_finished(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            registry.record_query(statement, time.perf_counter() - started)
+
+    event.listen(engine, "before_cursor_execute", _query_started)
+    event.listen(engine, "after_cursor_execute", query_finished)
@@ -0,0 +1,245 @@
+"""
+MessagePack encoding for the sync wire format.
+
+packb/unpackb use the msgpack package when it is installed and fall back to
+the pure-Python codec below otherwise; both produce standard MessagePack, so
+any client library can read and write it. Values are encoded the way
+app.core.responses encodes JSON: datetimes and dates become ISO-8601 strings
+with a Z suffix, tuples become arrays. The fallback decoder also accepts the
+timestamp extension (type -1) some clients send for dates.
+"""
+
+import struct
+from datetime import date, datetime, time, timezone
+from typing import Any, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MessagePackError(ValueError):
+    """Malformed or unsupported MessagePack data"""
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+
+def _pack(value: Any, out: bytearray):
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -0x20 <= value < 0:
+            out.append(value & 0xFF)
+        elif value >= 0:
+            for limit, code, fmt in ((0xFF, 0xCC, ">B"), (0xFFFF, 0xCD, ">H"), (0xFFFFFFFF, 0xCE, ">I"),
+                                     (0xFFFFFFFFFFFFFFFF, 0xCF, ">Q")):
+                if value <= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, value)
+                    return
+            raise OverflowError("Integer too large for MessagePack")
+        else:
+            for limit, code, fmt in ((-0x80, 0xD0, ">b"), (-0x8000, 0xD1, ">h"), (-0x80000000, 0xD2, ">i"),
+                                     (-0x8000000000000000, 0xD3, ">q")):
+                if value >= limit:
+                    out.append(code)
+                    out += struct.pack(fmt, value)
+                    return
+            raise OverflowError("Integer too large for MessagePack")
+    elif isinstance(value, float):
+        out.append(0xCB)
+        out += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        size = len(data)
+        if size < 0x20:
+            out.append(0xA0 | size)
+        elif size <= 0xFF:
+            out += bytes((0xD9, size))
+        elif size <= 0xFFFF:
+            out.append(0xDA)
+            out += struct.pack(">H", size)
+        else:
+            out.append(0xDB)
+            out += struct.pack(">I", size)
+        out += data
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        size = len(data)
+        if size <= 0xFF:
+            out += bytes((0xC4, size))
+        elif size <= 0xFFFF:
+            out.append(0xC5)
+            out += struct.pack(">H", size)
+        else:
+            out.append(0xC6)
+            out += struct.pack(">I", size)
+        out += data
+    elif isinstance(value, (list, tuple)):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x90 | size)
+        elif size <= 0xFFFF:
+            out.append(0xDC)
+            out += struct.pack(">H", size)
+        else:
+            out.append(0xDD)
+            out += struct.pack(">I", size)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x80 | size)
+        elif size <= 0xFFFF:
+            out.append(0xDE)
+            out += struct.pack(">H", size)
+        else:
+            out.append(0xDF)
+            out += struct.pack(">I", size)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    else:
+        _pack(_default(value), out)
+
+
+# (struct format, size) for the fixed-width scalar type codes
+_SCALARS = {
+    0xCA: (">f", 4), 0xCB: (">d", 8),
+    0xCC: (">B", 1), 0xCD: (">H", 2), 0xCE: (">I", 4), 0xCF: (">Q", 8),
+    0xD0: (">b", 1), 0xD1: (">h", 2), 0xD2: (">i", 4), 0xD3: (">q", 8),
+}
+# type code -> (length prefix format, prefix size, kind)
+_SIZED = {
+    0xD9: (">B", 1, "str"), 0xDA: (">H", 2, "str"), 0xDB: (">I", 4, "str"),
+    0xC4: (">B", 1, "bin"), 0xC5: (">H", 2, "bin"), 0xC6: (">I", 4, "bin"),
+    0xDC: (">H", 2, "array"), 0xDD: (">I", 4, "array"),
+    0xDE: (">H", 2, "map"), 0xDF: (">I", 4, "map"),
+    0xC7: (">B", 1, "ext"), 0xC8: (">H", 2, "ext"), 0xC9: (">I", 4, "ext"),
+}
+_FIXEXT = {0xD4: 1, 0xD5: 2, 0xD6: 4, 0xD7: 8, 0xD8: 16}
+
+
+def _take(data: memoryview, offset: int, size: int) -> Tuple[memoryview, int]:
+    end = offset + size
+    if end > len(data):
+        raise MessagePackError("Truncated MessagePack data")
+    return data[offset:end], end
+
+
+def _ext(code: int, payload: memoryview) -> Any:
+    if code != -1:
+        raise MessagePackError(f"Unsupported MessagePack extension type {code}")
+    if len(payload) == 4:
+        seconds, nanoseconds = struct.unpack(">I", payload)[0], 0
+    elif len(payload) == 8:
+        value = struct.unpack(">Q", payload)[0]
+        seconds, nanoseconds = value & 0x3FFFFFFFF, value >> 34
+    elif len(payload) == 12:
+        nanoseconds, seconds = struct.unpack(">Iq", payload)
+    else:
+        raise MessagePackError("Malformed MessagePack timestamp")
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=nanoseconds // 1000)
+
+
+def _unpack(data: memoryview, offset: int) -> Tuple[Any, int]:
+    if offset >= len(data):
+        raise MessagePackError("Truncated MessagePack data")
+    code = data[offset]
+    offset += 1
+    if code < 0x80:
+        return code, offset
+    if code >= 0xE0:
+        return code - 0x100, offset
+    if 0xA0 <= code <= 0xBF:
+        raw, offset = _take(data, offset, code & 0x1F)
+        return str(raw, "utf-8"), offset
+    if 0x90 <= code <= 0x9F:
+        return _unpack_array(data, offset, code & 0x0F)
+    if 0x80 <= code <= 0x8F:
+        return _unpack_map(data, offset, code & 0x0F)
+    if code == 0xC0:
+        return None, offset
+    if code in (0xC2, 0xC3):
+        return code == 0xC3, offset
+    if code in _SCALARS:
+        fmt, size = _SCALARS[code]
+        raw, offset = _take(data, offset, size)
+        return struct.unpack(fmt, raw)[0], offset
+    if code in _SIZED:
+        fmt, prefix, kind = _SIZED[code]
+        raw, offset = _take(data, offset, prefix)
+        size = struct.unpack(fmt, raw)[0]
+        if kind == "array":
+            return _unpack_array(data, offset, size)
+        if kind == "map":
+            return _unpack_map(data, offset, size)
+        if kind == "ext":
+            raw, offset = _take(data, offset, 1)
+            ext_code = struct.unpack(">b", raw)[0]
+            payload, offset = _take(data, offset, size)
+            return _ext(ext_code, payload), offset
+        raw, offset = _take(data, offset, size)
+        return (str(raw, "utf-8") if kind == "str" else bytes(raw)), offset
+    if code in _FIXEXT:
+        raw, offset = _take(data, offset, 1)
+        payload, offset = _take(data, offset, _FIXEXT[code])
+        return _ext(struct.unpack(">b", raw)[0], payload), offset
+    raise MessagePackError(f"Invalid MessagePack type code 0x{code:02x}")
+
+
+def _unpack_array(data: memoryview, offset: int, size: int) -> Tuple[list, int]:
+    items = []
+    for _ in range(size):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data: memoryview, offset: int, size: int) -> Tuple[dict, int]:
+    items = {}
+    for _ in range(size):
+        key, offset = _unpack(data, offset)
+        value, offset = _unpack(data, offset)
+        try:
+            items[key] = value
+        except TypeError:
+            raise MessagePackError("Unhashable MessagePack map key") from None
+    return items, offset
+
+
+def packb(value: Any) -> bytes:
+    """Encode value as MessagePack"""
+    if msgpack is not None:
+        return msgpack.packb(value, default=_default, use_bin_type=True, datetime=False)
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode one MessagePack value; raises MessagePackError on malformed input"""
+    if msgpack is not None:
+        try:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False, timestamp=3)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as exc:
+            raise MessagePackError(str(exc)) from exc
+    try:
+        value, offset = _unpack(memoryview(data), 0)
+    except (UnicodeDecodeError, RecursionError, OverflowError, OSError) as exc:
+        raise MessagePackError(str(exc)) from exc
+    if offset != len(data):
+        raise MessagePackError("Extra data after MessagePack value")
+    return value
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.user import User
+
+# Columns whose change drops the user's cache entry
+INVALIDATING_FIELDS = ("is_active", "password_hash")
+
+# Authenticated principals keyed by user id
+principal_cache = LRUCache(maxsize=settings.principal_cache_size, ttl=settings.principal_cache_ttl)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of an authenticated user; not an ORM object, so it never touches a session"""
+    id: int
+    email: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id, email=user.email, is_active=user.is_active,
+            created_at=user.created_at, updated_at=user.updated_at,
+        )
+
+
+def cache_principal(user: User) -> Principal:
+    """Snapshot a loaded user into the principal cache"""
+    principal = Principal.from_user(user)
+    principal_cache.set(principal.id, principal)
+    return principal
+
+
+def get_cached_principal(user_id: int) -> Optional[Principal]:
+    """Return the cached principal, or None"""
+    return principal_cache.get(user_id)
+
+
+def invalidate_principal(user_id: int):
+    """Drop a user from the principal cache (use after bulk UPDATEs on users)"""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session, flush_context):
+    """Remember users whose active flag or password changed, or who were deleted, until commit"""
+    changed = session.info.setdefault("changed_principals", set())
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[field].history.has_changes() for field in INVALIDATING_FIELDS):
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session):
+    # Only once committed: invalidating at flush lets a concurrent request re-cache the old row for a full TTL
+    for user_id in session.info.pop("changed_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_principals(session):
+    session.info.pop("changed_principals", None)
+
+
+@event.listens_for(User.__table__, "after_drop")
+def _clear_principals_on_drop(target, connection, **kw):
+    """Ids are reused after the users table is recreated"""
+    principal_cache.clear()
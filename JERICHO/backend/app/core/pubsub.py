@@ -0,0 +1,362 @@
+"""
+In-process publish/subscribe hub for server push.
+
+A PubSubHub keeps, per key, the set of local Subscriptions (one per open
+WebSocket or SSE stream). Publishing goes through a pluggable backend:
+MemoryBackend hands messages straight to this process's subscribers, and
+PostgresNotifyBackend sends them with pg_notify and delivers whatever its
+LISTEN connection receives, so every API process sees every message.
+
+Each Subscription buffers at most `maxsize` messages. A consumer that falls
+behind loses its oldest messages and is handed a single RESYNC message before
+the rest, telling it to catch up from its own cursor instead. An idle
+subscription is a small slotted object with no task or timer of its own.
+Listeners (add_listener) see every message this process receives, whether or
+not a connection here subscribes to its key.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+RESYNC = {"type": "resync"}
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class Subscription:
+    """A bounded message buffer for one connection, bound to the event loop that created it"""
+
+    __slots__ = (
+        "hub", "key", "maxsize", "on_ready", "expires_at", "dropped", "_loop", "_buffer", "_waiter", "_overflowed",
+        "closed",
+    )
+
+    def __init__(self, hub: "PubSubHub", key: Hashable, maxsize: int, on_ready: Optional[Callable[[], None]] = None):
+        self.hub = hub
+        self.key = key
+        self.maxsize = maxsize
+        self.on_ready = on_ready
+        self.expires_at: Optional[float] = None  # Unix time the connection's credentials run out
+        self.dropped = 0
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._buffer: Optional[deque] = None  # allocated on the first message
+        self._waiter: Optional[asyncio.Future] = None
+        self._overflowed = False
+
+    def deliver(self, message: Any):
+        """Queue a message; safe to call from any thread"""
+        if _running_loop() is self._loop:
+            self._put(message)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Any):
+        if self.closed:
+            return
+        if self._buffer is None:
+            self._buffer = deque()
+        elif len(self._buffer) >= self.maxsize:
+            self._buffer.popleft()
+            self._overflowed = True
+            self.dropped += 1
+            self.hub.dropped += 1
+        self._buffer.append(message)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def seconds_left(self) -> Optional[float]:
+        """Seconds until expires_at (0 once passed), or None when the subscription does not expire"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def pending(self) -> bool:
+        return self._overflowed or bool(self._buffer)
+
+    def get_nowait(self) -> Optional[Any]:
+        """The next message, or None when the buffer is empty"""
+        if self._overflowed:
+            self._overflowed = False
+            self.hub.resyncs += 1
+            return RESYNC
+        if self._buffer:
+            message = self._buffer.popleft()
+            if not self._buffer:
+                self._buffer = None  # idle subscriptions hold no buffer
+            return message
+        return None
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Wait for the next message; None after `timeout` seconds without one"""
+        message = self.get_nowait()
+        if message is not None or self.closed:
+            return message
+        self._waiter = self._loop.create_future()
+        timer = self._loop.call_later(timeout, self._wake) if timeout is not None else None
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+            if timer is not None:
+                timer.cancel()
+        return self.get_nowait()
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def close(self):
+        """Stop receiving and release any waiting get()"""
+        if not self.closed:
+            self.closed = True
+            self.hub._remove(self)
+            self._wake()
+
+
+class MemoryBackend:
+    """Delivers published messages to this process's subscribers only"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.hub: Optional["PubSubHub"] = None
+
+    async def start(self, hub: "PubSubHub"):
+        self.hub = hub
+
+    async def stop(self):
+        pass
+
+    def publish(self, key: Hashable, message: Any):
+        self.hub.deliver(key, message)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class PostgresNotifyBackend:
+    """Fans messages out to every process through PostgreSQL NOTIFY on one channel.
+
+    One asyncpg connection LISTENs and sends the queued notifications in
+    batches. Messages of the same type for the same key published between two
+    batches are coalesced when `coalesce` is set (only the newest is sent), so
+    a changes message never displaces a revoke. After the
+    connection is lost and re-established, every local subscriber is sent
+    RESYNC, since notifications sent in between were missed.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str, coalesce: bool = True, retry_seconds: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.coalesce = coalesce
+        self.retry_seconds = retry_seconds
+        self.hub: Optional["PubSubHub"] = None
+        self.connected = False
+        self.notified = 0
+        self.received = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._outbox: Dict[Any, tuple] = {}
+        self._sequence = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._closing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, hub: "PubSubHub"):
+        self.hub = hub
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._closing = False
+        if self._task is None:
+            self._task = self._loop.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0):
+        """Send what is still queued (waiting up to `timeout` seconds), then disconnect"""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+
+    def publish(self, key: Hashable, message: Any):
+        """Queue a notification; safe to call from any thread"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if _running_loop() is self._loop:
+            self._enqueue(key, message)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, key, message)
+
+    def _enqueue(self, key: Hashable, message: Any):
+        slot = (key, message.get("type") if isinstance(message, dict) else None)
+        if not self.coalesce:
+            self._sequence += 1
+            slot = (key, self._sequence)
+        self._outbox.pop(slot, None)
+        self._outbox[slot] = (key, message)
+        self._wake.set()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.received += 1
+        data = json.loads(payload)
+        self.hub.deliver(data["key"], data["message"])
+
+    async def _run(self):
+        import asyncpg
+
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: (lost.set(), self._wake.set()))
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                if not first:
+                    self.reconnects += 1
+                    self.hub.deliver_all(RESYNC)
+                first = False
+                while not lost.is_set():
+                    await self._wake.wait()
+                    self._wake.clear()
+                    batch, self._outbox = self._outbox, {}
+                    if batch:
+                        await connection.executemany("SELECT pg_notify($1, $2)", [
+                            (self.channel, json.dumps({"key": key, "message": message}))
+                            for key, message in batch.values()
+                        ])
+                        self.notified += len(batch)
+                    if self._closing:
+                        return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "channel": self.channel,
+            "connected": self.connected,
+            "notified": self.notified,
+            "received": self.received,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+
+class PubSubHub:
+    """Per-key subscriber sets in front of a publish backend"""
+
+    def __init__(self, backend=None, buffer_size: int = 32, max_connections: int = 0):
+        self.backend = backend or MemoryBackend()
+        self.backend.hub = self
+        self.buffer_size = buffer_size
+        self.max_connections = max_connections
+        self._subscribers: Dict[Hashable, Set[Subscription]] = {}
+        self._listeners: List[Callable[[Optional[Hashable], Any], None]] = []
+        self.connections = 0
+        self.peak_connections = 0
+        self.rejected = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    async def start(self):
+        await self.backend.start(self)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def at_capacity(self) -> bool:
+        return bool(self.max_connections) and self.connections >= self.max_connections
+
+    def subscribe(self, key: Hashable, on_ready: Optional[Callable[[], None]] = None) -> Optional[Subscription]:
+        """Open a subscription to `key`, or return None when the hub is at max_connections"""
+        if self.at_capacity():
+            self.rejected += 1
+            return None
+        subscription = Subscription(self, key, self.buffer_size, on_ready)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        self.connections += 1
+        self.peak_connections = max(self.peak_connections, self.connections)
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.key)
+        if subscribers is not None and subscription in subscribers:
+            subscribers.discard(subscription)
+            self.connections -= 1
+            if not subscribers:
+                del self._subscribers[subscription.key]
+
+    def publish(self, key: Hashable, message: Any):
+        """Send a message to every subscriber of `key` in every process sharing the backend"""
+        self.published += 1
+        self.backend.publish(key, message)
+
+    def add_listener(self, listener: Callable[[Optional[Hashable], Any], None]):
+        """Call listener(key, message) for every message received here; key is None for deliver_all"""
+        self._listeners.append(listener)
+
+    def deliver(self, key: Hashable, message: Any):
+        """Hand a message to this process's listeners and subscribers of `key`"""
+        for listener in self._listeners:
+            listener(key, message)
+        self._fan_out(key, message)
+
+    def deliver_all(self, message: Any):
+        for listener in self._listeners:
+            listener(None, message)
+        for key in tuple(self._subscribers):
+            self._fan_out(key, message)
+
+    def _fan_out(self, key: Hashable, message: Any):
+        for subscription in tuple(self._subscribers.get(key, ())):
+            subscription.deliver(message)
+            self.delivered += 1
+
+    def close_all(self) -> int:
+        """Close every subscription, ending their streams, and return how many were open"""
+        subscriptions = [subscription for subscribers in self._subscribers.values() for subscription in subscribers]
+        for subscription in subscriptions:
+            subscription.close()
+        return len(subscriptions)
+
+    def stats(self) -> dict:
+        return {
+            **self.backend.stats(),
+            "connections": self.connections,
+            "peak_connections": self.peak_connections,
+            "keys": len(self._subscribers),
+            "rejected": self.rejected,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs,
+        }
@@ -0,0 +1,79 @@
+"""
+JSON response rendering.
+
+FastJSONResponse is the app's default response class: it renders with orjson
+when installed and falls back to the standard library otherwise.
+
+For large payloads, row_dicts/dump_rows skip FastAPI's per-object
+validate-and-dump step. Rows loaded from the database already satisfy response
+schemas that mirror their columns, so the schema's fields are read straight
+from each instance's loaded state and encoded in one pass. The result is sent
+as a PreparedJSONResponse.
+"""
+
+import json
+import operator
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Any, Iterable, List, Type
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def _default(value: Any):
+    """Encode the non-JSON types ORM rows carry, in the same format as pydantic"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PreparedJSONResponse(Response):
+    """Response whose body is already encoded JSON"""
+    media_type = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _field_getter(schema: Type[BaseModel]):
+    fields = tuple(schema.model_fields)
+    getter = operator.itemgetter(*fields) if len(fields) > 1 else (lambda values: (values[fields[0]],))
+    return fields, getter
+
+
+def row_dicts(schema: Type[BaseModel], rows: Iterable[Any]) -> List[dict]:
+    """Plain dicts of `schema`'s fields for ORM instances loaded from the database"""
+    fields, getter = _field_getter(schema)
+    data = []
+    for row in rows:
+        try:
+            data.append(dict(zip(fields, getter(row.__dict__))))
+        except KeyError:
+            # Expired or deferred attribute: let pydantic load and validate it
+            data.append(schema.model_validate(row).model_dump(mode="json"))
+    return data
+
+
+def dump_rows(schema: Type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """Encode ORM instances as a JSON array of `schema` objects"""
+    return dumps(row_dicts(schema, rows))
@@ -0,0 +1,67 @@
+"""
+Deferred router registration.
+
+LazyRouter stands in for `app.include_router(module.router, prefix=...)` until
+the first HTTP or WebSocket request under its prefix: it then imports the
+router module, includes its routes on the app and steps aside, so a worker
+can start serving before every endpoint module (and the schemas, services and
+models behind it) has been imported. Starlette's router keeps iterating its
+route list after the placeholder declines the match, so that first request is
+routed to the routes appended for it.
+
+The OpenAPI schema is built from the registered routes; load_lazy_routers
+includes everything still pending before it is generated.
+"""
+
+import importlib
+import threading
+from typing import List, Optional
+
+from fastapi import FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+
+
+class LazyRouter(BaseRoute):
+    """Placeholder route that includes `module.router` under `prefix` on first use"""
+
+    def __init__(self, app: FastAPI, module: str, prefix: str, tags: Optional[List[str]] = None):
+        self.app = app
+        self.module = module
+        self.prefix = prefix
+        self.tags = tags
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.loaded:
+                return
+            router = importlib.import_module(self.module).router
+            self.app.include_router(router, prefix=self.prefix, tags=self.tags)
+            self.app.openapi_schema = None
+            self.loaded = True
+
+    def matches(self, scope):
+        if not self.loaded and scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                self.load()
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params):
+        self.load()
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope, receive, send):
+        raise RuntimeError("LazyRouter never matches a request")
+
+    def __repr__(self) -> str:
+        return f"LazyRouter(module={self.module!r}, prefix={self.prefix!r}, loaded={self.loaded})"
+
+
+def load_lazy_routers(app: FastAPI) -> int:
+    """Include every pending lazy router and return how many were loaded"""
+    pending = [route for route in app.router.routes if isinstance(route, LazyRouter) and not route.loaded]
+    for route in pending:
+        route.load()
+    return len(pending)
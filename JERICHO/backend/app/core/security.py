@@ -1,9 +1,11 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.workers import WorkerPool
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -19,6 +21,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordWorkerPool(WorkerPool):
+    """Worker pool for bcrypt work. Threads are the default since bcrypt
+    releases the GIL while hashing."""
+    thread_name_prefix = "password"
+
+
+password_pool = PasswordWorkerPool(
+    max_workers=settings.password_workers or min(4, os.cpu_count() or 1),
+    use_processes=settings.password_executor == "process",
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password worker pool"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash on the password worker pool"""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -32,13 +56,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return user_id"""
+def decode_token(token: str) -> Optional[dict]:
+    """Verify JWT token and return its claims"""
     try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-        return str(user_id)
+        return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return user_id"""
+    payload = decode_token(token)
+    user_id = payload.get("sub") if payload else None
+    if user_id is None:
+        return None
+    return str(user_id)
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Day-key and ISO helpers mirroring src/state/time/time.ts"""
+
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+APP_TIME_ZONE = ZoneInfo(settings.app_time_zone)
+
+# Weekday numbers by three-letter name: Sunday = 0 as Date.getDay(), or Monday = 0 as date.weekday()
+SUNDAY_FIRST_WEEKDAYS = {"sun": 0, "mon": 1, "tue": 2, "wed": 3, "thu": 4, "fri": 5, "sat": 6}
+MONDAY_FIRST_WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+
+def parse_iso(iso: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp (including the trailing `Z` form); None if invalid"""
+    if not iso:
+        return None
+    try:
+        parsed = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def to_iso(moment: datetime) -> str:
+    """Format like JavaScript's Date.toISOString(): UTC, millisecond precision, `Z`"""
+    moment = moment.astimezone(timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def day_key_from_date(moment: datetime, tz: ZoneInfo = APP_TIME_ZONE) -> str:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(tz).strftime("%Y-%m-%d")
+
+
+def day_key_from_iso(iso: Optional[str], tz: ZoneInfo = APP_TIME_ZONE) -> str:
+    """YYYY-MM-DD of an ISO timestamp in the app time zone ('' if invalid)"""
+    moment = parse_iso(iso)
+    return day_key_from_date(moment, tz) if moment else ""
+
+
+def now_day_key(tz: ZoneInfo = APP_TIME_ZONE) -> str:
+    return day_key_from_date(datetime.now(timezone.utc), tz)
@@ -0,0 +1,175 @@
+"""
+Negotiated wire formats for sync: JSON or MessagePack, optionally gzipped.
+
+Responses: `Accept: application/msgpack` selects MessagePack (JSON otherwise)
+and `Accept-Encoding: gzip` compresses bodies of at least
+sync_compression_min_bytes; smaller ones are not worth the CPU or the gzip
+header. Negotiated responses carry `Vary: Accept, Accept-Encoding`. Sync ETags
+are weak, so one tag validates every representation of a page.
+
+Requests: `Content-Type: application/msgpack` bodies are decoded as
+MessagePack and `Content-Encoding: gzip` bodies are decompressed as they
+stream in, never holding more than sync_max_body_bytes of decompressed data.
+
+WireRoute applies both to every endpoint of a router: request bodies are
+decoded before FastAPI validates them, and JSON responses built by FastAPI
+are re-encoded when the client asked for something else. Endpoints with large
+bodies build them with negotiated_response directly to encode only once.
+"""
+
+import gzip
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.msgpack_codec import MessagePackError, packb, unpackb
+from app.core.responses import dumps
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+VARY = "Accept, Accept-Encoding"
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+def _accepts(header: str, token: str) -> bool:
+    """Whether a comma-separated Accept-style header lists `token` with a non-zero q"""
+    for part in header.split(","):
+        value, _, params = part.partition(";")
+        if value.strip().lower() != token:
+            continue
+        for param in params.split(";"):
+            name, _, q = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(q) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def response_media_type(request: Request) -> str:
+    accept = request.headers.get("accept", "").lower()
+    return MSGPACK if any(_accepts(accept, media_type) for media_type in MSGPACK_TYPES) else JSON
+
+
+def accepts_gzip(request: Request) -> bool:
+    return _accepts(request.headers.get("accept-encoding", "").lower(), "gzip")
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    return packb(content) if media_type == MSGPACK else dumps(content)
+
+
+def negotiated_response(
+    request: Request, content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Encode content in the format the request accepts, gzipping large bodies when allowed"""
+    media_type = response_media_type(request)
+    return compress_response(request, Response(encode(content, media_type), status_code, headers, media_type))
+
+
+def compress_response(request: Request, response: Response) -> Response:
+    """Gzip a response body of at least sync_compression_min_bytes when the client accepts it"""
+    response.headers["Vary"] = VARY
+    body = response.body
+    if len(body) >= settings.sync_compression_min_bytes and accepts_gzip(request):
+        response.body = gzip.compress(body, compresslevel=settings.sync_compression_level, mtime=0)
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers["Content-Length"] = str(len(response.body))
+    return response
+
+
+def _too_large():
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body exceeds {settings.sync_max_body_bytes} bytes",
+    )
+
+
+class WireRequest(Request):
+    """Request whose body is decompressed while it streams in and decoded by its Content-Type"""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            limit = settings.sync_max_body_bytes
+            encoding = self.headers.get("content-encoding", "identity").strip().lower()
+            if encoding not in ("identity", "gzip", "x-gzip"):
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail=f"Unsupported Content-Encoding: {encoding}",
+                )
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding != "identity" else None
+            chunks, size = [], 0
+            try:
+                async for chunk in self.stream():
+                    if decompressor is not None:
+                        # Cap each step's output, so a small bomb cannot inflate past the limit in one call
+                        chunk = decompressor.decompress(chunk, limit - size + 1)
+                        while True:
+                            size += len(chunk)
+                            if size > limit:
+                                raise _too_large()
+                            chunks.append(chunk)
+                            if not decompressor.unconsumed_tail:
+                                break
+                            chunk = decompressor.decompress(decompressor.unconsumed_tail, limit - size + 1)
+                    else:
+                        size += len(chunk)
+                        if size > limit:
+                            raise _too_large()
+                        chunks.append(chunk)
+                if decompressor is not None and not decompressor.eof and size:
+                    raise zlib.error("incomplete gzip stream")
+            except zlib.error as exc:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed gzip body") from exc
+            self._body = b"".join(chunks)
+        return self._body
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            if self.scope.get("wire.content_type") == MSGPACK:
+                try:
+                    self._json = unpackb(body)
+                except MessagePackError as exc:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed MessagePack body: {exc}"
+                    ) from exc
+            else:
+                self._json = json.loads(body)
+        return self._json
+
+
+class WireRoute(APIRoute):
+    """Route accepting gzip/MessagePack request bodies and negotiating its responses"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def wire_handler(request: Request) -> Response:
+            scope = request.scope
+            if _media_type(request.headers.get("content-type", "")) in MSGPACK_TYPES:
+                # FastAPI only parses bodies it recognises as JSON; WireRequest.json() decodes MessagePack
+                headers = [(name, value) for name, value in scope["headers"] if name != b"content-type"]
+                scope = {**scope, "headers": headers + [(b"content-type", JSON.encode())], "wire.content_type": MSGPACK}
+            response = await handler(WireRequest(scope, request.receive))
+            if "vary" in response.headers or not hasattr(response, "body"):
+                return response  # already negotiated, or streamed
+            if response.media_type == JSON and response_media_type(request) == MSGPACK and response.body:
+                converted = Response(packb(json.loads(response.body)), response.status_code, media_type=MSGPACK)
+                for name, value in response.headers.items():
+                    if name not in ("content-length", "content-type"):
+                        converted.headers[name] = value
+                response = converted
+            return compress_response(request, response)
+
+        return wire_handler
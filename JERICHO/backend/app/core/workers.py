@@ -0,0 +1,93 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Set
+
+
+# Pools whose executor has been started, for shutdown_worker_pools
+_running: Set["WorkerPool"] = set()
+
+
+class WorkerPool:
+    """Bounded executor that keeps blocking work off the event loop.
+
+    At most ``max_workers`` jobs are handed to the executor at once; further
+    callers wait on a semaphore, which is what queue depth and wait time measure.
+    Use processes for pure-Python CPU work that holds the GIL.
+    """
+    thread_name_prefix = "worker"
+
+    def __init__(self, max_workers: int, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix)
+            _running.add(self)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop they first wait on, so keep one per loop
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._slots
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool once a worker slot is free"""
+        slots = self._get_slots()
+        queued_at = time.perf_counter()
+        self.queue_depth += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        waited = time.perf_counter() - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            slots.release()
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time metrics for health/metrics endpoints"""
+        started = self.completed + self.in_flight
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "wait_ms_avg": round(self.wait_seconds_total / started * 1000.0, 3) if started else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000.0, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        _running.discard(self)
+
+
+def shutdown_worker_pools():
+    """Shut down every pool that has started its executor"""
+    for pool in list(_running):
+        pool.shutdown()
@@ -0,0 +1,40 @@
+import json
+
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import TypeDecorator
+
+
+class JSONPayload(TypeDecorator):
+    """JSON payload column: JSONB on PostgreSQL, JSON1 text elsewhere.
+
+    Accepts dicts/lists or JSON strings (the format the columns held as Text)
+    and returns decoded values.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB(none_as_null=True))
+        return dialect.type_descriptor(JSON(none_as_null=True))
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return json.loads(value) if value else None
+        return value
+
+
+class dialect_sql(ColumnElement):
+    """Raw SQL chosen per dialect, for generated-column expressions"""
+    inherit_cache = False
+
+    def __init__(self, **by_dialect: str):
+        self.by_dialect = by_dialect
+
+
+@compiles(dialect_sql)
+def _compile_dialect_sql(element, compiler, **kw):
+    return element.by_dialect[compiler.dialect.name]
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+import hashlib
+import json
+
+from sqlalchemy import Column, Computed, Integer, BigInteger, Float, String, DateTime, Boolean, Text, ForeignKey, Index, case, event, select, inspect
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, Session
 
-from app.core.database import Base
+from app.core.database import Base, dialect_insert
+from app.models.types import JSONPayload, dialect_sql
 
 
 class User(Base):
@@ -31,8 +35,26 @@ class Goal(Base):
     title = Column(String, nullable=False)
     
     # Store complete goal contract as JSON (mirrors frontend structure)
-    goal_execution_contract = Column(Text)  # JSON string
-    goal_governance_contract = Column(Text)  # JSON string
+    goal_execution_contract = Column(JSONPayload)
+    goal_governance_contract = Column(JSONPayload)
+    
+    # Contract fields extracted by the database so deadline filters use an index
+    deadline_day_key = Column(String, Computed(dialect_sql(
+        sqlite="json_extract(goal_execution_contract, '$.deadline.dayKey')",
+        postgresql="(goal_execution_contract #>> '{deadline,dayKey}')",
+    )))
+    deadline_type = Column(String, Computed(dialect_sql(
+        sqlite=(
+            "coalesce(json_extract(goal_execution_contract, '$.deadlineType'), "
+            "CASE json_extract(goal_execution_contract, '$.deadline.isHardDeadline') "
+            "WHEN 1 THEN 'HARD' WHEN 0 THEN 'SOFT' END)"
+        ),
+        postgresql=(
+            "coalesce(goal_execution_contract ->> 'deadlineType', "
+            "CASE goal_execution_contract #>> '{deadline,isHardDeadline}' "
+            "WHEN 'true' THEN 'HARD' WHEN 'false' THEN 'SOFT' END)"
+        ),
+    )))
     admission_status = Column(String, default="pending")  # pending, admitted, rejected
     admission_reason = Column(Text)  # Reason for rejection if any
     
@@ -41,6 +63,9 @@ class Goal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     is_active = Column(Boolean, default=True)
     
+    # Per-user change sequence for incremental sync
+    sync_seq = Column(BigInteger, nullable=False, default=0)
+    
     # Relationships
     user = relationship("User", back_populates="goals")
     cycles = relationship("Cycle", back_populates="goal")
@@ -61,7 +86,10 @@ class Cycle(Base):
     ended_at = Column(DateTime(timezone=True))
     
     # Store complete cycle state as JSON (mirrors frontend cycle data)
-    cycle_data = Column(Text)  # JSON string with all cycle state
+    cycle_data = Column(JSONPayload)  # all cycle state
+    
+    # Per-user change sequence for incremental sync
+    sync_seq = Column(BigInteger, nullable=False, default=0)
     
     # Relationships
     user = relationship("User", back_populates="cycles")
@@ -85,15 +113,18 @@ class Block(Base):
     duration_minutes = Column(Integer, nullable=False)
     
     # Block status and execution
-    status = Column(String, default="scheduled")  # scheduled, started, completed, skipped
+    status = Column(String, default="scheduled")  # scheduled, started, completed, skipped, missed
     start_iso = Column(String)  # ISO timestamp when block started
     completion_iso = Column(String)  # ISO timestamp when block completed
     
     # Block metadata
-    block_data = Column(Text)  # JSON string with additional block properties
+    block_data = Column(JSONPayload)  # additional block properties
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Per-user change sequence for incremental sync
+    sync_seq = Column(BigInteger, nullable=False, default=0)
+    
     # Relationships
     user = relationship("User", back_populates="blocks")
     goal = relationship("Goal", back_populates="blocks")
@@ -111,10 +142,547 @@ class ExecutionEvent(Base):
     # Event data
     event_type = Column(String, nullable=False)  # BLOCK_STARTED, BLOCK_COMPLETED, etc.
     block_id = Column(Integer, ForeignKey("blocks.id"), nullable=False, index=True)
-    event_data = Column(Text)  # JSON string with complete event data
+    event_data = Column(JSONPayload)  # complete event data
     
     # Immutable timestamp
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Event hash for integrity verification
-    event_hash = Column(String, nullable=False, index=True)
\ No newline at end of file
+    event_hash = Column(String, nullable=False, index=True)
+    
+    # Per-cycle hash chain: sha256(previous chain_hash | event_hash), in id order
+    chain_hash = Column(String(64), nullable=False)
+    
+    # Per-user change sequence for incremental sync
+    sync_seq = Column(BigInteger, nullable=False, default=0)
+
+
+# Block listings: keyset pages over (day_key, id), optionally within one cycle
+Index("ix_blocks_user_day_id", Block.user_id, Block.day_key, Block.id)
+Index("ix_blocks_user_cycle_day_id", Block.user_id, Block.cycle_id, Block.day_key, Block.id)
+# Status views ("completed blocks this week"); INCLUDE makes minute totals index-only on PostgreSQL
+Index(
+    "ix_blocks_user_status_day", Block.user_id, Block.status, Block.day_key,
+    postgresql_include=["cycle_id", "duration_minutes"],
+)
+
+Index("ix_goals_user_deadline", Goal.user_id, Goal.deadline_type, Goal.deadline_day_key)
+
+# Containment (@>) queries on PostgreSQL; event payloads are left unindexed to keep ingest cheap
+for _column in (Goal.goal_execution_contract, Goal.goal_governance_contract, Cycle.cycle_data, Block.block_data):
+    Index(
+        f"ix_{_column.table.name}_{_column.key}_gin", _column,
+        postgresql_using="gin", postgresql_ops={_column.key: "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql")
+
+# Chain tails and ledger verification walk a cycle's events in id order
+Index("ix_execution_events_cycle_id_id", ExecutionEvent.cycle_id, ExecutionEvent.id)
+# A cycle's events over a time range
+Index("ix_execution_events_cycle_timestamp", ExecutionEvent.cycle_id, ExecutionEvent.timestamp)
+# Push dedup probe; unique, so the database refuses a duplicate even from a writer that skipped the probe
+Index("ix_execution_events_user_event_hash", ExecutionEvent.user_id, ExecutionEvent.event_hash, unique=True)
+
+
+# Sync cursors: rows changed after a client's cursor are found through these
+for _model in (Goal, Cycle, Block, ExecutionEvent):
+    Index(f"ix_{_model.__tablename__}_user_sync_seq", _model.user_id, _model.sync_seq)
+
+
+class UserSyncState(Base):
+    """Per-user change counter backing the sync cursor"""
+    __tablename__ = "user_sync_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+
+
+class CycleProjectionCheckpoint(Base):
+    """Persisted materializer state for a cycle, covering events up to last_event_id"""
+    __tablename__ = "cycle_projection_checkpoints"
+
+    cycle_id = Column(Integer, ForeignKey("cycles.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    last_event_id = Column(Integer, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+    state = Column(Text, nullable=False)  # JSON string with folded block state
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class LedgerCheckpoint(Base):
+    """Verified point in a cycle's event chain, with the Merkle root of the segment it closes"""
+    __tablename__ = "ledger_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cycle_id = Column(Integer, ForeignKey("cycles.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    last_event_id = Column(Integer, nullable=False)
+    event_count = Column(Integer, nullable=False)  # events covered from the start of the cycle
+    chain_hash = Column(String(64), nullable=False)  # chain_hash of last_event_id
+    merkle_root = Column(String(64), nullable=False)  # over event hashes since the previous checkpoint
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_ledger_checkpoints_cycle_event_count", "cycle_id", "event_count", unique=True),
+    )
+
+
+class PlanCacheEntry(Base):
+    """Generated deterministic plan, addressed by the hash of its generator input"""
+    __tablename__ = "plan_cache"
+
+    plan_hash = Column(String(64), primary_key=True)  # sha256 of canonical input + generator version
+    generator_version = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # SUCCESS, INFEASIBLE
+    plan = Column(JSONPayload, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CycleSummary(Base):
+    """Running totals for a cycle, updated in the same transaction as its block and event writes"""
+    __tablename__ = "cycle_summaries"
+
+    cycle_id = Column(Integer, ForeignKey("cycles.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    blocks_total = Column(Integer, nullable=False, default=0)
+    blocks_scheduled = Column(Integer, nullable=False, default=0)
+    blocks_started = Column(Integer, nullable=False, default=0)
+    blocks_completed = Column(Integer, nullable=False, default=0)
+    blocks_skipped = Column(Integer, nullable=False, default=0)
+    blocks_missed = Column(Integer, nullable=False, default=0)
+    blocks_other = Column(Integer, nullable=False, default=0)  # any other status
+    planned_minutes = Column(Integer, nullable=False, default=0)
+    completed_minutes = Column(Integer, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+    create_events = Column(Integer, nullable=False, default=0)
+    completion_events = Column(Integer, nullable=False, default=0)  # "complete" events with completed set
+    last_event_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class CyclePracticeTotal(Base):
+    """Per-practice block totals for a cycle, maintained alongside CycleSummary"""
+    __tablename__ = "cycle_practice_totals"
+
+    cycle_id = Column(Integer, ForeignKey("cycles.id"), primary_key=True)
+    practice = Column(String, primary_key=True)
+    blocks = Column(Integer, nullable=False, default=0)
+    minutes = Column(Integer, nullable=False, default=0)
+    completed_blocks = Column(Integer, nullable=False, default=0)
+    completed_minutes = Column(Integer, nullable=False, default=0)
+
+
+class DailyRollup(Base):
+    """Block and event totals for one goal, day and practice, updated with each block and event write"""
+    __tablename__ = "daily_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    goal_id = Column(Integer, ForeignKey("goals.id"), primary_key=True)
+    day_key = Column(String, primary_key=True)  # the blocks' day_key; events are dated by their block
+    practice = Column(String, primary_key=True)
+    planned_blocks = Column(Integer, nullable=False, default=0)
+    planned_minutes = Column(Integer, nullable=False, default=0)
+    open_blocks = Column(Integer, nullable=False, default=0)  # scheduled or started
+    completed_blocks = Column(Integer, nullable=False, default=0)
+    completed_minutes = Column(Integer, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+    complete_events = Column(Integer, nullable=False, default=0)  # event_type "complete"
+    dirty = Column(Boolean, nullable=False, default=True)  # changed since its week/month buckets were compacted
+
+
+class RollupBucket(Base):
+    """Sums of DailyRollup rows over a week (Monday start) or calendar month, compacted in the background"""
+    __tablename__ = "rollup_buckets"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    goal_id = Column(Integer, ForeignKey("goals.id"), primary_key=True)
+    period = Column(String, primary_key=True)  # week, month
+    period_start = Column(String, primary_key=True)  # first day_key of the period
+    practice = Column(String, primary_key=True)
+    planned_blocks = Column(Integer, nullable=False, default=0)
+    planned_minutes = Column(Integer, nullable=False, default=0)
+    open_blocks = Column(Integer, nullable=False, default=0)
+    completed_blocks = Column(Integer, nullable=False, default=0)
+    completed_minutes = Column(Integer, nullable=False, default=0)
+    events = Column(Integer, nullable=False, default=0)
+    complete_events = Column(Integer, nullable=False, default=0)
+
+
+class RateLimitBucket(Base):
+    """Token bucket shared by every API process (AUTH_RATE_LIMIT_BACKEND=database)"""
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(255), primary_key=True)  # e.g. ip:203.0.113.7, email:user@example.com
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False, index=True)  # Unix time of the last take
+    allowed = Column(Boolean, nullable=False, default=True)  # whether the last take was granted
+
+
+# Range sums over a user's days and buckets across goals; the compactor's queue of changed days
+Index("ix_daily_rollups_user_day", DailyRollup.user_id, DailyRollup.day_key)
+Index("ix_daily_rollups_dirty", DailyRollup.dirty)
+Index("ix_rollup_buckets_user_period", RollupBucket.user_id, RollupBucket.period, RollupBucket.period_start)
+
+
+SYNCED_MODELS = (Goal, Cycle, Block, ExecutionEvent)
+
+
+def reserve_sync_seq(connection, user_id: int, count: int = 1) -> int:
+    """Reserve `count` sequence numbers for a user and return the last one.
+
+    The upsert locks the user's counter row until commit, so concurrent writers
+    for the same user commit in sequence order and a cursor never skips a row.
+    """
+    insert = dialect_insert(connection)
+    table = UserSyncState.__table__
+    statement = (
+        insert(table)
+        .values(user_id=user_id, last_seq=count)
+        .on_conflict_do_update(index_elements=[table.c.user_id], set_={"last_seq": table.c.last_seq + count})
+        .returning(table.c.last_seq)
+    )
+    return connection.execute(statement).scalar_one()
+
+
+def lock_sync_seq(connection, user_id: int) -> int:
+    """Lock the user's counter row until commit without reserving anything, and return its last seq.
+
+    Writers that read a user's rows and then write based on them (push dedup)
+    take this first, so a concurrent writer for the same user waits and then
+    reads what this one committed.
+    """
+    return reserve_sync_seq(connection, user_id, 0)
+
+
+def reserve_sync_seqs(connection, counts: dict) -> dict:
+    """reserve_sync_seq for many users in one statement: {user_id: count} -> {user_id: last seq}.
+
+    Rows are written in user id order, so concurrent multi-user reservations lock
+    counter rows in the same order.
+    """
+    insert = dialect_insert(connection)
+    table = UserSyncState.__table__
+    statement = insert(table).values(
+        [{"user_id": user_id, "last_seq": counts[user_id]} for user_id in sorted(counts)]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id], set_={"last_seq": table.c.last_seq + statement.excluded.last_seq}
+    ).returning(table.c.user_id, table.c.last_seq)
+    return dict(connection.execute(statement).tuples().all())
+
+
+def note_sync_changes(session, last_seqs: dict):
+    """Remember {user_id: last seq} written in the session's transaction, published once it commits"""
+    pending = session.info.setdefault("sync_changes", {})
+    for user_id, last_seq in last_seqs.items():
+        pending[user_id] = max(pending.get(user_id, 0), last_seq)
+
+
+GENESIS_CHAIN_HASH = "0" * 64
+
+
+def compute_chain_hash(previous_chain_hash: str, event_hash: str) -> str:
+    """Link an event into its cycle's chain"""
+    return hashlib.sha256(f"{previous_chain_hash}|{event_hash}".encode("utf-8")).hexdigest()
+
+
+def ledger_tails(connection, cycle_ids) -> dict:
+    """Map each cycle id to the chain_hash of its newest event (cycles without events are omitted)"""
+    table = ExecutionEvent.__table__
+    newest = (
+        select(func.max(table.c.id))
+        .where(table.c.cycle_id.in_(list(cycle_ids)))
+        .group_by(table.c.cycle_id)
+    )
+    rows = connection.execute(select(table.c.cycle_id, table.c.chain_hash).where(table.c.id.in_(newest)))
+    return dict(rows.tuples().all())
+
+
+BLOCK_STATUS_COLUMNS = {
+    "scheduled": "blocks_scheduled",
+    "started": "blocks_started",
+    "completed": "blocks_completed",
+    "skipped": "blocks_skipped",
+    "missed": "blocks_missed",
+}
+SUMMARY_COUNTERS = (
+    "blocks_total", *BLOCK_STATUS_COLUMNS.values(), "blocks_other", "planned_minutes", "completed_minutes",
+    "event_count", "create_events", "completion_events",
+)
+PRACTICE_COUNTERS = ("blocks", "minutes", "completed_blocks", "completed_minutes")
+
+
+def is_completion_event(event_type: str, event_data) -> bool:
+    """summarizeCycle's completion test: a "complete" event whose data has a truthy `completed`"""
+    if event_type != "complete":
+        return False
+    if isinstance(event_data, str):
+        event_data = json.loads(event_data)
+    if not isinstance(event_data, dict):
+        return False
+    completed = event_data.get("completed")
+    # JavaScript truthiness: empty lists and objects count
+    return completed is not None and completed is not False and completed != 0 and completed != ""
+
+
+ROLLUP_COUNTERS = (
+    "planned_blocks", "planned_minutes", "open_blocks", "completed_blocks", "completed_minutes",
+    "events", "complete_events",
+)
+OPEN_BLOCK_STATUSES = ("scheduled", "started")
+
+
+class AggregateDeltas:
+    """Changes to cycle summaries and daily rollups collected from one write, applied as additive upserts.
+
+    Every counter is written as `value = value + delta`, so writers touching the
+    same cycle or day concurrently never lose each other's updates.
+    """
+
+    def __init__(self):
+        self.cycles = {}
+        self.practices = {}
+        self.event_cycles = set()
+        self.days = {}
+
+    def _cycle(self, cycle_id: int, user_id: int) -> dict:
+        counters = self.cycles.get(cycle_id)
+        if counters is None:
+            counters = self.cycles[cycle_id] = dict.fromkeys(SUMMARY_COUNTERS, 0)
+            counters["user_id"] = user_id
+        return counters
+
+    def _day(self, user_id: int, goal_id: int, day_key: str, practice) -> list:
+        return self.days.setdefault((user_id, goal_id, day_key, practice or ""), [0] * len(ROLLUP_COUNTERS))
+
+    def add_block(
+        self, user_id: int, goal_id: int, cycle_id: int, day_key: str, practice, status, minutes,
+        sign: int = 1, events: int = 0, complete_events: int = 0,
+    ):
+        """Count a block in (sign=1) or out of (sign=-1) its cycle summary and daily rollup.
+
+        `events` / `complete_events` move the block's existing events along with
+        it, for blocks whose day, goal or practice changes.
+        """
+        minutes = minutes or 0
+        completed = status == "completed"
+        counters = self._cycle(cycle_id, user_id)
+        counters["blocks_total"] += sign
+        counters[BLOCK_STATUS_COLUMNS.get(status or "scheduled", "blocks_other")] += sign
+        counters["planned_minutes"] += sign * minutes
+        counters["completed_minutes"] += sign * minutes if completed else 0
+
+        totals = self.practices.setdefault((cycle_id, practice or ""), [0, 0, 0, 0])
+        totals[0] += sign
+        totals[1] += sign * minutes
+        totals[2] += sign if completed else 0
+        totals[3] += sign * minutes if completed else 0
+
+        day = self._day(user_id, goal_id, day_key, practice)
+        day[0] += sign
+        day[1] += sign * minutes
+        day[2] += sign if (status or "scheduled") in OPEN_BLOCK_STATUSES else 0
+        day[3] += sign if completed else 0
+        day[4] += sign * minutes if completed else 0
+        day[5] += sign * events
+        day[6] += sign * complete_events
+
+    def add_event(self, user_id: int, cycle_id: int, event_type: str, event_data, block_key: tuple):
+        """Count an event in its cycle summary and, via block_key (goal_id, day_key, practice), its block's day"""
+        counters = self._cycle(cycle_id, user_id)
+        counters["event_count"] += 1
+        counters["create_events"] += event_type == "create"
+        counters["completion_events"] += is_completion_event(event_type, event_data)
+        self.event_cycles.add(cycle_id)
+
+        day = self._day(user_id, *block_key)
+        day[5] += 1
+        day[6] += event_type == "complete"
+
+    def apply(self, connection):
+        """Upsert the collected deltas; call after the events they count have been inserted"""
+        if not self.cycles:
+            return
+        insert = dialect_insert(connection)
+        last_event_ids = {}
+        if self.event_cycles:
+            events = ExecutionEvent.__table__
+            last_event_ids = dict(connection.execute(
+                select(events.c.cycle_id, func.max(events.c.id))
+                .where(events.c.cycle_id.in_(sorted(self.event_cycles)))
+                .group_by(events.c.cycle_id)
+            ).tuples().all())
+
+        # Rows are written in key order, so concurrent writers lock them in the same order.
+        # executemany of one single-row upsert: the statement compiles once and stays cached
+        table = CycleSummary.__table__
+        statement = insert(table)
+        set_ = {name: table.c[name] + statement.excluded[name] for name in SUMMARY_COUNTERS}
+        set_["last_event_id"] = case(
+            (statement.excluded.last_event_id > table.c.last_event_id, statement.excluded.last_event_id),
+            else_=table.c.last_event_id,
+        )
+        set_["updated_at"] = func.now()
+        connection.execute(statement.on_conflict_do_update(index_elements=[table.c.cycle_id], set_=set_), [
+            {"cycle_id": cycle_id, **self.cycles[cycle_id], "last_event_id": last_event_ids.get(cycle_id, 0)}
+            for cycle_id in sorted(self.cycles)
+        ])
+
+        rows = [
+            {"cycle_id": cycle_id, "practice": practice, **dict(zip(PRACTICE_COUNTERS, totals))}
+            for (cycle_id, practice), totals in sorted(self.practices.items())
+            if any(totals)
+        ]
+        if rows:
+            table = CyclePracticeTotal.__table__
+            statement = insert(table)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.cycle_id, table.c.practice],
+                set_={name: table.c[name] + statement.excluded[name] for name in PRACTICE_COUNTERS},
+            ), rows)
+            if any(row["blocks"] < 0 for row in rows):
+                connection.execute(table.delete().where(
+                    table.c.cycle_id.in_({row["cycle_id"] for row in rows}), table.c.blocks == 0
+                ))
+
+        # Emptied days are kept: their dirty flag is what tells the compactor to redo the bucket
+        rows = [
+            {"user_id": user_id, "goal_id": goal_id, "day_key": day_key, "practice": practice,
+             **dict(zip(ROLLUP_COUNTERS, totals)), "dirty": True}
+            for (user_id, goal_id, day_key, practice), totals in sorted(self.days.items())
+            if any(totals)
+        ]
+        if rows:
+            table = DailyRollup.__table__
+            statement = insert(table)
+            set_ = {name: table.c[name] + statement.excluded[name] for name in ROLLUP_COUNTERS}
+            set_["dirty"] = True
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.goal_id, table.c.day_key, table.c.practice], set_=set_,
+            ), rows)
+
+
+def block_event_counts(connection, block_ids) -> dict:
+    """Map block ids to (events, complete events) for blocks that have events"""
+    table = ExecutionEvent.__table__
+    rows = connection.execute(
+        select(table.c.block_id, func.count(), func.sum(case((table.c.event_type == "complete", 1), else_=0)))
+        .where(table.c.block_id.in_(list(block_ids)))
+        .group_by(table.c.block_id)
+    )
+    return {block_id: (count, completes) for block_id, count, completes in rows.tuples()}
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_sync_seq(session, flush_context, instances):
+    """Stamp new and modified synced rows with the next per-user sequence numbers"""
+    pending = {}
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, SYNCED_MODELS) and obj.user_id is not None:
+            if obj in session.new or session.is_modified(obj, include_collections=False):
+                pending.setdefault(obj.user_id, []).append(obj)
+
+    for user_id, objs in pending.items():
+        last_seq = reserve_sync_seq(session.connection(), user_id, len(objs))
+        note_sync_changes(session, {user_id: last_seq})
+        for offset, obj in enumerate(objs):
+            obj.sync_seq = last_seq - len(objs) + 1 + offset
+
+
+@event.listens_for(Session, "before_flush")
+def _chain_execution_events(session, flush_context, instances):
+    """Link new events onto their cycle's chain.
+
+    Runs after _assign_sync_seq, whose upsert holds the user's counter row, so
+    no other writer can extend the same cycle between reading the tail and commit.
+    """
+    new_events = [obj for obj in session.new if isinstance(obj, ExecutionEvent) and obj.chain_hash is None]
+    if not new_events:
+        return
+
+    # Rows of one mapper are inserted in the order they were added, which is the id order
+    new_events.sort(key=lambda obj: inspect(obj).insert_order)
+    tails = ledger_tails(session.connection(), {obj.cycle_id for obj in new_events})
+    for obj in new_events:
+        obj.chain_hash = compute_chain_hash(tails.get(obj.cycle_id, GENESIS_CHAIN_HASH), obj.event_hash)
+        tails[obj.cycle_id] = obj.chain_hash
+
+
+AGGREGATE_BLOCK_FIELDS = ("user_id", "goal_id", "cycle_id", "day_key", "practice", "status", "duration_minutes")
+ROLLUP_KEY_FIELDS = ("user_id", "goal_id", "day_key", "practice")
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so the replaced value is loaded even if expired"""
+
+
+for _name in AGGREGATE_BLOCK_FIELDS:
+    event.listen(getattr(Block, _name), "set", _keep_previous_value, active_history=True)
+
+
+def _committed_block_fields(obj) -> tuple:
+    """A block's aggregated fields as last loaded from the database"""
+    state = inspect(obj)
+    values = []
+    for name in AGGREGATE_BLOCK_FIELDS:
+        history = state.attrs[name].history
+        values.append(history.deleted[0] if history.deleted else getattr(obj, name))
+    return tuple(values)
+
+
+def _rollup_key(fields: tuple) -> tuple:
+    return tuple(value for name, value in zip(AGGREGATE_BLOCK_FIELDS, fields) if name in ROLLUP_KEY_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_aggregates(session, flush_context):
+    """Fold flushed block and event changes into cycle summaries and daily rollups.
+
+    Runs after the INSERTs, so new events have ids, while the session still
+    holds the pre-flush new/dirty/deleted sets and attribute history.
+    """
+    connection = session.connection()
+    deltas = AggregateDeltas()
+    for obj in session.new:
+        if isinstance(obj, Block):
+            deltas.add_block(*(getattr(obj, name) for name in AGGREGATE_BLOCK_FIELDS))
+
+    new_events = [obj for obj in session.new if isinstance(obj, ExecutionEvent)]
+    if new_events:
+        # Events are dated by their block as stored now, including changes made in this flush
+        blocks = Block.__table__
+        block_keys = {
+            row.id: (row.goal_id, row.day_key, row.practice)
+            for row in connection.execute(
+                select(blocks.c.id, blocks.c.goal_id, blocks.c.day_key, blocks.c.practice)
+                .where(blocks.c.id.in_({obj.block_id for obj in new_events}))
+            )
+        }
+        for obj in new_events:
+            deltas.add_event(obj.user_id, obj.cycle_id, obj.event_type, obj.event_data, block_keys[obj.block_id])
+
+    changed = []
+    for obj in session.dirty:
+        if isinstance(obj, Block) and session.is_modified(obj, include_collections=False):
+            old = _committed_block_fields(obj)
+            new = tuple(getattr(obj, name) for name in AGGREGATE_BLOCK_FIELDS)
+            if old != new:
+                changed.append((obj.id, old, new))
+    removed = [(obj.id, _committed_block_fields(obj)) for obj in session.deleted if isinstance(obj, Block)]
+
+    # A block moving to another day, goal or practice takes its earlier events along
+    moving = [block_id for block_id, old, new in changed if _rollup_key(old) != _rollup_key(new)]
+    moving += [block_id for block_id, _ in removed]
+    event_counts = block_event_counts(connection, moving) if moving else {}
+    for obj in new_events:
+        if obj.block_id in event_counts:
+            count, completes = event_counts[obj.block_id]
+            event_counts[obj.block_id] = (count - 1, completes - (obj.event_type == "complete"))
+
+    for block_id, old, new in changed:
+        count, completes = event_counts.get(block_id, (0, 0))
+        deltas.add_block(*old, sign=-1, events=count, complete_events=completes)
+        deltas.add_block(*new, events=count, complete_events=completes)
+    for block_id, old in removed:
+        count, completes = event_counts.get(block_id, (0, 0))
+        deltas.add_block(*old, sign=-1, events=count, complete_events=completes)
+    deltas.apply(connection)
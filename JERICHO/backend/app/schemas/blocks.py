@@ -34,6 +34,12 @@ class BlockResponse(BaseModel):
         from_attributes = True
 
 
+class BlockPage(BaseModel):
+    """Keyset-paginated block listing"""
+    blocks: List[BlockResponse]
+    next_cursor: Optional[str] = None
+
+
 class BlockUpdate(BaseModel):
     """Block update schema"""
     status: Optional[str] = None
@@ -62,4 +68,72 @@ class ExecutionEventResponse(BaseModel):
     event_hash: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MaterializedDay(BaseModel):
+    """Day of materialized blocks"""
+    date: str
+    blocks: List[Dict[str, Any]]
+
+
+class MaterializedCycleResponse(BaseModel):
+    """Block projection folded from a cycle's execution events"""
+    cycle_id: int
+    last_event_id: int
+    event_count: int
+    days: List[MaterializedDay]
+    today_blocks: List[Dict[str, Any]]
+
+
+class PracticeTotal(BaseModel):
+    """Block totals for one practice within a cycle"""
+    practice: str
+    blocks: int
+    minutes: int
+    completedBlocks: int
+    completedMinutes: int
+
+
+class CycleSummaryResponse(BaseModel):
+    """summarizeCycle's fields plus the cycle's maintained block and event totals"""
+    cycleId: int
+    completionCount: int
+    completionRate: float
+    convergenceReport: Optional[Dict[str, Any]] = None
+    blocksTotal: int
+    blocksByStatus: Dict[str, int]
+    plannedMinutes: int
+    completedMinutes: int
+    practiceTotals: List[PracticeTotal]
+    eventCount: int
+    lastEventId: Optional[int] = None
+    lastEventAt: Optional[datetime] = None
+
+
+class RollupTotals(BaseModel):
+    """Summed daily rollup counters"""
+    planned_blocks: int
+    planned_minutes: int
+    open_blocks: int
+    completed_blocks: int
+    completed_minutes: int
+    events: int
+    complete_events: int
+
+
+class ThroughputDay(RollupTotals):
+    """Rollup counters for one day"""
+    day_key: str
+
+
+class PracticeThroughput(RollupTotals):
+    """Rollup counters for one practice over the window"""
+    practice: str
+
+
+class ThroughputResponse(BaseModel):
+    """Daily series and per-practice totals over a window, read from the rollups"""
+    day_from: str
+    day_to: str
+    days: List[ThroughputDay]
+    practices: List[PracticeThroughput]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -25,18 +25,102 @@ class GoalResponse(BaseModel):
         from_attributes = True
 
 
+class GoalDeadlineResponse(GoalResponse):
+    """Goal with the deadline fields extracted from its execution contract"""
+    deadline_type: Optional[str] = None
+    deadline_day_key: Optional[str] = None
+
+
+class EvidenceSummary(BaseModel):
+    """Execution events recorded for a goal"""
+    totalEvents: int
+    completedCount: int
+    daysCovered: int
+
+
+class ScoringSummary(BaseModel):
+    """Throughput statistics behind an evidence-based probability"""
+    mu: float
+    sigma: float
+    K: int
+    D: int
+    remainingBlocksTotal: int
+    requiredBlocksPerDay: Optional[int] = None
+    expectedTotal: float
+
+
+class GoalProbabilityResponse(BaseModel):
+    """Goal-success probability (field names follow the client's ProbabilityResult)"""
+    goalId: int
+    value: Optional[float] = None
+    status: str
+    capApplied: bool
+    reasons: List[str]
+    requiredEvents: Optional[int] = None
+    evidenceSummary: EvidenceSummary
+    scoringSummary: Optional[ScoringSummary] = None
+    policyVersion: str
+
+
+class PlanError(BaseModel):
+    """Why the deterministic planner could not produce a plan"""
+    code: str
+    message: str
+    iterations: Optional[Dict[str, int]] = None
+    inputSummary: Optional[Dict[str, Any]] = None
+
+
+class ProposedBlock(BaseModel):
+    """Block proposed by the deterministic planner"""
+    id: str
+    dayKey: str
+    deliverableId: str
+    deliverableTitle: str
+    kind: str
+    durationMinutes: int
+    order: int
+
+
+class AutoDeliverable(BaseModel):
+    """Deliverable derived from the causal chain or the default split"""
+    id: str
+    title: str
+    kind: str
+    requiredBlocks: int
+
+
+class GoalPlanResponse(BaseModel):
+    """Deterministic plan for a goal (field names follow the client's DeterministicPlanResult)"""
+    goalId: int
+    planHash: str
+    generatorVersion: str
+    mode: str
+    source: str
+    status: str
+    proposedBlocks: List[ProposedBlock]
+    autoDeliverables: List[AutoDeliverable]
+    error: Optional[PlanError] = None
+
+
 class GoalValidationRequest(BaseModel):
     """Goal validation request schema"""
     goal_execution_contract: Dict[str, Any]
     goal_governance_contract: Optional[Dict[str, Any]] = None
 
 
+class GoalBatchValidationRequest(BaseModel):
+    """Batch goal validation request schema"""
+    contracts: List[Dict[str, Any]] = Field(..., max_length=10000)
+
+
 class GoalValidationResponse(BaseModel):
     """Goal validation response schema"""
     is_valid: bool
     admission_status: str
     admission_reason: Optional[str] = None
     validation_errors: Optional[List[str]] = None
+    contract_hash: Optional[str] = None
+    session_days: Optional[int] = None
 
 
 class CycleCreate(BaseModel):
@@ -0,0 +1,101 @@
+import json
+
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, Dict, Any
+
+from app.schemas.blocks import BlockResponse, ExecutionEventResponse
+from app.schemas.goals import GoalResponse, CycleResponse
+
+
+def decode_json_text(value: Any) -> Any:
+    """JSON payload columns are stored as text; decode them for responses"""
+    if isinstance(value, str):
+        return json.loads(value) if value else None
+    return value
+
+
+class SyncGoal(GoalResponse):
+    """Goal row in a sync pull"""
+    goal_execution_contract: Optional[Dict[str, Any]] = None
+    goal_governance_contract: Optional[Dict[str, Any]] = None
+    sync_seq: int
+
+    _decode_json = field_validator("goal_execution_contract", "goal_governance_contract", mode="before")(decode_json_text)
+
+
+class SyncCycle(CycleResponse):
+    """Cycle row in a sync pull"""
+    cycle_data: Optional[Dict[str, Any]] = None
+    sync_seq: int
+
+    _decode_json = field_validator("cycle_data", mode="before")(decode_json_text)
+
+
+class SyncBlock(BlockResponse):
+    """Block row in a sync pull"""
+    block_data: Optional[Dict[str, Any]] = None
+    sync_seq: int
+
+    _decode_json = field_validator("block_data", mode="before")(decode_json_text)
+
+
+class SyncEvent(ExecutionEventResponse):
+    """Execution event row in a sync pull"""
+    sync_seq: int
+
+    _decode_json = field_validator("event_data", mode="before")(decode_json_text)
+
+
+class SyncPullResponse(BaseModel):
+    """Sync pull response schema: rows changed after the client's cursor"""
+    cursor: int
+    has_more: bool
+    goals: List[SyncGoal] = []
+    cycles: List[SyncCycle] = []
+    blocks: List[SyncBlock] = []
+    events: List[SyncEvent] = []
+
+
+class SyncPushRequest(BaseModel):
+    """Sync push request schema (events are validated individually)"""
+    events: List[Any]  # validated per event by the ingest service
+    atomic: bool = False  # reject the whole push if any event is invalid
+
+
+class SyncPushRejection(BaseModel):
+    """Rejected event in a sync push"""
+    index: int
+    errors: List[str]
+
+
+class SyncPushResponse(BaseModel):
+    """Sync push response schema"""
+    received: int
+    accepted: int
+    duplicates: int
+    rejected: List[SyncPushRejection] = []
+
+
+class LedgerFailure(BaseModel):
+    """First event at which a cycle's chain fails to verify"""
+    event_id: int
+    reason: str
+
+
+class CycleLedgerReport(BaseModel):
+    """Verification result for one cycle's event chain"""
+    cycle_id: int
+    ok: bool
+    full: bool
+    from_event_id: int
+    last_event_id: int
+    events_verified: int
+    event_count: int
+    checkpoints_created: int
+    failure: Optional[LedgerFailure] = None
+
+
+class LedgerVerifyResponse(BaseModel):
+    """Ledger verification response schema"""
+    ok: bool
+    cycles: List[CycleLedgerReport] = []
@@ -0,0 +1,263 @@
+"""
+Production server: preforked uvicorn workers sharing one listening socket.
+
+The master builds the app (every router imported, nothing connected) and
+binds the socket, then forks the workers, so they start from the same
+preloaded, copy-on-write memory. Each worker runs uvicorn on the inherited
+socket with its own event loop, engines' pools and push-hub listener.
+
+Workers are recycled: after server_max_requests (plus up to
+server_max_requests_jitter, so they do not all restart at once) or when RSS
+grows past server_max_memory_mb, a worker drains and exits and the master
+forks a replacement. Connections arriving meanwhile queue on the shared
+socket and are picked up by the other workers.
+
+SIGTERM/SIGINT drain every worker: listeners close, SSE streams end (clients
+reconnect elsewhere after `retry`), WebSockets are closed with 1012, and
+in-flight requests, such as an /api/sync/push transaction, run to completion
+for up to server_graceful_timeout seconds before the lifespan shuts down.
+Background jobs (rollover, rollup compaction) run in worker 0 only.
+
+Usage:
+    python -m app.server [--workers N] [--host H] [--port P]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.core.config import Settings, settings as default_settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker dying this soon after it was forked is crashing, not being recycled
+CRASH_WINDOW_SECONDS = 2.0
+CRASH_BACKOFF_SECONDS = 1.0
+REAP_INTERVAL_SECONDS = 0.2
+# Between closing the listeners and closing idle connections, so requests on just-accepted ones arrive
+ACCEPT_GRACE_SECONDS = 0.2
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count(settings: Settings) -> int:
+    return settings.server_workers if settings.server_workers > 0 else cpu_count()
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak rather than current RSS where /proc is unavailable (kilobytes on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that recycles itself past a memory limit and ends push streams when draining"""
+
+    def __init__(self, config: uvicorn.Config, max_memory_bytes: int = 0, memory_check_seconds: float = 10.0):
+        super().__init__(config)
+        self.max_memory_bytes = max_memory_bytes
+        # main_loop ticks every 0.1s
+        self.memory_check_ticks = max(1, round(memory_check_seconds * 10))
+
+    async def on_tick(self, counter: int) -> bool:
+        if await super().on_tick(counter):
+            return True
+        if self.max_memory_bytes and counter % self.memory_check_ticks == 0:
+            rss = rss_bytes()
+            if rss > self.max_memory_bytes:
+                logger.warning("Worker RSS %d MiB exceeds the limit; recycling", rss // (1024 * 1024))
+                return True
+        return False
+
+    async def shutdown(self, sockets=None):
+        from app.services.sync_push import sync_hub
+
+        # SSE responses would otherwise hold the drain open until the graceful timeout
+        sync_hub.close_all()
+        # uvicorn closes connections with no request in progress, including ones accepted an instant
+        # earlier whose request has not been read yet; stop accepting and give those time to arrive
+        for server in self.servers:
+            server.close()
+        await asyncio.sleep(ACCEPT_GRACE_SECONDS)
+        await super().shutdown(sockets=sockets)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    """Forks, watches and replaces the worker processes"""
+
+    def __init__(self, app, sock: socket.socket, settings: Settings, workers: int):
+        self.app = app
+        self.sock = sock
+        self.settings = settings
+        self.workers = workers
+        self.children: Dict[int, int] = {}  # pid -> worker slot
+        self.started_at: Dict[int, float] = {}
+        self.stopping = False
+        self.recycled = 0
+        self.crashed = 0
+
+    def spawn(self, slot: int) -> int:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            self.started_at[pid] = time.monotonic()
+            return pid
+        # Child
+        code = 1
+        try:
+            self.run_worker(slot)
+            code = 0
+        except BaseException:
+            logger.exception("Worker %d failed", slot)
+        finally:
+            os._exit(code)
+
+    def run_worker(self, slot: int):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        # Pooled connections must not be shared across a fork. The master opens none; reset the
+        # sync pool anyway. The async engine's pool is left as is: recreating it outside its event
+        # loop gives it a threading first-connect lock, which deadlocks concurrent first checkouts.
+        from app.core.database import engine
+        engine.dispose(close=False)
+
+        self.app.state.background_jobs = slot == 0
+        max_requests = None
+        if self.settings.server_max_requests > 0:
+            max_requests = self.settings.server_max_requests + random.randint(0, self.settings.server_max_requests_jitter)
+        config = uvicorn.Config(
+            self.app,
+            lifespan="on",
+            limit_max_requests=max_requests,
+            timeout_graceful_shutdown=self.settings.server_graceful_timeout,
+            proxy_headers=True,
+        )
+        server = WorkerServer(
+            config,
+            max_memory_bytes=self.settings.server_max_memory_mb * 1024 * 1024,
+            memory_check_seconds=self.settings.server_memory_check_seconds,
+        )
+        server.run(sockets=[self.sock])
+        if not server.started:
+            raise RuntimeError("worker startup failed")
+
+    def handle_signal(self, signum, frame):
+        if not self.stopping:
+            logger.info("Received %s; draining %d workers", signal.Signals(signum).name, len(self.children))
+            self.stopping = True
+            self.signal_children(signal.SIGTERM)
+
+    def signal_children(self, signum: int):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited workers and, unless stopping, replace them"""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            slot = self.children.pop(pid, None)
+            lifetime = time.monotonic() - self.started_at.pop(pid, time.monotonic())
+            if slot is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                self.recycled += 1
+                logger.info("Worker %d [%d] recycled after %.0fs", slot, pid, lifetime)
+            else:
+                self.crashed += 1
+                logger.error("Worker %d [%d] exited with %d", slot, pid, code)
+                if lifetime < CRASH_WINDOW_SECONDS:
+                    time.sleep(CRASH_BACKOFF_SECONDS)
+            self.spawn(slot)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        for slot in range(self.workers):
+            self.spawn(slot)
+        logger.info("Serving on %s with %d workers [master %d]", self.sock.getsockname(), self.workers, os.getpid())
+
+        while not self.stopping:
+            self.reap()
+            time.sleep(REAP_INTERVAL_SECONDS)
+
+        # Drain: the workers finish in-flight requests, then run their lifespan shutdown
+        deadline = time.monotonic() + self.settings.server_graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(REAP_INTERVAL_SECONDS)
+        if self.children:
+            logger.error("Killing %d workers still running after the graceful timeout", len(self.children))
+            self.signal_children(signal.SIGKILL)
+            for pid in list(self.children):
+                os.waitpid(pid, 0)
+        self.sock.close()
+        return 0
+
+
+def serve(
+    settings: Optional[Settings] = None,
+    workers: Optional[int] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+) -> int:
+    """Preload the app, bind, fork the workers and supervise them until SIGTERM/SIGINT"""
+    from main import create_app
+
+    settings = settings or default_settings
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    app = create_app(settings, lazy_routers=False)
+    sock = bind_socket(host or settings.server_host, settings.server_port if port is None else port, settings.server_backlog)
+    return Master(app, sock, settings, workers or worker_count(settings)).run()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API with preforked workers")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: SERVER_WORKERS or the CPU count)")
+    parser.add_argument("--host", help="Bind address (default: SERVER_HOST)")
+    parser.add_argument("--port", type=int, help="Bind port (default: SERVER_PORT)")
+    args = parser.parse_args(argv)
+    return serve(workers=args.workers, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""
+Goal admission engine.
+
+Python port of validateGoalAdmission (src/domain/goal/GoalAdmissionPolicy.ts):
+a goal execution contract is ADMITTED only when it passes every hard check,
+otherwise it is REJECTED with the GoalRejectionCode values it violates (each
+code once, in the client's order). Server-side the temporal binding is also
+checked for consistency with the deadline: at least one committed session day
+must fall between the binding's start and the deadline.
+
+The contract checks depend only on the contract and the UTC day: the client
+compares deadlines at `<dayKey>T23:59:59.999Z`, which flips only at the end
+of a UTC day. assess_contracts therefore memoizes results by (content hash,
+UTC day) and fans large batches of uncached contracts out to a process pool,
+since hashing and day counting are pure-Python CPU work. Duplicate checks
+depend on the user's active goals, so they run after the cached part.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.timekeys import MONDAY_FIRST_WEEKDAYS
+from app.core.workers import WorkerPool
+from app.models.user import Goal
+from app.services.events import canonical_json, js_number
+
+REJECTION_MESSAGES = {
+    "PLAN_GENERATION_MECHANISM_MISSING": "Plan generation mechanism is required.",
+    "PLAN_GENERATION_MECHANISM_UNSUPPORTED": "Plan generation mechanism must be GENERIC_DETERMINISTIC (only supported type in v1).",
+    "TERMINAL_OUTCOME_MISSING": "Terminal outcome is required.",
+    "TERMINAL_OUTCOME_VAGUE": "Terminal outcome must be concrete and unambiguous.",
+    "TERMINAL_OUTCOME_IMMEASURABLE": "Terminal outcome must be verifiable at deadline.",
+    "DEADLINE_MISSING": "Deadline date is required.",
+    "DEADLINE_IN_PAST": "Deadline cannot be in the past.",
+    "DEADLINE_TOO_SOON": "Deadline must be at least 3 days from today.",
+    "SACRIFICE_MISSING": "You must declare what you will sacrifice to achieve this.",
+    "SACRIFICE_VAGUE": "Sacrifice must be specific and quantified.",
+    "SACRIFICE_NOT_BINDING": "Declared sacrifice must represent real cost.",
+    "TEMPORAL_BINDING_INVALID": "You must commit to a recurring schedule (days/week).",
+    "TEMPORAL_BINDING_INSUFFICIENT": "Committed days must be at least 3 per week.",
+    "CAUSAL_CHAIN_INCOMPLETE": "You must outline steps from today to the outcome.",
+    "CAUSAL_CHAIN_CIRCULAR": "Causal chain contains a loop; cannot reach outcome.",
+    "REINFORCEMENT_NOT_DECLARED": "You must declare daily visibility mechanism.",
+    "REINFORCEMENT_CONTRADICTION": "Daily visibility claim contradicts declared mechanism.",
+    "INSCRIPTION_MISSING": "Goal inscription is required for immutability.",
+    "INSCRIPTION_NOT_IMMUTABLE": "Goal has been altered since inscription; integrity compromised.",
+    "ASPIRATIONAL_ONLY": "Goal marked as aspiration; cannot admit to calendar.",
+    "DUPLICATE_ACTIVE": "Same outcome already active; archive or complete first.",
+    "REJECT_DISCLOSURE_REQUIRED": "You must accept the immutable goal commitment disclosure before admitting.",
+}
+
+SUPPORTED_MECHANISM_CLASS = "GENERIC_DETERMINISTIC"
+MIN_DEADLINE_DAYS = 3
+TRIVIAL_SACRIFICE_PATTERNS = ("maybe", "might", "could", "possibly", "no sacrifice", "nothing")
+CHECK_IN_FREQUENCIES = ("DAILY", "WEEKLY", "ON_PROGRESS")
+DAY_KEY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+FNV_MASK = 0xFFFFFFFFFFFFFFFF
+
+admission_pool = WorkerPool(
+    max_workers=settings.admission_workers or os.cpu_count() or 1,
+    use_processes=settings.admission_executor == "process",
+)
+
+# (content hash, UTC day key) -> contract assessment
+_assessment_cache = LRUCache(maxsize=settings.admission_cache_size)
+
+
+def compute_inscription_hash(text: str) -> str:
+    """FNV-1a 64 over UTF-16 code units, like computeInscriptionHash (utils/inscriptionHash.ts)"""
+    value = FNV_OFFSET
+    encoded = text.encode("utf-16-le", "surrogatepass")
+    for unit in memoryview(encoded).cast("H"):
+        value = ((value ^ unit) * FNV_PRIME) & FNV_MASK
+    return f"{value:016x}"
+
+
+def _js_stringify(data: dict) -> str:
+    return json.dumps(
+        {key: js_number(value) for key, value in data.items() if value is not None},
+        ensure_ascii=False, separators=(",", ":"),
+    )
+
+
+def _js_string(value) -> str:
+    """`String(value)` for the scalars contracts carry"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(js_number(value))
+
+
+def _section(contract: dict, key: str) -> Optional[dict]:
+    value = contract.get(key)
+    return value if isinstance(value, dict) and value else None
+
+
+def _text(section: Optional[dict], key: str) -> str:
+    value = (section or {}).get(key)
+    return value.strip() if isinstance(value, str) else ""
+
+
+def compute_contract_hash(contract: dict) -> str:
+    """computeContractHash: fingerprint of the inscribed fields"""
+    outcome = _section(contract, "terminalOutcome")
+    sacrifice = _section(contract, "sacrifice")
+    binding = _section(contract, "temporalBinding")
+    chain = _section(contract, "causalChain")
+    reinforcement = _section(contract, "reinforcement")
+    deadline = _section(contract, "deadline")
+
+    steps = chain.get("steps") if chain else None
+    parts = [
+        _js_stringify({
+            "text": _text(outcome, "text"),
+            "verificationCriteria": _text(outcome, "verificationCriteria"),
+            "isConcrete": outcome.get("isConcrete"),
+        }) if outcome else "",
+        str((deadline or {}).get("dayKey") or ""),
+        _js_stringify({
+            "whatIsGivenUp": _text(sacrifice, "whatIsGivenUp"),
+            "duration": _text(sacrifice, "duration"),
+            "quantifiedImpact": _text(sacrifice, "quantifiedImpact"),
+            "rationale": _text(sacrifice, "rationale"),
+        }) if sacrifice else "",
+        _js_string(binding["daysPerWeek"]) if binding and binding.get("daysPerWeek") is not None else "",
+        str((binding or {}).get("activationTime") or ""),
+        json.dumps({"steps": [
+            {key: value for key, value in (
+                ("sequence", js_number(step.get("sequence"))),
+                ("description", _text(step, "description")),
+                ("approximateDayOffset", js_number(step.get("approximateDayOffset"))),
+            ) if value is not None}
+            for step in steps if isinstance(step, dict)
+        ]}, ensure_ascii=False, separators=(",", ":")) if isinstance(steps, list) else "",
+        _js_string(reinforcement["dailyExposureEnabled"])
+        if reinforcement and reinforcement.get("dailyExposureEnabled") is not None else "",
+        str((reinforcement or {}).get("checkInFrequency") or ""),
+    ]
+    return compute_inscription_hash("|".join(parts))
+
+
+def _parse_day(value) -> Optional[date]:
+    if not isinstance(value, str) or not DAY_KEY_RE.match(value):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _specific_weekdays(specific_days) -> Optional[set]:
+    """Weekdays named in temporalBinding.specificDays ("Mon, Wed, Fri"); None = unrestricted"""
+    if not isinstance(specific_days, str):
+        return None
+    days = {MONDAY_FIRST_WEEKDAYS[token[:3].lower()] for token in re.findall(r"[A-Za-z]+", specific_days)
+            if token[:3].lower() in MONDAY_FIRST_WEEKDAYS}
+    return days or None
+
+
+def count_session_days(first: date, last: date, days_per_week: int, weekdays: Optional[set]) -> int:
+    """Committed session days in [first, last]"""
+    if last < first:
+        return 0
+    span = (last - first).days + 1
+    if weekdays is None:
+        return span * days_per_week // 7
+    weeks, extra = divmod(span, 7)
+    count = weeks * len(weekdays)
+    start = (first.weekday() + weeks * 7) % 7
+    return count + sum(1 for offset in range(extra) if (start + offset) % 7 in weekdays)
+
+
+def assess_contract(contract: Any, today: str) -> dict:
+    """Context-free admission checks for one contract on UTC day `today`"""
+    codes: List[str] = []
+    if not isinstance(contract, dict):
+        contract = {}
+    contract_hash = compute_contract_hash(contract)
+    now_day = date.fromisoformat(today)
+
+    mechanism = contract.get("planGenerationMechanismClass")
+    if not mechanism:
+        codes.append("PLAN_GENERATION_MECHANISM_MISSING")
+    elif mechanism != SUPPORTED_MECHANISM_CLASS:
+        codes.append("PLAN_GENERATION_MECHANISM_UNSUPPORTED")
+
+    if not contract.get("commitmentDisclosureAccepted"):
+        codes.append("REJECT_DISCLOSURE_REQUIRED")
+
+    inscription = _section(contract, "inscription")
+    if not inscription:
+        codes.append("INSCRIPTION_MISSING")
+    elif inscription.get("contractHash") != contract_hash:
+        codes.append("INSCRIPTION_NOT_IMMUTABLE")
+
+    outcome = _section(contract, "terminalOutcome")
+    if not outcome:
+        codes.append("TERMINAL_OUTCOME_MISSING")
+    else:
+        if len(_text(outcome, "text")) < 5:
+            codes.append("TERMINAL_OUTCOME_VAGUE")
+        if not outcome.get("isConcrete") or len(_text(outcome, "verificationCriteria")) < 3:
+            codes.append("TERMINAL_OUTCOME_IMMEASURABLE")
+
+    deadline_section = _section(contract, "deadline")
+    deadline = _parse_day((deadline_section or {}).get("dayKey"))
+    if deadline is None:
+        codes.append("DEADLINE_MISSING")
+    else:
+        # Day arithmetic equals the client's millisecond comparison against <dayKey>T23:59:59.999Z
+        if deadline < now_day:
+            codes.append("DEADLINE_IN_PAST")
+        if (deadline - now_day).days < MIN_DEADLINE_DAYS:
+            codes.append("DEADLINE_TOO_SOON")
+
+    sacrifice = _section(contract, "sacrifice")
+    if not sacrifice:
+        codes.append("SACRIFICE_MISSING")
+    else:
+        if len(_text(sacrifice, "whatIsGivenUp")) < 3 or len(_text(sacrifice, "quantifiedImpact")) < 2:
+            codes.append("SACRIFICE_VAGUE")
+        given_up = _text(sacrifice, "whatIsGivenUp").lower()
+        if any(pattern in given_up for pattern in TRIVIAL_SACRIFICE_PATTERNS):
+            codes.append("SACRIFICE_NOT_BINDING")
+
+    session_days = None
+    binding = _section(contract, "temporalBinding")
+    if not binding:
+        codes.append("TEMPORAL_BINDING_INVALID")
+    else:
+        days_per_week = binding.get("daysPerWeek")
+        valid_days = isinstance(days_per_week, (int, float)) and not isinstance(days_per_week, bool) \
+            and float(days_per_week).is_integer() and 3 <= days_per_week <= 7
+        if not valid_days:
+            codes.append("TEMPORAL_BINDING_INSUFFICIENT")
+        activation = binding.get("activationTime")
+        duration = binding.get("sessionDurationMinutes")
+        start = _parse_day(binding.get("startDayKey"))
+        if (
+            not isinstance(activation, str) or len(activation) < 4
+            or not isinstance(duration, (int, float)) or isinstance(duration, bool) or duration < 15
+            or start is None
+        ):
+            codes.append("TEMPORAL_BINDING_INVALID")
+        elif valid_days and deadline is not None:
+            session_days = count_session_days(
+                max(start, now_day), deadline, int(days_per_week), _specific_weekdays(binding.get("specificDays"))
+            )
+            if session_days == 0:
+                codes.append("TEMPORAL_BINDING_INVALID")
+
+    chain = _section(contract, "causalChain")
+    steps = chain.get("steps") if chain else None
+    if not chain or not isinstance(steps, list) or not steps:
+        codes.append("CAUSAL_CHAIN_INCOMPLETE")
+    if chain and isinstance(steps, list):
+        sequences = [step.get("sequence") if isinstance(step, dict) else None for step in steps]
+        if len(set(map(repr, sequences))) != len(sequences):
+            codes.append("CAUSAL_CHAIN_CIRCULAR")
+
+    reinforcement = _section(contract, "reinforcement")
+    if not reinforcement:
+        codes.append("REINFORCEMENT_NOT_DECLARED")
+    else:
+        exposure = reinforcement.get("dailyExposureEnabled")
+        if not exposure or reinforcement.get("checkInFrequency") not in CHECK_IN_FREQUENCIES:
+            codes.append("REINFORCEMENT_NOT_DECLARED")
+        if exposure and not _text(reinforcement, "dailyMechanism"):
+            codes.append("REINFORCEMENT_CONTRADICTION")
+
+    if contract.get("isAspirational"):
+        codes.append("ASPIRATIONAL_ONLY")
+
+    return {
+        "codes": list(dict.fromkeys(codes)),
+        "contract_hash": contract_hash,
+        "session_days": session_days,
+        "outcome": _text(outcome, "text").lower() if outcome else None,
+    }
+
+
+def assess_chunk(contracts: List[Any], today: str) -> List[dict]:
+    """Process-pool entry point: assess a slice of a batch"""
+    return [assess_contract(contract, today) for contract in contracts]
+
+
+def content_hash(contract: Any) -> str:
+    return hashlib.sha256(canonical_json(contract).encode("utf-8")).hexdigest()
+
+
+async def assess_contracts(contracts: List[Any], now: Optional[datetime] = None) -> List[dict]:
+    """Assess contracts, reusing memoized results and parallelising the rest"""
+    today = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).date().isoformat()
+    keys = [(content_hash(contract), today) for contract in contracts]
+
+    assessments: Dict[tuple, dict] = {}
+    pending: Dict[tuple, Any] = {}
+    for key, contract in zip(keys, contracts):
+        if key in assessments or key in pending:
+            continue
+        cached = _assessment_cache.get(key)
+        if cached is not None:
+            assessments[key] = cached
+        else:
+            pending[key] = contract
+
+    if pending:
+        items = list(pending.values())
+        if len(items) < settings.admission_parallel_threshold:
+            results = assess_chunk(items, today)
+        else:
+            size = math.ceil(len(items) / (admission_pool.max_workers * 4))
+            chunks = [items[i:i + size] for i in range(0, len(items), size)]
+            parts = await asyncio.gather(*(admission_pool.run(assess_chunk, chunk, today) for chunk in chunks))
+            results = [result for part in parts for result in part]
+        for key, result in zip(pending, results):
+            _assessment_cache.set(key, result)
+            assessments[key] = result
+
+    return [assessments[key] for key in keys]
+
+
+def admission_result(assessment: dict, existing_outcomes: Iterable[str] = (), active_signatures: Iterable[str] = ()) -> dict:
+    """Final verdict for one assessed contract given the user's active goals"""
+    codes = list(assessment["codes"])
+    duplicate = assessment["contract_hash"] in set(active_signatures)
+    if assessment["outcome"] is not None and assessment["outcome"] in {text.lower() for text in existing_outcomes}:
+        duplicate = True
+    if duplicate and "DUPLICATE_ACTIVE" not in codes:
+        codes.append("DUPLICATE_ACTIVE")
+    return {
+        "is_valid": not codes,
+        "admission_status": "rejected" if codes else "admitted",
+        "admission_reason": " ".join(REJECTION_MESSAGES.get(code, code) for code in codes) or None,
+        "validation_errors": codes,
+        "contract_hash": assessment["contract_hash"],
+        "session_days": assessment["session_days"],
+    }
+
+
+async def active_goal_context(db: AsyncSession, user_id: int):
+    """Outcome texts and inscribed contract hashes of the user's active goals"""
+    result = await db.execute(
+        select(Goal.goal_execution_contract).where(Goal.user_id == user_id, Goal.is_active.is_(True))
+    )
+    outcomes, signatures = [], []
+    for contract in result.scalars():
+        if not isinstance(contract, dict):
+            continue
+        text = (_section(contract, "terminalOutcome") or {}).get("text")
+        if isinstance(text, str) and text:
+            outcomes.append(text)
+        signature = (_section(contract, "inscription") or {}).get("contractHash")
+        if isinstance(signature, str) and signature:
+            signatures.append(signature)
+    return outcomes, signatures
+
+
+async def validate_contracts(
+    db: AsyncSession, user_id: int, contracts: List[Any], now: Optional[datetime] = None
+) -> List[dict]:
+    """Admission verdicts for a batch of contracts against the user's active goals"""
+    outcomes, signatures = await active_goal_context(db, user_id)
+    assessments = await assess_contracts(contracts, now=now)
+    return [admission_result(assessment, outcomes, signatures) for assessment in assessments]
@@ -0,0 +1,193 @@
+"""
+Admission control for the CPU-heavy auth routes (login, register, refresh).
+
+Each route gets a ConcurrencyLimiter (AUTH_CONCURRENCY_LIMITS), so a
+credential-stuffing burst queues briefly and is then shed with 503 +
+Retry-After, instead of holding database connections
+and event-loop time that sync and planning traffic need. Token buckets cap
+attempts per client IP (in the middleware, before the request body is read)
+and per account email (in the endpoints, before any password hashing).
+
+Buckets are per process by default. AUTH_RATE_LIMIT_BACKEND=database keeps
+them in the rate_limit_buckets table, one upsert per check, so every worker
+and host enforces the same limits. The per-IP check runs before the gate, so
+the database backend takes its connections from a small pool of its own
+(AUTH_RATE_LIMIT_POOL_SIZE): a burst waits on that pool, briefly, and is let
+through when it times out, leaving the app's pool to sync and planning.
+"""
+
+import time
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Float, case, delete, literal
+
+from app.core.config import Settings
+from app.core.limits import ConcurrencyLimiter, Limit, MemoryRateLimitBackend, RateLimiter, retry_after_header
+
+BACKENDS = ("memory", "database")
+
+
+class DatabaseRateLimitBackend:
+    """Token buckets in the rate_limit_buckets table, shared by every process using the database.
+
+    A take is one atomic upsert that refills the bucket for the time elapsed
+    since its last take, charges it when enough tokens are left, and returns
+    the outcome. Rows idle for `idle_seconds` (long enough for any bucket to
+    refill completely) are deleted every `purge_interval` seconds.
+
+    Without an `engine`, one is created on first use with at most `pool_size`
+    connections, each checkout and SQLite lock waiting `timeout_seconds`; the
+    RateLimiter lets a request through when that runs out.
+    """
+
+    name = "database"
+
+    def __init__(
+        self,
+        engine=None,
+        database_url: Optional[str] = None,
+        pool_size: int = 2,
+        timeout_seconds: float = 0.25,
+        idle_seconds: float = 3600.0,
+        purge_interval: float = 60.0,
+    ):
+        self.engine = engine
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.idle_seconds = idle_seconds
+        self.purge_interval = purge_interval
+        self.purged = 0
+        self._owns_engine = engine is None
+        self._last_purge = time.time()
+
+    def _get_engine(self):
+        if self.engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            from app.core.config import settings
+            from app.core.database import engine_options, is_sqlite, to_async_url
+
+            database_url = self.database_url or settings.database_url
+            options = engine_options(database_url, use_async=True)
+            if "pool_size" in options:
+                options.update(pool_size=self.pool_size, max_overflow=0, pool_timeout=self.timeout_seconds)
+            if is_sqlite(database_url):
+                options["connect_args"]["timeout"] = self.timeout_seconds
+            self.engine = create_async_engine(to_async_url(database_url), **options)
+        return self.engine
+
+    async def close(self):
+        """Dispose of the engine this backend created"""
+        if self._owns_engine and self.engine is not None:
+            engine, self.engine = self.engine, None
+            await engine.dispose()
+
+    async def take(self, key: str, limit: Limit, now: float, cost: float = 1.0) -> float:
+        from app.core.database import dialect_insert
+        from app.models.user import RateLimitBucket
+
+        table = RateLimitBucket.__table__
+        engine = self._get_engine()
+        at = literal(now, Float)
+        elapsed = case((table.c.updated_at < at, at - table.c.updated_at), else_=0.0)
+        refilled = table.c.tokens + elapsed * limit.per_second
+        refilled = case((refilled > limit.burst, float(limit.burst)), else_=refilled)
+        granted = refilled >= cost
+
+        statement = (
+            dialect_insert(engine)(table)
+            .values(key=key, tokens=limit.burst - cost, updated_at=now, allowed=True)
+            .on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={
+                    "tokens": case((granted, refilled - cost), else_=refilled),
+                    "updated_at": case((table.c.updated_at < at, at), else_=table.c.updated_at),
+                    "allowed": granted,
+                },
+            )
+            .returning(table.c.tokens, table.c.allowed)
+        )
+        async with engine.begin() as conn:
+            tokens, allowed = (await conn.execute(statement)).one()
+            if now - self._last_purge >= self.purge_interval:
+                self._last_purge = now
+                result = await conn.execute(delete(table).where(table.c.updated_at < now - self.idle_seconds))
+                self.purged += result.rowcount
+        if allowed:
+            return 0.0
+        return (cost - tokens) / limit.per_second if limit.per_second > 0 else float("inf")
+
+    def stats(self) -> dict:
+        stats = {"backend": self.name, "purged": self.purged}
+        if self.engine is not None:
+            from app.core.database import pool_status
+            stats["database"] = pool_status(self.engine.sync_engine)
+        return stats
+
+
+def create_rate_limit_backend(settings: Settings, idle_seconds: float = 3600.0):
+    name = settings.auth_rate_limit_backend
+    if name not in BACKENDS:
+        raise ValueError(f"auth_rate_limit_backend must be one of {', '.join(BACKENDS)}, not {name!r}")
+    if name == "database":
+        return DatabaseRateLimitBackend(
+            database_url=settings.database_url,
+            pool_size=settings.auth_rate_limit_pool_size,
+            timeout_seconds=settings.auth_rate_limit_timeout_seconds,
+            idle_seconds=idle_seconds,
+        )
+    return MemoryRateLimitBackend(settings.auth_rate_limit_max_keys)
+
+
+class AuthLimits:
+    """Concurrency gates and rate limits for the auth routes of one app"""
+
+    def __init__(self, settings: Settings, rate_limit_backend=None):
+        self.ip_limit = Limit(settings.auth_ip_burst, settings.auth_ip_per_minute)
+        self.email_limit = Limit(settings.auth_email_burst, settings.auth_email_per_minute)
+        # The longest any bucket takes to refill from empty
+        idle_seconds = max(
+            (limit.burst / limit.per_second for limit in (self.ip_limit, self.email_limit) if limit.per_second > 0),
+            default=3600.0,
+        )
+        self.rate_limiter = RateLimiter(rate_limit_backend or create_rate_limit_backend(settings, idle_seconds))
+        self.gates = {
+            path: ConcurrencyLimiter(limit, settings.auth_queue_size, settings.auth_queue_timeout_seconds)
+            if limit > 0 else None
+            for path, limit in settings.auth_concurrency_limits.items()
+        }
+        self.retry_after_seconds = settings.auth_retry_after_seconds
+
+    def middleware_options(self) -> dict:
+        """Keyword arguments for LoadSheddingMiddleware"""
+        return {
+            "gates": self.gates,
+            "rate_limiter": self.rate_limiter,
+            "client_limit": self.ip_limit,
+            "retry_after_seconds": self.retry_after_seconds,
+        }
+
+    async def check_email(self, email: str):
+        """Charge an attempt to the account; raises 429 once its bucket is empty"""
+        retry_after = await self.rate_limiter.hit(f"email:{email.strip().lower()}", self.email_limit)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts for this account",
+                headers=retry_after_header(retry_after),
+            )
+
+    async def close(self):
+        """Release the rate-limit backend's connections, if it has its own"""
+        close = getattr(self.rate_limiter.backend, "close", None)
+        if close is not None:
+            await close()
+
+    def stats(self) -> dict:
+        return {
+            "rate_limit": self.rate_limiter.stats(),
+            "routes": {path: gate.stats() if gate is not None else None for path, gate in self.gates.items()},
+        }
+
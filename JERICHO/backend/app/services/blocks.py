@@ -0,0 +1,79 @@
+"""
+Block listing (/api/blocks).
+
+Blocks are returned in (day_key, id) order with keyset pagination: the cursor
+holds the last (day_key, id) sent and the next page starts strictly after it,
+so each page is a range scan on ix_blocks_user_day_id (or
+ix_blocks_user_cycle_day_id with a cycle filter) at any depth. The NDJSON
+export streams the same query from a server-side cursor.
+"""
+
+import base64
+from typing import AsyncIterator, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.core.responses import dumps, row_dicts
+from app.models.user import Block
+from app.schemas.blocks import BlockResponse
+
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(day_key: str, block_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{day_key}|{block_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        day_key, block_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return day_key, int(block_id)
+    except (UnicodeError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def block_query(
+    user_id: int,
+    day_from: Optional[str] = None,
+    day_to: Optional[str] = None,
+    cycle_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[Tuple[str, int]] = None,
+) -> Select:
+    query = select(Block).where(Block.user_id == user_id)
+    if cycle_id is not None:
+        query = query.where(Block.cycle_id == cycle_id)
+    if day_from is not None:
+        query = query.where(Block.day_key >= day_from)
+    if day_to is not None:
+        query = query.where(Block.day_key <= day_to)
+    if status is not None:
+        query = query.where(Block.status == status)
+    if after is not None:
+        query = query.where(tuple_(Block.day_key, Block.id) > tuple_(*after))
+    return query.order_by(Block.day_key, Block.id)
+
+
+async def list_blocks(db: AsyncSession, user_id: int, limit: int, after: Optional[Tuple[str, int]] = None, **filters) -> dict:
+    """One page of blocks plus the cursor for the next page (None on the last page)"""
+    result = await db.execute(block_query(user_id, after=after, **filters).limit(limit + 1))
+    rows = list(result.scalars())
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].day_key, page[-1].id) if len(rows) > limit else None
+    return {"blocks": page, "next_cursor": next_cursor}
+
+
+async def stream_blocks_ndjson(user_id: int, after: Optional[Tuple[str, int]] = None, **filters) -> AsyncIterator[bytes]:
+    """Yield every matching block as NDJSON, one chunk per fetched batch.
+
+    Uses its own session so the cursor outlives the request's dependencies.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            block_query(user_id, after=after, **filters).execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for batch in result.scalars().partitions():
+            yield b"".join(dumps(row) + b"\n" for row in row_dicts(BlockResponse, batch))
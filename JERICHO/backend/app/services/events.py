@@ -0,0 +1,252 @@
+"""
+Bulk ingest of client execution events (/api/sync/push).
+
+Events are validated against ExecutionEventCreate and a bad event is reported by
+index instead of failing the whole push. Valid events are deduplicated on a content hash
+(within the batch and against rows already stored), linked onto their cycle's
+hash chain, then written in chunks:
+COPY on PostgreSQL, executemany on SQLite, and counted into their cycle
+summaries and daily rollups. Everything happens in one transaction.
+
+The check against stored rows runs after the user's sync counter row is
+locked, so two pushes of the same events are serialized and the second sees
+the first's rows. The unique (user_id, event_hash) index backs this up: rows
+are inserted with ON CONFLICT DO NOTHING, and a push whose rows were not all
+written is rolled back rather than leave a gap in the sequence and chain.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import (
+    GENESIS_CHAIN_HASH, Block, ExecutionEvent, AggregateDeltas, compute_chain_hash, ledger_tails, lock_sync_seq,
+    note_sync_changes, reserve_sync_seq,
+)
+from app.schemas.blocks import ExecutionEventCreate
+
+INSERT_CHUNK_SIZE = 5000
+LOOKUP_CHUNK_SIZE = 900  # stays under SQLite's default bound-parameter limit
+EVENT_COLUMNS = ("user_id", "cycle_id", "block_id", "event_type", "event_data", "event_hash", "chain_hash", "sync_seq")
+EVENT_CONFLICT_SQL = "ON CONFLICT (user_id, event_hash) DO NOTHING"
+INSERT_EVENT_SQL = (
+    f"INSERT INTO {ExecutionEvent.__tablename__} ({', '.join(EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)}) {EVENT_CONFLICT_SQL}"
+)
+# COPY cannot skip conflicts, so PostgreSQL copies into a per-transaction staging table first
+EVENT_STAGING_TABLE = "execution_events_staging"
+CREATE_EVENT_STAGING_SQL = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {EVENT_STAGING_TABLE} ON COMMIT DELETE ROWS AS "
+    f"SELECT {', '.join(EVENT_COLUMNS)} FROM {ExecutionEvent.__tablename__} WITH NO DATA"
+)
+INSERT_STAGED_EVENTS_SQL = (
+    f"INSERT INTO {ExecutionEvent.__tablename__} ({', '.join(EVENT_COLUMNS)}) "
+    f"SELECT {', '.join(EVENT_COLUMNS)} FROM {EVENT_STAGING_TABLE} ORDER BY sync_seq {EVENT_CONFLICT_SQL}"
+)
+
+_canonical_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+_event_list_adapter = TypeAdapter(List[ExecutionEventCreate])
+
+
+def canonical_json(data: Any) -> str:
+    """Deterministic JSON encoding used for hashing"""
+    return _canonical_encoder.encode(data)
+
+
+def js_number(value):
+    """Integral floats without a fraction, as JSON.stringify and template strings print them"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def compute_event_hash(user_id: int, event: ExecutionEventCreate, event_data_json: str = None) -> str:
+    """Content hash identifying an event; resending the same event yields the same hash.
+
+    Pass ``event_data_json`` when the canonical event_data encoding is already at hand.
+    """
+    if event_data_json is None:
+        event_data_json = canonical_json(event.event_data)
+    return event_content_hash(user_id, event.cycle_id, event.block_id, event.event_type, event_data_json)
+
+
+def event_content_hash(user_id: int, cycle_id: int, block_id: int, event_type: str, event_data_json: str) -> str:
+    payload = f"{user_id}|{cycle_id}|{block_id}|{event_type}|{event_data_json}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chunked(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def format_validation_error(error: dict) -> str:
+    path = ".".join(str(part) for part in error["loc"])
+    return f"{path}: {error['msg']}" if path else error["msg"]
+
+
+def validate_events(raw_events: List[Any]):
+    """Validate a batch in one pass, falling back to per-event errors only on failure.
+
+    Returns ``(candidates, rejected)`` where candidates are ``(index, event)`` pairs.
+    """
+    try:
+        return list(enumerate(_event_list_adapter.validate_python(raw_events))), []
+    except ValidationError as exc:
+        errors_by_index = {}
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            errors_by_index.setdefault(index, []).append(format_validation_error(dict(error, loc=loc)))
+
+    candidates = [
+        (index, ExecutionEventCreate.model_validate(raw))
+        for index, raw in enumerate(raw_events)
+        if index not in errors_by_index
+    ]
+    rejected = [{"index": index, "errors": errors} for index, errors in errors_by_index.items()]
+    return candidates, rejected
+
+
+async def _owned_blocks(db: AsyncSession, user_id: int, block_ids: List[int]) -> Dict[int, Any]:
+    """Map each of the user's blocks to its (cycle_id, goal_id, day_key, practice) row"""
+    owned = {}
+    for chunk in chunked(block_ids, LOOKUP_CHUNK_SIZE):
+        result = await db.execute(
+            select(Block.id, Block.cycle_id, Block.goal_id, Block.day_key, Block.practice)
+            .where(Block.user_id == user_id, Block.id.in_(chunk))
+        )
+        owned.update((row.id, row) for row in result)
+    return owned
+
+
+# Expanding bind parameter: the IN list is bound as one value instead of coerced per item
+EXISTING_HASHES_QUERY = select(ExecutionEvent.event_hash).where(
+    ExecutionEvent.user_id == bindparam("user_id"),
+    ExecutionEvent.event_hash.in_(bindparam("hashes", expanding=True)),
+)
+
+
+async def _existing_hashes(db: AsyncSession, user_id: int, hashes: List[str]) -> set:
+    existing = set()
+    for chunk in chunked(hashes, LOOKUP_CHUNK_SIZE):
+        result = await db.execute(EXISTING_HASHES_QUERY, {"user_id": user_id, "hashes": chunk})
+        existing.update(result.scalars().all())
+    return existing
+
+
+async def write_event_rows(db: AsyncSession, rows: List[dict]) -> int:
+    """Write rows in chunks (COPY on PostgreSQL, executemany elsewhere), skipping duplicates; returns rows written"""
+    if not rows:
+        return 0
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        await conn.exec_driver_sql(CREATE_EVENT_STAGING_SQL)
+        raw = await conn.get_raw_connection()
+        for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+            await raw.driver_connection.copy_records_to_table(
+                EVENT_STAGING_TABLE,
+                records=[tuple(row[column] for column in EVENT_COLUMNS) for row in chunk],
+                columns=list(EVENT_COLUMNS),
+            )
+        # Ordered by sync_seq, so ids follow each cycle's chain order
+        written = (await conn.exec_driver_sql(INSERT_STAGED_EVENTS_SQL)).rowcount
+        await conn.exec_driver_sql(f"TRUNCATE {EVENT_STAGING_TABLE}")
+        return written
+
+    # Plain DB-API executemany; skips per-row SQLAlchemy parameter processing
+    written = 0
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        result = await conn.exec_driver_sql(
+            INSERT_EVENT_SQL, [tuple(row[column] for column in EVENT_COLUMNS) for row in chunk]
+        )
+        written += result.rowcount
+    return written
+
+
+async def ingest_events(db: AsyncSession, user_id: int, raw_events: List[Any], atomic: bool = False) -> dict:
+    """Validate, dedup and bulk-insert a push batch in a single transaction.
+
+    With ``atomic`` set, any rejected event causes nothing to be written.
+    """
+    candidates, rejected = validate_events(raw_events)
+    blocks = await _owned_blocks(db, user_id, sorted({event.block_id for _, event in candidates}))
+
+    rows = []
+    seen = set()
+    duplicates = 0
+    for index, event in candidates:
+        block = blocks.get(event.block_id)
+        if block is None:
+            rejected.append({"index": index, "errors": [f"block_id: block {event.block_id} not found"]})
+            continue
+        if block.cycle_id != event.cycle_id:
+            rejected.append({"index": index, "errors": [f"cycle_id: block {event.block_id} belongs to cycle {block.cycle_id}"]})
+            continue
+
+        event_data_json = canonical_json(event.event_data)
+        event_hash = compute_event_hash(user_id, event, event_data_json)
+        if event_hash in seen:
+            duplicates += 1
+            continue
+        seen.add(event_hash)
+        rows.append({
+            "user_id": user_id,
+            "cycle_id": event.cycle_id,
+            "block_id": event.block_id,
+            "event_type": event.event_type,
+            "event_data": event_data_json if event.event_data is not None else None,
+            "event_hash": event_hash,
+        })
+
+    try:
+        if rows:
+            # Lock first: a concurrent push of the same events waits here, then finds this push's rows
+            await db.run_sync(lambda session: lock_sync_seq(session.connection(), user_id))
+            existing = await _existing_hashes(db, user_id, [row["event_hash"] for row in rows])
+            if existing:
+                duplicates += len(existing)
+                rows = [row for row in rows if row["event_hash"] not in existing]
+
+        if atomic and rejected:
+            rows = []
+
+        if rows:
+            last_seq = await db.run_sync(lambda session: reserve_sync_seq(session.connection(), user_id, len(rows)))
+            note_sync_changes(db.sync_session, {user_id: last_seq})
+            # Read chain tails only after the reservation has locked the user's counter row
+            tails = await db.run_sync(
+                lambda session: ledger_tails(session.connection(), {row["cycle_id"] for row in rows})
+            )
+            for seq, row in enumerate(rows, start=last_seq - len(rows) + 1):
+                row["sync_seq"] = seq
+                row["chain_hash"] = compute_chain_hash(tails.get(row["cycle_id"], GENESIS_CHAIN_HASH), row["event_hash"])
+                tails[row["cycle_id"]] = row["chain_hash"]
+        written = await write_event_rows(db, rows)
+        if written != len(rows):
+            # Only a writer that bypassed the counter lock can get here; its sequence numbers and chain links are void
+            raise RuntimeError(f"{len(rows) - written} events were written concurrently; retry the push")
+        if rows:
+            deltas = AggregateDeltas()
+            for row in rows:
+                block = blocks[row["block_id"]]
+                deltas.add_event(
+                    user_id, row["cycle_id"], row["event_type"], row["event_data"],
+                    (block.goal_id, block.day_key, block.practice),
+                )
+            await db.run_sync(lambda session: deltas.apply(session.connection()))
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    rejected.sort(key=lambda item: item["index"])
+    return {
+        "received": len(raw_events),
+        "accepted": len(rows),
+        "duplicates": duplicates,
+        "rejected": rejected,
+    }
@@ -0,0 +1,30 @@
+"""
+Goal queries that filter on execution-contract fields.
+
+Deadline fields are generated columns on goals (Goal.deadline_type,
+Goal.deadline_day_key) covered by ix_goals_user_deadline, so these filters run
+in the database instead of decoding every contract in Python.
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import Goal
+
+
+async def goals_due_between(
+    db: AsyncSession, user_id: int, start_day: str, end_day: str, deadline_type: Optional[str] = None
+) -> List[Goal]:
+    """Active goals whose contract deadline falls within [start_day, end_day] (YYYY-MM-DD)"""
+    query = select(Goal).where(
+        Goal.user_id == user_id,
+        Goal.deadline_day_key >= start_day,
+        Goal.deadline_day_key <= end_day,
+        Goal.is_active.is_(True),
+    )
+    if deadline_type is not None:
+        query = query.where(Goal.deadline_type == deadline_type)
+    result = await db.execute(query.order_by(Goal.deadline_day_key, Goal.id))
+    return list(result.scalars().all())
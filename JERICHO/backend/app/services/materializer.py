@@ -0,0 +1,260 @@
+"""
+Server-side execution-event materializer.
+
+Python port of materializeBlocksFromEvents (src/state/engine/todayAuthority.ts):
+ExecutionEvent rows (create/reschedule/complete/delete/missed/tick_now) are
+folded, in append order, into block projections. The fold for each cycle is
+persisted as a checkpoint (cycle_projection_checkpoints) and kept in a small
+in-process cache, so rebuilding a view only applies events appended after the
+checkpoint: O(new events), not O(all events).
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.timekeys import day_key_from_date, day_key_from_iso, now_day_key, parse_iso, to_iso
+from app.models.user import CycleProjectionCheckpoint, ExecutionEvent
+
+STREAM_BATCH_SIZE = 1000
+
+# Folded state per cycle id; a miss falls back to the persisted checkpoint
+_state_cache = LRUCache(maxsize=256)
+
+
+@sa_event.listens_for(ExecutionEvent.__table__, "after_drop")
+def _clear_states_on_drop(target, connection, **kw):
+    """Cycle ids are reused after the ledger is recreated"""
+    _state_cache.clear()
+
+
+@dataclass
+class MaterializedState:
+    """Folded block state for one cycle, covering events up to last_event_id"""
+    blocks: Dict[str, dict] = field(default_factory=dict)
+    completed: Set[str] = field(default_factory=set)
+    deleted: Set[str] = field(default_factory=set)
+    last_event_id: int = 0
+    event_count: int = 0
+    persisted_event_count: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "blocks": self.blocks,
+            "completed": sorted(self.completed),
+            "deleted": sorted(self.deleted),
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: CycleProjectionCheckpoint) -> "MaterializedState":
+        data = json.loads(checkpoint.state)
+        return cls(
+            blocks=data["blocks"],
+            completed=set(data["completed"]),
+            deleted=set(data["deleted"]),
+            last_event_id=checkpoint.last_event_id,
+            event_count=checkpoint.event_count,
+            persisted_event_count=checkpoint.event_count,
+        )
+
+
+def _js_round(value: float) -> int:
+    """Math.round semantics (halves round up), unlike Python's banker's rounding"""
+    return int(math.floor(value + 0.5))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _coalesce(*values):
+    """JavaScript `??` chain: first value that is not None"""
+    return next((value for value in values if value is not None), None)
+
+
+def build_block_from_event(event: dict, fallback_day: str, fallback: Optional[dict] = None) -> dict:
+    """Initial projection for a block first seen in `event`"""
+    fallback = fallback or {}
+    base_date = event.get("dateISO") or day_key_from_iso(event.get("startISO")) or fallback_day
+    start_iso = event.get("startISO") or f"{base_date}T08:00:00.000Z"
+    minutes = max(0, _js_round(event["minutes"])) if _is_number(event.get("minutes")) else 30
+    end_iso = event.get("endISO")
+    if not end_iso:
+        start = parse_iso(start_iso)
+        end_iso = to_iso(start + timedelta(minutes=minutes)) if start else None
+    domain = event.get("domain")
+    if not domain or domain == "Unclassified":
+        domain = fallback.get("domain") or fallback.get("practice") or "Focus"
+    status = event.get("status") or ("completed" if event.get("completed") else fallback.get("status") or "planned")
+
+    return {
+        "id": event["blockId"],
+        "cycleId": event.get("cycleId") or fallback.get("cycleId"),
+        "goalId": event.get("goalId") or fallback.get("goalId"),
+        "origin": event.get("origin") or fallback.get("origin"),
+        "suggestionId": event.get("suggestionId") or fallback.get("suggestionId"),
+        "deliverableId": _coalesce(event.get("deliverableId"), fallback.get("deliverableId")),
+        "criterionId": _coalesce(event.get("criterionId"), fallback.get("criterionId")),
+        "lockedUntilDayKey": _coalesce(event.get("lockedUntilDayKey"), fallback.get("lockedUntilDayKey")),
+        "practice": fallback.get("practice") or domain,
+        "domain": domain,
+        "label": event.get("rawLabel") or fallback.get("label") or "Block",
+        "start": start_iso,
+        "end": end_iso,
+        "status": status,
+    }
+
+
+def apply_event(state: MaterializedState, event: dict, fallback_day: str):
+    """Fold one event into the state (same rules as the frontend materializer)"""
+    block_id = event.get("blockId")
+    if not block_id:
+        return
+    kind = event.get("kind")
+    if kind == "missed" or block_id in state.deleted:
+        return
+    if kind == "delete":
+        state.deleted.add(block_id)
+        state.blocks.pop(block_id, None)
+        return
+
+    fallback = state.blocks.get(block_id)
+    if fallback is None and kind and kind not in ("create", "complete"):
+        return
+
+    block = dict(fallback) if fallback is not None else build_block_from_event(event, fallback_day)
+    if event.get("rawLabel"):
+        block["label"] = event["rawLabel"]
+    if kind in ("reschedule", "create"):
+        if event.get("startISO"):
+            block["start"] = event["startISO"]
+        if event.get("endISO"):
+            block["end"] = event["endISO"]
+    if event.get("status"):
+        block["status"] = event["status"]
+    domain = event.get("domain")
+    if domain and domain != "Unclassified":
+        block["domain"] = domain
+        if not block.get("practice"):
+            block["practice"] = domain
+    for key in ("deliverableId", "criterionId", "lockedUntilDayKey"):
+        if key in event:
+            block[key] = event[key]
+    if kind in ("reschedule", "create") and event.get("minutes") and not event.get("endISO") and block.get("start"):
+        start = parse_iso(block["start"])
+        if start and _is_number(event["minutes"]):
+            block["end"] = to_iso(start + timedelta(minutes=_js_round(event["minutes"])))
+    if event.get("completed"):
+        state.completed.add(block_id)
+        block["status"] = "completed"
+    elif block_id in state.completed:
+        block["status"] = "completed"
+
+    state.blocks[block_id] = block
+
+
+def event_from_row(row) -> dict:
+    """Client-shaped event from an ExecutionEvent row (event_type is the kind)"""
+    data = row.event_data
+    if isinstance(data, str):
+        data = json.loads(data) if data else {}
+    event = dict(data or {})
+    event["kind"] = row.event_type
+    event.setdefault("blockId", str(row.block_id))
+    event.setdefault("cycleId", row.cycle_id)
+    return event
+
+
+def materialize_events(events: List[dict], fallback_day: Optional[str] = None) -> MaterializedState:
+    """Fold an in-memory event list from scratch"""
+    state = MaterializedState()
+    fallback_day = fallback_day or now_day_key()
+    for event in events:
+        apply_event(state, event, fallback_day)
+        state.event_count += 1
+    return state
+
+
+def project_days(state: MaterializedState, today_iso: Optional[str] = None) -> dict:
+    """Group projected blocks by day key, ordered by day then start/id"""
+    days: Dict[str, List[dict]] = {}
+    for block in state.blocks.values():
+        key = day_key_from_iso(block.get("start"))
+        if key:
+            days.setdefault(key, []).append(block)
+
+    for blocks in days.values():
+        blocks.sort(key=lambda block: (block.get("start") or "", str(block["id"])))
+
+    today_key = today_iso or now_day_key()
+    return {
+        "days": [{"date": key, "blocks": days[key]} for key in sorted(days)],
+        "today_blocks": days.get(today_key, []),
+    }
+
+
+async def save_checkpoint(db: AsyncSession, cycle_id: int, user_id: int, state: MaterializedState):
+    await db.merge(CycleProjectionCheckpoint(
+        cycle_id=cycle_id,
+        user_id=user_id,
+        last_event_id=state.last_event_id,
+        event_count=state.event_count,
+        state=state.to_json(),
+    ))
+    await db.commit()
+    state.persisted_event_count = state.event_count
+
+
+async def materialize_cycle(db: AsyncSession, cycle_id: int, user_id: int) -> MaterializedState:
+    """Bring a cycle's folded state up to date, applying only events after its checkpoint"""
+    state = _state_cache.get(cycle_id)
+    if state is None:
+        checkpoint = await db.get(CycleProjectionCheckpoint, cycle_id)
+        state = MaterializedState.from_checkpoint(checkpoint) if checkpoint else MaterializedState()
+        _state_cache.set(cycle_id, state)
+
+    result = await db.stream(
+        select(
+            ExecutionEvent.id,
+            ExecutionEvent.event_type,
+            ExecutionEvent.block_id,
+            ExecutionEvent.cycle_id,
+            ExecutionEvent.event_data,
+            ExecutionEvent.timestamp,
+        )
+        .where(ExecutionEvent.cycle_id == cycle_id, ExecutionEvent.id > state.last_event_id)
+        .order_by(ExecutionEvent.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async for row in result:
+        # Concurrent callers share the cached state; the id guard applies each event once, in order
+        if row.id <= state.last_event_id:
+            continue
+        fallback_day = day_key_from_date(row.timestamp) if row.timestamp else now_day_key()
+        apply_event(state, event_from_row(row), fallback_day)
+        state.last_event_id = row.id
+        state.event_count += 1
+
+    if state.event_count - state.persisted_event_count >= settings.materializer_checkpoint_interval:
+        await save_checkpoint(db, cycle_id, user_id, state)
+    return state
+
+
+async def rebuild_cycle(db: AsyncSession, cycle_id: int, user_id: int) -> MaterializedState:
+    """Discard the checkpoint and refold the cycle from its first event"""
+    _state_cache.invalidate(cycle_id)
+    checkpoint = await db.get(CycleProjectionCheckpoint, cycle_id)
+    if checkpoint is not None:
+        await db.delete(checkpoint)
+        await db.commit()
+    state = await materialize_cycle(db, cycle_id, user_id)
+    if state.event_count != state.persisted_event_count:
+        await save_checkpoint(db, cycle_id, user_id, state)
+    return state
@@ -0,0 +1,318 @@
+"""
+Server-side deterministic plan generator.
+
+Python port of generateDeterministicPlan / buildAutoDeliverables
+(src/core/deterministicPlanGenerator.ts). Plans are pure functions of the
+generator input (deadline, start, causal chain, constraints, mode), so they
+are content-addressed: the cache key is a canonical hash of the normalized
+input plus PLANNER_VERSION. Lookups go through an in-process LRU, then the
+plan_cache table, and only then the generator; goals built from the same
+template share one cached plan however many users or devices ask for it.
+
+The input is derived from the goal the way the client derives it: deadline
+from the contract's deadline.dayKey, start from temporalBinding.startDayKey
+(falling back to the goal's creation day), causal chain steps, and caps from
+the contract's optional `constraints` (maxBlocksPerDay defaults to 4,
+maxBlocksPerWeek to 16). Only REBASE_FROM_TODAY plans depend on today, so
+REGENERATE plans are keyed without it.
+"""
+
+import hashlib
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.timekeys import SUNDAY_FIRST_WEEKDAYS, day_key_from_date, now_day_key
+from app.models.user import Goal, PlanCacheEntry
+from app.services.events import canonical_json, js_number
+
+PLANNER_VERSION = "deterministic_v1"
+PLAN_MODES = ("REGENERATE", "REBASE_FROM_TODAY")
+DEFAULT_MAX_BLOCKS_PER_DAY = 4
+DEFAULT_MAX_BLOCKS_PER_WEEK = 16
+BLOCK_DURATION_MINUTES = 60
+
+MAX_DAY_ITERATIONS = 50000
+MAX_ALLOCATION_ITERATIONS = 50000
+
+DEFAULT_DELIVERABLES = (
+    {"id": "deliv-planning", "title": "Planning & Setup", "kind": "PLANNING", "requiredBlocks": 2},
+    {"id": "deliv-core", "title": "Core Work", "kind": "CORE", "requiredBlocks": 6},
+    {"id": "deliv-verify", "title": "Verification & Review", "kind": "VERIFICATION", "requiredBlocks": 2},
+)
+
+# plan hash -> generated plan; a miss falls back to the plan_cache table
+_plan_cache = LRUCache(maxsize=settings.plan_cache_size)
+
+
+@sa_event.listens_for(PlanCacheEntry.__table__, "after_drop")
+def _clear_plans_on_drop(target, connection, **kw):
+    """Keep the memory tier from outliving the persistent one"""
+    _plan_cache.clear()
+
+
+class PlanInputError(ValueError):
+    """A goal whose contract cannot be turned into generator input"""
+
+
+def build_auto_deliverables(causal_chain_steps: Optional[List[dict]] = None) -> List[dict]:
+    """Deliverables from the causal chain, or the default Planning/Core/Verify split"""
+    if causal_chain_steps:
+        ordered = sorted(causal_chain_steps, key=lambda step: step["sequence"])
+        last = len(ordered) - 1
+        return [
+            {
+                "id": f"deliv-causal-{js_number(step['sequence'])}",
+                "title": step["description"],
+                "kind": "PLANNING" if index < 1 else "CORE" if index < last else "VERIFICATION",
+                "requiredBlocks": 1,
+            }
+            for index, step in enumerate(ordered)
+        ]
+    return [dict(deliverable) for deliverable in DEFAULT_DELIVERABLES]
+
+
+def _eligible_days(start_day_key: str, deadline_day_key: str, constraints: dict) -> Tuple[List[str], int]:
+    """Days in [start, deadline] on a preferred weekday and not blacked out, with the iteration count"""
+    blackout = set(constraints.get("blackoutDayKeys") or [])
+    preferred = set(constraints.get("preferredDaysOfWeek") or [])
+    if start_day_key > deadline_day_key:
+        return [], 0
+    first, last = date.fromisoformat(start_day_key), date.fromisoformat(deadline_day_key)
+    iterations = (last - first).days + 1
+    if iterations > MAX_DAY_ITERATIONS:
+        raise PlanInputError(
+            f"Eligible-day iteration cap exceeded: {iterations} iterations, "
+            f"start={start_day_key}, deadline={deadline_day_key}"
+        )
+    eligible = []
+    for offset in range(iterations):
+        day = first + timedelta(days=offset)
+        day_key = day.isoformat()
+        # isoweekday() % 7 is Date.getUTCDay(): 0=Sun .. 6=Sat
+        if day_key not in blackout and (not preferred or day.isoweekday() % 7 in preferred):
+            eligible.append(day_key)
+    return eligible, iterations
+
+
+def _week_start(day_key: str) -> str:
+    """Monday of the day's week, for weekly capacity"""
+    day = date.fromisoformat(day_key)
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _infeasible(code: str, message: str, deliverables: Optional[List[dict]] = None, **details) -> dict:
+    return {
+        "status": "INFEASIBLE",
+        "proposedBlocks": [],
+        "autoDeliverables": deliverables or [],
+        "error": {"code": code, "message": message, **details},
+    }
+
+
+def generate_deterministic_plan(plan_input: dict) -> dict:
+    """SUCCESS with earliest-first proposed blocks, or INFEASIBLE with a single error"""
+    constraints = plan_input["constraints"]
+    deadline_day_key = plan_input["contractDeadlineDayKey"]
+    start_day_key = plan_input["contractStartDayKey"]
+    max_per_day, max_per_week = constraints["maxBlocksPerDay"], constraints["maxBlocksPerWeek"]
+
+    if max_per_day <= 0:
+        return _infeasible("DAILY_CAP_ZERO", "Daily block capacity must be greater than 0")
+    if max_per_week <= 0:
+        return _infeasible("WEEKLY_CAP_ZERO", "Weekly block capacity must be greater than 0")
+    if deadline_day_key <= start_day_key:
+        return _infeasible("DEADLINE_BEFORE_START", "Deadline must be after start date")
+
+    effective_start = plan_input["nowDayKey"] if plan_input["mode"] == "REBASE_FROM_TODAY" else start_day_key
+    eligible_days, day_iterations = _eligible_days(effective_start, deadline_day_key, constraints)
+    if not eligible_days:
+        return _infeasible("NO_ELIGIBLE_DAYS", "No eligible working days between start and deadline")
+
+    deliverables = build_auto_deliverables(plan_input.get("causalChainSteps"))
+    total_required = sum(deliverable["requiredBlocks"] for deliverable in deliverables)
+    capacity = min(len(eligible_days) * max_per_day, math.ceil(len(eligible_days) / 7) * max_per_week)
+    target_blocks = min(total_required, capacity)
+    if target_blocks < 1:
+        return _infeasible("NO_ELIGIBLE_DAYS", "Insufficient capacity to fit required blocks", deliverables)
+
+    block_queue = [
+        (deliverable, order) for deliverable in deliverables for order in range(deliverable["requiredBlocks"])
+    ]
+    week_keys = {day_key: _week_start(day_key) for day_key in eligible_days}
+    proposed: List[dict] = []
+    daily_count: Dict[str, int] = {}
+    weekly_count: Dict[str, int] = {}
+    day_index = 0
+    allocation_iterations = 0
+
+    for deliverable, order in block_queue:
+        if len(proposed) >= target_blocks:
+            break
+        allocated = False
+        for attempt in range(len(eligible_days)):
+            allocation_iterations += 1
+            if allocation_iterations > MAX_ALLOCATION_ITERATIONS:
+                result = _infeasible(
+                    "PLAN_NON_TERMINATING_GUARD",
+                    "Block allocation exceeded iteration limit (pathological constraints detected)",
+                    deliverables,
+                    iterations={"dayIterations": day_iterations, "allocationIterations": allocation_iterations},
+                    inputSummary={
+                        "start": effective_start,
+                        "deadline": deadline_day_key,
+                        "daysAvailable": len(eligible_days),
+                    },
+                )
+                result["proposedBlocks"] = proposed
+                return result
+            day_key = eligible_days[(day_index + attempt) % len(eligible_days)]
+            week_key = week_keys[day_key]
+            if daily_count.get(day_key, 0) < max_per_day and weekly_count.get(week_key, 0) < max_per_week:
+                proposed.append({
+                    "id": f"block-{len(proposed)}",
+                    "dayKey": day_key,
+                    "deliverableId": deliverable["id"],
+                    "deliverableTitle": deliverable["title"],
+                    "kind": deliverable["kind"],
+                    "durationMinutes": BLOCK_DURATION_MINUTES,
+                    "order": order,
+                })
+                daily_count[day_key] = daily_count.get(day_key, 0) + 1
+                weekly_count[week_key] = weekly_count.get(week_key, 0) + 1
+                allocated = True
+                break
+        if not allocated:
+            day_index += 1
+
+    if not proposed:
+        return _infeasible("NO_ELIGIBLE_DAYS", "Failed to allocate blocks despite eligible days", deliverables)
+    return {"status": "SUCCESS", "proposedBlocks": proposed, "autoDeliverables": deliverables}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _day_key(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value).isoformat() if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+def _causal_chain_steps(contract: dict) -> Optional[List[dict]]:
+    """execution.causalChainSteps (client cycle shape) or causalChain.steps (admission shape)"""
+    steps = (contract.get("execution") or {}).get("causalChainSteps")
+    if not isinstance(steps, list):
+        steps = (contract.get("causalChain") or {}).get("steps")
+    if not isinstance(steps, list):
+        return None
+    return [
+        {"sequence": js_number(step["sequence"]), "description": str(step.get("description") or "")}
+        for step in steps
+        if isinstance(step, dict) and _is_number(step.get("sequence"))
+    ]
+
+
+def _preferred_days(constraints: dict) -> List[int]:
+    """preferredDaysOfWeek, or workableDayPolicy.weekdays (numbers or names), Sunday = 0"""
+    days = constraints.get("preferredDaysOfWeek")
+    if not isinstance(days, list):
+        days = (constraints.get("workableDayPolicy") or {}).get("weekdays")
+    preferred = set()
+    for entry in days if isinstance(days, list) else []:
+        if _is_number(entry) and float(entry).is_integer() and 0 <= entry <= 6:
+            preferred.add(int(entry))
+        elif isinstance(entry, str) and entry[:3].lower() in SUNDAY_FIRST_WEEKDAYS:
+            preferred.add(SUNDAY_FIRST_WEEKDAYS[entry[:3].lower()])
+    return sorted(preferred)
+
+
+def plan_input_for_goal(goal: Goal, mode: str = "REGENERATE", today: Optional[str] = None) -> dict:
+    """Normalized generator input for a stored goal"""
+    contract = goal.goal_execution_contract if isinstance(goal.goal_execution_contract, dict) else {}
+    deadline = _day_key((contract.get("deadline") or {}).get("dayKey"))
+    if deadline is None:
+        raise PlanInputError("Goal contract has no deadline day")
+    start = _day_key((contract.get("temporalBinding") or {}).get("startDayKey"))
+    if start is None:
+        start = day_key_from_date(goal.created_at) if goal.created_at else (today or now_day_key())
+
+    constraints = contract.get("constraints") if isinstance(contract.get("constraints"), dict) else {}
+    blackouts = constraints.get("blackoutDayKeys")
+    if not isinstance(blackouts, list):
+        blackouts = constraints.get("blackoutDates")
+    max_per_day, max_per_week = constraints.get("maxBlocksPerDay"), constraints.get("maxBlocksPerWeek")
+    return {
+        "contractDeadlineDayKey": deadline,
+        "contractStartDayKey": start,
+        # Only REBASE_FROM_TODAY reads today; leaving it out keeps REGENERATE plans shareable across days
+        "nowDayKey": (today or now_day_key()) if mode == "REBASE_FROM_TODAY" else None,
+        "causalChainSteps": _causal_chain_steps(contract),
+        "constraints": {
+            # `value || default`, as the client reads strategy constraints
+            "maxBlocksPerDay": max_per_day if _is_number(max_per_day) and max_per_day else DEFAULT_MAX_BLOCKS_PER_DAY,
+            "maxBlocksPerWeek": max_per_week if _is_number(max_per_week) and max_per_week else DEFAULT_MAX_BLOCKS_PER_WEEK,
+            "preferredDaysOfWeek": _preferred_days(constraints),
+            "blackoutDayKeys": sorted({key for key in map(_day_key, blackouts or []) if key}),
+            "timezone": settings.app_time_zone,
+        },
+        "mode": mode,
+    }
+
+
+def plan_hash(plan_input: dict) -> str:
+    """Content address of a plan: canonical generator input plus generator version"""
+    payload = canonical_json({"input": plan_input, "version": PLANNER_VERSION})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _store_plan(db: AsyncSession, key: str, plan: dict):
+    """Insert a computed plan; a concurrent insert of the same content wins harmlessly"""
+    conn = await db.connection()
+    await conn.execute(
+        dialect_insert(conn)(PlanCacheEntry.__table__)
+        .values(plan_hash=key, generator_version=PLANNER_VERSION, status=plan["status"], plan=plan)
+        .on_conflict_do_nothing(index_elements=["plan_hash"])
+    )
+    await db.commit()
+
+
+async def get_plan(db: AsyncSession, plan_input: dict) -> Tuple[str, dict, str]:
+    """(plan hash, plan, source) where source is memory, database or generated"""
+    key = plan_hash(plan_input)
+    plan = _plan_cache.get(key)
+    if plan is not None:
+        return key, plan, "memory"
+
+    entry = await db.get(PlanCacheEntry, key)
+    if entry is not None:
+        _plan_cache.set(key, entry.plan)
+        return key, entry.plan, "database"
+
+    plan = generate_deterministic_plan(plan_input)
+    await _store_plan(db, key, plan)
+    _plan_cache.set(key, plan)
+    return key, plan, "generated"
+
+
+async def plan_for_goal(db: AsyncSession, goal: Goal, mode: str = "REGENERATE", today: Optional[str] = None) -> dict:
+    """Deterministic plan for a stored goal, served from the plan cache when possible"""
+    key, plan, source = await get_plan(db, plan_input_for_goal(goal, mode, today))
+    return {
+        "goalId": goal.id,
+        "planHash": key,
+        "generatorVersion": PLANNER_VERSION,
+        "mode": mode,
+        "source": source,
+        **plan,
+    }
@@ -0,0 +1,407 @@
+"""
+Batch goal-success probability engine.
+
+Python port of scoreGoalSuccessProbability / computeCompletedThroughput
+(src/state/engine/probabilityScore.ts) that scores every active goal in one
+pass. Per-goal inputs (deadline, remaining blocks, governance gate, workable
+weekdays) become (G,) arrays; completed-block counts for the window become a
+(G, S) day matrix, so window selection, mean/stddev and the normal tail
+probability are array operations rather than a per-goal loop.
+
+Results keep the client's ProbabilityResult shape (value, status, capApplied,
+reasons, requiredEvents, evidenceSummary, scoringSummary). Server-side:
+
+- Evidence is `complete` execution events, dated by their block's day_key
+  (the client's event.dateISO).
+- Remaining work is the goal's scheduled/started blocks from today on.
+- Both are read from the daily rollups (services/rollups.py), not from blocks.
+- Constraints come from the execution contract's optional `constraints`
+  object; workableDayPolicy.weekdays, blackoutDates and maxBlocksPerDay are
+  applied. Without maxBlocksPerDay every workable day counts toward capacity.
+- Plan proofs and auto-asana conflicts live only in the client, so the prior
+  is the client's fallback plan proof and UNSCHEDULABLE is never returned.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.timekeys import SUNDAY_FIRST_WEEKDAYS, day_key_from_date, to_iso
+from app.models.user import DailyRollup, Goal
+
+POLICY_VERSION = "probability_v2"
+MIN_EVIDENCE_DAYS = 7
+NO_EVIDENCE_CAP = 0.65
+REMAINING_BLOCK_STATUSES = ("scheduled", "started")
+
+CONTRACT_ACTIVE, CONTRACT_MISSING, CONTRACT_INACTIVE = 0, 1, 2
+
+(OUTCOME_SCORED, OUTCOME_INFEASIBLE, OUTCOME_NO_WORKABLE_DAYS, OUTCOME_NO_CONTRACT,
+ OUTCOME_INACTIVE, OUTCOME_INSUFFICIENT_EVIDENCE) = range(6)
+OUTCOME_REASONS = {
+    OUTCOME_INFEASIBLE: "INFEASIBLE",
+    OUTCOME_NO_WORKABLE_DAYS: "NO_WORKABLE_DAYS",
+    OUTCOME_NO_CONTRACT: "no_match",
+    OUTCOME_INACTIVE: "inactive",
+    OUTCOME_INSUFFICIENT_EVIDENCE: "insufficient_evidence",
+}
+
+# numpy weekmasks start on Monday; ours start on Sunday like Date.getDay()
+_MONDAY_FIRST = [1, 2, 3, 4, 5, 6, 0]
+
+
+@dataclass
+class ProbabilityInputs:
+    """Column-oriented inputs for G goals (rows ordered by goal_ids)"""
+    goal_ids: np.ndarray  # (G,) int64, ascending
+    deadline: np.ndarray  # (G,) datetime64[D], NaT when the contract has no deadline
+    remaining_blocks: np.ndarray  # (G,) int64
+    contract_state: np.ndarray  # (G,) int8, CONTRACT_*
+    min_evidence: np.ndarray  # (G,) int64, governance.minEvidenceEvents
+    weekmask: np.ndarray  # (G, 7) bool, Sunday first
+    max_per_day: np.ndarray  # (G,) float64, NaN = unlimited
+    constraint_density: np.ndarray  # (G,) float64, constraintDensityScore
+    total_events: np.ndarray  # (G,) int64
+    completed_events: np.ndarray  # (G,) int64
+    days_covered: np.ndarray  # (G,) int64
+    # Sparse (row, day, count) completed-block counts covering at least the scoring window
+    completed_rows: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    completed_days: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype="datetime64[D]"))
+    completed_counts: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    blackouts: Dict[int, np.ndarray] = field(default_factory=dict)  # row -> datetime64[D] dates
+
+    @classmethod
+    def empty(cls, goal_ids) -> "ProbabilityInputs":
+        """Inputs for goals with no contracts, work or evidence; fill in what applies"""
+        count = len(goal_ids)
+        return cls(
+            goal_ids=np.asarray(goal_ids, dtype=np.int64),
+            deadline=np.full(count, np.datetime64("NaT"), dtype="datetime64[D]"),
+            remaining_blocks=np.zeros(count, dtype=np.int64),
+            contract_state=np.full(count, CONTRACT_MISSING, dtype=np.int8),
+            min_evidence=np.zeros(count, dtype=np.int64),
+            weekmask=np.ones((count, 7), dtype=bool),
+            max_per_day=np.full(count, np.nan),
+            constraint_density=np.zeros(count),
+            total_events=np.zeros(count, dtype=np.int64),
+            completed_events=np.zeros(count, dtype=np.int64),
+            days_covered=np.zeros(count, dtype=np.int64),
+        )
+
+
+def _weekday(days: np.ndarray) -> np.ndarray:
+    """Day of week, Sunday = 0 (1970-01-01 was a Thursday)"""
+    return (days.astype("int64") + 4) % 7
+
+
+def _normal_cdf(z: np.ndarray) -> np.ndarray:
+    """Same Abramowitz-Stegun erf approximation as the client, for identical scores"""
+    x = z / math.sqrt(2)
+    sign = np.where(x >= 0, 1.0, -1.0)
+    ax = np.abs(x)
+    t = 1 / (1 + 0.3275911 * ax)
+    poly = ((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t + 0.254829592) * t
+    return 0.5 * (1 + sign * (1 - poly * np.exp(-ax * ax)))
+
+
+def _clamp01(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0), 0.0, 1.0)
+
+
+def window_span(inputs: ProbabilityInputs, window_days: int, today: np.datetime64) -> int:
+    """Calendar days to load so each goal's last `window_days` workable days are covered"""
+    per_week = inputs.weekmask.sum(axis=1)
+    fewest = int(per_week[per_week > 0].min()) if (per_week > 0).any() else 7
+    span = -(-window_days // fewest) * 7
+    recent = [int(((dates <= today) & (dates > today - 4 * span)).sum()) for dates in inputs.blackouts.values()]
+    return span + max(recent, default=0)
+
+
+def _workable_days_remaining(inputs: ProbabilityInputs, today: np.datetime64, open_rows: np.ndarray) -> np.ndarray:
+    """Workable days in [today, deadline] for open_rows, as in computeFeasibility"""
+    remaining = np.zeros(len(inputs.goal_ids), dtype=np.int64)
+    if not open_rows.any():
+        return remaining
+    # One busday_count per distinct weekday policy (masks packed into 7-bit codes)
+    codes = inputs.weekmask @ (1 << np.arange(7))
+    end = inputs.deadline + np.timedelta64(1, "D")
+    for code in np.unique(codes[open_rows]).tolist():
+        rows = open_rows & (codes == code)
+        if code:
+            remaining[rows] = np.busday_count(today, end[rows], weekmask=inputs.weekmask[rows][0][_MONDAY_FIRST])
+    for row, dates in inputs.blackouts.items():
+        if remaining[row]:
+            dates = np.unique(dates[(dates >= today) & (dates <= inputs.deadline[row])])
+            remaining[row] -= int(inputs.weekmask[row][_weekday(dates)].sum())
+    return remaining
+
+
+def score_batch(
+    inputs: ProbabilityInputs, today: str, window_days: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Score every goal in `inputs` as of day key `today`"""
+    window_days = window_days or settings.probability_window_days
+    count = len(inputs.goal_ids)
+    if not count:
+        return []
+    day = np.datetime64(today, "D")
+
+    # Feasibility: deadline, remaining work and workable days to the deadline
+    remaining = inputs.remaining_blocks
+    deadline_open = ~np.isnat(inputs.deadline) & (inputs.deadline > day)
+    days_left = _workable_days_remaining(inputs, day, deadline_open & (remaining > 0))
+    short_capacity = np.nan_to_num(inputs.max_per_day * days_left, nan=np.inf) < remaining
+    infeasible = (remaining > 0) & (~deadline_open | (days_left == 0) | short_capacity)
+    no_workable_days = ~infeasible & (days_left <= 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required_per_day = np.where(days_left > 0, np.ceil(remaining / np.maximum(days_left, 1)), 0)
+
+    # Prior from the client's fallback plan proof (no intensity, no slack)
+    initial = np.minimum(_clamp01(1 - (0.35 + 0.2 * inputs.constraint_density)), NO_EVIDENCE_CAP)
+
+    # Throughput over each goal's last `window_days` workable days, column 0 = today
+    span = window_span(inputs, window_days, day)
+    columns = day - np.arange(span)
+    workable = inputs.weekmask[:, _weekday(columns)]
+    for row, dates in inputs.blackouts.items():
+        workable[row] &= ~np.isin(columns, dates)
+    position = np.cumsum(workable, axis=1) - 1
+    in_window = workable & (position < window_days)
+
+    completed = np.zeros((count, span), dtype=np.int64)
+    offsets = (day - inputs.completed_days).astype("int64")
+    keep = (offsets >= 0) & (offsets < span)
+    np.add.at(completed, (inputs.completed_rows[keep], offsets[keep]), inputs.completed_counts[keep])
+
+    # (G, window_days) series in the client's day order, so sums do not depend on the batch's span
+    series = np.zeros((count, window_days), dtype=np.int64)
+    slot = np.zeros((count, window_days), dtype=bool)
+    rows, cols = np.nonzero(in_window)
+    series[rows, position[rows, cols]] = completed[rows, cols]
+    slot[rows, position[rows, cols]] = True
+
+    samples = slot.sum(axis=1)
+    window_total = series.sum(axis=1)
+    mu = window_total / np.maximum(samples, 1)
+    sigma = np.sqrt((((series - mu[:, None]) ** 2) * slot).sum(axis=1) / np.maximum(samples, 1))
+    evidence_days = (series > 0).sum(axis=1)
+
+    expected_total = days_left * mu
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (remaining - expected_total) / (np.sqrt(days_left) * sigma)
+    value = np.where(sigma == 0, (expected_total >= remaining).astype(float), _clamp01(1 - _normal_cdf(z)))
+    above_cap = evidence_days >= MIN_EVIDENCE_DAYS
+    combined = np.where(above_cap, _clamp01((value + initial) / 2), np.minimum(value, NO_EVIDENCE_CAP))
+
+    # Governance gate (deriveProbabilityStatus)
+    insufficient = (inputs.min_evidence > 0) & (inputs.total_events < inputs.min_evidence)
+
+    # Outcome per goal, in the client's precedence: feasibility, then governance, then evidence
+    outcome = np.select(
+        [infeasible, no_workable_days, inputs.contract_state == CONTRACT_MISSING,
+         inputs.contract_state == CONTRACT_INACTIVE, insufficient],
+        [OUTCOME_INFEASIBLE, OUTCOME_NO_WORKABLE_DAYS, OUTCOME_NO_CONTRACT,
+         OUTCOME_INACTIVE, OUTCOME_INSUFFICIENT_EVIDENCE],
+        OUTCOME_SCORED,
+    )
+    status = np.where(window_total == 0, "NO_EVIDENCE", np.where(above_cap, "ELIGIBLE", "INELIGIBLE"))
+
+    results = []
+    columns_out = zip(
+        inputs.goal_ids.tolist(), outcome.tolist(), inputs.min_evidence.tolist(), inputs.total_events.tolist(),
+        inputs.completed_events.tolist(), inputs.days_covered.tolist(), initial.tolist(), combined.tolist(),
+        status.tolist(), above_cap.tolist(), mu.tolist(), sigma.tolist(), samples.tolist(), days_left.tolist(),
+        remaining.tolist(), required_per_day.tolist(), expected_total.tolist(),
+    )
+    for (goal_id, result_outcome, required_events, total_events, completed_count, days_covered, prior, score,
+         scored_status, uncapped, mean, std, k, d, left, per_day, expected) in columns_out:
+        evidence_summary = {"totalEvents": total_events, "completedCount": completed_count, "daysCovered": days_covered}
+        if result_outcome == OUTCOME_SCORED:
+            results.append({
+                "goalId": goal_id,
+                "value": score,
+                "status": scored_status,
+                "capApplied": not uncapped,
+                "reasons": [] if uncapped else ["CAP_APPLIED_NO_EVIDENCE"],
+                "requiredEvents": required_events,
+                "evidenceSummary": evidence_summary,
+                "scoringSummary": {
+                    "mu": mean,
+                    "sigma": std,
+                    "K": k,
+                    "D": d,
+                    "remainingBlocksTotal": left,
+                    "requiredBlocksPerDay": int(per_day),
+                    "expectedTotal": expected,
+                },
+                "policyVersion": POLICY_VERSION,
+            })
+        else:
+            infeasible_outcome = result_outcome in (OUTCOME_INFEASIBLE, OUTCOME_NO_WORKABLE_DAYS)
+            results.append({
+                "goalId": goal_id,
+                "value": 0.0 if infeasible_outcome else prior,
+                "status": "INFEASIBLE" if infeasible_outcome else "NO_EVIDENCE",
+                "capApplied": False,
+                "reasons": [OUTCOME_REASONS[result_outcome]],
+                "requiredEvents": required_events,
+                "evidenceSummary": evidence_summary,
+                "policyVersion": POLICY_VERSION,
+            })
+    return results
+
+
+def _day_array(values) -> np.ndarray:
+    """datetime64[D] array of day keys; missing or malformed keys become NaT"""
+    try:
+        return np.array([value or "NaT" for value in values], dtype="datetime64[D]")
+    except (TypeError, ValueError):
+        days = []
+        for value in values:
+            try:
+                days.append(np.datetime64(value, "D") if isinstance(value, str) and value else np.datetime64("NaT"))
+            except ValueError:
+                days.append(np.datetime64("NaT"))
+        return np.array(days, dtype="datetime64[D]")
+
+
+def _normalize_weekdays(weekdays) -> Optional[List[bool]]:
+    """Sunday-first workable mask, or None when the policy allows every day"""
+    if not isinstance(weekdays, list) or not weekdays:
+        return None
+    mask = [False] * 7
+    for entry in weekdays:
+        if isinstance(entry, int) and not isinstance(entry, bool) and 0 <= entry <= 6:
+            mask[entry] = True
+        elif isinstance(entry, str) and entry[:3].lower() in SUNDAY_FIRST_WEEKDAYS:
+            mask[SUNDAY_FIRST_WEEKDAYS[entry[:3].lower()]] = True
+    return mask
+
+
+def _positive_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value > 0
+
+
+def _contract_state(contract, now_iso: str) -> int:
+    """resolveActiveContract for the goal's own governance contract"""
+    if not isinstance(contract, dict):
+        return CONTRACT_MISSING
+    active_from, active_until = contract.get("activeFromISO"), contract.get("activeUntilISO")
+    if (active_from and now_iso < active_from) or (active_until and now_iso > active_until):
+        return CONTRACT_INACTIVE
+    return CONTRACT_ACTIVE
+
+
+async def load_inputs(
+    db: AsyncSession, today: str, now_iso: str, user_id: Optional[int] = None,
+    window_days: Optional[int] = None,
+) -> ProbabilityInputs:
+    """Read active goals and their windowed evidence into arrays (four aggregate queries)"""
+    window_days = window_days or settings.probability_window_days
+    goal_query = select(
+        Goal.id, Goal.deadline_day_key, Goal.goal_execution_contract, Goal.goal_governance_contract
+    ).where(Goal.is_active.is_(True)).order_by(Goal.id)
+    if user_id is not None:
+        goal_query = goal_query.where(Goal.user_id == user_id)
+    goals = (await db.execute(goal_query)).all()
+
+    inputs = ProbabilityInputs.empty([goal.id for goal in goals])
+    if not goals:
+        return inputs
+    inputs.deadline[:] = _day_array([goal.deadline_day_key for goal in goals])
+
+    for row, goal in enumerate(goals):
+        governance = goal.goal_governance_contract
+        inputs.contract_state[row] = _contract_state(governance, now_iso)
+        if inputs.contract_state[row] != CONTRACT_MISSING:
+            minimum = (governance.get("governance") or {}).get("minEvidenceEvents")
+            inputs.min_evidence[row] = minimum if _positive_number(minimum) else 0
+
+        execution = goal.goal_execution_contract
+        constraints = execution.get("constraints") if isinstance(execution, dict) else None
+        if not isinstance(constraints, dict):
+            continue
+        weekdays = _normalize_weekdays((constraints.get("workableDayPolicy") or {}).get("weekdays"))
+        if weekdays is not None:
+            inputs.weekmask[row] = weekdays
+        blackouts = constraints.get("blackoutDates")
+        blackouts = blackouts if isinstance(blackouts, list) else []
+        if blackouts:
+            dates = _day_array(blackouts)
+            inputs.blackouts[row] = dates[~np.isnat(dates)]
+        if _positive_number(constraints.get("maxBlocksPerDay")):
+            inputs.max_per_day[row] = constraints["maxBlocksPerDay"]
+        inputs.constraint_density[row] = sum((
+            _positive_number(constraints.get("maxBlocksPerDay")),
+            _positive_number(constraints.get("maxBlocksPerWeek")),
+            bool(blackouts),
+            weekdays is not None,
+            bool(constraints.get("dailyCapacityOverrides")),
+        )) / 5
+
+    def rows_for(goal_ids):
+        """Row index of each goal id, and which ids belong to a loaded goal"""
+        ids = np.asarray(goal_ids, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(inputs.goal_ids, ids), len(inputs.goal_ids) - 1)
+        return rows, inputs.goal_ids[rows] == ids
+
+    # Evidence and remaining work come from the daily rollups; `blocks` is not read
+    def scoped(query):
+        return query.where(DailyRollup.user_id == user_id) if user_id is not None else query
+
+    remaining = (await db.execute(scoped(
+        select(DailyRollup.goal_id, func.sum(DailyRollup.open_blocks))
+        .where(DailyRollup.day_key >= today, DailyRollup.open_blocks > 0)
+        .group_by(DailyRollup.goal_id)
+    ))).all()
+    if remaining:
+        goal_ids, counts = zip(*remaining)
+        rows, found = rows_for(goal_ids)
+        inputs.remaining_blocks[rows[found]] = np.asarray(counts, dtype=np.int64)[found]
+
+    has_events = DailyRollup.events > 0
+    summary = (await db.execute(scoped(
+        select(
+            DailyRollup.goal_id, func.sum(DailyRollup.events), func.sum(DailyRollup.complete_events),
+            func.count(func.distinct(DailyRollup.day_key)),
+        )
+        .where(has_events)
+        .group_by(DailyRollup.goal_id)
+    ))).all()
+    if summary:
+        goal_ids, totals, completes, days = zip(*summary)
+        rows, found = rows_for(goal_ids)
+        inputs.total_events[rows[found]] = np.asarray(totals, dtype=np.int64)[found]
+        inputs.completed_events[rows[found]] = np.asarray(completes, dtype=np.int64)[found]
+        inputs.days_covered[rows[found]] = np.asarray(days, dtype=np.int64)[found]
+
+    day = np.datetime64(today, "D")
+    first_day = str(day - (window_span(inputs, window_days, day) - 1))
+    windowed = (await db.execute(scoped(
+        select(DailyRollup.goal_id, DailyRollup.day_key, func.sum(DailyRollup.complete_events))
+        .where(DailyRollup.complete_events > 0, DailyRollup.day_key >= first_day, DailyRollup.day_key <= today)
+        .group_by(DailyRollup.goal_id, DailyRollup.day_key)
+    ))).all()
+    if windowed:
+        goal_ids, day_keys, counts = zip(*windowed)
+        rows, found = rows_for(goal_ids)
+        inputs.completed_rows = rows[found]
+        inputs.completed_days = np.array(day_keys, dtype="datetime64[D]")[found]
+        inputs.completed_counts = np.asarray(counts, dtype=np.int64)[found]
+    return inputs
+
+
+async def score_goals(
+    db: AsyncSession, user_id: Optional[int] = None, now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Score every active goal (of one user, or of all users) as of `now`"""
+    now = now or datetime.now(timezone.utc)
+    today = day_key_from_date(now)
+    inputs = await load_inputs(db, today, to_iso(now), user_id=user_id)
+    return score_batch(inputs, today)
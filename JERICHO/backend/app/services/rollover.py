@@ -0,0 +1,293 @@
+"""
+Server-side rollover of overdue blocks.
+
+Rollover (src/core/engine/rollover.ts) runs in the client when the app is
+opened, so blocks left `scheduled` or `started` on a past day stay that way on
+the server until someone looks. sweep_overdue_blocks marks every such block
+`missed` and appends a `missed` ExecutionEvent for it (the client's missed
+event shape), across all users.
+
+Overdue block ids are read in keyset pages over the primary key and handed to
+a few asyncio workers. Each worker claims its page with an
+UPDATE ... RETURNING per overdue status, limited to blocks that are still
+overdue, then stamps sync sequence numbers, links the events onto their cycle
+chains, bulk-inserts them and updates the cycle summaries and daily rollups,
+all in one transaction. The block status is the only
+progress marker: a re-run, or a sweep restarted after a crash, finds exactly
+the blocks no committed chunk has claimed. Overdue carry-over blocks are still
+created by the client, which owns placement.
+"""
+
+import asyncio
+import math
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, is_sqlite
+from app.core.timekeys import APP_TIME_ZONE, day_key_from_date, parse_iso, to_iso
+from app.models.user import (
+    GENESIS_CHAIN_HASH, Block, AggregateDeltas, compute_chain_hash, ledger_tails, note_sync_changes,
+    reserve_sync_seqs,
+)
+from app.services.events import EVENT_COLUMNS, canonical_json, event_content_hash, write_event_rows
+
+OVERDUE_STATUSES = ("scheduled", "started")
+MISSED_STATUS = "missed"
+MISSED_EVENT_TYPE = "missed"
+
+_blocks = Block.__table__
+SET_BLOCK_SEQ = (
+    update(_blocks).where(_blocks.c.id == bindparam("block_id")).values(sync_seq=bindparam("block_seq"))
+)
+
+
+def missed_event_data(block, missed_at_iso: str) -> dict:
+    """Payload of a rollover `missed` event, as rolloverAtMidnight emits it"""
+    extra = block.block_data if isinstance(block.block_data, dict) else {}
+    start_iso = block.start_iso or f"{block.day_key}T08:00:00.000Z"
+    start = parse_iso(start_iso)
+    minutes = block.duration_minutes or 30
+    data = {
+        "id": f"missed-{block.id}-{block.day_key}",
+        "blockId": str(block.id),
+        "dateISO": block.day_key,
+        "minutes": minutes,
+        "rawLabel": block.title or block.practice or "Missed Block",
+        "domain": block.practice or "Unclassified",
+        "cycleId": block.cycle_id,
+        "goalId": block.goal_id,
+        "origin": extra.get("origin") or "system",
+        "completed": False,
+        "kind": MISSED_EVENT_TYPE,
+        "startISO": start_iso,
+        "endISO": to_iso(start + timedelta(minutes=minutes)) if start else None,
+        "status": MISSED_STATUS,
+        "missedAtISO": missed_at_iso,
+        "linkageStatus": "LINKED" if extra.get("deliverableId") else "UNLINKED_ACTIVITY",
+    }
+    if extra.get("deliverableId"):
+        data["deliverableId"] = extra["deliverableId"]
+    return data
+
+
+async def roll_over_chunk(block_ids: List[int], today: str, missed_at_iso: str) -> Tuple[int, List[int]]:
+    """Mark the still-overdue blocks among block_ids missed and log their events.
+
+    Returns the number of blocks claimed and the ids of their users.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            conn = await db.connection()
+            # One UPDATE per overdue status, so the aggregates know which count each block leaves
+            deltas = AggregateDeltas()
+            claimed = []
+            for previous_status in OVERDUE_STATUSES:
+                rows = (await conn.execute(
+                    update(_blocks)
+                    .where(
+                        _blocks.c.id.in_(block_ids),
+                        _blocks.c.status == previous_status,
+                        _blocks.c.day_key < today,
+                    )
+                    .values(status=MISSED_STATUS)
+                    .returning(
+                        _blocks.c.id, _blocks.c.user_id, _blocks.c.cycle_id, _blocks.c.goal_id, _blocks.c.day_key,
+                        _blocks.c.title, _blocks.c.practice, _blocks.c.duration_minutes, _blocks.c.start_iso,
+                        _blocks.c.block_data,
+                    )
+                )).all()
+                for block in rows:
+                    fields = (block.user_id, block.goal_id, block.cycle_id, block.day_key, block.practice)
+                    deltas.add_block(*fields, previous_status, block.duration_minutes, sign=-1)
+                    deltas.add_block(*fields, MISSED_STATUS, block.duration_minutes)
+                    deltas.add_event(
+                        block.user_id, block.cycle_id, MISSED_EVENT_TYPE, None,
+                        (block.goal_id, block.day_key, block.practice),
+                    )
+                claimed.extend(rows)
+            if not claimed:
+                await db.commit()
+                return 0, []
+
+            by_user: Dict[int, list] = defaultdict(list)
+            for block in claimed:
+                by_user[block.user_id].append(block)
+
+            # Two sequence numbers per block: the status change and its event
+            counts = {user_id: 2 * len(blocks) for user_id, blocks in by_user.items()}
+            last_seqs = await conn.run_sync(lambda sync_conn: reserve_sync_seqs(sync_conn, counts))
+            note_sync_changes(db.sync_session, last_seqs)
+            first_seq = {user_id: last_seqs[user_id] - count + 1 for user_id, count in counts.items()}
+            # Read chain tails only after the reservation has locked the users' counter rows
+            tails = await conn.run_sync(lambda sync_conn: ledger_tails(sync_conn, {b.cycle_id for b in claimed}))
+
+            block_seqs, event_rows = [], []
+            for user_id in sorted(by_user):
+                blocks = sorted(by_user[user_id], key=lambda block: block.id)
+                seq = first_seq[user_id]
+                for block in blocks:
+                    block_seqs.append({"block_id": block.id, "block_seq": seq})
+                    seq += 1
+                for block in blocks:
+                    event_data_json = canonical_json(missed_event_data(block, missed_at_iso))
+                    event_hash = event_content_hash(
+                        user_id, block.cycle_id, block.id, MISSED_EVENT_TYPE, event_data_json
+                    )
+                    chain_hash = compute_chain_hash(tails.get(block.cycle_id, GENESIS_CHAIN_HASH), event_hash)
+                    tails[block.cycle_id] = chain_hash
+                    event_rows.append(dict(zip(EVENT_COLUMNS, (
+                        user_id, block.cycle_id, block.id, MISSED_EVENT_TYPE,
+                        event_data_json, event_hash, chain_hash, seq,
+                    ))))
+                    seq += 1
+
+            await conn.execute(SET_BLOCK_SEQ, block_seqs)
+            if await write_event_rows(db, event_rows) != len(event_rows):
+                raise RuntimeError("missed events were already written concurrently")
+            await conn.run_sync(deltas.apply)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return len(claimed), list(by_user)
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+async def sweep_overdue_blocks(
+    now: Optional[datetime] = None, chunk_size: Optional[int] = None, workers: Optional[int] = None,
+) -> dict:
+    """Roll over every block overdue as of `now` (all users) and return the sweep's metrics"""
+    now = now or datetime.now(timezone.utc)
+    today = day_key_from_date(now)
+    missed_at_iso = to_iso(now)
+    chunk_size = chunk_size or settings.rollover_chunk_size
+    # SQLite has a single writer; extra workers would only queue on its lock
+    workers = 1 if is_sqlite(settings.database_url) else (workers or settings.rollover_workers)
+
+    scan_lock = asyncio.Lock()
+    last_id = 0
+    chunk_ms: List[float] = []
+    users = set()
+    claimed = 0
+
+    async def next_page() -> List[int]:
+        nonlocal last_id
+        async with scan_lock:
+            async with AsyncSessionLocal() as db:
+                ids = (await db.execute(
+                    select(Block.id)
+                    .where(Block.id > last_id, Block.status.in_(OVERDUE_STATUSES), Block.day_key < today)
+                    .order_by(Block.id)
+                    .limit(chunk_size)
+                )).scalars().all()
+            if ids:
+                last_id = ids[-1]
+            return ids
+
+    async def worker():
+        nonlocal claimed
+        while True:
+            ids = await next_page()
+            if not ids:
+                return
+            started = time.perf_counter()
+            count, user_ids = await roll_over_chunk(ids, today, missed_at_iso)
+            chunk_ms.append((time.perf_counter() - started) * 1000)
+            claimed += count
+            users.update(user_ids)
+
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(worker()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    seconds = time.perf_counter() - started
+
+    chunk_ms.sort()
+    return {
+        "day": today,
+        "blocks_missed": claimed,
+        "users": len(users),
+        "chunks": len(chunk_ms),
+        "workers": workers,
+        "seconds": round(seconds, 3),
+        "blocks_per_second": round(claimed / seconds) if seconds else 0,
+        "chunk_ms": {
+            "p50": round(_percentile(chunk_ms, 0.5), 1),
+            "p95": round(_percentile(chunk_ms, 0.95), 1),
+            "max": round(chunk_ms[-1], 1) if chunk_ms else 0.0,
+        },
+    }
+
+
+def seconds_until_next_rollover(now: datetime, delay_seconds: float = 0.0) -> float:
+    """Seconds from `now` until `delay_seconds` past the next midnight in the app time zone"""
+    local = now.astimezone(APP_TIME_ZONE)
+    midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=APP_TIME_ZONE)
+    return max(0.0, (midnight - local).total_seconds()) + delay_seconds
+
+
+class RolloverScheduler:
+    """Runs a sweep at startup (catching up on missed nights), then after each app-time-zone midnight"""
+
+    def __init__(self, delay_seconds: Optional[float] = None):
+        self.delay_seconds = settings.rollover_delay_seconds if delay_seconds is None else delay_seconds
+        self.sweeps = 0
+        self.failures = 0
+        self.last_sweep: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self, now: Optional[datetime] = None) -> Optional[dict]:
+        try:
+            self.last_sweep = await sweep_overdue_blocks(now=now)
+        except Exception as exc:
+            # A failed chunk rolled back; the next sweep picks its blocks up again
+            self.failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return None
+        self.sweeps += 1
+        return self.last_sweep
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(seconds_until_next_rollover(datetime.now(timezone.utc), self.delay_seconds))
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sweeps": self.sweeps,
+            "failures": self.failures,
+            "last_sweep": self.last_sweep,
+            "last_error": self.last_error,
+        }
+
+
+rollover_scheduler = RolloverScheduler()
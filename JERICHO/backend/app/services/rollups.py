@@ -0,0 +1,371 @@
+"""
+Daily rollups and their weekly/monthly buckets.
+
+Throughput views (computeCompletedThroughput, src/state/metrics.js) and the
+probability engine sum planned/completed blocks and minutes per day and
+practice. DailyRollup keeps those sums per (user, goal, day_key, practice),
+updated in the same transaction as every block and event write (see
+AggregateDeltas in models/user.py); events are dated by their block's day.
+
+Every update marks its daily row dirty. compact_rollups, run by
+RollupCompactor in the background or `python -m app.cli compact-rollups`,
+recomputes the week and month buckets of dirty days and clears the flag with a
+compare-and-set on the counters it read, so a day changed mid-compaction stays
+dirty for the next pass.
+
+rollup_totals answers range sums over any window from buckets for the whole
+clean weeks and months inside it and daily rows for the rest (including any
+period with a dirty day), so results are always exact.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, case, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, dialect_insert
+from app.models.user import (
+    OPEN_BLOCK_STATUSES, ROLLUP_COUNTERS, Block, DailyRollup, ExecutionEvent, RollupBucket, User,
+)
+from app.services.events import chunked
+
+PERIODS = ("week", "month")
+REBUILD_BATCH_SIZE = 200  # users per rebuild transaction
+
+_daily = DailyRollup.__table__
+_buckets = RollupBucket.__table__
+MARK_CLEAN = (
+    update(_daily)
+    .where(
+        _daily.c.user_id == bindparam("k_user_id"),
+        _daily.c.goal_id == bindparam("k_goal_id"),
+        _daily.c.day_key == bindparam("k_day_key"),
+        _daily.c.practice == bindparam("k_practice"),
+        *[_daily.c[name] == bindparam(f"k_{name}") for name in ROLLUP_COUNTERS],
+    )
+    .values(dirty=False)
+)
+
+
+def period_start(day_key: str, period: str) -> str:
+    """First day of the week (Monday) or month containing day_key"""
+    day = date.fromisoformat(day_key)
+    if period == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    return day.replace(day=1).isoformat()
+
+
+def period_end(start: str, period: str) -> str:
+    """First day after the period starting at `start`"""
+    day = date.fromisoformat(start)
+    if period == "week":
+        return (day + timedelta(days=7)).isoformat()
+    return (day.replace(year=day.year + 1, month=1) if day.month == 12 else day.replace(month=day.month + 1)).isoformat()
+
+
+def _next_day(day_key: str) -> str:
+    return (date.fromisoformat(day_key) + timedelta(days=1)).isoformat()
+
+
+async def rebuild_rollups(db: AsyncSession, user_id: Optional[int] = None) -> dict:
+    """Recompute the daily rollups of one or all users from blocks and events, and drop their buckets.
+
+    The rebuilt days are dirty, so the next compaction recreates the buckets.
+    Run it while the users it covers are not writing.
+    """
+    query = select(User.id).order_by(User.id)
+    if user_id is not None:
+        query = query.where(User.id == user_id)
+    user_ids = (await db.execute(query)).scalars().all()
+
+    days = 0
+    for batch in chunked(user_ids, REBUILD_BATCH_SIZE):
+        key = (Block.user_id, Block.goal_id, Block.day_key, Block.practice)
+        is_open = Block.status.in_(OPEN_BLOCK_STATUSES)
+        is_completed = Block.status == "completed"
+        rows: Dict[tuple, list] = defaultdict(lambda: [0] * len(ROLLUP_COUNTERS))
+        blocks = await db.execute(
+            select(
+                *key, func.count(), func.sum(Block.duration_minutes),
+                func.sum(case((is_open, 1), else_=0)),
+                func.sum(case((is_completed, 1), else_=0)),
+                func.sum(case((is_completed, Block.duration_minutes), else_=0)),
+            )
+            .where(Block.user_id.in_(batch))
+            .group_by(*key)
+        )
+        for row in blocks.tuples():
+            rows[row[:4]][:5] = [value or 0 for value in row[4:]]
+        events = await db.execute(
+            select(*key, func.count(), func.sum(case((ExecutionEvent.event_type == "complete", 1), else_=0)))
+            .join(ExecutionEvent, ExecutionEvent.block_id == Block.id)
+            .where(Block.user_id.in_(batch))
+            .group_by(*key)
+        )
+        for *block_key, count, completes in events.tuples():
+            rows[tuple(block_key)][5:] = [count, completes or 0]
+
+        try:
+            await db.execute(delete(RollupBucket).where(RollupBucket.user_id.in_(batch)))
+            await db.execute(delete(DailyRollup).where(DailyRollup.user_id.in_(batch)))
+            if rows:
+                await db.execute(DailyRollup.__table__.insert(), [
+                    {"user_id": user, "goal_id": goal, "day_key": day_key, "practice": practice or "",
+                     **dict(zip(ROLLUP_COUNTERS, totals)), "dirty": True}
+                    for (user, goal, day_key, practice), totals in sorted(rows.items())
+                ])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        days += len(rows)
+    return {"users": len(user_ids), "daily_rows": days}
+
+
+async def compact_rollups(db: AsyncSession, batch_size: Optional[int] = None) -> dict:
+    """Recompute the week and month buckets of every dirty day, a batch of days per transaction"""
+    batch_size = batch_size or settings.rollup_compaction_batch_size
+    started = time.perf_counter()
+    passes = days_compacted = buckets_written = 0
+    last_key: Tuple = ()
+    while True:
+        # Keyset over the primary key, so days that stay dirty (changed mid-pass) are not re-read forever
+        query = select(_daily).where(_daily.c.dirty.is_(True))
+        if last_key:
+            query = query.where(_after_key(last_key))
+        dirty = (await db.execute(
+            query.order_by(_daily.c.user_id, _daily.c.goal_id, _daily.c.day_key, _daily.c.practice).limit(batch_size)
+        )).all()
+        if not dirty:
+            break
+        last_key = (dirty[-1].user_id, dirty[-1].goal_id, dirty[-1].day_key, dirty[-1].practice)
+        try:
+            buckets_written += await _compact_days(db, dirty)
+            await db.execute(MARK_CLEAN, [
+                {f"k_{name}": getattr(row, name) for name in ("user_id", "goal_id", "day_key", "practice", *ROLLUP_COUNTERS)}
+                for row in dirty
+            ])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        passes += 1
+        days_compacted += len(dirty)
+    return {
+        "batches": passes,
+        "days_compacted": days_compacted,
+        "buckets_written": buckets_written,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _after_key(key: tuple):
+    """Rows after (user_id, goal_id, day_key, practice) in primary-key order"""
+    user_id, goal_id, day_key, practice = key
+    return or_(
+        _daily.c.user_id > user_id,
+        and_(_daily.c.user_id == user_id, _daily.c.goal_id > goal_id),
+        and_(_daily.c.user_id == user_id, _daily.c.goal_id == goal_id, _daily.c.day_key > day_key),
+        and_(_daily.c.user_id == user_id, _daily.c.goal_id == goal_id, _daily.c.day_key == day_key,
+             _daily.c.practice > practice),
+    )
+
+
+async def _compact_days(db: AsyncSession, dirty) -> int:
+    """Rewrite the buckets containing the given daily rows; returns how many were written"""
+    affected = defaultdict(set)  # (user_id, goal_id) -> {(period, start, practice)}
+    for row in dirty:
+        for period in PERIODS:
+            affected[(row.user_id, row.goal_id)].add((period, period_start(row.day_key, period), row.practice))
+
+    conn = await db.connection()
+    statement = dialect_insert(conn)(_buckets)
+    upsert = statement.on_conflict_do_update(
+        index_elements=[_buckets.c.user_id, _buckets.c.goal_id, _buckets.c.period, _buckets.c.period_start,
+                        _buckets.c.practice],
+        set_={name: statement.excluded[name] for name in ROLLUP_COUNTERS},
+    )
+
+    rows = []
+    for (user_id, goal_id), buckets in sorted(affected.items()):
+        first = min(start for _, start, _ in buckets)
+        last = max(period_end(start, period) for period, start, _ in buckets)
+        sums = {bucket: [0] * len(ROLLUP_COUNTERS) for bucket in buckets}
+        days = await db.execute(
+            select(_daily.c.day_key, _daily.c.practice, *[_daily.c[name] for name in ROLLUP_COUNTERS])
+            .where(_daily.c.user_id == user_id, _daily.c.goal_id == goal_id,
+                   _daily.c.day_key >= first, _daily.c.day_key < last)
+        )
+        for day_key, practice, *totals in days.tuples():
+            for period in PERIODS:
+                bucket = sums.get((period, period_start(day_key, period), practice))
+                if bucket is not None:
+                    for index, value in enumerate(totals):
+                        bucket[index] += value
+        rows.extend(
+            {"user_id": user_id, "goal_id": goal_id, "period": period, "period_start": start, "practice": practice,
+             **dict(zip(ROLLUP_COUNTERS, totals))}
+            for (period, start, practice), totals in sorted(sums.items())
+        )
+    if rows:
+        await db.execute(upsert, rows)
+    return len(rows)
+
+
+def plan_window(first_day: str, last_day: str, dirty_days=()) -> Tuple[List[tuple], List[tuple]]:
+    """Split [first_day, last_day] into bucket periods and leftover day ranges.
+
+    Whole months are read from month buckets, then whole weeks from week
+    buckets; periods containing a dirty day, and all remaining days, are read
+    from daily rows. Returns ([(period, start)], [(first, last_exclusive)]).
+    """
+    dirty = sorted(dirty_days)
+    end = _next_day(last_day)
+
+    def clean(start, stop):
+        return not any(start <= day < stop for day in dirty)
+
+    buckets, day_ranges = [], []
+    day = first_day
+    while day < end:
+        chosen = None
+        for period in ("month", "week"):
+            if period_start(day, period) == day and period_end(day, period) <= end and clean(day, period_end(day, period)):
+                chosen = period
+                break
+        if chosen:
+            buckets.append((chosen, day))
+            day = period_end(day, chosen)
+            continue
+        stop = _next_day(day)
+        if day_ranges and day_ranges[-1][1] == day:
+            day_ranges[-1] = (day_ranges[-1][0], stop)
+        else:
+            day_ranges.append((day, stop))
+        day = stop
+    return buckets, day_ranges
+
+
+async def rollup_totals(
+    db: AsyncSession, user_id: int, first_day: str, last_day: str,
+    goal_id: Optional[int] = None, group_by: Optional[str] = None,
+) -> Dict:
+    """Sum the user's rollup counters over [first_day, last_day], reading only rollup tables.
+
+    group_by may be "goal_id" or "practice"; the result maps group values
+    (or None without grouping) to {counter: total}.
+    """
+    dirty_query = select(func.distinct(_daily.c.day_key)).where(
+        _daily.c.user_id == user_id, _daily.c.day_key >= first_day, _daily.c.day_key <= last_day,
+        _daily.c.dirty.is_(True),
+    )
+    if goal_id is not None:
+        dirty_query = dirty_query.where(_daily.c.goal_id == goal_id)
+    buckets, day_ranges = plan_window(first_day, last_day, (await db.execute(dirty_query)).scalars().all())
+
+    totals: Dict = defaultdict(lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+    sources = []
+    if buckets:
+        sources.append((_buckets, or_(*[
+            and_(_buckets.c.period == period, _buckets.c.period_start == start) for period, start in buckets
+        ])))
+    if day_ranges:
+        sources.append((_daily, or_(*[
+            and_(_daily.c.day_key >= start, _daily.c.day_key < stop) for start, stop in day_ranges
+        ])))
+    for table, window in sources:
+        group = [table.c[group_by]] if group_by else []
+        query = select(*group, *[func.sum(table.c[name]) for name in ROLLUP_COUNTERS]).where(
+            table.c.user_id == user_id, window
+        )
+        if goal_id is not None:
+            query = query.where(table.c.goal_id == goal_id)
+        for row in (await db.execute(query.group_by(*group))).tuples():
+            key, values = (row[0], row[1:]) if group_by else (None, row)
+            if all(value is None for value in values):
+                continue
+            for name, value in zip(ROLLUP_COUNTERS, values):
+                totals[key][name] += value or 0
+    return dict(totals)
+
+
+async def daily_series(
+    db: AsyncSession, user_id: int, first_day: str, last_day: str, goal_id: Optional[int] = None,
+) -> List[dict]:
+    """Per-day counters for every day in [first_day, last_day] (zero-filled), from daily rollups"""
+    query = (
+        select(_daily.c.day_key, *[func.sum(_daily.c[name]) for name in ROLLUP_COUNTERS])
+        .where(_daily.c.user_id == user_id, _daily.c.day_key >= first_day, _daily.c.day_key <= last_day)
+        .group_by(_daily.c.day_key)
+    )
+    if goal_id is not None:
+        query = query.where(_daily.c.goal_id == goal_id)
+    by_day = {day_key: values for day_key, *values in (await db.execute(query)).tuples()}
+
+    series = []
+    day = first_day
+    while day <= last_day:
+        series.append({"day_key": day, **dict(zip(ROLLUP_COUNTERS, by_day.get(day, [0] * len(ROLLUP_COUNTERS))))})
+        day = _next_day(day)
+    return series
+
+
+class RollupCompactor:
+    """Compacts dirty daily rollups into week/month buckets every `interval_seconds`"""
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = (
+            settings.rollup_compaction_interval_seconds if interval_seconds is None else interval_seconds
+        )
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self) -> Optional[dict]:
+        try:
+            async with AsyncSessionLocal() as db:
+                self.last_run = await compact_rollups(db)
+        except Exception as exc:
+            # Committed batches are kept; the rest of the days are still dirty
+            self.failures += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            return None
+        self.runs += 1
+        return self.last_run
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
+
+
+rollup_compactor = RollupCompactor()
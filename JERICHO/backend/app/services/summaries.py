@@ -0,0 +1,217 @@
+"""
+Cycle summaries: per-cycle totals kept current on every write.
+
+CycleSummary and CyclePracticeTotal hold what summarizeCycle
+(src/state/cycleSummary.ts) and dashboards otherwise recompute from a cycle's
+full event and block history: blocks and minutes by status and practice, event
+counts and the newest event. The write paths (ORM flushes, /api/sync/push
+ingest, the rollover sweep) add their changes to these rows as additive
+upserts in the same transaction as the write itself (see AggregateDeltas in
+models/user.py), so reading a summary is a few primary-key lookups.
+
+compute_summaries derives the same totals from scratch. rebuild_summaries uses
+it to backfill existing data, check_summaries to report drift. A rebuild
+replaces whole rows and should run while the cycles it covers are not being
+written; a follow-up check confirms the result.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Text, delete, func, insert, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import (
+    BLOCK_STATUS_COLUMNS, PRACTICE_COUNTERS, SUMMARY_COUNTERS, Block, Cycle, CyclePracticeTotal, CycleSummary,
+    ExecutionEvent, is_completion_event,
+)
+from app.services.events import LOOKUP_CHUNK_SIZE, chunked
+
+SUMMARY_BATCH_SIZE = 500  # cycles per aggregate query / rebuild transaction
+MAX_REPORTED_MISMATCHES = 100
+
+
+async def _cycle_owners(db: AsyncSession, user_id: Optional[int], cycle_id: Optional[int]) -> Dict[int, int]:
+    query = select(Cycle.id, Cycle.user_id).order_by(Cycle.id)
+    if user_id is not None:
+        query = query.where(Cycle.user_id == user_id)
+    if cycle_id is not None:
+        query = query.where(Cycle.id == cycle_id)
+    return dict((await db.execute(query)).tuples().all())
+
+
+async def compute_summaries(db: AsyncSession, owners: Dict[int, int]) -> Tuple[Dict[int, dict], Dict[tuple, list]]:
+    """Summary counters and practice totals for the given {cycle_id: user_id}, from the base tables"""
+    cycle_ids = sorted(owners)
+    summaries = {
+        cycle_id: {**dict.fromkeys(SUMMARY_COUNTERS, 0), "user_id": owners[cycle_id], "last_event_id": 0}
+        for cycle_id in cycle_ids
+    }
+    practices: Dict[tuple, list] = {}
+
+    blocks = await db.execute(
+        select(Block.cycle_id, Block.status, Block.practice, func.count(), func.coalesce(func.sum(Block.duration_minutes), 0))
+        .where(Block.cycle_id.in_(cycle_ids))
+        .group_by(Block.cycle_id, Block.status, Block.practice)
+    )
+    for cycle_id, status, practice, count, minutes in blocks.tuples():
+        completed = status == "completed"
+        summary = summaries[cycle_id]
+        summary["blocks_total"] += count
+        summary[BLOCK_STATUS_COLUMNS.get(status or "scheduled", "blocks_other")] += count
+        summary["planned_minutes"] += minutes
+        summary["completed_minutes"] += minutes if completed else 0
+        totals = practices.setdefault((cycle_id, practice or ""), [0, 0, 0, 0])
+        totals[0] += count
+        totals[1] += minutes
+        totals[2] += count if completed else 0
+        totals[3] += minutes if completed else 0
+
+    events = await db.execute(
+        select(ExecutionEvent.cycle_id, ExecutionEvent.event_type, func.count(), func.max(ExecutionEvent.id))
+        .where(ExecutionEvent.cycle_id.in_(cycle_ids))
+        .group_by(ExecutionEvent.cycle_id, ExecutionEvent.event_type)
+    )
+    for cycle_id, event_type, count, last_event_id in events.tuples():
+        summary = summaries[cycle_id]
+        summary["event_count"] += count
+        summary["create_events"] += count if event_type == "create" else 0
+        summary["last_event_id"] = max(summary["last_event_id"], last_event_id)
+
+    # The `completed` flag is judged in Python, with the same truthiness rule as the write path
+    completions = await db.stream(
+        select(ExecutionEvent.cycle_id, type_coerce(ExecutionEvent.event_data, Text))
+        .where(ExecutionEvent.cycle_id.in_(cycle_ids), ExecutionEvent.event_type == "complete")
+        .execution_options(yield_per=LOOKUP_CHUNK_SIZE)
+    )
+    async for cycle_id, event_data in completions:
+        summaries[cycle_id]["completion_events"] += is_completion_event("complete", event_data)
+    await completions.close()
+    return summaries, practices
+
+
+async def _stored_summaries(db: AsyncSession, cycle_ids: List[int]) -> Tuple[Dict[int, dict], Dict[tuple, list]]:
+    columns = [CycleSummary.__table__.c[name] for name in ("cycle_id", "user_id", *SUMMARY_COUNTERS, "last_event_id")]
+    rows = await db.execute(select(*columns).where(CycleSummary.cycle_id.in_(cycle_ids)))
+    summaries = {row["cycle_id"]: dict(row) for row in rows.mappings()}
+    for summary in summaries.values():
+        del summary["cycle_id"]
+
+    table = CyclePracticeTotal.__table__
+    rows = await db.execute(
+        select(table.c.cycle_id, table.c.practice, *[table.c[name] for name in PRACTICE_COUNTERS])
+        .where(table.c.cycle_id.in_(cycle_ids))
+    )
+    practices = {(cycle_id, practice): list(totals) for cycle_id, practice, *totals in rows.tuples()}
+    return summaries, practices
+
+
+async def rebuild_summaries(db: AsyncSession, user_id: Optional[int] = None, cycle_id: Optional[int] = None) -> dict:
+    """Recompute and replace the summaries of every matching cycle; pass no user_id for all users"""
+    owners = await _cycle_owners(db, user_id, cycle_id)
+    for batch in chunked(sorted(owners), SUMMARY_BATCH_SIZE):
+        summaries, practices = await compute_summaries(db, {cycle: owners[cycle] for cycle in batch})
+        try:
+            await db.execute(delete(CyclePracticeTotal).where(CyclePracticeTotal.cycle_id.in_(batch)))
+            await db.execute(delete(CycleSummary).where(CycleSummary.cycle_id.in_(batch)))
+            await db.execute(insert(CycleSummary), [
+                {"cycle_id": cycle, **summary} for cycle, summary in summaries.items()
+            ])
+            if practices:
+                await db.execute(insert(CyclePracticeTotal), [
+                    {"cycle_id": cycle, "practice": practice, **dict(zip(PRACTICE_COUNTERS, totals))}
+                    for (cycle, practice), totals in sorted(practices.items())
+                ])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    return {"cycles": len(owners)}
+
+
+def _diff(cycle_id: int, stored: Dict[str, int], expected: Dict[str, int]) -> List[dict]:
+    return [
+        {"cycle_id": cycle_id, "field": field, "stored": stored.get(field, 0), "expected": value}
+        for field, value in expected.items()
+        if stored.get(field, 0) != value
+    ]
+
+
+async def check_summaries(db: AsyncSession, user_id: Optional[int] = None, cycle_id: Optional[int] = None) -> dict:
+    """Compare stored summaries with totals recomputed from the base tables.
+
+    A cycle without a summary row matches when it has no blocks or events.
+    At most MAX_REPORTED_MISMATCHES field differences are listed.
+    """
+    owners = await _cycle_owners(db, user_id, cycle_id)
+    mismatched_cycles = 0
+    mismatches: List[dict] = []
+    for batch in chunked(sorted(owners), SUMMARY_BATCH_SIZE):
+        expected, expected_practices = await compute_summaries(db, {cycle: owners[cycle] for cycle in batch})
+        stored, stored_practices = await _stored_summaries(db, batch)
+        for cycle in batch:
+            differences = _diff(cycle, stored.get(cycle, {"user_id": owners[cycle]}), expected[cycle])
+            practice_names = sorted(
+                {practice for c, practice in expected_practices if c == cycle}
+                | {practice for c, practice in stored_practices if c == cycle}
+            )
+            for practice in practice_names:
+                differences += _diff(
+                    cycle,
+                    {f"practice:{practice}.{name}": value
+                     for name, value in zip(PRACTICE_COUNTERS, stored_practices.get((cycle, practice), []))},
+                    {f"practice:{practice}.{name}": value
+                     for name, value in zip(PRACTICE_COUNTERS, expected_practices.get((cycle, practice), [0, 0, 0, 0]))},
+                )
+            if differences:
+                mismatched_cycles += 1
+                mismatches.extend(differences[:MAX_REPORTED_MISMATCHES - len(mismatches)])
+    return {
+        "ok": mismatched_cycles == 0,
+        "cycles_checked": len(owners),
+        "mismatched_cycles": mismatched_cycles,
+        "mismatches": mismatches,
+    }
+
+
+async def read_cycle_summary(db: AsyncSession, cycle: Cycle) -> dict:
+    """The cycle's summary in summarizeCycle's shape plus the stored totals; primary-key reads only"""
+    summary = await db.get(CycleSummary, cycle.id)
+    counters = {name: getattr(summary, name) if summary else 0 for name in (*SUMMARY_COUNTERS, "last_event_id")}
+    practices = (await db.execute(
+        select(CyclePracticeTotal).where(CyclePracticeTotal.cycle_id == cycle.id).order_by(CyclePracticeTotal.practice)
+    )).scalars().all()
+    last_event_at = None
+    if counters["last_event_id"]:
+        last_event_at = (await db.execute(
+            select(ExecutionEvent.timestamp).where(ExecutionEvent.id == counters["last_event_id"])
+        )).scalar_one_or_none()
+    cycle_data = cycle.cycle_data if isinstance(cycle.cycle_data, dict) else {}
+
+    return {
+        "cycleId": cycle.id,
+        "completionCount": counters["completion_events"],
+        "completionRate": (
+            counters["completion_events"] / counters["create_events"] if counters["create_events"] else 0
+        ),
+        "convergenceReport": cycle_data.get("convergenceReport"),
+        "blocksTotal": counters["blocks_total"],
+        "blocksByStatus": {
+            **{status: counters[column] for status, column in BLOCK_STATUS_COLUMNS.items()},
+            "other": counters["blocks_other"],
+        },
+        "plannedMinutes": counters["planned_minutes"],
+        "completedMinutes": counters["completed_minutes"],
+        "practiceTotals": [
+            {
+                "practice": row.practice,
+                "blocks": row.blocks,
+                "minutes": row.minutes,
+                "completedBlocks": row.completed_blocks,
+                "completedMinutes": row.completed_minutes,
+            }
+            for row in practices
+        ],
+        "eventCount": counters["event_count"],
+        "lastEventId": counters["last_event_id"] or None,
+        "lastEventAt": last_event_at,
+    }
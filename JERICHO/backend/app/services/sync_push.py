@@ -0,0 +1,128 @@
+"""
+Server push for sync (/api/sync/events and /api/sync/ws).
+
+Clients hold one long-lived SSE stream or WebSocket and pull only when told
+their change feed moved, instead of polling /api/sync/pull. Every write path
+records the last sync_seq it reserved per user on its session
+(note_sync_changes in models/user.py); once that transaction commits, the
+user's subscribers are sent {"type": "changes", "seq": N}. Messages are hints,
+not data: a client pulls from its own cursor, so coalesced or dropped messages
+(a RESYNC in their place) never lose changes.
+
+Streams end when the JWT they were opened with expires (WebSocket close 1008;
+SSE ends, and the EventSource reconnect authenticates again), and once a
+transaction deactivating or deleting the user commits ({"type": "revoked"}).
+Every process receiving a revoke also drops the user's cached principal, so
+REST calls stop authenticating cluster-wide, not only on the committing node.
+
+The hub's backend is PostgreSQL LISTEN/NOTIFY when the database is PostgreSQL,
+so writes in any API process (or `python -m app.cli rollover`) reach
+subscribers on every node, and in-memory otherwise (SQLite development and
+tests).
+"""
+
+import json
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import is_sqlite
+from app.core.principals import invalidate_principal, principal_cache
+from app.core.pubsub import RESYNC, MemoryBackend, PostgresNotifyBackend, PubSubHub
+from app.models.user import User
+
+BACKENDS = ("auto", "memory", "postgres")
+
+# Last message on a deactivated user's streams
+REVOKED = {"type": "revoked"}
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """A libpq-style DSN for asyncpg from a SQLAlchemy PostgreSQL URL"""
+    scheme, sep, rest = database_url.partition("://")
+    return f"postgresql://{rest}" if sep else database_url
+
+
+def create_backend(name: Optional[str] = None, database_url: Optional[str] = None):
+    name = name or settings.sync_push_backend
+    database_url = database_url or settings.database_url
+    if name not in BACKENDS:
+        raise ValueError(f"sync_push_backend must be one of {', '.join(BACKENDS)}, not {name!r}")
+    if name == "memory" or (name == "auto" and is_sqlite(database_url)):
+        return MemoryBackend()
+    return PostgresNotifyBackend(asyncpg_dsn(database_url), settings.sync_push_channel)
+
+
+sync_hub = PubSubHub(
+    create_backend(),
+    buffer_size=settings.sync_push_buffer_size,
+    max_connections=settings.sync_push_max_connections,
+)
+
+
+def _drop_revoked_principals(user_id, message):
+    if message == REVOKED:
+        invalidate_principal(user_id)
+    elif user_id is None and message == RESYNC:
+        # The backend reconnected and may have missed revokes
+        principal_cache.clear()
+
+
+sync_hub.add_listener(_drop_revoked_principals)
+
+
+def changes_message(seq: int) -> dict:
+    return {"type": "changes", "seq": seq}
+
+
+def hello_message(seq: int) -> dict:
+    """First message on every stream: the user's current sequence, to compare with the client's cursor"""
+    return {"type": "hello", "seq": seq}
+
+
+def sse_event(message: dict) -> str:
+    """Encode a message as one text/event-stream event; sequence-bearing messages carry it as the event id"""
+    lines = []
+    if "seq" in message:
+        lines.append(f"id: {message['seq']}")
+    lines.append(f"event: {message['type']}")
+    lines.append(f"data: {json.dumps(message, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def publish_sync_changes(last_seqs: dict):
+    """Tell each user's subscribers that their feed now ends at the given seq"""
+    for user_id, last_seq in last_seqs.items():
+        sync_hub.publish(user_id, changes_message(last_seq))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session):
+    last_seqs = session.info.pop("sync_changes", None)
+    if last_seqs:
+        publish_sync_changes(last_seqs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session):
+    session.info.pop("sync_changes", None)
+    session.info.pop("revoked_users", None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_revoked_users(session, flush_context):
+    """Remember users deactivated or deleted in this transaction; their streams are closed once it commits"""
+    revoked = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    for obj in session.dirty:
+        if isinstance(obj, User) and not obj.is_active and inspect(obj).attrs.is_active.history.has_changes():
+            revoked.add(obj.id)
+    if revoked:
+        session.info.setdefault("revoked_users", set()).update(revoked)
+
+
+@event.listens_for(Session, "after_commit")
+def _revoke_committed_users(session):
+    for user_id in session.info.pop("revoked_users", ()):
+        sync_hub.publish(user_id, REVOKED)
@@ -0,0 +1,85 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Point the whole session at a scratch database before the app reads its settings
+TEST_DATABASE_DIR = tempfile.mkdtemp(prefix="jericho-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DATABASE_DIR, 'jericho_test.db')}"
+atexit.register(shutil.rmtree, TEST_DATABASE_DIR, ignore_errors=True)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from app.core.database import get_db, Base, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models.user import User, Goal, Cycle, Block  # noqa: E402
+
+# Default `seeded` shape: one goal, cycle and block; parametrize `seeded` indirectly with overrides
+SEED_SHAPE = {
+    "cycles": 1,
+    "days": ["2026-01-15"],
+    "blocks_per_day": 1,
+    "statuses": ["scheduled"],  # by slot within the day, repeating
+}
+
+
+@pytest.fixture
+def setup_database():
+    """Setup test database"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Get database session for testing"""
+    db = next(get_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client():
+    """Get test client"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def seeded(request, db_session):
+    """Create a user with one goal, cycles and blocks per SEED_SHAPE (overridden by the parameter).
+
+    A day's blocks take the cycles in turn. Goal, cycles and blocks are
+    committed in that order, so their sync_seq values follow it.
+    """
+    shape = {**SEED_SHAPE, **getattr(request, "param", {})}
+    user = User(email="test@example.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    goal = Goal(user_id=user.id, title="Test Goal", goal_execution_contract='{"deadlineType": "HARD"}', admission_status="admitted")
+    db_session.add(goal)
+    db_session.commit()
+    cycles = [Cycle(user_id=user.id, goal_id=goal.id, status="active") for _ in range(shape["cycles"])]
+    db_session.add_all(cycles)
+    db_session.commit()
+    blocks = [
+        Block(
+            user_id=user.id, goal_id=goal.id, cycle_id=cycles[slot % len(cycles)].id, day_key=day_key,
+            practice="Creation", title=f"Block {day_key}-{slot}", duration_minutes=30,
+            status=shape["statuses"][slot % len(shape["statuses"])],
+        )
+        for day_key in shape["days"]
+        for slot in range(shape["blocks_per_day"])
+    ]
+    db_session.add_all(blocks)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    return {
+        "user": user, "goal": goal, "cycle": cycles[0], "cycle_ids": [cycle.id for cycle in cycles],
+        "block": blocks[0], "blocks": blocks, "headers": headers,
+    }
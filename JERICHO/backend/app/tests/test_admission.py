@@ -0,0 +1,264 @@
+import asyncio
+import copy
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import Base, engine, get_db
+from app.core.security import create_access_token
+from app.core.workers import WorkerPool
+from app.models.user import User, Goal
+from app.services import admission
+from app.services.admission import assess_contract, assess_contracts, compute_contract_hash, count_session_days
+
+NOW = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+TODAY = "2026-01-10"
+
+
+def build_contract(today=TODAY, **overrides):
+    """Valid contract, as buildValidGoalContract (src/domain/goal/testHelpers.ts) builds it"""
+    start = date.fromisoformat(today)
+    contract = {
+        "goalId": "goal-1",
+        "cycleId": "cycle-1",
+        "planGenerationMechanismClass": "GENERIC_DETERMINISTIC",
+        "terminalOutcome": {
+            "text": "Complete the JERICHO implementation",
+            "verificationCriteria": "All modules deployed and tested in production",
+            "isConcrete": True,
+        },
+        "deadline": {"dayKey": (start + timedelta(days=36)).isoformat(), "isHardDeadline": True},
+        "sacrifice": {
+            "whatIsGivenUp": "Free time on weekends",
+            "duration": "6 weeks",
+            "quantifiedImpact": "8 hours/week",
+            "rationale": "Weekend time needed for focused development",
+        },
+        "temporalBinding": {
+            "daysPerWeek": 5,
+            "activationTime": "09:00",
+            "sessionDurationMinutes": 120,
+            "weeklyMinutes": 600,
+            "startDayKey": today,
+        },
+        "causalChain": {"steps": [
+            {"sequence": 1, "description": "Design API schema", "approximateDayOffset": 7},
+            {"sequence": 2, "description": "Implement core services", "approximateDayOffset": 14},
+        ]},
+        "reinforcement": {
+            "dailyExposureEnabled": True,
+            "dailyMechanism": "Calendar block title + dashboard banner",
+            "checkInFrequency": "DAILY",
+            "triggerDescription": "Every morning at 6 AM",
+        },
+        "inscription": {"acknowledgment": "I understand this is binding"},
+        "isAspirational": False,
+        "commitmentDisclosureAccepted": True,
+    }
+    contract.update(overrides)
+    if contract.get("inscription"):
+        contract["inscription"]["contractHash"] = compute_contract_hash(contract)
+    return contract
+
+
+def utc_today():
+    """UTC day the validation endpoints assess against"""
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty assessment cache"""
+    admission._assessment_cache.clear()
+    yield
+    admission._assessment_cache.clear()
+
+
+class TestAdmissionPolicy:
+    """Test the port of validateGoalAdmission"""
+
+    def test_contract_hash_matches_client(self):
+        """Test the FNV-1a contract hash of a contract with non-ASCII text equals the client's"""
+        contract = {
+            "terminalOutcome": {
+                "text": " Complete the JERICHO implementation — café \U0001F680 ",
+                "verificationCriteria": "All modules deployed and tested in production",
+                "isConcrete": True,
+            },
+            "deadline": {"dayKey": "2026-02-15"},
+            "sacrifice": {
+                "whatIsGivenUp": "Free time on weekends", "duration": "6 weeks",
+                "quantifiedImpact": "8 hours/week", "rationale": 'Weekend "time"\n needed',
+            },
+            "temporalBinding": {"daysPerWeek": 5, "activationTime": "09:00"},
+            "causalChain": {"steps": [
+                {"sequence": 1, "description": "Design API schema", "approximateDayOffset": 7},
+                {"sequence": 2, "description": "Implement"},
+            ]},
+            "reinforcement": {"dailyExposureEnabled": True, "checkInFrequency": "DAILY"},
+        }
+        # Computed by computeContractHash in Node
+        assert compute_contract_hash(contract) == "1a848c6d981f0d93"
+
+    def test_valid_contract_is_admitted(self):
+        """Test a complete contract passes every check"""
+        result = assess_contract(build_contract(), TODAY)
+        assert result["codes"] == []
+        # Weekdays-per-week pace from Jan 10 through Feb 15
+        assert result["session_days"] == 37 * 5 // 7
+
+    def test_rejection_codes_in_client_order(self):
+        """Test each violated rule is reported once, in policy order"""
+        contract = build_contract(
+            planGenerationMechanismClass="HABIT_LOOP",
+            deadline={"dayKey": "2026-01-12"},
+            sacrifice={"whatIsGivenUp": "maybe sleep", "quantifiedImpact": "x"},
+            causalChain={"steps": [{"sequence": 1, "description": "a"}, {"sequence": 1, "description": "b"}]},
+            reinforcement={"dailyExposureEnabled": False, "checkInFrequency": "HOURLY"},
+            isAspirational=True,
+        )
+        assert assess_contract(contract, TODAY)["codes"] == [
+            "PLAN_GENERATION_MECHANISM_UNSUPPORTED",
+            "DEADLINE_TOO_SOON",
+            "SACRIFICE_VAGUE",
+            "SACRIFICE_NOT_BINDING",
+            "CAUSAL_CHAIN_CIRCULAR",
+            "REINFORCEMENT_NOT_DECLARED",
+            "ASPIRATIONAL_ONLY",
+        ]
+
+    def test_deadline_boundaries(self):
+        """Test the day arithmetic matches the client's <dayKey>T23:59:59.999Z comparison"""
+        codes = lambda day_key: assess_contract(build_contract(deadline={"dayKey": day_key}), TODAY)["codes"]
+        assert "DEADLINE_IN_PAST" in codes("2026-01-09")
+        assert codes("2026-01-10")[:1] == ["DEADLINE_TOO_SOON"]
+        assert "DEADLINE_TOO_SOON" in codes("2026-01-12")
+        assert codes("2026-01-13") == []
+        assert "DEADLINE_MISSING" in codes("2026-02-30")
+
+    def test_tampered_contract_fails_inscription(self):
+        """Test editing an inscribed field breaks the inscription hash"""
+        contract = build_contract()
+        contract["terminalOutcome"]["text"] = "Something else entirely"
+        assert assess_contract(contract, TODAY)["codes"] == ["INSCRIPTION_NOT_IMMUTABLE"]
+
+    def test_binding_needs_a_session_before_the_deadline(self):
+        """Test a binding that starts after the deadline is inconsistent"""
+        binding = dict(build_contract()["temporalBinding"], startDayKey="2026-03-01")
+        assert assess_contract(build_contract(temporalBinding=binding), TODAY)["codes"] == ["TEMPORAL_BINDING_INVALID"]
+
+    def test_malformed_contract_is_rejected_not_raised(self):
+        """Test wrong types are reported as missing sections"""
+        result = assess_contract({"terminalOutcome": "text", "causalChain": {"steps": None}}, TODAY)
+        assert "TERMINAL_OUTCOME_MISSING" in result["codes"]
+        assert "CAUSAL_CHAIN_INCOMPLETE" in result["codes"]
+        assert assess_contract(None, TODAY)["codes"][0] == "PLAN_GENERATION_MECHANISM_MISSING"
+
+    def test_count_session_days(self):
+        """Test session-day counting against a day-by-day walk"""
+        first = date(2026, 1, 10)
+        for weekdays in ({0, 2, 4}, {5, 6}, None):
+            for length in range(0, 30):
+                last = first + timedelta(days=length)
+                walk = [first + timedelta(days=offset) for offset in range(length + 1)]
+                expected = (
+                    sum(1 for day in walk if day.weekday() in weekdays) if weekdays else len(walk) * 4 // 7
+                )
+                assert count_session_days(first, last, 4, weekdays) == expected
+
+
+class TestAssessContracts:
+    """Test memoization and process-pool fan-out"""
+
+    def test_results_are_memoized_by_content(self):
+        """Test identical contracts are assessed once and reused"""
+        contracts = [build_contract(), build_contract(), build_contract(isAspirational=True)]
+        results = asyncio.run(assess_contracts(contracts, now=NOW))
+        assert results[0] == results[1]
+        assert results[2]["codes"] == ["ASPIRATIONAL_ONLY"]
+        assert len(admission._assessment_cache) == 2
+
+        hits = admission._assessment_cache.hits
+        asyncio.run(assess_contracts([build_contract()], now=NOW))
+        assert admission._assessment_cache.hits == hits + 1
+
+    def test_process_pool_matches_inline(self, monkeypatch):
+        """Test a large batch fanned out to worker processes gives the inline results"""
+        pool = WorkerPool(max_workers=2, use_processes=True)
+        monkeypatch.setattr(admission, "admission_pool", pool)
+        monkeypatch.setattr(admission.settings, "admission_parallel_threshold", 1)
+        contracts = [
+            build_contract(deadline={"dayKey": (date(2026, 1, 5) + timedelta(days=offset)).isoformat()})
+            for offset in range(40)
+        ]
+        try:
+            results = asyncio.run(assess_contracts(contracts, now=NOW))
+        finally:
+            pool.shutdown()
+        assert pool.stats()["completed"] == 8
+        assert results == [assess_contract(copy.deepcopy(contract), TODAY) for contract in contracts]
+
+
+class TestValidationEndpoints:
+    """Test goal validation endpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def headers(self, db_session):
+        """Create a user with one active goal and return auth headers"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.commit()
+        db_session.add(Goal(user_id=user.id, title="Active", goal_execution_contract=build_contract(utc_today())))
+        db_session.commit()
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+    def test_batch_validation(self, headers):
+        """Test each contract gets a verdict, with duplicates of active goals rejected"""
+        outcome = {"text": "Ship the mobile app", "verificationCriteria": "Live in the store", "isConcrete": True}
+        today = utc_today()
+        contracts = [build_contract(today, terminalOutcome=outcome), build_contract(today), {"goalId": "empty"}]
+        response = TestClient(app).post("/api/goals/validate/batch", json={"contracts": contracts}, headers=headers)
+        assert response.status_code == 200
+        fresh, duplicate, empty = response.json()
+        assert fresh["is_valid"] is True
+        assert fresh["admission_status"] == "admitted"
+        assert duplicate["validation_errors"] == ["DUPLICATE_ACTIVE"]
+        assert duplicate["admission_reason"] == "Same outcome already active; archive or complete first."
+        assert empty["admission_status"] == "rejected"
+        assert "DEADLINE_MISSING" in empty["validation_errors"]
+
+    def test_single_validation(self, headers):
+        """Test the single-contract endpoint uses the same engine"""
+        response = TestClient(app).post(
+            "/api/goals/validate", json={"goal_execution_contract": build_contract(utc_today(), isAspirational=True)}, headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json()["validation_errors"] == ["ASPIRATIONAL_ONLY", "DUPLICATE_ACTIVE"]
+
+    def test_validation_requires_auth(self):
+        """Test validation endpoints reject anonymous requests"""
+        response = TestClient(app).post("/api/goals/validate/batch", json={"contracts": []})
+        assert response.status_code in [401, 403]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import create_app
+from app.core.config import Settings
+from app.core.database import Base, engine
+from app.core.routing import LazyRouter
+from app.core.workers import WorkerPool
+from app.services.sync_push import sync_hub
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestAppFactory:
+    """Test create_app, lazy router registration and the lifespan"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    def test_import_does_not_touch_the_database(self, tmp_path):
+        """Test importing main and building an app neither connects nor creates tables"""
+        database = tmp_path / "untouched.db"
+        script = (
+            "import json, sys, main\n"
+            "main.create_app(lazy_routers=True)\n"
+            "print(json.dumps(sorted(m for m in sys.modules if m.startswith('app.api'))))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, "DATABASE_URL": f"sqlite:///{database}"},
+        )
+        assert json.loads(result.stdout) == []
+        assert not database.exists()
+
+    def test_database_settings_cannot_be_changed_per_app(self, tmp_path):
+        """Test a Settings pointing at another database is rejected rather than silently ignored"""
+        with pytest.raises(ValueError, match="database_url"):
+            create_app(Settings(database_url=f"sqlite:///{tmp_path / 'other.db'}"))
+        with pytest.raises(ValueError, match="db_pool_size"):
+            create_app(Settings(db_pool_size=1))
+
+    def test_lazy_routers_load_on_first_request(self):
+        """Test a lazy router is included by the first request under its prefix and that request is served"""
+        app = create_app(Settings(metrics_enabled=False), lazy_routers=True)
+        placeholders = {route.prefix: route for route in app.router.routes if isinstance(route, LazyRouter)}
+        assert set(placeholders) == {"/api/auth", "/api/goals", "/api/blocks", "/api/sync"}
+        client = TestClient(app)
+
+        response = client.get("/api/blocks/throughput")
+
+        assert response.status_code in (401, 403)
+        assert placeholders["/api/blocks"].loaded
+        assert not placeholders["/api/goals"].loaded
+        assert client.get("/").status_code == 200
+        assert not placeholders["/api/auth"].loaded
+
+    def test_openapi_includes_pending_lazy_routers(self):
+        """Test the schema lists every router, loaded or not"""
+        client = TestClient(create_app(lazy_routers=True))
+        paths = client.get("/openapi.json").json()["paths"]
+        assert "/api/auth/login" in paths
+        assert "/api/sync/pull" in paths
+
+    def test_lifespan_starts_push_hub_and_releases_pools(self):
+        """Test startup starts the push hub and shutdown stops worker pools that were started"""
+        pool = WorkerPool(max_workers=1)
+        pool._get_executor()
+        with TestClient(create_app()) as client:
+            assert client.get("/health").json()["sync_push"]["backend"] == sync_hub.backend.name
+        assert pool._executor is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,180 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.auth as auth_api
+from main import create_app
+from app.core.config import Settings
+from app.core.database import Base, SessionLocal, async_engine, engine, pool_status
+from app.core.limits import ConcurrencyLimiter, Limit, MemoryRateLimitBackend, RateLimiter
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services.auth_limits import DatabaseRateLimitBackend
+
+
+def limited_settings(**overrides) -> Settings:
+    return Settings(metrics_enabled=False, **overrides)
+
+
+class TestLimiters:
+    """Test the concurrency gate and the token-bucket backends"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    def test_gate_queues_in_order_then_sheds(self):
+        """Test waiters get freed slots first come first served, and a full queue or a timeout sheds"""
+        async def run():
+            gate = ConcurrencyLimiter(limit=1, queue_size=1, timeout=5)
+            assert await gate.acquire()
+            waiting = asyncio.create_task(gate.acquire())
+            await asyncio.sleep(0)
+            assert gate.queued == 1
+            assert not await gate.acquire()  # queue full
+            gate.release()
+            assert await waiting and gate.in_flight == 1
+
+            gate.timeout = 0.01
+            assert not await gate.acquire()  # no slot freed in time
+            gate.release()
+            return gate.stats()
+
+        stats = asyncio.run(run())
+        assert stats == {"limit": 1, "in_flight": 0, "queued": 0, "admitted": 2, "rejected": 1, "timed_out": 1}
+
+    @pytest.mark.parametrize("shared", [False, True])
+    def test_token_buckets(self, shared):
+        """Test bursts, refill and Retry-After for the memory backend and the database backend shared by two processes"""
+        limit = Limit(burst=2, per_minute=60)
+        if shared:
+            first, second = DatabaseRateLimitBackend(), DatabaseRateLimitBackend()
+        else:
+            first = second = MemoryRateLimitBackend()
+
+        async def run():
+            waits = [
+                await first.take("ip:a", limit, now=1000.0),
+                await second.take("ip:a", limit, now=1000.0),
+                await first.take("ip:a", limit, now=1000.25),
+                await second.take("ip:b", limit, now=1000.25),
+                await second.take("ip:a", limit, now=1001.0),
+                await first.take("ip:a", limit, now=1001.0),
+            ]
+            if shared:
+                await first.close()
+                await second.close()
+            return waits
+
+        waits = asyncio.run(run())
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(0.75)
+        assert waits[3:5] == [0.0, 0.0]
+        assert waits[5] == pytest.approx(1.0)
+
+    def test_database_backend_uses_its_own_pool_and_fails_open(self):
+        """Test bucket checks never take app pool connections and let requests through when their pool is busy"""
+        backend = DatabaseRateLimitBackend(pool_size=1, timeout_seconds=0.05)
+        limiter = RateLimiter(backend)
+        limit = Limit(burst=1, per_minute=1)
+
+        async def run():
+            assert await limiter.hit("ip:a", limit) == 0.0
+            assert await limiter.hit("ip:a", limit) > 0
+            app_checked_out = pool_status(async_engine.sync_engine).get("checkedout", 0)
+            async with backend.engine.connect():
+                # The bucket pool's one connection is taken: the check gives up and allows the request
+                assert await limiter.hit("ip:a", limit) == 0.0
+                assert pool_status(async_engine.sync_engine).get("checkedout", 0) == app_checked_out
+            stats = limiter.stats()
+            await backend.close()
+            return stats
+
+        stats = asyncio.run(run())
+        assert (stats["allowed"], stats["limited"], stats["errors"]) == (1, 1, 1)
+        assert stats["database"]["size"] == 1
+        assert backend.engine is None
+
+
+class TestAuthAdmission:
+    """Test rate limits and load shedding on the auth routes"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    def test_email_limit(self):
+        """Test an account's login attempts are limited whatever the password, other accounts unaffected"""
+        client = TestClient(create_app(limited_settings(auth_email_burst=2, auth_email_per_minute=1)))
+        attempt = {"email": "victim@example.com", "password": "guess"}
+        assert [client.post("/api/auth/login", json=attempt).status_code for _ in range(2)] == [401, 401]
+
+        response = client.post("/api/auth/login", json={**attempt, "email": "VICTIM@example.com"})
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) == 60
+        assert client.post("/api/auth/login", json={**attempt, "email": "other@example.com"}).status_code == 401
+
+    def test_client_ip_limit_covers_auth_routes_only(self):
+        """Test one client's auth requests share a bucket, while its other requests pass"""
+        client = TestClient(create_app(limited_settings(auth_ip_burst=2, auth_ip_per_minute=1)))
+        attempt = {"email": "user@example.com", "password": "password123"}
+        assert client.post("/api/auth/register", json=attempt).status_code == 200
+        assert client.post("/api/auth/login", json=attempt).status_code == 200
+        response = client.post("/api/auth/refresh")
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+        assert client.get("/").status_code == 200
+
+    def test_saturated_login_sheds_while_sync_is_served(self, monkeypatch):
+        """Test logins past the gate and its queue get 503 at once, and sync requests are not held up"""
+        db = SessionLocal()
+        user = User(email="sync@example.com", password_hash="hash")
+        db.add(user)
+        db.commit()
+        token = create_access_token(data={"sub": str(user.id)})
+        db.close()
+
+        app = create_app(limited_settings(
+            auth_concurrency_limits={"/api/auth/login": 2}, auth_queue_size=2, auth_queue_timeout_seconds=5,
+        ))
+
+        async def run():
+            release = asyncio.Event()
+
+            async def slow_verify(password, password_hash):
+                await release.wait()
+                return False
+
+            monkeypatch.setattr(auth_api, "verify_password_async", slow_verify)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=10) as client:
+                attempt = {"email": "sync@example.com", "password": "guess"}
+                logins = [asyncio.create_task(client.post("/api/auth/login", json=attempt)) for _ in range(4)]
+                while app.state.auth_limits.gates["/api/auth/login"].queued < 2:
+                    await asyncio.sleep(0.01)
+
+                shed = await client.post("/api/auth/login", json=attempt)
+                pull = await client.get("/api/sync/pull", headers={"Authorization": f"Bearer {token}"})
+                release.set()
+                return shed, pull, [response.status_code for response in await asyncio.gather(*logins)]
+
+        shed, pull, statuses = asyncio.run(run())
+        assert shed.status_code == 503
+        assert shed.headers["retry-after"] == "1"
+        assert pull.status_code == 200
+        assert statuses == [401] * 4
+        assert app.state.auth_limits.stats()["routes"]["/api/auth/login"]["rejected"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -3,11 +3,20 @@ from fastapi.testclient import TestClient
 import json
 
 from main import app
+from app.core.database import Base, engine
 
 
 class TestBasicAuth:
     """Test basic authentication functionality"""
     
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database (the app no longer creates tables on import)"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+    
     @pytest.fixture
     def client(self):
         """Get test client"""
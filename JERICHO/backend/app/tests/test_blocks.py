@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.usefixtures("setup_database")
+
+# Two cycles, three blocks a day over ten days; each day's last block is completed
+TEN_DAYS = {
+    "cycles": 2,
+    "days": [f"2026-01-{day}" for day in range(10, 20)],
+    "blocks_per_day": 3,
+    "statuses": ["scheduled", "scheduled", "completed"],
+}
+
+
+@pytest.mark.parametrize("seeded", [TEN_DAYS], indirect=True, ids=["ten_days"])
+class TestBlockListing:
+    """Test keyset-paginated and streaming /api/blocks"""
+
+    def test_keyset_pages_cover_range_once(self, client, seeded):
+        """Test pages walk the filtered range in (day_key, id) order without gaps or repeats"""
+        params = {"cycle_id": seeded["cycle_ids"][0], "day_from": "2026-01-12", "day_to": "2026-01-16", "limit": 3}
+        seen, cursor = [], None
+        while True:
+            data = client.get("/api/blocks/", params=dict(params, cursor=cursor) if cursor else params,
+                              headers=seeded["headers"]).json()
+            seen += [(block["day_key"], block["id"]) for block in data["blocks"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 10
+        assert seen == sorted(seen)
+        assert {day for day, _ in seen} == {f"2026-01-{day}" for day in range(12, 17)}
+
+    def test_status_filter_and_bad_cursor(self, client, seeded):
+        """Test the status filter and rejection of malformed cursors"""
+        data = client.get("/api/blocks/?status=completed&limit=100", headers=seeded["headers"]).json()
+        assert len(data["blocks"]) == 10
+        assert data["next_cursor"] is None
+
+        response = client.get("/api/blocks/?cursor=not-a-cursor", headers=seeded["headers"])
+        assert response.status_code == 400
+
+    def test_ndjson_export(self, client, seeded):
+        """Test NDJSON mode streams every match regardless of limit"""
+        response = client.get(
+            f"/api/blocks/?cycle_id={seeded['cycle_ids'][1]}&limit=1",
+            headers=dict(seeded["headers"], Accept="application/x-ndjson"),
+        )
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 10
+        assert [row["day_key"] for row in rows] == sorted(row["day_key"] for row in rows)
+
+    def test_cycle_range_uses_composite_index(self, db_session, seeded):
+        """Test the cycle + day-range query is served by one composite index"""
+        plan = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM blocks WHERE user_id = 1 AND cycle_id = 1 "
+            "AND day_key BETWEEN '2026-01-12' AND '2026-01-16' ORDER BY day_key, id"
+        ).all()
+        details = " ".join(row[-1] for row in plan)
+        assert "ix_blocks_user_cycle_day_id" in details
+        assert "TEMP B-TREE" not in details
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,115 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.cache import LRUCache
+from app.core.database import Base, engine, get_db
+from app.core.principals import Principal, principal_cache
+from app.models.user import User
+
+
+class TestLRUCache:
+    """Test LRU/TTL cache behaviour"""
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        cache = LRUCache(maxsize=10, ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.stats()["misses"] == 1
+
+
+class TestPrincipalCache:
+    """Test get_current_user principal caching and invalidation"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def client(self):
+        """Get test client"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def auth_headers(self, client):
+        """Register and login a user, returning bearer headers"""
+        user_data = {"email": "test@example.com", "password": "testpassword123"}
+        client.post("/api/auth/register", json=user_data)
+        token = client.post("/api/auth/login", json=user_data).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_repeat_requests_hit_cache(self, client, auth_headers):
+        """Test the second authenticated request is served from the cache"""
+        client.get("/api/auth/me", headers=auth_headers)
+        hits_before = principal_cache.hits
+
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == "test@example.com"
+        assert principal_cache.hits == hits_before + 1
+
+    def test_cached_principal_is_read_only(self, client, auth_headers):
+        """Test the cache holds a frozen snapshot, not a session-less User"""
+        user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+        principal = principal_cache.get(user_id)
+        assert isinstance(principal, Principal)
+        assert not hasattr(principal, "password_hash")
+
+    def test_deactivation_invalidates_on_commit(self, client, auth_headers):
+        """Test deactivating a user drops the cached principal once committed, and rejects it afterwards"""
+        client.get("/api/auth/me", headers=auth_headers)
+        assert len(principal_cache) == 1
+
+        db = next(get_db())
+        try:
+            user = db.query(User).filter(User.email == "test@example.com").first()
+            user.is_active = False
+            db.flush()
+            assert len(principal_cache) == 1  # others still see the committed row until commit
+            db.commit()
+        finally:
+            db.close()
+
+        assert len(principal_cache) == 0
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Inactive user"
+        # Rejected from the cache as well as from the database
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 401
+
+    def test_rolled_back_change_keeps_principal(self, client, auth_headers):
+        """Test a rolled-back deactivation does not invalidate"""
+        client.get("/api/auth/me", headers=auth_headers)
+        db = next(get_db())
+        try:
+            db.query(User).filter(User.email == "test@example.com").first().is_active = False
+            db.flush()
+            db.rollback()
+        finally:
+            db.close()
+        assert len(principal_cache) == 1
+        assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+if __name__ == "__main__":
+    pytest.main([__file__])
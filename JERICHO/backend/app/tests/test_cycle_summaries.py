@@ -0,0 +1,188 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent, CycleSummary, CyclePracticeTotal
+from app.services.summaries import check_summaries, rebuild_summaries
+from app.services.rollover import sweep_overdue_blocks
+
+
+def run_with_db(function, **kwargs):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await function(db, **kwargs)
+    return asyncio.run(run())
+
+
+class TestCycleSummaries:
+    """Test cycle summaries kept current by every write path"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def cycles(self, db_session):
+        """Two users with one cycle each"""
+        created = []
+        for email in ("a@example.com", "b@example.com"):
+            user = User(email=email, password_hash="hash")
+            db_session.add(user)
+            db_session.flush()
+            goal = Goal(user_id=user.id, title="Goal", goal_execution_contract={})
+            db_session.add(goal)
+            db_session.flush()
+            cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active",
+                          cycle_data={"convergenceReport": {"verdict": "INCOMPLETE"}})
+            db_session.add(cycle)
+            db_session.commit()
+            created.append(cycle)
+        return created
+
+    def add_block(self, db_session, cycle, status="scheduled", practice="Focus", minutes=30, day_key="2026-01-30"):
+        block = Block(
+            user_id=cycle.user_id, goal_id=cycle.goal_id, cycle_id=cycle.id, day_key=day_key, practice=practice,
+            title="Block", duration_minutes=minutes, status=status,
+        )
+        db_session.add(block)
+        db_session.commit()
+        return block
+
+    def summary(self, db_session, cycle):
+        db_session.expire_all()
+        return db_session.get(CycleSummary, cycle.id)
+
+    def headers(self, cycle):
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': str(cycle.user_id)})}"}
+
+    def test_orm_block_writes_update_summary(self, cycles, db_session):
+        """Test inserts, status changes, moves and deletes are counted in the same flush"""
+        cycle = cycles[0]
+        other = Cycle(user_id=cycle.user_id, goal_id=cycle.goal_id, status="active")
+        db_session.add(other)
+        db_session.commit()
+        first = self.add_block(db_session, cycle, minutes=30)
+        second = self.add_block(db_session, cycle, practice="Creation", minutes=60)
+        first.status = "completed"
+        db_session.commit()
+
+        summary = self.summary(db_session, cycle)
+        assert (summary.blocks_total, summary.blocks_scheduled, summary.blocks_completed) == (2, 1, 1)
+        assert (summary.planned_minutes, summary.completed_minutes) == (90, 30)
+
+        second.cycle_id = other.id
+        db_session.commit()
+        db_session.delete(first)
+        db_session.commit()
+        summary = self.summary(db_session, cycle)
+        assert (summary.blocks_total, summary.planned_minutes, summary.completed_minutes) == (0, 0, 0)
+        assert db_session.query(CyclePracticeTotal).filter_by(cycle_id=cycle.id).count() == 0
+        moved = db_session.get(CyclePracticeTotal, (other.id, "Creation"))
+        assert (moved.blocks, moved.minutes) == (1, 60)
+        assert run_with_db(check_summaries)["ok"] is True
+
+    def test_pushed_events_update_summary(self, cycles, db_session):
+        """Test /api/sync/push counts events and summarizeCycle's completions"""
+        cycle = cycles[0]
+        block = self.add_block(db_session, cycle)
+        events = [
+            {"event_type": "create", "block_id": block.id, "cycle_id": cycle.id, "event_data": {"n": n}}
+            for n in range(4)
+        ] + [
+            {"event_type": "complete", "block_id": block.id, "cycle_id": cycle.id, "event_data": {"completed": True}},
+            {"event_type": "complete", "block_id": block.id, "cycle_id": cycle.id, "event_data": {"completed": False}},
+        ]
+        client = TestClient(app)
+        assert client.post("/api/sync/push", json={"events": events}, headers=self.headers(cycle)).json()["accepted"] == 6
+
+        summary = self.summary(db_session, cycle)
+        newest = db_session.query(ExecutionEvent).order_by(ExecutionEvent.id.desc()).first()
+        assert (summary.event_count, summary.create_events, summary.completion_events) == (6, 4, 1)
+        assert summary.last_event_id == newest.id
+
+        data = client.get(f"/api/blocks/cycles/{cycle.id}/summary", headers=self.headers(cycle)).json()
+        assert data["completionCount"] == 1
+        assert data["completionRate"] == 0.25
+        assert data["convergenceReport"] == {"verdict": "INCOMPLETE"}
+        assert data["blocksByStatus"]["scheduled"] == 1
+        assert data["practiceTotals"] == [
+            {"practice": "Focus", "blocks": 1, "minutes": 30, "completedBlocks": 0, "completedMinutes": 0}
+        ]
+        assert data["lastEventId"] == newest.id
+        assert data["lastEventAt"] is not None
+
+    def test_orm_events_update_summary(self, cycles, db_session):
+        """Test events added through the ORM are counted after their ids are assigned"""
+        cycle = cycles[0]
+        block = self.add_block(db_session, cycle)
+        event = ExecutionEvent(
+            user_id=cycle.user_id, cycle_id=cycle.id, block_id=block.id, event_type="complete",
+            event_data={"completed": True}, event_hash="h" * 64,
+        )
+        db_session.add(event)
+        db_session.commit()
+        summary = self.summary(db_session, cycle)
+        assert (summary.event_count, summary.completion_events, summary.last_event_id) == (1, 1, event.id)
+
+    def test_rollover_moves_blocks_to_missed(self, cycles, db_session):
+        """Test the sweep moves counts from scheduled/started to missed and counts its events"""
+        cycle = cycles[0]
+        self.add_block(db_session, cycle, status="scheduled")
+        self.add_block(db_session, cycle, status="started")
+        self.add_block(db_session, cycle, status="completed")
+        asyncio.run(sweep_overdue_blocks(now=datetime(2026, 2, 1, 18, 0, tzinfo=timezone.utc)))
+
+        summary = self.summary(db_session, cycle)
+        assert (summary.blocks_scheduled, summary.blocks_started, summary.blocks_missed) == (0, 0, 2)
+        assert (summary.blocks_completed, summary.event_count) == (1, 2)
+        assert run_with_db(check_summaries)["ok"] is True
+
+    def test_checker_reports_drift_and_rebuild_repairs(self, cycles, db_session):
+        """Test the checker lists differing fields and a rebuild backfills from the base tables"""
+        cycle = cycles[0]
+        self.add_block(db_session, cycle, status="completed", minutes=45)
+        db_session.query(CycleSummary).filter_by(cycle_id=cycle.id).update({"completed_minutes": 5})
+        db_session.query(CyclePracticeTotal).delete()
+        db_session.commit()
+
+        report = run_with_db(check_summaries)
+        assert report["ok"] is False
+        assert report["cycles_checked"] == 2
+        assert report["mismatched_cycles"] == 1
+        fields = {(m["field"], m["stored"], m["expected"]) for m in report["mismatches"]}
+        assert ("completed_minutes", 5, 45) in fields
+        assert ("practice:Focus.blocks", 0, 1) in fields
+
+        assert run_with_db(rebuild_summaries) == {"cycles": 2}
+        assert run_with_db(check_summaries)["ok"] is True
+        assert self.summary(db_session, cycle).completed_minutes == 45
+
+    def test_summary_endpoint_is_owner_only(self, cycles):
+        """Test a cycle without writes reads as zeros and other users' cycles are hidden"""
+        client = TestClient(app)
+        data = client.get(f"/api/blocks/cycles/{cycles[0].id}/summary", headers=self.headers(cycles[0])).json()
+        assert (data["blocksTotal"], data["completionRate"], data["lastEventAt"]) == (0, 0, None)
+        response = client.get(f"/api/blocks/cycles/{cycles[1].id}/summary", headers=self.headers(cycles[0]))
+        assert response.status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, text
+
+from main import app
+from app.core.database import Base, engine, AsyncSessionLocal, engine_options, to_async_url
+from app.models.user import User
+
+
+class TestAsyncDatabase:
+    """Test async engine/session selection"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    def test_async_url_mapping(self):
+        """Test sync URLs map onto their async drivers"""
+        assert to_async_url("sqlite:///./jericho_dev.db") == "sqlite+aiosqlite:///./jericho_dev.db"
+        assert to_async_url("postgresql://u:p@db/jericho") == "postgresql+asyncpg://u:p@db/jericho"
+        assert to_async_url("postgres://u:p@db/jericho") == "postgresql+asyncpg://u:p@db/jericho"
+        assert to_async_url("postgresql+psycopg2://u:p@db/jericho") == "postgresql+asyncpg://u:p@db/jericho"
+        assert to_async_url("postgresql+asyncpg://u:p@db/jericho") == "postgresql+asyncpg://u:p@db/jericho"
+
+    def test_async_session_round_trip(self):
+        """Test rows written through the async session are readable"""
+        async def round_trip():
+            async with AsyncSessionLocal() as db:
+                db.add(User(email="async@example.com", password_hash="hash"))
+                await db.commit()
+                result = await db.execute(select(User).where(User.email == "async@example.com"))
+                return result.scalars().first()
+
+        user = asyncio.run(round_trip())
+        assert user is not None
+        assert user.is_active is True
+
+
+class TestEngineTuning:
+    """Test pool options and SQLite pragmas"""
+
+    def test_sqlite_pragmas_applied(self):
+        """Test new SQLite connections run in WAL with a busy timeout"""
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+    def test_memory_sqlite_skips_pool_sizing(self):
+        """Test in-memory SQLite gets no QueuePool sizing options"""
+        assert "pool_size" not in engine_options("sqlite:///:memory:")
+        assert engine_options("postgresql://u:p@db/jericho")["pool_size"] == 5
+
+    def test_statement_timeout_per_driver(self, monkeypatch):
+        """Test statement timeout is passed in each PostgreSQL driver's format"""
+        from app.core import database
+        monkeypatch.setattr(database.settings, "db_statement_timeout_ms", 2500)
+        sync_args = engine_options("postgresql://u:p@db/jericho")["connect_args"]
+        async_args = engine_options("postgresql://u:p@db/jericho", use_async=True)["connect_args"]
+        assert sync_args["options"] == "-c statement_timeout=2500"
+        assert async_args["server_settings"] == {"statement_timeout": "2500"}
+
+    def test_health_reports_pool_counters(self):
+        """Test /health exposes live pool counts"""
+        response = TestClient(app).get("/health")
+        pools = response.json()["database"]
+        assert pools["sync"]["pool"] == "QueuePool"
+        assert "checkedout" in pools["sync"]
+        assert "overflow" in pools["async"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
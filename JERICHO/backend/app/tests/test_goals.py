@@ -0,0 +1,87 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from main import app
+from app.core.database import get_db, Base, engine
+from app.core.security import create_access_token
+from app.models.user import User, Goal
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Setup test database"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db_session():
+    """Get database session for testing"""
+    db = next(get_db())
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def user(db_session):
+    """Create a user with goals due on different days"""
+    user = User(email="test@example.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    contracts = {
+        "Hard this week": {"deadline": {"dayKey": "2026-01-16", "isHardDeadline": True}},
+        "Soft this week": {"deadline": {"dayKey": "2026-01-17", "isHardDeadline": False}},
+        "Hard next month": {"deadline": {"dayKey": "2026-02-20", "isHardDeadline": True}},
+        "Equation goal": '{"deadlineType": "HARD", "deadline": {"dayKey": "2026-01-15"}}',
+    }
+    for title, contract in contracts.items():
+        db_session.add(Goal(user_id=user.id, title=title, goal_execution_contract=contract))
+    db_session.commit()
+    return user
+
+
+class TestContractColumns:
+    """Test JSON payload columns and the generated deadline columns"""
+
+    def test_payloads_round_trip_decoded(self, db_session, user):
+        """Test dicts and JSON strings are both stored as JSON objects"""
+        goals = {goal.title: goal for goal in db_session.query(Goal)}
+        assert goals["Equation goal"].goal_execution_contract == {"deadlineType": "HARD", "deadline": {"dayKey": "2026-01-15"}}
+        assert goals["Hard this week"].goal_governance_contract is None
+
+    def test_generated_deadline_columns(self, db_session, user):
+        """Test deadline fields are extracted by the database"""
+        rows = db_session.execute(select(Goal.title, Goal.deadline_type, Goal.deadline_day_key).order_by(Goal.id)).all()
+        assert [tuple(row) for row in rows] == [
+            ("Hard this week", "HARD", "2026-01-16"),
+            ("Soft this week", "SOFT", "2026-01-17"),
+            ("Hard next month", "HARD", "2026-02-20"),
+            ("Equation goal", "HARD", "2026-01-15"),
+        ]
+
+    def test_deadline_filter_uses_index(self, db_session, user):
+        """Test the deadline filter is answered from ix_goals_user_deadline"""
+        plan = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM goals WHERE user_id = ? AND deadline_type = 'HARD' "
+            "AND deadline_day_key BETWEEN '2026-01-12' AND '2026-01-18'",
+            (user.id,),
+        ).all()
+        assert any("ix_goals_user_deadline" in row[-1] for row in plan)
+
+    def test_goals_due_endpoint(self, user):
+        """Test HARD goals due in a week are returned in deadline order"""
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+        response = TestClient(app).get(
+            "/api/goals/due?deadline_type=HARD&start=2026-01-12&end=2026-01-18", headers=headers
+        )
+        assert response.status_code == 200
+        assert [goal["title"] for goal in response.json()] == ["Equation goal", "Hard this week"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,149 @@
+import asyncio
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent, LedgerCheckpoint
+from app.services import ledger
+from app.services.ledger import MerkleAccumulator
+
+
+def rfc6962_root(leaves):
+    """Reference recursive Merkle tree hash"""
+    if len(leaves) == 1:
+        return hashlib.sha256(b"\x00" + leaves[0].encode("utf-8")).digest()
+    split = 1
+    while split * 2 < len(leaves):
+        split *= 2
+    return hashlib.sha256(b"\x01" + rfc6962_root(leaves[:split]) + rfc6962_root(leaves[split:])).digest()
+
+
+class TestMerkleAccumulator:
+    """Test the streaming Merkle root"""
+
+    def test_matches_reference_tree(self):
+        """Test the streaming root equals the recursive definition for every size"""
+        leaves = [f"leaf-{i}" for i in range(33)]
+        for size in range(1, len(leaves) + 1):
+            merkle = MerkleAccumulator()
+            for leaf in leaves[:size]:
+                merkle.add(leaf)
+            assert merkle.root() == rfc6962_root(leaves[:size]).hex()
+
+
+class TestLedgerVerification:
+    """Test hash-chain verification with Merkle checkpoints"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self, monkeypatch):
+        """Setup test database"""
+        monkeypatch.setattr(ledger.settings, "ledger_checkpoint_interval", 4)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def client(self):
+        """Get test client"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def seeded(self, db_session, client):
+        """Create a user, goal, cycle and block, then push ten events"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.commit()
+        goal = Goal(user_id=user.id, title="Test Goal", goal_execution_contract='{}', admission_status="admitted")
+        db_session.add(goal)
+        db_session.commit()
+        cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+        db_session.add(cycle)
+        db_session.commit()
+        block = Block(
+            user_id=user.id, goal_id=goal.id, cycle_id=cycle.id,
+            day_key="2026-01-15", practice="Creation", title="Test Block", duration_minutes=60
+        )
+        db_session.add(block)
+        db_session.commit()
+
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+        events = [
+            {"event_type": "complete", "block_id": block.id, "cycle_id": cycle.id, "event_data": {"id": f"evt-{seq}"}}
+            for seq in range(10)
+        ]
+        client.post("/api/sync/push", json={"events": events}, headers=headers)
+        return {"user_id": user.id, "cycle_id": cycle.id, "block_id": block.id, "headers": headers}
+
+    def verify(self, seeded, full=False):
+        async def run():
+            async with AsyncSessionLocal() as db:
+                return await ledger.verify_cycle(db, seeded["cycle_id"], seeded["user_id"], full=full)
+        return asyncio.run(run())
+
+    def test_incremental_verification(self, db_session, seeded):
+        """Test later runs only read events appended after the newest checkpoint"""
+        report = self.verify(seeded)
+        assert report["ok"] is True
+        assert report["events_verified"] == 10
+        assert report["checkpoints_created"] == 2
+        assert db_session.query(LedgerCheckpoint).count() == 2
+
+        report = self.verify(seeded)
+        assert report["ok"] is True
+        assert report["from_event_id"] == 8
+        assert report["events_verified"] == 2
+        assert report["checkpoints_created"] == 0
+
+    def test_orm_inserts_extend_the_chain(self, db_session, seeded):
+        """Test events added through a session link onto the pushed chain"""
+        db_session.add(ExecutionEvent(
+            user_id=seeded["user_id"], cycle_id=seeded["cycle_id"], block_id=seeded["block_id"],
+            event_type="complete", event_data='{"id": "evt-orm"}',
+            event_hash=ledger.event_content_hash(
+                seeded["user_id"], seeded["cycle_id"], seeded["block_id"], "complete", '{"id":"evt-orm"}'
+            ),
+        ))
+        db_session.commit()
+
+        report = self.verify(seeded, full=True)
+        assert report["ok"] is True
+        assert report["event_count"] == 11
+
+    def test_tampering_is_detected(self, db_session, seeded):
+        """Test an edited event fails a full audit even behind a checkpoint"""
+        self.verify(seeded)
+
+        event = db_session.get(ExecutionEvent, 2)
+        event.event_data = '{"id":"forged"}'
+        db_session.commit()
+
+        assert self.verify(seeded)["ok"] is True  # event 2 is behind the newest checkpoint
+        report = self.verify(seeded, full=True)
+        assert report["ok"] is False
+        assert report["failure"]["event_id"] == 2
+
+    def test_verify_endpoint(self, client, seeded):
+        """Test the verify endpoint reports every cycle of the user"""
+        response = client.post("/api/sync/verify?full=true", headers=seeded["headers"])
+        assert response.status_code == 200
+        data = response.json()
+        assert data["ok"] is True
+        assert [cycle["event_count"] for cycle in data["cycles"]] == [10]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
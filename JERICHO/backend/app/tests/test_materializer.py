@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent, CycleProjectionCheckpoint
+from app.services import materializer
+from app.services.materializer import materialize_events, project_days
+
+
+def create_event(block_id, start_iso, minutes=60, **extra):
+    return dict({"kind": "create", "blockId": block_id, "startISO": start_iso, "minutes": minutes, "domain": "CREATION"}, **extra)
+
+
+class TestMaterializerFold:
+    """Test the event fold matches the frontend materializer rules"""
+
+    def test_create_reschedule_complete(self):
+        """Test blocks follow reschedules and stay completed"""
+        state = materialize_events([
+            create_event("blk-1", "2026-01-13T15:00:00.000Z"),
+            {"kind": "reschedule", "blockId": "blk-1", "startISO": "2026-01-14T15:00:00.000Z", "minutes": 90},
+            {"kind": "complete", "blockId": "blk-1", "completed": True},
+            {"kind": "reschedule", "blockId": "blk-1", "startISO": "2026-01-15T15:00:00.000Z", "status": "planned"},
+        ], fallback_day="2026-01-13")
+
+        block = state.blocks["blk-1"]
+        assert block["start"] == "2026-01-15T15:00:00.000Z"
+        assert block["end"] == "2026-01-14T16:30:00.000Z"  # no minutes on the last reschedule
+        assert block["status"] == "completed"
+        assert block["domain"] == "CREATION"
+
+    def test_delete_missed_and_orphans(self):
+        """Test deletes are final, missed is ignored and orphan reschedules are dropped"""
+        state = materialize_events([
+            create_event("blk-1", "2026-01-13T15:00:00.000Z"),
+            {"kind": "missed", "blockId": "blk-1", "placementState": "MISSED"},
+            {"kind": "delete", "blockId": "blk-1"},
+            create_event("blk-1", "2026-01-14T15:00:00.000Z"),
+            {"kind": "reschedule", "blockId": "blk-2", "startISO": "2026-01-14T15:00:00.000Z"},
+            {"kind": "tick_now"},
+        ], fallback_day="2026-01-13")
+
+        assert state.blocks == {}
+        assert state.deleted == {"blk-1"}
+
+    def test_days_use_app_time_zone(self):
+        """Test day keys follow the app time zone like dayKeyFromDate"""
+        state = materialize_events([
+            create_event("late", "2026-01-14T03:00:00.000Z"),  # 21:00 on the 13th in Chicago
+            create_event("early", "2026-01-13T14:00:00.000Z"),
+        ], fallback_day="2026-01-13")
+
+        projection = project_days(state, today_iso="2026-01-13")
+        assert [day["date"] for day in projection["days"]] == ["2026-01-13"]
+        assert [block["id"] for block in projection["today_blocks"]] == ["early", "late"]
+
+
+class TestMaterializerCheckpoints:
+    """Test persisted checkpoints and incremental replay"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def seeded(self, db_session):
+        """Create a user, goal, cycle and block"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.commit()
+        goal = Goal(user_id=user.id, title="Test Goal", goal_execution_contract='{}', admission_status="admitted")
+        db_session.add(goal)
+        db_session.commit()
+        cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+        db_session.add(cycle)
+        db_session.commit()
+        block = Block(
+            user_id=user.id, goal_id=goal.id, cycle_id=cycle.id,
+            day_key="2026-01-13", practice="Creation", title="Test Block", duration_minutes=60
+        )
+        db_session.add(block)
+        db_session.commit()
+        return {"user_id": user.id, "cycle_id": cycle.id, "block_id": block.id}
+
+    def append_events(self, db_session, seeded, events):
+        for seq, event in enumerate(events):
+            db_session.add(ExecutionEvent(
+                user_id=seeded["user_id"], cycle_id=seeded["cycle_id"], block_id=seeded["block_id"],
+                event_type=event["kind"], event_data=json.dumps(event), event_hash=f"hash-{event['blockId']}-{seq}",
+            ))
+        db_session.commit()
+
+    def materialize(self, seeded):
+        async def run():
+            async with AsyncSessionLocal() as db:
+                return await materializer.materialize_cycle(db, seeded["cycle_id"], seeded["user_id"])
+        return asyncio.run(run())
+
+    def test_only_new_events_are_applied(self, db_session, seeded, monkeypatch):
+        """Test a rebuild after a checkpoint replays only the tail of the ledger"""
+        monkeypatch.setattr(materializer.settings, "materializer_checkpoint_interval", 1)
+        self.append_events(db_session, seeded, [
+            create_event(f"blk-{i}", "2026-01-13T15:00:00.000Z") for i in range(20)
+        ])
+        state = self.materialize(seeded)
+        assert len(state.blocks) == 20
+
+        checkpoint = db_session.get(CycleProjectionCheckpoint, seeded["cycle_id"])
+        assert checkpoint.event_count == 20
+
+        # Drop the in-process copy so the next call starts from the persisted checkpoint
+        materializer._state_cache.clear()
+        self.append_events(db_session, seeded, [{"kind": "complete", "blockId": "blk-3", "completed": True}])
+
+        applied = []
+        original_apply = materializer.apply_event
+        monkeypatch.setattr(materializer, "apply_event", lambda *args: applied.append(1) or original_apply(*args))
+        state = self.materialize(seeded)
+
+        assert len(applied) == 1
+        assert state.event_count == 21
+        assert state.blocks["blk-3"]["status"] == "completed"
+
+    def test_materialized_endpoint(self, db_session, seeded):
+        """Test the cycle projection endpoint groups blocks by day"""
+        self.append_events(db_session, seeded, [
+            create_event("blk-a", "2026-01-13T15:00:00.000Z"),
+            create_event("blk-b", "2026-01-14T15:00:00.000Z"),
+        ])
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(seeded['user_id'])})}"}
+        client = TestClient(app)
+
+        response = client.get(f"/api/blocks/cycles/{seeded['cycle_id']}/materialized?today=2026-01-14", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [day["date"] for day in data["days"]] == ["2026-01-13", "2026-01-14"]
+        assert [block["id"] for block in data["today_blocks"]] == ["blk-b"]
+
+        missing = client.get(f"/api/blocks/cycles/{seeded['cycle_id'] + 1}/materialized", headers=headers)
+        assert missing.status_code == 404
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
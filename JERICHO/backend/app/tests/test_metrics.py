@@ -0,0 +1,114 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import Base, engine, get_db
+from app.core.metrics import MetricsRegistry, RequestStats, current_request, request_metrics
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle
+
+
+def sample(text, line_prefix):
+    """Value of the exposition line starting with line_prefix (0 when absent)"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0
+
+
+class TestMetrics:
+    """Test request metrics, query accounting and the /metrics endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def user(self, db_session):
+        """A user with three goals of two cycles each"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.flush()
+        for n in range(3):
+            goal = Goal(user_id=user.id, title=f"Goal {n}", goal_execution_contract={})
+            db_session.add(goal)
+            db_session.flush()
+            db_session.add_all(Cycle(user_id=user.id, goal_id=goal.id, status="active") for _ in range(2))
+        db_session.commit()
+        return user
+
+    def test_requests_are_recorded_by_route_template(self, user):
+        """Test counts, latency and per-request queries are labelled with the route, not the raw path"""
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+        route = 'method="GET",route="/api/goals/{goal_id}/plan"'
+        before = client.get("/metrics").text
+
+        client.get("/api/goals/999999/plan", headers=headers)
+        client.get("/api/goals/999998/plan", headers=headers)
+        client.get("/no-such-page")
+        after = client.get("/metrics")
+
+        assert after.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = after.text
+        assert "# TYPE jericho_http_request_duration_seconds histogram" in text
+        count = f"jericho_http_request_duration_seconds_count{{{route}}}"
+        assert sample(text, count) - sample(before, count) == 2
+        requests = f'jericho_http_requests_total{{{route},status="404"}}'
+        assert sample(text, requests) - sample(before, requests) == 2
+        unmatched = 'jericho_http_requests_total{method="GET",route="unmatched",status="404"}'
+        assert sample(text, unmatched) - sample(before, unmatched) == 1
+        assert sample(text, f'jericho_http_request_duration_seconds_bucket{{{route},le="+Inf"}}') == sample(text, count)
+        # The goal lookup runs on the async engine; its queries count against the request
+        queries = f"jericho_http_request_db_queries_sum{{{route}}}"
+        assert sample(text, queries) - sample(before, queries) >= 2
+        assert f'jericho_http_requests_in_flight{{{route}}} 0' in text
+        assert "jericho_db_queries_total" in text
+
+    def test_lazy_loads_in_a_loop_are_flagged(self, user, db_session, monkeypatch):
+        """Test an N+1 over Goal.cycles is reported with its repeated statement"""
+        registry = MetricsRegistry(query_threshold=2)
+        monkeypatch.setattr(request_metrics, "record_query", registry.record_query)
+        user_id = user.id
+        db_session.expire_all()
+        stats = RequestStats()
+        token = current_request.set(stats)
+        try:
+            goals = db_session.query(Goal).filter(Goal.user_id == user_id).all()
+            assert sum(len(goal.cycles) for goal in goals) == 6
+        finally:
+            current_request.reset(token)
+        registry.start_request("GET", "/api/goals/")
+        registry.finish_request("GET", "/api/goals/", "/api/goals/", 200, 0.01, stats)
+
+        assert stats.queries == 4
+        flagged = registry.stats()["recent_query_heavy"]
+        assert len(flagged) == 1
+        assert flagged[0]["queries"] == 4
+        assert flagged[0]["top_statement_count"] == 3
+        assert flagged[0]["top_statement"].startswith("SELECT cycles.id")
+        assert 'jericho_http_query_heavy_requests_total{method="GET",route="/api/goals/"} 1' in registry.render()
+
+    def test_queries_outside_requests_count_only_in_totals(self, db_session):
+        """Test queries with no request in flight (background jobs, CLI) update the process totals"""
+        before = request_metrics.queries_total
+        db_session.query(User).count()
+        assert current_request.get() is None
+        assert request_metrics.queries_total == before + 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
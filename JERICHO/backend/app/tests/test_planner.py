@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, PlanCacheEntry
+from app.services import planner
+from app.services.planner import build_auto_deliverables, generate_deterministic_plan, plan_hash, plan_input_for_goal
+
+
+def build_input(**overrides):
+    """Generator input, as buildInput in deterministicPlanGenerator.test.ts"""
+    plan_input = {
+        "contractDeadlineDayKey": "2026-02-20",
+        "contractStartDayKey": "2026-01-10",
+        "nowDayKey": "2026-01-10",
+        "causalChainSteps": None,
+        "constraints": {
+            "maxBlocksPerDay": 4,
+            "maxBlocksPerWeek": 16,
+            "preferredDaysOfWeek": [1, 2, 3, 4, 5],
+            "blackoutDayKeys": [],
+            "timezone": "UTC",
+        },
+        "mode": "REGENERATE",
+    }
+    plan_input.update(overrides)
+    return plan_input
+
+
+def build_contract(**overrides):
+    """Execution contract with a deadline, binding start and causal chain"""
+    contract = {
+        "deadline": {"dayKey": "2026-02-20", "isHardDeadline": True},
+        "temporalBinding": {"daysPerWeek": 3, "startDayKey": "2026-01-10"},
+        "causalChain": {"steps": [
+            {"sequence": 2, "description": "Build"},
+            {"sequence": 1, "description": "Design"},
+            {"sequence": 3, "description": "Test"},
+        ]},
+        "constraints": {"maxBlocksPerWeek": 2, "workableDayPolicy": {"weekdays": ["mon", "wed", "fri"]}},
+    }
+    contract.update(overrides)
+    return contract
+
+
+class TestDeterministicPlanGenerator:
+    """Test the port of generateDeterministicPlan"""
+
+    def test_default_deliverables(self):
+        """Test the Planning/Core/Verify split without a causal chain"""
+        deliverables = build_auto_deliverables([])
+        assert [d["kind"] for d in deliverables] == ["PLANNING", "CORE", "VERIFICATION"]
+        assert sum(d["requiredBlocks"] for d in deliverables) == 10
+
+    def test_causal_chain_deliverables_sorted_by_sequence(self):
+        """Test causal chain steps become one-block deliverables in sequence order"""
+        deliverables = build_auto_deliverables([
+            {"sequence": 3, "description": "Test"},
+            {"sequence": 1, "description": "Design"},
+            {"sequence": 2, "description": "Build"},
+        ])
+        assert [(d["id"], d["title"], d["kind"]) for d in deliverables] == [
+            ("deliv-causal-1", "Design", "PLANNING"),
+            ("deliv-causal-2", "Build", "CORE"),
+            ("deliv-causal-3", "Test", "VERIFICATION"),
+        ]
+
+    def test_matches_client_allocation(self):
+        """Test earliest-first allocation under daily, weekly, weekday and blackout constraints"""
+        result = generate_deterministic_plan(build_input(constraints={
+            "maxBlocksPerDay": 2,
+            "maxBlocksPerWeek": 3,
+            "preferredDaysOfWeek": [1, 3, 5],
+            "blackoutDayKeys": ["2026-01-14"],
+            "timezone": "UTC",
+        }))
+        assert result["status"] == "SUCCESS"
+        # Generated by the TypeScript planner for the same input
+        assert [(b["dayKey"], b["deliverableId"], b["order"]) for b in result["proposedBlocks"]] == [
+            ("2026-01-12", "deliv-planning", 0),
+            ("2026-01-12", "deliv-planning", 1),
+            ("2026-01-16", "deliv-core", 0),
+            ("2026-01-19", "deliv-core", 1),
+            ("2026-01-19", "deliv-core", 2),
+            ("2026-01-21", "deliv-core", 3),
+            ("2026-01-26", "deliv-core", 4),
+            ("2026-01-26", "deliv-core", 5),
+            ("2026-01-28", "deliv-verify", 0),
+        ]
+        assert [b["id"] for b in result["proposedBlocks"]] == [f"block-{i}" for i in range(9)]
+
+    @pytest.mark.parametrize("overrides,code", [
+        ({"constraints": dict(build_input()["constraints"], maxBlocksPerDay=-1)}, "DAILY_CAP_ZERO"),
+        ({"constraints": dict(build_input()["constraints"], maxBlocksPerWeek=0)}, "WEEKLY_CAP_ZERO"),
+        ({"contractDeadlineDayKey": "2026-01-10"}, "DEADLINE_BEFORE_START"),
+        ({"nowDayKey": "2026-03-01", "mode": "REBASE_FROM_TODAY"}, "NO_ELIGIBLE_DAYS"),
+    ])
+    def test_infeasible_inputs(self, overrides, code):
+        """Test each infeasible input reports its single error code"""
+        result = generate_deterministic_plan(build_input(**overrides))
+        assert result["status"] == "INFEASIBLE"
+        assert result["proposedBlocks"] == []
+        assert result["error"]["code"] == code
+
+    def test_rebase_starts_from_today(self):
+        """Test REBASE_FROM_TODAY schedules nothing before today"""
+        result = generate_deterministic_plan(build_input(nowDayKey="2026-01-20", mode="REBASE_FROM_TODAY"))
+        assert result["proposedBlocks"][0]["dayKey"] == "2026-01-20"
+
+
+class TestPlanCache:
+    """Test plan inputs, content addressing and the cached endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def goals(self, db_session):
+        """Two users with goals from the same template, plus a goal without a deadline"""
+        users = [User(email=f"user{i}@example.com", password_hash="hash") for i in range(2)]
+        db_session.add_all(users)
+        db_session.commit()
+        goals = [
+            Goal(user_id=users[0].id, title="Template", goal_execution_contract=dict(build_contract(), goalId="a")),
+            Goal(user_id=users[1].id, title="Template", goal_execution_contract=dict(build_contract(), goalId="b")),
+            Goal(user_id=users[0].id, title="Open-ended", goal_execution_contract={"deadline": {}}),
+        ]
+        db_session.add_all(goals)
+        db_session.commit()
+        return users, goals
+
+    def headers(self, user):
+        return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+    def test_plan_input_from_contract(self, goals):
+        """Test the contract is normalized into generator input"""
+        _, (goal, _, _) = goals
+        plan_input = plan_input_for_goal(goal)
+        assert plan_input["contractStartDayKey"] == "2026-01-10"
+        assert plan_input["nowDayKey"] is None
+        assert [step["description"] for step in plan_input["causalChainSteps"]] == ["Build", "Design", "Test"]
+        assert plan_input["constraints"]["maxBlocksPerDay"] == 4
+        assert plan_input["constraints"]["maxBlocksPerWeek"] == 2
+        assert plan_input["constraints"]["preferredDaysOfWeek"] == [1, 3, 5]
+
+    def test_templated_goals_share_one_plan(self, goals):
+        """Test identical contracts are generated once, then served from memory or the table"""
+        users, goals = goals
+        client = TestClient(app)
+        planner._plan_cache.clear()
+
+        first = client.get(f"/api/goals/{goals[0].id}/plan", headers=self.headers(users[0]))
+        assert first.status_code == 200
+        assert first.json()["source"] == "generated"
+        assert first.json()["status"] == "SUCCESS"
+        assert [b["deliverableTitle"] for b in first.json()["proposedBlocks"]] == ["Design", "Build", "Test"]
+
+        second = client.get(f"/api/goals/{goals[1].id}/plan", headers=self.headers(users[1]))
+        assert second.json()["source"] == "memory"
+        assert second.json()["planHash"] == first.json()["planHash"]
+        assert second.json()["proposedBlocks"] == first.json()["proposedBlocks"]
+
+        planner._plan_cache.clear()
+        third = client.get(f"/api/goals/{goals[1].id}/plan", headers=self.headers(users[1]))
+        assert third.json()["source"] == "database"
+        assert third.json()["proposedBlocks"] == first.json()["proposedBlocks"]
+
+        async def count_entries():
+            async with AsyncSessionLocal() as db:
+                return len((await db.execute(PlanCacheEntry.__table__.select())).all())
+        assert asyncio.run(count_entries()) == 1
+
+    def test_hash_covers_input_and_version(self, goals, monkeypatch):
+        """Test the plan hash changes with the constraints and the generator version"""
+        _, (goal, _, _) = goals
+        plan_input = plan_input_for_goal(goal)
+        rebased = plan_input_for_goal(goal, "REBASE_FROM_TODAY", today="2026-01-20")
+        assert plan_hash(plan_input) != plan_hash(rebased)
+        tightened = dict(plan_input, constraints=dict(plan_input["constraints"], maxBlocksPerWeek=1))
+        assert plan_hash(plan_input) != plan_hash(tightened)
+
+        key = plan_hash(plan_input)
+        monkeypatch.setattr(planner, "PLANNER_VERSION", "deterministic_v2")
+        assert plan_hash(plan_input) != key
+
+    def test_plan_endpoint_errors(self, goals):
+        """Test other users' goals are hidden and goals without a deadline are rejected"""
+        users, goals = goals
+        client = TestClient(app)
+        assert client.get(f"/api/goals/{goals[1].id}/plan", headers=self.headers(users[0])).status_code == 404
+        assert client.get(f"/api/goals/{goals[2].id}/plan", headers=self.headers(users[0])).status_code == 422
+        response = client.get(f"/api/goals/{goals[0].id}/plan?mode=LATER", headers=self.headers(users[0]))
+        assert response.status_code == 422
+        assert client.get(f"/api/goals/{goals[0].id}/plan").status_code in [401, 403]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
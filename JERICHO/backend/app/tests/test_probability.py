@@ -0,0 +1,292 @@
+import asyncio
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, async_engine, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent
+from app.services.probability import (
+    CONTRACT_ACTIVE, CONTRACT_INACTIVE, CONTRACT_MISSING, ProbabilityInputs, score_batch, score_goals,
+)
+
+TODAY = "2026-01-15"  # a Thursday
+NOW = datetime(2026, 1, 15, 18, 0, tzinfo=timezone.utc)
+
+
+def add_days(day_key, days):
+    return (date.fromisoformat(day_key) + timedelta(days=days)).isoformat()
+
+
+def weekday(day_key):
+    return (date.fromisoformat(day_key).weekday() + 1) % 7
+
+
+def reference_score(goal, today, window_days):
+    """Per-goal transliteration of scoreGoalSuccessProbability's server-side path"""
+    def workable(day_key):
+        return goal["weekmask"][weekday(day_key)] and day_key not in goal["blackouts"]
+
+    summary = {"totalEvents": goal["total"], "completedCount": goal["completed"], "daysCovered": goal["covered"]}
+    remaining, deadline = goal["remaining"], goal["deadline"]
+    if deadline is None or deadline <= today:
+        status, days_left = ("INFEASIBLE" if remaining > 0 else "FEASIBLE"), 0
+    elif not remaining:
+        status, days_left = "FEASIBLE", 0
+    else:
+        days, cursor = [], today
+        while cursor <= deadline:
+            if workable(cursor) and (goal["max_per_day"] is None or goal["max_per_day"] > 0):
+                days.append(cursor)
+            cursor = add_days(cursor, 1)
+        days_left = len(days)
+        capacity = math.inf if goal["max_per_day"] is None else goal["max_per_day"] * days_left
+        status = "INFEASIBLE" if days_left == 0 or capacity < remaining else "FEASIBLE"
+    if status == "INFEASIBLE" or days_left <= 0:
+        reasons = ["INFEASIBLE"] if status == "INFEASIBLE" else ["NO_WORKABLE_DAYS"]
+        return {"value": 0.0, "status": "INFEASIBLE", "reasons": reasons, "evidenceSummary": summary}
+
+    initial = min(max(0.0, 1 - (0.35 + 0.2 * goal["density"])), 0.65)
+    gate = {CONTRACT_MISSING: "no_match", CONTRACT_INACTIVE: "inactive"}.get(goal["contract"])
+    if gate is None and goal["min_evidence"] > 0 and goal["total"] < goal["min_evidence"]:
+        gate = "insufficient_evidence"
+    if gate:
+        return {"value": initial, "status": "NO_EVIDENCE", "reasons": [gate], "evidenceSummary": summary}
+
+    series, cursor = [], today
+    while len(series) < window_days:
+        if workable(cursor):
+            series.append(goal["completions"].get(cursor, 0))
+        cursor = add_days(cursor, -1)
+    mu = sum(series) / len(series)
+    sigma = math.sqrt(sum((v - mu) ** 2 for v in series) / len(series))
+    if sigma == 0:
+        value = 1.0 if days_left * mu >= remaining else 0.0
+    else:
+        x = ((remaining - days_left * mu) / (math.sqrt(days_left) * sigma)) / math.sqrt(2)
+        t = 1 / (1 + 0.3275911 * abs(x))
+        y = 1 - (((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t + 0.254829592) * t) * math.exp(-x * x)
+        value = min(max(1 - 0.5 * (1 + math.copysign(y, x)), 0.0), 1.0)
+    evidence_days = sum(1 for v in series if v > 0)
+    above_cap = evidence_days >= 7
+    status = "NO_EVIDENCE" if not sum(series) else ("ELIGIBLE" if above_cap else "INELIGIBLE")
+    return {
+        "value": min(max((value + initial) / 2, 0.0), 1.0) if above_cap else min(value, 0.65),
+        "status": status,
+        "reasons": [] if above_cap else ["CAP_APPLIED_NO_EVIDENCE"],
+        "evidenceSummary": summary,
+    }
+
+
+def random_goals(count, seed):
+    rng = random.Random(seed)
+    goals = []
+    for _ in range(count):
+        weekmask = [True] * 7 if rng.random() < 0.6 else [d not in (0, 6) for d in range(7)]
+        completions = {add_days(TODAY, -d): rng.randint(1, 4) for d in range(21) if rng.random() < 0.7}
+        total = sum(completions.values())
+        goals.append({
+            "deadline": rng.choice([None, add_days(TODAY, -2), TODAY, add_days(TODAY, rng.randint(1, 40))]),
+            "remaining": rng.choice([0, rng.randint(1, 60)]),
+            "contract": rng.choice([CONTRACT_ACTIVE] * 4 + [CONTRACT_MISSING, CONTRACT_INACTIVE]),
+            "min_evidence": rng.choice([0, 0, 10, 60]),
+            "weekmask": weekmask,
+            "blackouts": {add_days(TODAY, rng.randint(-10, 10))} if rng.random() < 0.2 else set(),
+            "max_per_day": rng.choice([None, None, 1, 3]),
+            "density": 0.2 if not all(weekmask) else 0.0,
+            "completions": completions,
+            "total": total + rng.randint(0, 5),
+            "completed": total,
+            "covered": len(completions),
+        })
+    return goals
+
+
+def build_inputs(goals):
+    inputs = ProbabilityInputs.empty(np.arange(1, len(goals) + 1))
+    rows, days, counts = [], [], []
+    for row, goal in enumerate(goals):
+        inputs.deadline[row] = np.datetime64(goal["deadline"] or "NaT", "D")
+        inputs.remaining_blocks[row] = goal["remaining"]
+        inputs.contract_state[row] = goal["contract"]
+        inputs.min_evidence[row] = goal["min_evidence"]
+        inputs.weekmask[row] = goal["weekmask"]
+        inputs.max_per_day[row] = np.nan if goal["max_per_day"] is None else goal["max_per_day"]
+        inputs.constraint_density[row] = goal["density"]
+        inputs.total_events[row] = goal["total"]
+        inputs.completed_events[row] = goal["completed"]
+        inputs.days_covered[row] = goal["covered"]
+        if goal["blackouts"]:
+            inputs.blackouts[row] = np.array(sorted(goal["blackouts"]), dtype="datetime64[D]")
+        for day_key, count in goal["completions"].items():
+            rows.append(row)
+            days.append(day_key)
+            counts.append(count)
+    inputs.completed_rows = np.array(rows, dtype=np.int64)
+    inputs.completed_days = np.array(days, dtype="datetime64[D]")
+    inputs.completed_counts = np.array(counts, dtype=np.int64)
+    return inputs
+
+
+class TestScoreBatch:
+    """Test the vectorized engine against the client's per-goal algorithm"""
+
+    @pytest.mark.parametrize("window_days", [7, 14])
+    def test_matches_per_goal_reference(self, window_days):
+        """Test every goal of a mixed batch scores as the per-goal algorithm does"""
+        goals = random_goals(400, seed=window_days)
+        results = score_batch(build_inputs(goals), TODAY, window_days=window_days)
+        assert {"ELIGIBLE", "INFEASIBLE", "NO_EVIDENCE"} <= {result["status"] for result in results}
+        for goal, result in zip(goals, results):
+            expected = reference_score(goal, TODAY, window_days)
+            assert result["status"] == expected["status"]
+            assert result["reasons"] == expected["reasons"]
+            assert result["evidenceSummary"] == expected["evidenceSummary"]
+            assert result["value"] == pytest.approx(expected["value"], abs=1e-12)
+
+    def test_scores_do_not_depend_on_the_batch(self):
+        """Test a goal scores identically alone and alongside others"""
+        goals = random_goals(50, seed=3)
+        batch = score_batch(build_inputs(goals), TODAY)
+        alone = [score_batch(build_inputs([goal]), TODAY)[0] for goal in goals]
+        for single, batched in zip(alone, batch):
+            single["goalId"] = batched["goalId"]
+            assert single == batched
+
+    def test_window_skips_non_workable_days(self):
+        """Test a weekday-only goal is scored over its last seven weekdays"""
+        goal = random_goals(1, seed=0)[0]
+        goal.update(
+            deadline=add_days(TODAY, 20), remaining=10, contract=CONTRACT_ACTIVE, min_evidence=0,
+            weekmask=[d not in (0, 6) for d in range(7)], blackouts=set(), max_per_day=None,
+            completions={add_days(TODAY, -d): 1 for d in range(9)},
+        )
+        result = score_batch(build_inputs([goal]), TODAY)[0]
+        # Thu..Mon of this week and Fri..Thu of last: weekend completions fall outside the series
+        assert result["scoringSummary"]["K"] == 7
+        assert result["scoringSummary"]["mu"] == pytest.approx(1.0)
+        assert result["status"] == "ELIGIBLE"
+
+
+class TestScoreGoals:
+    """Test scoring goals from the database"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def seeded(self, db_session):
+        """Create a goal completing two blocks a day for a week and a goal with no governance contract"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.commit()
+        governance = {"contractId": "c1", "version": 1, "governance": {"minEvidenceEvents": 5}}
+        scored = Goal(
+            user_id=user.id, title="Scored", goal_governance_contract=governance,
+            goal_execution_contract={"deadline": {"dayKey": add_days(TODAY, 10)}},
+        )
+        ungoverned = Goal(
+            user_id=user.id, title="Ungoverned", goal_execution_contract={"deadline": {"dayKey": add_days(TODAY, 10)}},
+        )
+        db_session.add_all([scored, ungoverned])
+        db_session.commit()
+        cycle = Cycle(user_id=user.id, goal_id=scored.id, status="active")
+        db_session.add(cycle)
+        db_session.commit()
+
+        def block(goal, day_key, status):
+            return Block(
+                user_id=user.id, goal_id=goal.id, cycle_id=cycle.id, day_key=day_key,
+                practice="Creation", title="Block", duration_minutes=30, status=status,
+            )
+
+        done = [block(scored, add_days(TODAY, -d), "completed") for d in range(7) for _ in range(2)]
+        todo = [block(goal, add_days(TODAY, d), "scheduled") for goal in (scored, ungoverned) for d in range(1, 16)]
+        db_session.add_all(done + todo)
+        db_session.commit()
+        db_session.add_all(
+            ExecutionEvent(
+                user_id=user.id, cycle_id=cycle.id, block_id=b.id, event_type=kind,
+                event_data='{}', event_hash=f"hash-{b.id}-{kind}",
+            )
+            for b in done for kind in ("create", "complete")
+        )
+        db_session.commit()
+        return {"user_id": user.id, "scored": scored.id, "ungoverned": ungoverned.id}
+
+    def score(self, user_id=None):
+        async def run():
+            async with AsyncSessionLocal() as db:
+                return await score_goals(db, user_id=user_id, now=NOW)
+        return {result["goalId"]: result for result in asyncio.run(run())}
+
+    def test_scores_goal_from_completed_events(self, seeded):
+        """Test windowed completions, remaining blocks and the deadline feed the score"""
+        result = self.score()[seeded["scored"]]
+        assert result["status"] == "ELIGIBLE"
+        assert result["reasons"] == []
+        assert result["evidenceSummary"] == {"totalEvents": 28, "completedCount": 14, "daysCovered": 7}
+        summary = result["scoringSummary"]
+        assert (summary["mu"], summary["sigma"], summary["K"]) == (2.0, 0.0, 7)
+        # 15 scheduled blocks over the 11 days from today through the deadline
+        assert (summary["D"], summary["remainingBlocksTotal"], summary["requiredBlocksPerDay"]) == (11, 15, 2)
+        assert result["value"] == pytest.approx((1.0 + 0.65) / 2)
+
+    def test_goal_without_governance_contract_is_not_scored(self, seeded):
+        """Test the governance gate returns the prior with its reason code"""
+        result = self.score()[seeded["ungoverned"]]
+        assert result["status"] == "NO_EVIDENCE"
+        assert result["reasons"] == ["no_match"]
+        assert result["value"] == pytest.approx(0.65)
+        assert "scoringSummary" not in result
+
+    def test_scoring_reads_rollups_not_blocks(self, seeded):
+        """Test the evidence window and remaining work come from the daily rollups"""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            self.score()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        assert any("daily_rollups" in statement for statement in statements)
+        assert not any("FROM blocks" in statement or "JOIN blocks" in statement for statement in statements)
+
+    def test_probability_endpoint(self, seeded):
+        """Test the endpoint scores the current user's goals"""
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(seeded['user_id'])})}"}
+        response = TestClient(app).get("/api/goals/probability", headers=headers)
+        assert response.status_code == 200
+        assert sorted(result["goalId"] for result in response.json()) == [seeded["scored"], seeded["ungoverned"]]
+
+    def test_probability_endpoint_requires_auth(self):
+        """Test the endpoint rejects anonymous requests"""
+        response = TestClient(app).get("/api/goals/probability")
+        assert response.status_code in [401, 403]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
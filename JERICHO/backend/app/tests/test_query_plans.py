@@ -0,0 +1,220 @@
+"""
+Query-plan regression tests.
+
+The schema is built by the Alembic migrations (not create_all) in a scratch
+SQLite database, seeded and ANALYZEd, and every hot query is run through
+EXPLAIN QUERY PLAN. A query that scans a table or sorts instead of reading an
+index in order fails the suite.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from alembic.runtime.migration import MigrationContext
+from alembic.autogenerate import compare_metadata
+from sqlalchemy import create_engine, insert, select
+
+from app.core.database import Base
+from app.models.user import (
+    GENESIS_CHAIN_HASH, User, Goal, Cycle, Block, ExecutionEvent, UserSyncState, compute_chain_hash, ledger_tails,
+)
+from app.services.blocks import block_query
+from app.services.events import EXISTING_HASHES_QUERY
+
+USERS, CYCLES_PER_USER, DAYS, BLOCKS_PER_DAY, EVENTS_PER_BLOCK = 4, 3, 120, 3, 2
+
+
+def alembic_config(connection) -> Config:
+    config = Config("alembic.ini")
+    config.attributes["connection"] = connection
+    config.attributes["configure_logger"] = False
+    return config
+
+
+@pytest.fixture(scope="module")
+def connection(tmp_path_factory):
+    """Migrated, seeded and analyzed scratch database"""
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), "head")
+        seed(connection)
+        connection.exec_driver_sql("ANALYZE")
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+def seed(connection):
+    seq = 0
+    start = datetime(2026, 1, 1)
+    for user_id in range(1, USERS + 1):
+        connection.execute(insert(User), {"id": user_id, "email": f"user{user_id}@example.com", "password_hash": "hash"})
+        connection.execute(insert(Goal), {
+            "id": user_id, "user_id": user_id, "title": "Goal", "sync_seq": 0,
+            "goal_execution_contract": {"deadline": {"dayKey": "2026-03-01", "isHardDeadline": True}},
+        })
+        for cycle_index in range(CYCLES_PER_USER):
+            cycle_id = (user_id - 1) * CYCLES_PER_USER + cycle_index + 1
+            connection.execute(insert(Cycle), {"id": cycle_id, "user_id": user_id, "goal_id": user_id, "sync_seq": 0})
+
+        blocks, events = [], []
+        for day in range(DAYS):
+            for slot in range(BLOCKS_PER_DAY):
+                seq += 1
+                block_id = seq
+                cycle_id = (user_id - 1) * CYCLES_PER_USER + slot % CYCLES_PER_USER + 1
+                blocks.append({
+                    "id": block_id, "user_id": user_id, "goal_id": user_id, "cycle_id": cycle_id,
+                    "day_key": (start + timedelta(days=day)).strftime("%Y-%m-%d"), "practice": "Creation",
+                    "title": "Block", "duration_minutes": 30, "status": ("scheduled", "completed", "missed")[slot],
+                    "sync_seq": seq,
+                })
+                for offset in range(EVENTS_PER_BLOCK):
+                    events.append({
+                        "user_id": user_id, "cycle_id": cycle_id, "block_id": block_id, "event_type": "complete",
+                        "event_hash": f"{block_id}-{offset}", "chain_hash": "0" * 64, "sync_seq": seq,
+                        "timestamp": start + timedelta(days=day, minutes=offset),
+                    })
+        connection.execute(insert(Block), blocks)
+        connection.execute(insert(ExecutionEvent), events)
+
+
+def query_plan(connection, statement) -> str:
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_indexed(plan: str, index: str = None):
+    """Every table access is an index search, with no sort step"""
+    for line in plan.splitlines():
+        assert not (line.startswith("SCAN ") and "CONSTANT ROW" not in line), plan
+    assert "TEMP B-TREE" not in plan, plan
+    if index is not None:
+        assert f"INDEX {index} " in plan, plan
+
+
+class TestMigrations:
+    """Test the migration history matches the models"""
+
+    def test_single_head(self):
+        """Test migrations form a single linear history"""
+        assert len(ScriptDirectory.from_config(Config("alembic.ini")).get_heads()) == 1
+
+    def test_migrated_schema_matches_models(self, connection):
+        """Test upgrade head produces the schema the models declare"""
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        assert compare_metadata(context, Base.metadata) == []
+
+    def test_upgrade_from_baseline_keeps_data(self, tmp_path):
+        """Test a baseline database upgrades with payloads decoded, rows numbered for sync and events chained"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+        with engine.begin() as connection:
+            config = alembic_config(connection)
+            command.upgrade(config, "0001")
+            for sql in (
+                "INSERT INTO users (id, email, password_hash) VALUES (1, 'user@example.com', 'hash')",
+                "INSERT INTO goals (id, user_id, title, goal_execution_contract, goal_governance_contract) "
+                "VALUES (1, 1, 'Goal', '{\"deadline\": {\"dayKey\": \"2026-03-01\", \"isHardDeadline\": true}}', '')",
+                "INSERT INTO cycles (id, user_id, goal_id, cycle_data) VALUES (1, 1, 1, '{\"week\": 1}')",
+                "INSERT INTO blocks (id, user_id, goal_id, cycle_id, day_key, practice, title, duration_minutes) "
+                "VALUES (1, 1, 1, 1, '2026-01-05', 'Creation', 'Block', 30)",
+                "INSERT INTO execution_events (user_id, cycle_id, block_id, event_type, event_hash) "
+                "VALUES (1, 1, 1, 'start', 'a'), (1, 1, 1, 'complete', 'b')",
+            ):
+                connection.exec_driver_sql(sql)
+            command.upgrade(config, "head")
+
+            goal = connection.execute(
+                select(Goal.goal_governance_contract, Goal.deadline_day_key, Goal.deadline_type, Goal.sync_seq)
+            ).one()
+            assert tuple(goal) == (None, "2026-03-01", "HARD", 1)
+            assert connection.execute(select(Cycle.cycle_data, Cycle.sync_seq)).one() == ({"week": 1}, 2)
+            assert connection.execute(select(Block.sync_seq)).scalar_one() == 3
+            assert connection.execute(select(ExecutionEvent.sync_seq).order_by(ExecutionEvent.id)).scalars().all() == [4, 5]
+            assert connection.execute(select(UserSyncState.last_seq)).scalar_one() == 5
+            chain = compute_chain_hash(compute_chain_hash(GENESIS_CHAIN_HASH, "a"), "b")
+            assert ledger_tails(connection, [1]) == {1: chain}
+
+            command.downgrade(config, "0001")
+            assert connection.exec_driver_sql("SELECT goal_execution_contract FROM goals").scalar_one().startswith("{")
+        engine.dispose()
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (type_ == "index" and not reflected and obj.dialect_kwargs.get("postgresql_using") == "gin")
+
+
+class TestHotQueryPlans:
+    """Test hot queries are served by composite indexes"""
+
+    def test_block_listing(self, connection):
+        """Test keyset block pages by day range"""
+        plan = query_plan(connection, block_query(2, day_from="2026-02-01", day_to="2026-02-07", after=("2026-02-03", 10)))
+        assert_indexed(plan, "ix_blocks_user_day_id")
+
+    def test_block_listing_in_cycle(self, connection):
+        """Test block pages for one cycle"""
+        plan = query_plan(connection, block_query(2, cycle_id=5, day_from="2026-02-01", day_to="2026-02-07"))
+        assert_indexed(plan, "ix_blocks_user_cycle_day_id")
+
+    def test_blocks_by_status(self, connection):
+        """Test (user_id, status, day_key) lookups"""
+        plan = query_plan(connection, block_query(2, status="completed", day_from="2026-02-01", day_to="2026-02-07"))
+        assert_indexed(plan, "ix_blocks_user_status_day")
+
+    def test_user_cycle_events(self, connection):
+        """Test a user's events for one cycle"""
+        statement = select(ExecutionEvent.id).where(ExecutionEvent.user_id == 2, ExecutionEvent.cycle_id == 5)
+        assert_indexed(query_plan(connection, statement))
+
+    def test_cycle_events_by_time(self, connection):
+        """Test a cycle's events over a time range, in time order"""
+        statement = (
+            select(ExecutionEvent)
+            .where(ExecutionEvent.cycle_id == 5, ExecutionEvent.timestamp >= datetime(2026, 2, 1))
+            .order_by(ExecutionEvent.timestamp)
+        )
+        assert_indexed(query_plan(connection, statement), "ix_execution_events_cycle_timestamp")
+
+    def test_ledger_stream_and_tails(self, connection):
+        """Test the verifier's tail read and chain-order stream"""
+        stream = select(ExecutionEvent).where(ExecutionEvent.cycle_id == 5, ExecutionEvent.id > 100).order_by(ExecutionEvent.id)
+        assert_indexed(query_plan(connection, stream), "ix_execution_events_cycle_id_id")
+
+        plan = "\n".join(
+            row[-1] for row in connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT cycle_id, chain_hash FROM execution_events WHERE id IN "
+                "(SELECT max(id) FROM execution_events WHERE cycle_id IN (4, 5) GROUP BY cycle_id)"
+            )
+        )
+        assert_indexed(plan)
+        assert ledger_tails(connection, [4, 5]).keys() == {4, 5}
+
+    @pytest.mark.parametrize("model", [Goal, Cycle, Block, ExecutionEvent])
+    def test_sync_pull(self, connection, model):
+        """Test per-table sync pull range scans"""
+        statement = select(model).where(model.user_id == 2, model.sync_seq > 100).order_by(model.sync_seq).limit(501)
+        assert_indexed(query_plan(connection, statement), f"ix_{model.__tablename__}_user_sync_seq")
+
+    def test_goal_deadlines(self, connection):
+        """Test deadline filters on generated contract columns"""
+        statement = select(Goal.id).where(
+            Goal.user_id == 2, Goal.deadline_type == "HARD", Goal.deadline_day_key.between("2026-02-25", "2026-03-03")
+        )
+        assert_indexed(query_plan(connection, statement), "ix_goals_user_deadline")
+
+    def test_event_dedup_lookup(self, connection):
+        """Test the push dedup probe by content hash"""
+        compiled = EXISTING_HASHES_QUERY.compile(dialect=connection.dialect)
+        sql = str(compiled).replace("(__[POSTCOMPILE_hashes])", "(?, ?)")
+        plan = "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", (2, "a", "b")))
+        assert_indexed(plan)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core import responses
+from app.core.responses import FastJSONResponse, dump_rows
+from app.models.user import Block
+from app.schemas.blocks import BlockResponse
+
+
+def make_block(**overrides):
+    values = dict(
+        id=1, user_id=1, goal_id=1, cycle_id=1, day_key="2026-01-15", practice="Creation",
+        title="Block", duration_minutes=30, status="scheduled", start_iso=None, completion_iso=None,
+        created_at=datetime(2026, 1, 15, 6, 0, 12, 345678, tzinfo=timezone.utc), updated_at=None,
+    )
+    values.update(overrides)
+    return Block(**values)
+
+
+class TestJSONResponses:
+    """Test the fast JSON rendering paths"""
+
+    def test_dump_rows_matches_pydantic(self):
+        """Test rows encode exactly like the response_model path"""
+        rows = [make_block(id=1), make_block(id=2, updated_at=datetime(2026, 1, 16, 8, 30))]
+        expected = [BlockResponse.model_validate(row).model_dump(mode="json") for row in rows]
+        assert json.loads(dump_rows(BlockResponse, rows)) == expected
+
+    def test_stdlib_fallback(self, monkeypatch):
+        """Test rendering without orjson produces the same JSON"""
+        rows = [make_block()]
+        with_orjson = dump_rows(BlockResponse, rows)
+        monkeypatch.setattr(responses, "orjson", None)
+        assert dump_rows(BlockResponse, rows) == with_orjson
+        assert FastJSONResponse({"ok": True}).body == b'{"ok":true}'
+
+    def test_unloaded_attributes_fall_back_to_pydantic(self):
+        """Test rows missing loaded state are still serialized"""
+        row = make_block(start_iso="2026-01-15T06:00:00.000Z")
+        del row.__dict__["start_iso"]
+        assert json.loads(dump_rows(BlockResponse, [row])) == [BlockResponse.model_validate(row).model_dump(mode="json")]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent, UserSyncState
+from app.services import rollover
+from app.services.ledger import verify_ledger
+from app.services.rollover import RolloverScheduler, seconds_until_next_rollover, sweep_overdue_blocks
+
+# 2026-02-01 in America/Chicago
+NOW = datetime(2026, 2, 1, 18, 0, tzinfo=timezone.utc)
+
+
+class TestRollover:
+    """Test the nightly missed-block sweep"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def blocks(self, db_session):
+        """Two users' blocks on past days and today, in every status"""
+        created = {}
+        for email in ("a@example.com", "b@example.com"):
+            user = User(email=email, password_hash="hash")
+            db_session.add(user)
+            db_session.flush()
+            goal = Goal(user_id=user.id, title="Goal", goal_execution_contract={})
+            db_session.add(goal)
+            db_session.flush()
+            cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+            db_session.add(cycle)
+            db_session.flush()
+            for day_key, status in (
+                ("2026-01-30", "scheduled"), ("2026-01-31", "started"), ("2026-01-31", "completed"),
+                ("2026-01-31", "skipped"), ("2026-02-01", "scheduled"),
+            ):
+                block = Block(
+                    user_id=user.id, goal_id=goal.id, cycle_id=cycle.id, day_key=day_key, practice="Focus",
+                    title=f"{status} {day_key}", duration_minutes=45, status=status,
+                    start_iso=f"{day_key}T15:00:00.000Z", block_data={"deliverableId": "d-1"},
+                )
+                db_session.add(block)
+                db_session.flush()
+                created[(email, day_key, status)] = block.id
+        db_session.commit()
+        return created
+
+    def statuses(self, db_session):
+        db_session.expire_all()
+        return {block.id: block.status for block in db_session.query(Block).all()}
+
+    def missed_events(self, db_session):
+        return db_session.query(ExecutionEvent).filter(ExecutionEvent.event_type == "missed").all()
+
+    def test_sweep_marks_overdue_blocks_missed(self, blocks, db_session):
+        """Test only scheduled/started blocks on past days roll over, with one event each"""
+        metrics = asyncio.run(sweep_overdue_blocks(now=NOW, chunk_size=3))
+        assert metrics["day"] == "2026-02-01"
+        assert metrics["blocks_missed"] == 4
+        assert metrics["users"] == 2
+        assert metrics["chunks"] == 2
+
+        statuses = self.statuses(db_session)
+        for (email, day_key, status), block_id in blocks.items():
+            overdue = status in ("scheduled", "started") and day_key < "2026-02-01"
+            assert statuses[block_id] == ("missed" if overdue else status)
+
+        events = self.missed_events(db_session)
+        assert sorted(event.block_id for event in events) == sorted(
+            block_id for (_, day_key, status), block_id in blocks.items()
+            if status in ("scheduled", "started") and day_key < "2026-02-01"
+        )
+        data = next(event.event_data for event in events if event.block_id == blocks[("a@example.com", "2026-01-30", "scheduled")])
+        assert data["kind"] == "missed"
+        assert data["dateISO"] == "2026-01-30"
+        assert data["endISO"] == "2026-01-30T15:45:00.000Z"
+        assert data["linkageStatus"] == "LINKED"
+        assert data["missedAtISO"] == "2026-02-01T18:00:00.000Z"
+
+    def test_sweep_stamps_sync_seq_and_extends_ledger(self, blocks, db_session):
+        """Test rolled-over blocks and their events are visible to sync and chained"""
+        asyncio.run(sweep_overdue_blocks(now=NOW))
+        for state in db_session.query(UserSyncState).all():
+            seqs = [row.sync_seq for model in (Block, ExecutionEvent)
+                    for row in db_session.query(model).filter(model.user_id == state.user_id)]
+            assert len(set(seqs)) == len(seqs)
+            assert max(seqs) == state.last_seq
+
+        async def verify():
+            async with AsyncSessionLocal() as db:
+                return await verify_ledger(db, full=True)
+        assert asyncio.run(verify())["ok"] is True
+
+    def test_rerun_is_a_no_op(self, blocks, db_session):
+        """Test a second sweep on the same day finds nothing"""
+        asyncio.run(sweep_overdue_blocks(now=NOW))
+        assert asyncio.run(sweep_overdue_blocks(now=NOW))["blocks_missed"] == 0
+        assert len(self.missed_events(db_session)) == 4
+
+    def test_sweep_resumes_after_failure(self, blocks, db_session, monkeypatch):
+        """Test a failed chunk rolls back whole and the next sweep finishes the job"""
+        write_event_rows = rollover.write_event_rows
+        calls = []
+
+        async def failing_write(db, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return await write_event_rows(db, rows)
+
+        monkeypatch.setattr(rollover, "write_event_rows", failing_write)
+        with pytest.raises(RuntimeError):
+            asyncio.run(sweep_overdue_blocks(now=NOW, chunk_size=2))
+        assert len(self.missed_events(db_session)) == 2
+        assert list(self.statuses(db_session).values()).count("missed") == 2
+
+        monkeypatch.setattr(rollover, "write_event_rows", write_event_rows)
+        assert asyncio.run(sweep_overdue_blocks(now=NOW, chunk_size=2))["blocks_missed"] == 2
+        assert len(self.missed_events(db_session)) == 4
+
+    def test_scheduler_records_sweeps(self, blocks, monkeypatch):
+        """Test the scheduler keeps the last sweep's metrics and survives failures"""
+        scheduler = RolloverScheduler(delay_seconds=0)
+        assert asyncio.run(scheduler.run_once(NOW))["blocks_missed"] == 4
+
+        async def broken_sweep(now=None):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(rollover, "sweep_overdue_blocks", broken_sweep)
+        assert asyncio.run(scheduler.run_once(NOW)) is None
+        stats = scheduler.stats()
+        assert (stats["sweeps"], stats["failures"]) == (1, 1)
+        assert stats["last_error"] == "RuntimeError: database is locked"
+        assert stats["running"] is False
+
+
+def test_next_rollover_is_after_local_midnight():
+    """Test the scheduler sleeps until midnight in the app time zone, plus the delay"""
+    # 23:30 in Chicago (CST, UTC-6)
+    assert seconds_until_next_rollover(datetime(2026, 2, 2, 5, 30, tzinfo=timezone.utc), 60) == 30 * 60 + 60
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
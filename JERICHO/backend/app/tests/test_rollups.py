@@ -0,0 +1,213 @@
+import asyncio
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, engine, get_db
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block, ExecutionEvent, DailyRollup, RollupBucket, ROLLUP_COUNTERS
+from app.services import rollups
+from app.services.rollups import compact_rollups, plan_window, rebuild_rollups, rollup_totals
+
+FIRST_DAY = "2026-01-01"
+
+
+def add_days(day_key, days):
+    return (date.fromisoformat(day_key) + timedelta(days=days)).isoformat()
+
+
+def run_with_db(function, *args, **kwargs):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await function(db, *args, **kwargs)
+    return asyncio.run(run())
+
+
+def test_plan_window_uses_whole_clean_periods():
+    """Test windows split into months, then Monday weeks, then leftover days"""
+    buckets, days = plan_window("2026-01-28", "2026-03-10")
+    assert buckets == [("month", "2026-02-01"), ("week", "2026-03-02")]
+    # 2026-03-01 is a Sunday, so it is read as a day before the first whole week of March
+    assert days == [("2026-01-28", "2026-02-01"), ("2026-03-01", "2026-03-02"), ("2026-03-09", "2026-03-11")]
+
+    buckets, days = plan_window("2026-01-28", "2026-03-10", dirty_days={"2026-02-11"})
+    assert ("month", "2026-02-01") not in buckets
+    assert ("week", "2026-02-09") not in buckets
+    assert ("week", "2026-02-02") in buckets
+    assert ("2026-02-09", "2026-02-16") in days
+
+
+class TestDailyRollups:
+    """Test daily rollups, their compaction and range queries"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def cycle(self, db_session):
+        """A user with one goal and cycle"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.flush()
+        goal = Goal(user_id=user.id, title="Goal", goal_execution_contract={})
+        db_session.add(goal)
+        db_session.flush()
+        cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+        db_session.add(cycle)
+        db_session.commit()
+        return cycle
+
+    @pytest.fixture
+    def history(self, cycle, db_session):
+        """Ninety days of blocks in mixed statuses and practices, some with completion events"""
+        rng = random.Random(18)
+        blocks = []
+        for offset in range(90):
+            for _ in range(rng.randint(0, 3)):
+                blocks.append(Block(
+                    user_id=cycle.user_id, goal_id=cycle.goal_id, cycle_id=cycle.id,
+                    day_key=add_days(FIRST_DAY, offset), practice=rng.choice(["Creation", "Focus", "Skill"]),
+                    title="Block", duration_minutes=rng.choice([15, 30, 60]),
+                    status=rng.choice(["scheduled", "completed", "completed", "skipped"]),
+                ))
+        db_session.add_all(blocks)
+        db_session.commit()
+        db_session.add_all(
+            ExecutionEvent(
+                user_id=cycle.user_id, cycle_id=cycle.id, block_id=block.id, event_type="complete",
+                event_data={"completed": True}, event_hash=f"hash-{block.id}",
+            )
+            for block in blocks if block.status == "completed"
+        )
+        db_session.commit()
+        return blocks
+
+    def daily_rows(self, db_session):
+        db_session.expire_all()
+        return {
+            (row.user_id, row.goal_id, row.day_key, row.practice): tuple(getattr(row, name) for name in ROLLUP_COUNTERS)
+            for row in db_session.query(DailyRollup).all()
+            if any(getattr(row, name) for name in ROLLUP_COUNTERS)
+        }
+
+    def expected_totals(self, db_session, first_day, last_day):
+        """Brute-force sums over blocks, as computeCompletedThroughput scans them"""
+        db_session.expire_all()
+        blocks = [b for b in db_session.query(Block).all() if first_day <= b.day_key <= last_day]
+        completed = [b for b in blocks if b.status == "completed"]
+        return {
+            "planned_blocks": len(blocks),
+            "planned_minutes": sum(b.duration_minutes for b in blocks),
+            "completed_blocks": len(completed),
+            "completed_minutes": sum(b.duration_minutes for b in completed),
+            "complete_events": sum(
+                1 for e in db_session.query(ExecutionEvent).all() if first_day <= db_session.get(Block, e.block_id).day_key <= last_day
+            ),
+        }
+
+    def test_block_writes_update_daily_rows(self, cycle, db_session):
+        """Test completions and moves (with the block's events) land on the right day"""
+        block = Block(
+            user_id=cycle.user_id, goal_id=cycle.goal_id, cycle_id=cycle.id, day_key="2026-01-05",
+            practice="Focus", title="Block", duration_minutes=30, status="scheduled",
+        )
+        db_session.add(block)
+        db_session.commit()
+        key = (cycle.user_id, cycle.goal_id, "2026-01-05", "Focus")
+        assert self.daily_rows(db_session)[key] == (1, 30, 1, 0, 0, 0, 0)
+
+        block.status = "completed"
+        db_session.add(ExecutionEvent(
+            user_id=cycle.user_id, cycle_id=cycle.id, block_id=block.id, event_type="complete",
+            event_data={"completed": True}, event_hash="h1",
+        ))
+        db_session.commit()
+        assert self.daily_rows(db_session)[key] == (1, 30, 0, 1, 30, 1, 1)
+
+        block.day_key = "2026-01-06"
+        db_session.commit()
+        moved = (cycle.user_id, cycle.goal_id, "2026-01-06", "Focus")
+        assert self.daily_rows(db_session) == {moved: (1, 30, 0, 1, 30, 1, 1)}
+
+    def test_rebuild_matches_incremental_maintenance(self, history, db_session):
+        """Test a rebuild from blocks and events reproduces the incrementally kept rows"""
+        incremental = self.daily_rows(db_session)
+        assert run_with_db(rebuild_rollups)["users"] == 1
+        assert self.daily_rows(db_session) == incremental
+
+    def test_range_totals_are_exact(self, history, db_session):
+        """Test range sums over buckets and days match sums over blocks, before and after a change"""
+        result = run_with_db(compact_rollups)
+        assert result["days_compacted"] > 0
+        assert db_session.query(DailyRollup).filter(DailyRollup.dirty.is_(True)).count() == 0
+        assert db_session.query(RollupBucket).filter_by(period="month", period_start="2026-02-01").count() > 0
+
+        user_id = history[0].user_id
+        windows = [(FIRST_DAY, "2026-03-31"), ("2026-01-28", "2026-03-10"), ("2026-02-10", "2026-02-10")]
+        for first_day, last_day in windows:
+            totals = run_with_db(rollup_totals, user_id, first_day, last_day)[None]
+            for name, value in self.expected_totals(db_session, first_day, last_day).items():
+                assert totals[name] == value, (first_day, last_day, name)
+
+        # A late completion in an already compacted month is read from daily rows until recompacted
+        late = next(b for b in history if b.status == "scheduled" and b.day_key.startswith("2026-02"))
+        late.status = "completed"
+        db_session.commit()
+        totals = run_with_db(rollup_totals, user_id, FIRST_DAY, "2026-03-31")[None]
+        assert totals["completed_minutes"] == self.expected_totals(db_session, FIRST_DAY, "2026-03-31")["completed_minutes"]
+
+        run_with_db(compact_rollups)
+        by_practice = run_with_db(rollup_totals, user_id, FIRST_DAY, "2026-03-31", group_by="practice")
+        assert sum(t["completed_minutes"] for t in by_practice.values()) == totals["completed_minutes"]
+
+    def test_day_changed_during_compaction_stays_dirty(self, history, db_session, monkeypatch):
+        """Test the compare-and-set leaves a day updated mid-compaction for the next pass"""
+        compact_days = rollups._compact_days
+        changed = history[0]
+
+        async def compact_then_write(db, dirty):
+            written = await compact_days(db, dirty)
+            await db.execute(
+                update(DailyRollup)
+                .where(DailyRollup.day_key == changed.day_key, DailyRollup.practice == changed.practice)
+                .values(planned_blocks=DailyRollup.planned_blocks + 1)
+            )
+            return written
+
+        monkeypatch.setattr(rollups, "_compact_days", compact_then_write)
+        run_with_db(compact_rollups)
+        dirty = db_session.query(DailyRollup).filter(DailyRollup.dirty.is_(True)).all()
+        assert [(row.day_key, row.practice) for row in dirty] == [(changed.day_key, changed.practice)]
+
+    def test_throughput_endpoint(self, history, cycle):
+        """Test the 90-day series and practice totals"""
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(cycle.user_id)})}"}
+        response = TestClient(app).get("/api/blocks/throughput?day_to=2026-03-31&days=90", headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["day_from"], data["day_to"], len(data["days"])) == ("2026-01-01", "2026-03-31", 90)
+        assert sum(day["planned_blocks"] for day in data["days"]) == len(history)
+        assert sum(p["planned_blocks"] for p in data["practices"]) == len(history)
+        assert {p["practice"] for p in data["practices"]} <= {"Creation", "Focus", "Skill"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
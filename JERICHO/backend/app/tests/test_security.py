@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.security import (
+    PasswordWorkerPool,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+class TestPasswordWorkerPool:
+    """Test bcrypt offloading and pool metrics"""
+
+    def test_async_hash_and_verify(self):
+        """Test async wrappers produce hashes the sync verifier accepts"""
+        async def hash_and_verify():
+            hashed = await get_password_hash_async("testpassword123")
+            return hashed, await verify_password_async("testpassword123", hashed), await verify_password_async("wrong", hashed)
+
+        hashed, good, bad = asyncio.run(hash_and_verify())
+        assert verify_password("testpassword123", hashed)
+        assert good is True
+        assert bad is False
+
+    def test_pool_bounds_concurrency(self):
+        """Test at most max_workers jobs run at once and waits are recorded"""
+        pool = PasswordWorkerPool(max_workers=2)
+        peak = {"running": 0, "max": 0}
+
+        def slow_job():
+            peak["running"] += 1
+            peak["max"] = max(peak["max"], peak["running"])
+            time.sleep(0.05)
+            peak["running"] -= 1
+            return True
+
+        async def storm():
+            return await asyncio.gather(*(pool.run(slow_job) for _ in range(6)))
+
+        try:
+            assert all(asyncio.run(storm()))
+        finally:
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert peak["max"] <= 2
+        assert stats["completed"] == 6
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 0
+        assert stats["wait_ms_max"] > 0
+
+    def test_event_loop_stays_responsive(self):
+        """Test a hashing storm does not block other coroutines"""
+        pool = PasswordWorkerPool(max_workers=2)
+
+        async def storm_with_probe():
+            jobs = asyncio.gather(*(pool.run(time.sleep, 0.1) for _ in range(4)))
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            probe_latency = time.perf_counter() - started
+            await jobs
+            return probe_latency
+
+        try:
+            assert asyncio.run(storm_with_probe()) < 0.05
+        finally:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
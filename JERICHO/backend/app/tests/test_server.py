@@ -0,0 +1,143 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from app.core.config import Settings
+from app.server import WorkerServer, bind_socket, rss_bytes, worker_count
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED = """
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.user import User
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+user = User(email="server@example.com", password_hash="hash")
+db.add(user)
+db.commit()
+print(create_access_token(data={"sub": str(user.id)}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestServer:
+    """Test the preforking server: worker recycling and graceful drain"""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        """Start `python -m app.server` on a scratch database; yields (process, base_url, token)"""
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'server.db'}", "SERVER_MAX_REQUESTS_JITTER": "0"}
+        token = subprocess.run(
+            [sys.executable, "-c", SEED], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        processes = []
+
+        def start(*args, **settings):
+            port = free_port()
+            process = subprocess.Popen(
+                [sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port), *args],
+                cwd=BACKEND_DIR, env={**env, **settings}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            processes.append(process)
+            base_url = f"http://127.0.0.1:{port}"
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    httpx.get(base_url + "/", timeout=1)
+                    return process, base_url, token
+                except httpx.TransportError:
+                    assert process.poll() is None and time.monotonic() < deadline
+                    time.sleep(0.1)
+
+        yield start
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    def test_worker_count_defaults_to_cpus(self):
+        """Test SERVER_WORKERS=0 means one worker per available CPU"""
+        assert worker_count(Settings(server_workers=3)) == 3
+        assert worker_count(Settings(server_workers=0)) >= 1
+        assert rss_bytes() > 0
+
+    def test_recycled_workers_drop_no_requests(self, server):
+        """Test requests keep succeeding while workers exit after max_requests and are replaced"""
+        process, base_url, _ = server("--workers", "2", SERVER_MAX_REQUESTS="5")
+        statuses = [httpx.get(base_url + "/", timeout=10).status_code for _ in range(40)]
+        assert statuses == [200] * 40
+        assert process.poll() is None
+
+    def test_cold_worker_serves_concurrent_first_requests(self, server):
+        """Test a fresh worker's first database connections, opened concurrently, do not deadlock"""
+        _, base_url, token = server("--workers", "1")
+
+        async def burst():
+            async with httpx.AsyncClient(base_url=base_url, timeout=10) as client:
+                headers = {"Authorization": f"Bearer {token}"}
+                return await asyncio.gather(*(client.get("/api/auth/me", headers=headers) for _ in range(16)))
+
+        assert [response.status_code for response in asyncio.run(burst())] == [200] * 16
+
+    def test_drain_serves_request_on_just_accepted_connection(self):
+        """Test a connection accepted just before shutdown still gets its response instead of being dropped"""
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"2")]})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        async def run():
+            sock = bind_socket("127.0.0.1", 0, 16)
+            config = uvicorn.Config(app, lifespan="off", log_level="error")
+            config.load()
+            server = WorkerServer(config)
+            server.lifespan = config.lifespan_class(config)
+            await server.startup(sockets=[sock])
+            reader, writer = await asyncio.open_connection(*sock.getsockname())
+            while not server.server_state.connections:
+                await asyncio.sleep(0.01)
+
+            shutdown = asyncio.create_task(server.shutdown(sockets=[sock]))
+            await asyncio.sleep(0.05)  # draining has begun; the request arrives late
+            writer.write(b"GET / HTTP/1.1\r\nHost: test\r\n\r\n")
+            response = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            await shutdown
+            return response
+
+        response = asyncio.run(run())
+        assert response.startswith(b"HTTP/1.1 200")
+        assert response.endswith(b"ok")
+
+    def test_sigterm_ends_push_streams_and_exits(self, server):
+        """Test a draining worker closes open SSE streams instead of waiting out the graceful timeout"""
+        process, base_url, token = server("--workers", "1", SERVER_GRACEFUL_TIMEOUT="30")
+        with httpx.stream(
+            "GET", base_url + "/api/sync/events", headers={"Authorization": f"Bearer {token}"}, timeout=10,
+        ) as response:
+            assert response.status_code == 200
+            lines = response.iter_lines()
+            assert next(line for line in lines if line.startswith("data:"))
+            started = time.monotonic()
+            process.send_signal(signal.SIGTERM)
+            for _ in lines:
+                pass
+        assert process.wait(timeout=20) == 0
+        assert time.monotonic() - started < 10
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
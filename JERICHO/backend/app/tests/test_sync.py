@@ -0,0 +1,171 @@
+import asyncio
+
+import httpx
+import pytest
+
+import app.services.events as events_service
+from main import app
+from app.models.user import Block, ExecutionEvent
+
+pytestmark = pytest.mark.usefixtures("setup_database")
+
+
+def make_event(seeded, seq):
+    return {
+        "event_type": "complete",
+        "block_id": seeded["block"].id,
+        "cycle_id": seeded["cycle"].id,
+        "event_data": {"id": f"evt-{seq}", "kind": "complete", "completed": True},
+    }
+
+
+class TestSyncPush:
+    """Test bulk execution-event ingest via /api/sync/push"""
+
+    def test_push_inserts_events(self, client, seeded, db_session):
+        """Test a batch of valid events is stored"""
+        events = [make_event(seeded, seq) for seq in range(50)]
+        response = client.post("/api/sync/push", json={"events": events}, headers=seeded["headers"])
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["accepted"] == 50
+        assert data["duplicates"] == 0
+        assert data["rejected"] == []
+        assert db_session.query(ExecutionEvent).count() == 50
+
+    def test_push_dedups_within_batch_and_across_pushes(self, client, seeded, db_session):
+        """Test resent events are counted as duplicates, not stored twice"""
+        events = [make_event(seeded, seq) for seq in range(10)]
+        client.post("/api/sync/push", json={"events": events + events[:3]}, headers=seeded["headers"])
+
+        response = client.post("/api/sync/push", json={"events": events}, headers=seeded["headers"])
+        data = response.json()
+        assert data["accepted"] == 0
+        assert data["duplicates"] == 10
+        assert db_session.query(ExecutionEvent).count() == 10
+
+    def test_concurrent_identical_pushes_store_events_once(self, seeded, db_session, monkeypatch):
+        """Test two pushes of the same events racing through dedup store them once"""
+        probe = events_service._existing_hashes
+
+        async def slow_probe(*args):
+            existing = await probe(*args)
+            await asyncio.sleep(0.05)  # let the other push reach its probe before this one writes
+            return existing
+
+        monkeypatch.setattr(events_service, "_existing_hashes", slow_probe)
+        events = [make_event(seeded, seq) for seq in range(20)]
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=10) as client:
+                push = lambda: client.post("/api/sync/push", json={"events": events}, headers=seeded["headers"])
+                return await asyncio.gather(push(), push())
+
+        results = sorted((response.json()["accepted"], response.json()["duplicates"]) for response in asyncio.run(run()))
+        assert results == [(0, 20), (20, 0)]
+        assert db_session.query(ExecutionEvent).count() == 20
+
+    def test_unique_index_refuses_duplicates_that_skip_dedup(self, client, seeded, db_session, monkeypatch):
+        """Test a push whose dedup probe missed stored rows is rolled back, not stored twice"""
+        events = [make_event(seeded, seq) for seq in range(5)]
+        client.post("/api/sync/push", json={"events": events}, headers=seeded["headers"])
+
+        async def blind_probe(*args):
+            return set()
+
+        monkeypatch.setattr(events_service, "_existing_hashes", blind_probe)
+        with pytest.raises(RuntimeError):
+            client.post("/api/sync/push", json={"events": events + [make_event(seeded, 5)]}, headers=seeded["headers"])
+        assert db_session.query(ExecutionEvent).count() == 5
+
+    def test_push_reports_partial_failures(self, client, seeded, db_session):
+        """Test invalid and foreign events are reported by index while the rest are stored"""
+        events = [
+            make_event(seeded, 1),
+            {"event_type": "complete"},
+            dict(make_event(seeded, 2), block_id=9999),
+            dict(make_event(seeded, 3), cycle_id=seeded["cycle"].id + 1),
+        ]
+        data = client.post("/api/sync/push", json={"events": events}, headers=seeded["headers"]).json()
+
+        assert data["accepted"] == 1
+        assert [item["index"] for item in data["rejected"]] == [1, 2, 3]
+        assert any("block_id" in error for error in data["rejected"][0]["errors"])
+        assert db_session.query(ExecutionEvent).count() == 1
+
+    def test_atomic_push_writes_nothing_on_rejection(self, client, seeded, db_session):
+        """Test atomic pushes are all-or-nothing"""
+        events = [make_event(seeded, 1), {"event_type": "complete"}]
+        data = client.post(
+            "/api/sync/push", json={"events": events, "atomic": True}, headers=seeded["headers"]
+        ).json()
+
+        assert data["accepted"] == 0
+        assert len(data["rejected"]) == 1
+        assert db_session.query(ExecutionEvent).count() == 0
+
+
+class TestSyncPull:
+    """Test cursor-based incremental /api/sync/pull"""
+
+    def test_initial_pull_returns_everything(self, client, seeded):
+        """Test a zero cursor returns all rows with decoded payloads"""
+        data = client.get("/api/sync/pull", headers=seeded["headers"]).json()
+
+        assert data["has_more"] is False
+        assert data["cursor"] == 3
+        assert [goal["goal_execution_contract"] for goal in data["goals"]] == [{"deadlineType": "HARD"}]
+        assert len(data["cycles"]) == 1
+        assert len(data["blocks"]) == 1
+
+    def test_pull_returns_only_changes_after_cursor(self, client, seeded, db_session):
+        """Test rows unchanged since the cursor are not resent"""
+        cursor = client.get("/api/sync/pull", headers=seeded["headers"]).json()["cursor"]
+
+        block = db_session.get(Block, seeded["block"].id)
+        block.status = "completed"
+        db_session.commit()
+        client.post("/api/sync/push", json={"events": [make_event(seeded, 1)]}, headers=seeded["headers"])
+
+        data = client.get(f"/api/sync/pull?cursor={cursor}", headers=seeded["headers"]).json()
+        assert data["goals"] == [] and data["cycles"] == []
+        assert [block["status"] for block in data["blocks"]] == ["completed"]
+        assert [event["event_data"]["id"] for event in data["events"]] == ["evt-1"]
+        assert data["cursor"] == cursor + 2
+
+    def test_paging_with_has_more(self, client, seeded):
+        """Test small pages walk every change exactly once"""
+        client.post(
+            "/api/sync/push", json={"events": [make_event(seeded, seq) for seq in range(7)]}, headers=seeded["headers"]
+        )
+
+        cursor, seen, pages = 0, [], 0
+        while True:
+            data = client.get(f"/api/sync/pull?cursor={cursor}&limit=4", headers=seeded["headers"]).json()
+            pages += 1
+            seen += [row["sync_seq"] for key in ("goals", "cycles", "blocks", "events") for row in data[key]]
+            cursor = data["cursor"]
+            if not data["has_more"]:
+                break
+
+        assert pages == 3
+        assert sorted(seen) == list(range(1, 11))
+
+    def test_etag_not_modified(self, client, seeded):
+        """Test an unchanged pull answers 304 for a matching If-None-Match"""
+        first = client.get("/api/sync/pull?cursor=3", headers=seeded["headers"])
+        etag = first.headers["etag"]
+
+        second = client.get("/api/sync/pull?cursor=3", headers=dict(seeded["headers"], **{"If-None-Match": etag}))
+        assert second.status_code == 304
+
+        client.post("/api/sync/push", json={"events": [make_event(seeded, 1)]}, headers=seeded["headers"])
+        third = client.get("/api/sync/pull?cursor=3", headers=dict(seeded["headers"], **{"If-None-Match": etag}))
+        assert third.status_code == 200
+        assert len(third.json()["events"]) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
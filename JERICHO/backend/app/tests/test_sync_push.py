@@ -0,0 +1,318 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from main import app
+from app.core.database import Base, engine, get_db
+from app.core.principals import get_cached_principal, principal_cache
+from app.core.pubsub import RESYNC, MemoryBackend, PostgresNotifyBackend, PubSubHub
+from app.core.security import create_access_token
+from app.models.user import User, Goal, Cycle, Block
+from app.services.sync_push import REVOKED, create_backend, sync_hub
+
+
+def test_slow_consumer_is_sent_resync():
+    """Test a full buffer drops its oldest messages and leads with one RESYNC"""
+    async def run():
+        hub = PubSubHub(MemoryBackend(), buffer_size=3)
+        subscription = hub.subscribe(1)
+        for seq in range(1, 6):
+            hub.publish(1, {"type": "changes", "seq": seq})
+        hub.publish(2, {"type": "changes", "seq": 99})
+        received = [subscription.get_nowait() for _ in range(5)]
+        assert await subscription.get(timeout=0.01) is None
+        subscription.close()
+        return hub, subscription, received
+
+    hub, subscription, received = asyncio.run(run())
+    assert received == [RESYNC, {"type": "changes", "seq": 3}, {"type": "changes", "seq": 4},
+                        {"type": "changes", "seq": 5}, None]
+    assert subscription.dropped == 2
+    stats = hub.stats()
+    assert (stats["delivered"], stats["dropped"], stats["resyncs"], stats["connections"]) == (5, 2, 1, 0)
+
+
+def test_hub_refuses_connections_past_its_limit():
+    """Test max_connections caps open subscriptions and a closed one frees its slot"""
+    async def run():
+        hub = PubSubHub(MemoryBackend(), max_connections=2)
+        first, second = hub.subscribe(1), hub.subscribe(1)
+        assert hub.subscribe(2) is None
+        first.close()
+        assert hub.subscribe(2) is not None
+        hub.publish(1, {"type": "changes", "seq": 1})
+        assert not second.closed
+        assert second.get_nowait() == {"type": "changes", "seq": 1}
+        return hub.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["connections"], stats["peak_connections"], stats["rejected"], stats["keys"]) == (2, 2, 1, 2)
+
+
+class LoopbackConnection:
+    """Stands in for an asyncpg connection: each pg_notify comes straight back to the listener"""
+
+    def __init__(self):
+        self.listener = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        pass
+
+    async def add_listener(self, channel, callback):
+        self.listener = (channel, callback)
+
+    async def executemany(self, query, args):
+        channel, callback = self.listener
+        for _, payload in args:
+            callback(self, 0, channel, payload)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+def test_notify_backend_never_coalesces_away_a_revoke(monkeypatch):
+    """Test a changes message published after REVOKED in the same batch does not replace it"""
+    async def connect(dsn):
+        return LoopbackConnection()
+
+    monkeypatch.setattr("asyncpg.connect", connect)
+
+    async def run():
+        hub = PubSubHub(PostgresNotifyBackend("postgresql://test", "test_sync"))
+        await hub.start()
+        subscription = hub.subscribe(1)
+        hub.publish(1, {"type": "changes", "seq": 1})
+        hub.publish(1, REVOKED)
+        hub.publish(1, {"type": "changes", "seq": 2})
+        await hub.stop()
+        received = []
+        while (message := subscription.get_nowait()) is not None:
+            received.append(message)
+        return received
+
+    assert asyncio.run(run()) == [REVOKED, {"type": "changes", "seq": 2}]
+
+
+def test_revoke_drops_cached_principal_on_every_node():
+    """Test a revoke received from the backend invalidates the principal cache, even with no stream open here"""
+    principal_cache.set(7, "cached")
+    principal_cache.set(8, "cached")
+    sync_hub.deliver(7, REVOKED)
+    assert get_cached_principal(7) is None
+    assert get_cached_principal(8) == "cached"
+
+    sync_hub.deliver_all(RESYNC)  # a reconnected backend may have missed revokes
+    assert get_cached_principal(8) is None
+
+
+def test_backend_follows_the_database():
+    """Test auto picks LISTEN/NOTIFY for PostgreSQL and memory for SQLite"""
+    assert isinstance(create_backend("auto", "sqlite:///./jericho.db"), MemoryBackend)
+    backend = create_backend("auto", "postgresql+psycopg2://app:secret@db:5432/jericho")
+    assert isinstance(backend, PostgresNotifyBackend)
+    assert backend.dsn == "postgresql://app:secret@db:5432/jericho"
+    with pytest.raises(ValueError):
+        create_backend("redis", "sqlite:///./jericho.db")
+
+
+class TestSyncPushChannel:
+    """Test the SSE and WebSocket change feeds"""
+
+    @pytest.fixture(autouse=True)
+    def setup_database(self):
+        """Setup test database"""
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        yield
+        Base.metadata.drop_all(bind=engine)
+
+    @pytest.fixture
+    def db_session(self):
+        """Get database session for testing"""
+        db = next(get_db())
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @pytest.fixture
+    def block(self, db_session):
+        """A user with one goal, cycle and block"""
+        user = User(email="test@example.com", password_hash="hash")
+        db_session.add(user)
+        db_session.flush()
+        goal = Goal(user_id=user.id, title="Goal", goal_execution_contract={})
+        db_session.add(goal)
+        db_session.flush()
+        cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+        db_session.add(cycle)
+        db_session.flush()
+        block = Block(
+            user_id=user.id, goal_id=goal.id, cycle_id=cycle.id, day_key="2026-01-15",
+            practice="Focus", title="Block", duration_minutes=30,
+        )
+        db_session.add(block)
+        db_session.commit()
+        return block
+
+    def token(self, block):
+        return create_access_token(data={"sub": str(block.user_id)})
+
+    def test_websocket_announces_pushed_and_orm_changes(self, block, db_session):
+        """Test the socket opens with the feed head and is told of each committed write"""
+        client = TestClient(app)
+        with client.websocket_connect(f"/api/sync/ws?token={self.token(block)}") as socket:
+            hello = socket.receive_json()
+            assert hello["type"] == "hello"
+
+            event = {"event_type": "complete", "block_id": block.id, "cycle_id": block.cycle_id, "event_data": {}}
+            response = client.post(
+                "/api/sync/push", json={"events": [event]}, headers={"Authorization": f"Bearer {self.token(block)}"}
+            )
+            assert response.json()["accepted"] == 1
+            assert socket.receive_json() == {"type": "changes", "seq": hello["seq"] + 1}
+
+            block.title = "Renamed"
+            db_session.commit()
+            assert socket.receive_json() == {"type": "changes", "seq": hello["seq"] + 2}
+        assert sync_hub.connections == 0
+
+    def test_websocket_rejects_invalid_token(self, block):
+        """Test an unauthenticated socket is closed with a policy violation"""
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with TestClient(app).websocket_connect("/api/sync/ws?token=not-a-jwt") as socket:
+                socket.receive_json()
+        assert closed.value.code == 1008
+
+    def test_websocket_closed_when_token_expires(self, block):
+        """Test a socket opened with a token is closed with a policy violation once the token expires"""
+        token = create_access_token(data={"sub": str(block.user_id)}, expires_delta=timedelta(seconds=1))
+        started = time.monotonic()
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with TestClient(app).websocket_connect(f"/api/sync/ws?token={token}") as socket:
+                assert socket.receive_json()["type"] == "hello"
+                socket.receive_json()
+        assert closed.value.code == 1008
+        assert time.monotonic() - started < 5
+        assert sync_hub.connections == 0
+
+    def test_deactivation_closes_streams(self, block, db_session):
+        """Test deactivating a user closes their open sockets, and they cannot reconnect"""
+        client = TestClient(app)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/api/sync/ws?token={self.token(block)}") as socket:
+                assert socket.receive_json()["type"] == "hello"
+                user = db_session.get(User, block.user_id)
+                user.is_active = False
+                db_session.commit()
+                socket.receive_json()
+        assert closed.value.code == 1008
+        assert client.get("/api/sync/events", params={"access_token": self.token(block)}).status_code == 401
+
+    def test_event_stream(self, block, db_session):
+        """Test the SSE stream sends hello, then a changes event once a write commits"""
+        assert TestClient(app).get("/api/sync/events").status_code == 401
+
+        async def read_stream():
+            chunks, status, closed = [], [], asyncio.Event()
+
+            async def receive():
+                await closed.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                    status.append(dict(message["headers"])[b"content-type"])
+                elif message.get("body"):
+                    chunks.append(message["body"].decode())
+                    if len(chunks) == 1:
+                        block.status = "completed"
+                        db_session.commit()
+                    else:
+                        closed.set()
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": "/api/sync/events", "raw_path": b"/api/sync/events",
+                "root_path": "", "query_string": b"",
+                "headers": [(b"authorization", f"Bearer {self.token(block)}".encode())],
+                "client": ("test", 1), "server": ("test", 80),
+            }
+            await asyncio.wait_for(app(scope, receive, send), timeout=10)
+            return status, chunks
+
+        status, chunks = asyncio.run(read_stream())
+        assert status[0] == 200
+        assert status[1].startswith(b"text/event-stream")
+        assert chunks[0].startswith("retry: 5000\n\n")
+        assert "event: hello\n" in chunks[0]
+        seq = block.sync_seq
+        assert chunks[1] == f'id: {seq}\nevent: changes\ndata: {{"type":"changes","seq":{seq}}}\n\n'
+        assert sync_hub.connections == 0
+
+    def test_event_stream_ends_with_token_or_revocation(self, block, db_session):
+        """Test the SSE stream ends once its token expires, and ends after a revoked event on deactivation"""
+        def read_stream(token, on_hello=None):
+            async def receive():
+                await asyncio.sleep(10)
+                return {"type": "http.disconnect"}
+
+            chunks = []
+
+            async def send(message):
+                if message.get("body"):
+                    chunks.append(message["body"].decode())
+                    if len(chunks) == 1 and on_hello is not None:
+                        on_hello()
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": "/api/sync/events", "raw_path": b"/api/sync/events",
+                "root_path": "", "query_string": f"access_token={token}".encode(), "headers": [],
+                "client": ("test", 1), "server": ("test", 80),
+            }
+            asyncio.run(asyncio.wait_for(app(scope, receive, send), timeout=5))
+            return chunks
+
+        expiring = create_access_token(data={"sub": str(block.user_id)}, expires_delta=timedelta(seconds=1))
+        chunks = read_stream(expiring)
+        assert len(chunks) == 1 and "event: hello\n" in chunks[0]
+
+        def deactivate():
+            db_session.get(User, block.user_id).is_active = False
+            db_session.commit()
+
+        chunks = read_stream(self.token(block), on_hello=deactivate)
+        assert chunks[1:] == ['event: revoked\ndata: {"type":"revoked"}\n\n']
+        assert sync_hub.connections == 0
+
+    def test_rolled_back_writes_are_not_announced(self, block, db_session):
+        """Test only committed transactions publish"""
+        async def run():
+            subscription = sync_hub.subscribe(block.user_id)
+            block.title = "Discarded"
+            db_session.flush()
+            db_session.rollback()
+            missed = subscription.get_nowait()
+            block.title = "Kept"
+            db_session.commit()
+            announced = subscription.get_nowait()
+            subscription.close()
+            return missed, announced
+
+        missed, announced = asyncio.run(run())
+        assert missed is None
+        assert announced == {"type": "changes", "seq": block.sync_seq}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,149 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.core.msgpack_codec import MessagePackError, _pack, _unpack, packb, unpackb
+from app.models.user import ExecutionEvent
+
+pytestmark = pytest.mark.usefixtures("setup_database")
+
+MSGPACK = "application/msgpack"
+# One cycle with a day of twenty blocks
+BLOCK_DAY = {"blocks_per_day": 20}
+
+
+def make_events(seeded, count):
+    return [
+        {
+            "event_type": "complete",
+            "block_id": seeded["blocks"][0].id,
+            "cycle_id": seeded["cycle"].id,
+            "event_data": {"id": f"evt-{seq}", "kind": "complete", "completed": True},
+        }
+        for seq in range(count)
+    ]
+
+
+def raw_pull(client, headers, **extra):
+    """GET /api/sync/pull without httpx decoding the body"""
+    with client.stream("GET", "/api/sync/pull", headers={**headers, **extra}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestMessagePackCodec:
+    """Test the MessagePack encoder and decoder"""
+
+    def test_round_trips_every_type(self):
+        """Test both codecs round-trip scalars, containers and every length class"""
+        value = {
+            "nil": None, "flags": [True, False],
+            "ints": [0, 127, 128, 255, 65535, 2 ** 32, 2 ** 64 - 1, -1, -32, -33, -129, -(2 ** 31), -(2 ** 63)],
+            "float": 1.5, "strings": ["", "x" * 31, "y" * 255, "z" * 70000, "héllo"],
+            "bytes": b"\x00\x01", "list": list(range(20)), "map": {str(key): key for key in range(20)},
+        }
+        assert unpackb(packb(value)) == value
+        out = bytearray()
+        _pack(value, out)
+        assert _unpack(memoryview(bytes(out)), 0)[0] == value
+
+    def test_encodes_like_the_json_responses(self):
+        """Test the fallback emits standard MessagePack, with datetimes as ISO strings"""
+        out = bytearray()
+        _pack({"a": [1, "b"], "at": datetime(2026, 1, 15, 9, 30, tzinfo=timezone.utc)}, out)
+        assert bytes(out) == b"\x82\xa1a\x92\x01\xa1b\xa2at\xb42026-01-15T09:30:00Z"
+
+    def test_decodes_timestamp_extension(self):
+        """Test the timestamp extension type decodes to an aware datetime"""
+        assert unpackb(b"\xd6\xff\x00\x00\x00\x3c") == datetime(1970, 1, 1, 0, 1, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize("data", [b"", b"\x92\x01", b"\xc1", b"\x01\x02", b"\xa2\xff\xfe", b"\xdd\xff\xff\xff\xff"])
+    def test_rejects_malformed_data(self, data):
+        """Test truncated, invalid and trailing bytes raise MessagePackError"""
+        with pytest.raises(MessagePackError):
+            unpackb(data)
+
+
+@pytest.mark.parametrize("seeded", [BLOCK_DAY], indirect=True, ids=["block_day"])
+class TestSyncWireFormats:
+    """Test content negotiation on /api/sync/pull and /api/sync/push"""
+
+    def test_pull_defaults_to_json(self, client, seeded):
+        """Test clients that ask for nothing in particular get uncompressed JSON"""
+        response, body = raw_pull(client, seeded["headers"], **{"Accept-Encoding": "identity"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+        assert len(json.loads(body)["blocks"]) == 20
+
+    def test_pull_msgpack_and_gzip(self, client, seeded):
+        """Test MessagePack and gzip combine, decode to the JSON page and share its ETag"""
+        plain = client.get("/api/sync/pull", headers=seeded["headers"])
+        response, body = raw_pull(client, seeded["headers"], Accept=MSGPACK, **{"Accept-Encoding": "gzip"})
+        assert response.headers["content-type"] == MSGPACK
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == len(body)
+        assert unpackb(gzip.decompress(body)) == plain.json()
+        assert response.headers["etag"] == plain.headers["etag"]
+
+        revalidated = client.get(
+            "/api/sync/pull", headers={**seeded["headers"], "Accept": MSGPACK, "If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    def test_small_responses_skip_compression(self, client, seeded, monkeypatch):
+        """Test bodies under sync_compression_min_bytes are sent as is"""
+        _, body = raw_pull(client, seeded["headers"], **{"Accept-Encoding": "identity"})
+        monkeypatch.setattr(settings, "sync_compression_min_bytes", len(body) + 1)
+        response, _ = raw_pull(client, seeded["headers"], **{"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        monkeypatch.setattr(settings, "sync_compression_min_bytes", len(body))
+        response, _ = raw_pull(client, seeded["headers"], **{"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_push_accepts_msgpack_and_gzip_bodies(self, client, seeded, db_session):
+        """Test gzipped MessagePack pushes are ingested and answered in MessagePack"""
+        body = gzip.compress(packb({"events": make_events(seeded, 40)}))
+        response = client.post(
+            "/api/sync/push",
+            content=body,
+            headers={**seeded["headers"], "Content-Type": MSGPACK, "Content-Encoding": "gzip", "Accept": MSGPACK},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == MSGPACK
+        assert unpackb(response.content)["accepted"] == 40
+        assert db_session.query(ExecutionEvent).count() == 40
+
+    def test_push_accepts_gzipped_json(self, client, seeded, db_session):
+        """Test a gzipped JSON push is decompressed and validated like a plain one"""
+        body = gzip.compress(json.dumps({"events": make_events(seeded, 5)}).encode())
+        response = client.post(
+            "/api/sync/push", content=body,
+            headers={**seeded["headers"], "Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 5
+
+    def test_push_rejects_bad_bodies(self, client, seeded, monkeypatch):
+        """Test malformed, oversized and unsupported bodies fail cleanly"""
+        headers = {**seeded["headers"], "Content-Type": MSGPACK}
+        assert client.post("/api/sync/push", content=b"\xc1", headers=headers).status_code == 400
+        assert client.post(
+            "/api/sync/push", content=b"not gzip", headers={**headers, "Content-Encoding": "gzip"}
+        ).status_code == 400
+        assert client.post(
+            "/api/sync/push", content=b"x", headers={**headers, "Content-Encoding": "br"}
+        ).status_code == 415
+
+        monkeypatch.setattr(settings, "sync_max_body_bytes", 4096)
+        bomb = gzip.compress(b"\x00" * 1024 * 1024)
+        assert len(bomb) < 4096
+        response = client.post("/api/sync/push", content=bomb, headers={**headers, "Content-Encoding": "gzip"})
+        assert response.status_code == 413
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
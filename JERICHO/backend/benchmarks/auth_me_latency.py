@@ -0,0 +1,128 @@
+"""
+Concurrency benchmark for GET /api/auth/me.
+
+Runs N concurrent clients in-process against the app and reports latency
+percentiles for two paths:
+
+- legacy: the pre-async dependency (sync Session via get_db)
+- async:  the current route backed by get_async_db
+
+Usage:
+    python -m benchmarks.auth_me_latency --clients 200 --requests 25
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+
+from main import app
+from app.api.auth import security
+from app.core.database import Base, SessionLocal, engine, get_db
+from app.core.security import create_access_token, get_password_hash, verify_token
+from app.models.user import User
+from app.schemas.auth import UserResponse
+
+BENCH_EMAIL = "bench-auth-me@example.com"
+LEGACY_PATH = "/bench/legacy/me"
+ASYNC_PATH = "/api/auth/me"
+
+
+def legacy_get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    """Verbatim copy of the sync get_current_user lookup, kept for comparison"""
+    user_id = verify_token(credentials.credentials)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    user = db.query(User).filter(User.id == int(user_id)).first()
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+@app.get(LEGACY_PATH, response_model=UserResponse, include_in_schema=False)
+async def legacy_me(current_user: User = Depends(legacy_get_current_user)):
+    return current_user
+
+
+def seed_user() -> str:
+    """Ensure the benchmark user exists and return a bearer token for it"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if user is None:
+            user = User(email=BENCH_EMAIL, password_hash=get_password_hash("bench-password"))
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return create_access_token(data={"sub": str(user.id)})
+    finally:
+        db.close()
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a sorted sample list"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+    return samples[rank]
+
+
+async def run_scenario(path: str, token: str, clients: int, requests_per_client: int) -> dict:
+    """Drive `clients` concurrent loops of `requests_per_client` GETs against path"""
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    errors = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000.0)
+                if response.status_code != 200:
+                    errors += 1
+
+        # Warm-up so pool and import costs are not counted
+        await client.get(path, headers=headers)
+        wall_started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        wall_seconds = time.perf_counter() - wall_started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 1) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def main(clients: int, requests_per_client: int) -> dict:
+    token = seed_user()
+    return {
+        "benchmark": "auth_me_latency",
+        "before": await run_scenario(LEGACY_PATH, token, clients, requests_per_client),
+        "after": await run_scenario(ASYNC_PATH, token, clients, requests_per_client),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="p99 latency for /api/auth/me under concurrency")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=25, help="requests per client")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.clients, args.requests)), indent=2))
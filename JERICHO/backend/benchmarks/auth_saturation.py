@@ -0,0 +1,126 @@
+"""
+Sync latency while a credential-stuffing burst saturates /api/auth/login.
+
+Runs --attackers concurrent loops of wrong-password logins (real bcrypt
+verification) against the app in-process for --seconds, while --syncers
+loops poll /api/sync/pull. Compares two apps:
+
+- unlimited: no concurrency gates or rate limits on the auth routes
+- gated:     the AUTH_CONCURRENCY_LIMITS gates with their short queue
+
+Per-IP and per-email buckets are off in both runs, since every simulated
+attacker shares one client address; the gates are what is measured. Reports
+sync latency percentiles and login status counts (503 = shed).
+
+Usage:
+    python -m benchmarks.auth_saturation --attackers 200 --syncers 20 --seconds 10
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from main import create_app
+from app.core.config import Settings
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+
+BENCH_EMAIL = "bench-auth-saturation@example.com"
+
+
+def seed_user() -> str:
+    """Ensure the benchmark user exists and return a bearer token for it"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if user is None:
+            user = User(email=BENCH_EMAIL, password_hash=get_password_hash("bench-password"))
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return create_access_token(data={"sub": str(user.id)})
+    finally:
+        db.close()
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a sorted sample list"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+    return samples[rank]
+
+
+async def run_scenario(name: str, settings: Settings, token: str, attackers: int, syncers: int, seconds: float) -> dict:
+    app = create_app(settings)
+    logins, sync_statuses, sync_latencies = Counter(), Counter(), []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    # Errors inside the app (e.g. database pool timeouts) come back as 500s rather than aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60, limits=limits) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.get("/api/sync/pull", headers=headers)  # warm-up
+        deadline = time.perf_counter() + seconds
+
+        async def attacker():
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": "wrong"})
+                logins[response.status_code] += 1
+                if response.status_code in (429, 503):
+                    # The attackers share this process's CPU with the app, so unlike remote ones they must back off
+                    # for the run to measure the server rather than the load generator
+                    await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+
+        async def syncer():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/sync/pull", headers=headers)
+                sync_latencies.append((time.perf_counter() - started) * 1000.0)
+                sync_statuses[response.status_code] += 1
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(attacker() for _ in range(attackers)), *(syncer() for _ in range(syncers)))
+
+    sync_latencies.sort()
+    return {
+        "scenario": name,
+        "logins": dict(sorted(logins.items())),
+        "login_attempts_per_second": round(sum(logins.values()) / seconds, 1),
+        "sync_requests": len(sync_latencies),
+        "sync_statuses": dict(sorted(sync_statuses.items())),
+        "sync_p50_ms": round(percentile(sync_latencies, 50), 2),
+        "sync_p95_ms": round(percentile(sync_latencies, 95), 2),
+        "sync_p99_ms": round(percentile(sync_latencies, 99), 2),
+        "sync_max_ms": round(sync_latencies[-1], 2) if sync_latencies else 0.0,
+    }
+
+
+async def main(attackers: int, syncers: int, seconds: float) -> dict:
+    token = seed_user()
+    common = {"metrics_enabled": False, "auth_ip_burst": 0, "auth_email_burst": 0}
+    return {
+        "benchmark": "auth_saturation",
+        "attackers": attackers,
+        "syncers": syncers,
+        "unlimited": await run_scenario(
+            "unlimited", Settings(auth_concurrency_limits={}, **common), token, attackers, syncers, seconds
+        ),
+        "gated": await run_scenario("gated", Settings(**common), token, attackers, syncers, seconds),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync latency while login is saturated")
+    parser.add_argument("--attackers", type=int, default=200)
+    parser.add_argument("--syncers", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.attackers, args.syncers, args.seconds)), indent=2))
@@ -0,0 +1,78 @@
+"""
+Microbenchmark: serialize N BlockResponse objects from ORM rows.
+
+Compares FastAPI's default response_model path (validate each row, dump it to
+JSON-compatible values, json.dumps) with FastJSONResponse (same steps, orjson
+render) and the pre-validated dump_rows path used for large payloads, which
+reads loaded row state directly.
+
+Usage:
+    python -m benchmarks.block_serialization --count 50000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, dump_rows
+from app.models.user import Block
+from app.schemas.blocks import BlockResponse
+
+
+def make_rows(count: int) -> list:
+    created = datetime(2026, 1, 15, 6, 0, 12, 345678, tzinfo=timezone.utc)
+    return [
+        Block(
+            id=i, user_id=1, goal_id=1, cycle_id=1, day_key="2026-01-15", practice="Creation",
+            title=f"Block {i}", duration_minutes=30, status="scheduled",
+            start_iso="2026-01-15T06:00:00.000Z", completion_iso=None, created_at=created, updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_default(rows) -> bytes:
+    content = [BlockResponse.model_validate(row).model_dump(mode="json") for row in rows]
+    return JSONResponse(content).body
+
+
+def fast_json_response(rows) -> bytes:
+    content = [BlockResponse.model_validate(row).model_dump(mode="json") for row in rows]
+    return FastJSONResponse(content).body
+
+
+def prevalidated(rows) -> bytes:
+    return dump_rows(BlockResponse, rows)
+
+
+def timed(fn, rows, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(rows)
+        best = min(best, time.perf_counter() - started)
+    return {"ms": round(best * 1000, 1), "objects_per_second": round(len(rows) / best), "bytes": len(body)}
+
+
+def main(count: int, repeat: int) -> dict:
+    rows = make_rows(count)
+    assert json.loads(fastapi_default(rows)) == json.loads(prevalidated(rows))
+    return {
+        "benchmark": "block_serialization",
+        "objects": count,
+        "fastapi_default": timed(fastapi_default, rows, repeat),
+        "fast_json_response": timed(fast_json_response, rows, repeat),
+        "prevalidated": timed(prevalidated, rows, repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialize BlockResponse objects from ORM rows")
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.count, args.repeat), indent=2))
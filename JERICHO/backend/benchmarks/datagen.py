@@ -0,0 +1,265 @@
+"""
+Seeded synthetic dataset for the benchmark suite.
+
+Builds users, goals, cycles, blocks and execution events at production scale
+(10k users / 1M events by default). Shapes follow the certification artifacts:
+blocks as in artifacts/certification/committedSchedule.json (day key, start
+time, duration, goal) and events as in executionEvents.json (a `create` per
+block, a `complete` with minutes for roughly 38% of them, CREATION/FOCUS
+domains). Each user gets 1-3 goals with one active cycle each, and blocks over
+DAYS days of which the last quarter are still ahead of NOW; past blocks that
+were neither completed nor skipped are left `scheduled`, for the rollover.
+
+Rows are written with bulk inserts and carry everything the write paths would
+have set: per-user sync_seq, event and chain hashes. Cycle summaries and
+daily rollups are then rebuilt from them. The same DatasetSpec always yields
+the same rows.
+
+Usage:
+    python -m benchmarks.datagen --users 10000 --events 1000000 --seed 21
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.core.security import get_password_hash
+from app.models.user import (
+    GENESIS_CHAIN_HASH, Block, Cycle, ExecutionEvent, Goal, User, UserSyncState, compute_chain_hash,
+)
+from app.services.events import EVENT_COLUMNS, canonical_json, event_content_hash
+from app.services.rollups import compact_rollups, rebuild_rollups
+from app.services.summaries import rebuild_summaries
+
+FIRST_DAY = date(2026, 1, 5)
+DAYS = 28
+NOW = datetime(2026, 1, 26, 12, 0, tzinfo=timezone.utc)  # day 21 of 28
+PASSWORD = "bench-password"
+EMAIL = "bench-{}@example.com"
+DOMAINS = (("CREATION", "Creation"), ("FOCUS", "Focus"))
+DURATIONS = (30, 30, 30, 60, 90)
+# executionEvents.json has 16 `complete` events for 42 `create`s; only past blocks can be completed
+COMPLETES_PER_BLOCK = 16 / 42
+PAST_COMPLETION_RATE = COMPLETES_PER_BLOCK / ((NOW.date() - FIRST_DAY).days / DAYS)
+SKIP_RATE = 0.07
+USERS_PER_BATCH = 500
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 10000
+    events: int = 1000000
+    seed: int = 21
+
+
+def email(user_number: int) -> str:
+    return EMAIL.format(user_number)
+
+
+def goal_contract(rng: random.Random, goal_number: int, start: date) -> dict:
+    """A contract shaped like buildValidGoalContract's (src/domain/goal/testHelpers.ts)"""
+    days_per_week = rng.choice((3, 4, 5))
+    session_minutes = rng.choice((60, 90, 120))
+    return {
+        "goalId": f"goal-{goal_number}",
+        "cycleId": f"cycle-{goal_number}",
+        "planGenerationMechanismClass": "GENERIC_DETERMINISTIC",
+        "terminalOutcome": {
+            "text": f"Ship milestone {goal_number}",
+            "verificationCriteria": "Deliverable published and reviewed",
+            "isConcrete": True,
+        },
+        "deadline": {"dayKey": (start + timedelta(days=rng.randint(30, 90))).isoformat(), "isHardDeadline": True},
+        "sacrifice": {
+            "whatIsGivenUp": "Evening leisure",
+            "duration": "8 weeks",
+            "quantifiedImpact": f"{days_per_week * session_minutes // 60} hours/week",
+            "rationale": "Time reserved for focused work",
+        },
+        "temporalBinding": {
+            "daysPerWeek": days_per_week,
+            "activationTime": "06:00",
+            "sessionDurationMinutes": session_minutes,
+            "weeklyMinutes": days_per_week * session_minutes,
+            "startDayKey": start.isoformat(),
+        },
+        "causalChain": {"steps": [
+            {"sequence": 1, "description": "Outline deliverable", "approximateDayOffset": 7},
+            {"sequence": 2, "description": "Produce first draft", "approximateDayOffset": 21},
+        ]},
+        "reinforcement": {
+            "dailyExposureEnabled": True,
+            "dailyMechanism": "Calendar block title + dashboard banner",
+            "checkInFrequency": "DAILY",
+            "triggerDescription": "Every morning at 6 AM",
+        },
+        "inscription": {"acknowledgment": "I understand this is binding"},
+        "isAspirational": False,
+        "commitmentDisclosureAccepted": True,
+    }
+
+
+def event_data(kind: str, block: dict, domain: str, rng: random.Random) -> dict:
+    """An event payload in executionEvents.json's shape"""
+    start = datetime.fromisoformat(block["start_iso"].replace("Z", "+00:00"))
+    completed = kind == "complete"
+    return {
+        "id": "%032x" % rng.getrandbits(128),
+        "blockId": f"blk-{block['id']}",
+        "dateISO": block["day_key"],
+        "minutes": block["duration_minutes"] if completed else 0,
+        "rawLabel": block["title"],
+        "domain": domain,
+        "cycleId": f"cycle-{block['cycle_id']}",
+        "goalId": f"goal-{block['goal_id']}",
+        "origin": "auto_asana",
+        "completed": completed,
+        "kind": kind,
+        "startISO": block["start_iso"],
+        "endISO": (start + timedelta(minutes=block["duration_minutes"])).isoformat().replace("+00:00", ".000Z"),
+        "status": "planned",
+        "linkageStatus": "UNLINKED_ACTIVITY",
+    }
+
+
+class Generator:
+    """Emits rows for consecutive batches of users, keeping id counters across batches"""
+
+    def __init__(self, spec: DatasetSpec, password_hash: str):
+        self.spec = spec
+        self.password_hash = password_hash
+        self.rng = random.Random(spec.seed)
+        self.next_id = {"goals": 1, "cycles": 1, "blocks": 1, "events": 1}
+        # One create per block plus the completions: events average out to spec.events
+        self.blocks_per_user = spec.events / spec.users / (1 + COMPLETES_PER_BLOCK)
+
+    def take_id(self, table: str) -> int:
+        value = self.next_id[table]
+        self.next_id[table] += 1
+        return value
+
+    def batch(self, first_user: int, last_user: int) -> dict:
+        rng = self.rng
+        today = NOW.date().isoformat()
+        rows = {"users": [], "goals": [], "cycles": [], "blocks": [], "events": [], "sync_state": []}
+        for user_id in range(first_user, last_user + 1):
+            seq = 0
+            rows["users"].append({"id": user_id, "email": email(user_id), "password_hash": self.password_hash})
+            cycles = []
+            for _ in range(rng.randint(1, 3)):
+                goal_id, cycle_id = self.take_id("goals"), self.take_id("cycles")
+                seq += 2
+                rows["goals"].append({
+                    "id": goal_id, "user_id": user_id, "title": f"Goal {goal_id}",
+                    "goal_execution_contract": goal_contract(rng, goal_id, FIRST_DAY),
+                    "admission_status": "admitted", "sync_seq": seq - 1,
+                })
+                rows["cycles"].append({
+                    "id": cycle_id, "user_id": user_id, "goal_id": goal_id, "status": "active", "sync_seq": seq,
+                })
+                cycles.append((goal_id, cycle_id))
+
+            count = max(1, round(rng.gauss(self.blocks_per_user, self.blocks_per_user / 4)))
+            blocks = []
+            for n in range(count):
+                goal_id, cycle_id = rng.choice(cycles)
+                day_key = (FIRST_DAY + timedelta(days=rng.randrange(DAYS))).isoformat()
+                domain, practice = rng.choice(DOMAINS)
+                status = "scheduled"
+                if day_key < today:
+                    roll = rng.random()
+                    if roll < PAST_COMPLETION_RATE:
+                        status = "completed"
+                    elif roll > 1 - SKIP_RATE:
+                        status = "skipped"
+                start_iso = f"{day_key}T{6 + 2 * (n % 6):02d}:00:00.000Z"
+                seq += 1
+                block = {
+                    "id": self.take_id("blocks"), "user_id": user_id, "goal_id": goal_id, "cycle_id": cycle_id,
+                    "day_key": day_key, "practice": practice, "title": "Auto Asana Execution",
+                    "duration_minutes": rng.choice(DURATIONS), "status": status, "start_iso": start_iso,
+                    "completion_iso": start_iso if status == "completed" else None, "sync_seq": seq,
+                }
+                blocks.append((block, domain))
+            rows["blocks"].extend(block for block, _ in blocks)
+
+            # Events in day order, chained per cycle as the ledger expects
+            tails = {}
+            for block, domain in sorted(blocks, key=lambda item: (item[0]["day_key"], item[0]["id"])):
+                for kind in ("create", "complete") if block["status"] == "completed" else ("create",):
+                    data_json = canonical_json(event_data(kind, block, domain, rng))
+                    event_hash = event_content_hash(user_id, block["cycle_id"], block["id"], kind, data_json)
+                    chain_hash = compute_chain_hash(tails.get(block["cycle_id"], GENESIS_CHAIN_HASH), event_hash)
+                    tails[block["cycle_id"]] = chain_hash
+                    seq += 1
+                    rows["events"].append({"id": self.take_id("events"), **dict(zip(EVENT_COLUMNS, (
+                        user_id, block["cycle_id"], block["id"], kind, data_json, event_hash, chain_hash, seq,
+                    )))})
+            rows["sync_state"].append({"user_id": user_id, "last_seq": seq})
+        return rows
+
+
+def _reset_sequences(conn):
+    """Move PostgreSQL id sequences past the explicitly inserted ids"""
+    for table in ("users", "goals", "cycles", "blocks", "execution_events"):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+async def _rebuild_aggregates():
+    async with AsyncSessionLocal() as db:
+        await rebuild_summaries(db)
+        await rebuild_rollups(db)
+        await compact_rollups(db)
+
+
+def generate(spec: DatasetSpec) -> dict:
+    """Replace the database contents with the dataset described by `spec` and return its counts"""
+    started = time.perf_counter()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    generator = Generator(spec, get_password_hash(PASSWORD))
+    tables = (
+        ("users", User), ("goals", Goal), ("cycles", Cycle), ("blocks", Block), ("events", ExecutionEvent),
+        ("sync_state", UserSyncState),
+    )
+    for first_user in range(1, spec.users + 1, USERS_PER_BATCH):
+        rows = generator.batch(first_user, min(first_user + USERS_PER_BATCH - 1, spec.users))
+        with engine.begin() as conn:
+            for key, model in tables:
+                if rows[key]:
+                    conn.execute(insert(model), rows[key])
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            _reset_sequences(conn)
+    asyncio.run(_rebuild_aggregates())
+
+    with engine.connect() as conn:
+        counts = {
+            name: conn.execute(select(func.count()).select_from(model)).scalar_one()
+            for name, model in (("users", User), ("goals", Goal), ("cycles", Cycle), ("blocks", Block),
+                                ("events", ExecutionEvent))
+        }
+        counts["overdue_blocks"] = conn.execute(
+            select(func.count()).select_from(Block)
+            .where(Block.status == "scheduled", Block.day_key < NOW.date().isoformat())
+        ).scalar_one()
+    return {"spec": asdict(spec), "counts": counts, "seconds": round(time.perf_counter() - started, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the database with the benchmark dataset")
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--events", type=int, default=DatasetSpec.events)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    args = parser.parse_args()
+
+    print(json.dumps(generate(DatasetSpec(args.users, args.events, args.seed)), indent=2))
@@ -0,0 +1,101 @@
+"""
+Microbenchmark: score N goals with the batch probability engine.
+
+Builds synthetic engine inputs (deadlines, remaining blocks, governance gates,
+weekday policies and a window of completed-block counts per goal) and times
+score_batch over all of them, against scoring a sample of goals one at a time
+as the client does.
+
+Usage:
+    python -m benchmarks.probability_batch --goals 100000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.probability import CONTRACT_ACTIVE, CONTRACT_INACTIVE, ProbabilityInputs, score_batch
+
+TODAY = "2026-01-15"
+
+
+def make_inputs(count: int, window_days: int, seed: int = 7) -> ProbabilityInputs:
+    rng = np.random.default_rng(seed)
+    inputs = ProbabilityInputs.empty(np.arange(1, count + 1))
+    today = np.datetime64(TODAY, "D")
+    inputs.deadline[:] = today + rng.integers(-5, 60, count)
+    inputs.remaining_blocks[:] = rng.integers(0, 80, count)
+    inputs.contract_state[:] = rng.choice([CONTRACT_ACTIVE, CONTRACT_INACTIVE], count, p=[0.9, 0.1])
+    inputs.min_evidence[:] = rng.choice([0, 5, 20], count)
+    weekdays_only = rng.random(count) < 0.3
+    inputs.weekmask[weekdays_only] = [False, True, True, True, True, True, False]
+    inputs.constraint_density[weekdays_only] = 0.2
+
+    # Completions on a random subset of the last two weeks
+    days = window_days * 2
+    rows, offsets = np.nonzero(rng.random((count, days)) < 0.6)
+    inputs.completed_rows = rows
+    inputs.completed_days = today - offsets
+    inputs.completed_counts = rng.integers(1, 5, len(rows))
+    per_goal = np.bincount(rows, weights=inputs.completed_counts, minlength=count).astype(np.int64)
+    inputs.total_events[:] = per_goal + rng.integers(0, 10, count)
+    inputs.completed_events[:] = per_goal
+    inputs.days_covered[:] = np.bincount(rows, minlength=count)
+    return inputs
+
+
+def goal_slice(inputs: ProbabilityInputs, row: int) -> ProbabilityInputs:
+    picked = inputs.completed_rows == row
+    return ProbabilityInputs(
+        **{
+            name: getattr(inputs, name)[row:row + 1]
+            for name in (
+                "goal_ids", "deadline", "remaining_blocks", "contract_state", "min_evidence", "weekmask",
+                "max_per_day", "constraint_density", "total_events", "completed_events", "days_covered",
+            )
+        },
+        completed_rows=np.zeros(int(picked.sum()), dtype=np.int64),
+        completed_days=inputs.completed_days[picked],
+        completed_counts=inputs.completed_counts[picked],
+    )
+
+
+def main(count: int, sample: int, window_days: int, repeat: int) -> dict:
+    inputs = make_inputs(count, window_days)
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = score_batch(inputs, TODAY, window_days=window_days)
+        best = min(best, time.perf_counter() - started)
+
+    sample = min(sample, count)
+    slices = [goal_slice(inputs, row) for row in range(sample)]
+    started = time.perf_counter()
+    one_at_a_time = [score_batch(single, TODAY, window_days=window_days)[0] for single in slices]
+    per_goal = (time.perf_counter() - started) / sample
+    assert one_at_a_time == results[:sample]
+
+    statuses = {}
+    for result in results:
+        statuses[result["status"]] = statuses.get(result["status"], 0) + 1
+    return {
+        "benchmark": "probability_batch",
+        "goals": count,
+        "batch": {"ms": round(best * 1000, 1), "goals_per_second": round(count / best)},
+        "per_goal": {"sampled": sample, "estimated_ms": round(per_goal * count * 1000, 1)},
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score goal-success probabilities in one batch")
+    parser.add_argument("--goals", type=int, default=100000)
+    parser.add_argument("--sample", type=int, default=2000, help="Goals scored one at a time for comparison")
+    parser.add_argument("--window-days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.goals, args.sample, args.window_days, args.repeat), indent=2))
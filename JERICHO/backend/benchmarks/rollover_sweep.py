@@ -0,0 +1,85 @@
+"""
+Benchmark: nightly rollover of overdue blocks.
+
+Seeds `--blocks` scheduled blocks on past days, spread over `--users` users
+(one goal and cycle each) and backfills their cycle summaries and daily
+rollups, then times
+sweep_overdue_blocks marking them all missed, and a second sweep that should
+find nothing.
+
+Usage:
+    python -m benchmarks.rollover_sweep --blocks 1000000 --users 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models.user import Block, Cycle, Goal, User
+from app.services.rollover import sweep_overdue_blocks
+from app.services.rollups import rebuild_rollups
+from app.services.summaries import rebuild_summaries
+
+NOW = datetime(2026, 2, 1, 12, 0, tzinfo=timezone.utc)
+INSERT_CHUNK_SIZE = 50000
+
+
+def seed(blocks: int, users: int):
+    """Fresh schema with `blocks` scheduled blocks on the 14 days before NOW"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    first_day = date(2026, 1, 18)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": i, "email": f"bench-rollover-{i}@example.com", "password_hash": "hash"}
+                                    for i in range(1, users + 1)])
+        conn.execute(insert(Goal), [{"id": i, "user_id": i, "title": "Bench Goal", "goal_execution_contract": {}}
+                                    for i in range(1, users + 1)])
+        conn.execute(insert(Cycle), [{"id": i, "user_id": i, "goal_id": i, "status": "active"}
+                                     for i in range(1, users + 1)])
+        for start in range(0, blocks, INSERT_CHUNK_SIZE):
+            conn.execute(insert(Block), [
+                {
+                    "user_id": i % users + 1, "goal_id": i % users + 1, "cycle_id": i % users + 1,
+                    "day_key": (first_day + timedelta(days=i % 14)).isoformat(),
+                    "practice": "Creation", "title": f"Block {i}", "duration_minutes": 30,
+                    "status": "scheduled", "start_iso": f"{(first_day + timedelta(days=i % 14)).isoformat()}T15:00:00.000Z",
+                }
+                for i in range(start, min(start + INSERT_CHUNK_SIZE, blocks))
+            ])
+
+
+async def main(blocks: int, users: int, chunk_size: int, workers: int) -> dict:
+    started = time.perf_counter()
+    seed(blocks, users)
+    async with AsyncSessionLocal() as db:
+        await rebuild_summaries(db)
+        await rebuild_rollups(db)
+    seed_seconds = time.perf_counter() - started
+
+    first = await sweep_overdue_blocks(now=NOW, chunk_size=chunk_size, workers=workers)
+    rerun = await sweep_overdue_blocks(now=NOW, chunk_size=chunk_size, workers=workers)
+    assert first["blocks_missed"] == blocks and rerun["blocks_missed"] == 0
+    return {
+        "benchmark": "rollover_sweep",
+        "blocks": blocks,
+        "users": users,
+        "seed_seconds": round(seed_seconds, 1),
+        "sweep": first,
+        "rerun": {"blocks_missed": rerun["blocks_missed"], "seconds": rerun["seconds"]},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll over overdue blocks in one sweep")
+    parser.add_argument("--blocks", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.blocks, args.users, args.chunk_size, args.workers)), indent=2))
@@ -0,0 +1,159 @@
+"""
+Throughput scaling of the preforking server (python -m app.server) across cores.
+
+Starts the server on a scratch SQLite database with 1, 2, 4, ... workers (up
+to --max-workers) and drives it over real TCP from --load-processes client
+processes, each keeping --connections requests in flight for --seconds.
+Reports requests/s, latency percentiles and the speedup over one worker.
+
+The load generator runs on the same host, so leave it cores of its own:
+scaling flattens once workers plus load processes exceed the CPU count.
+
+Usage:
+    python -m benchmarks.serve_scaling --max-workers 8 --load-processes 4
+    python -m benchmarks.serve_scaling --path /api/blocks/?day_from=2026-01-05
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.server import cpu_count
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED = """
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.user import User
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+user = User(email="bench-serve@example.com", password_hash="bench")
+db.add(user)
+db.commit()
+print(create_access_token(data={"sub": str(user.id)}))
+"""
+
+
+def start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def load(args) -> dict:
+    """One client process: `connections` concurrent request loops until the deadline"""
+    base_url, path, token, connections, seconds = args
+
+    async def run():
+        latencies, errors = [], 0
+        limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30,
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            deadline = time.perf_counter() + seconds
+
+            async def loop():
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(path)
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(loop() for _ in range(connections)))
+        return {"requests": len(latencies), "errors": errors, "latencies": latencies}
+
+    return asyncio.run(run())
+
+
+def measure(workers: int, options, env: dict, token: str, port: int) -> dict:
+    process = start_server(workers, port, env)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        jobs = [(base_url, options.path, token, options.connections, options.seconds)] * options.load_processes
+        with multiprocessing.Pool(options.load_processes) as pool:
+            pool.map(load, [(base_url, options.path, token, options.connections, 1.0)] * options.load_processes)  # warm up
+            results = pool.map(load, jobs)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    latencies = sorted(latency for result in results for latency in result["latencies"])
+    requests = sum(result["requests"] for result in results)
+    return {
+        "workers": workers,
+        "requests": requests,
+        "errors": sum(result["errors"] for result in results),
+        "requests_per_second": round(requests / options.seconds, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else 0.0,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=cpu_count())
+    parser.add_argument("--load-processes", type=int, default=max(1, cpu_count() // 2))
+    parser.add_argument("--connections", type=int, default=32, help="In-flight requests per load process")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--path", default="/api/auth/me")
+    parser.add_argument("--port", type=int, default=8790)
+    options = parser.parse_args()
+
+    counts = []
+    workers = 1
+    while workers < options.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(options.max_workers)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{os.path.join(scratch, 'serve.db')}",
+            "SERVER_MAX_REQUESTS": "0",
+            "ENVIRONMENT": "production",
+        }
+        token = subprocess.run(
+            [sys.executable, "-c", SEED], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        runs = [measure(count, options, env, token, options.port) for count in counts]
+
+    baseline = runs[0]["requests_per_second"] or 1.0
+    for run in runs:
+        run["speedup"] = round(run["requests_per_second"] / baseline, 2)
+    print(json.dumps({
+        "cpus": cpu_count(),
+        "path": options.path,
+        "load_processes": options.load_processes,
+        "connections": options.connections,
+        "seconds": options.seconds,
+        "runs": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
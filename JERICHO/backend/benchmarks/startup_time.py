@@ -0,0 +1,105 @@
+"""
+Cold-start benchmark: import, app construction, lifespan startup, first request.
+
+Each run is a fresh interpreter, so nothing is cached in sys.modules. Reports
+the median over --runs of the time from interpreter start to the end of each
+phase, for eager and lazy router registration, and how long creating the
+schema takes (what importing main used to pay on every boot).
+
+Usage:
+    python -m benchmarks.startup_time --runs 5
+    python -m benchmarks.startup_time --runs 5 --collect   # also time pytest collection
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints phase timings in milliseconds as JSON
+PHASES = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+marks = {}
+
+def mark(name):
+    marks[name] = round((time.perf_counter() - started) * 1000, 1)
+
+import main
+mark("import_main_ms")
+app = main.create_app(lazy_routers=%(lazy)s)
+mark("create_app_ms")
+
+async def serve():
+    import httpx
+    async with app.router.lifespan_context(app):
+        mark("startup_ms")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/api/auth/me")
+        mark("first_request_ms")
+
+asyncio.run(serve())
+marks["modules"] = len(sys.modules)
+print(json.dumps(marks))
+"""
+
+SCHEMA = """
+import json, time
+from app.core.database import Base, engine
+import app.models.user
+started = time.perf_counter()
+Base.metadata.create_all(bind=engine)
+print(json.dumps({"create_schema_ms": round((time.perf_counter() - started) * 1000, 1)}))
+"""
+
+
+def run_child(script: str, database_url: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "DATABASE_URL": database_url},
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def medians(samples: list) -> dict:
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--collect", action="store_true", help="Also time `pytest --collect-only`")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = os.environ.get("DATABASE_URL") or f"sqlite:///{os.path.join(scratch, 'startup.db')}"
+        results = {"runs": args.runs}
+        # Into an empty database each time, unless DATABASE_URL names one
+        schema = [
+            run_child(SCHEMA, os.environ.get("DATABASE_URL") or f"sqlite:///{os.path.join(scratch, f'schema-{n}.db')}")
+            for n in range(args.runs)
+        ]
+        results.update(medians(schema))
+        for mode, lazy in (("eager_routers", False), ("lazy_routers", True)):
+            results[mode] = medians([run_child(PHASES % {"lazy": lazy}, database_url) for _ in range(args.runs)])
+
+        if args.collect:
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "pytest", "--collect-only", "-q"], cwd=BACKEND_DIR,
+                capture_output=True, check=True, env={**os.environ, "DATABASE_URL": database_url},
+            )
+            results["pytest_collect_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Benchmark suite: scripted load scenarios over the synthetic dataset.
+
+Seeds the database with benchmarks.datagen (unless --skip-seed), then drives
+the app in-process through httpx.AsyncClient:
+
+- login_storm:   concurrent POST /api/auth/login for distinct users
+- block_listing: a week of GET /api/blocks/, following next_cursor
+- sync_pull:     full initial /api/sync/pull per user, then a poll and an ETag revalidation
+- sync_push:     /api/sync/push batches of completion events
+- rollover:      sweep_overdue_blocks over every overdue block (runs last; it
+                 changes the data, so a rerun with --skip-seed finds nothing)
+
+Each scenario reports operations per second and latency percentiles per
+operation (a login, one user's full pull, ...), status codes, and database
+queries per HTTP request. Results are written as JSON together with the
+commit they were run at; --compare flags metrics that regressed by more than
+--tolerance against an earlier results file and exits non-zero.
+
+Usage:
+    python -m benchmarks.suite --users 10000 --events 1000000 --output results.json
+    python -m benchmarks.suite --skip-seed --scenarios login_storm,sync_pull --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+import httpx
+from sqlalchemy import func, select
+
+from main import app
+from app.core.database import AsyncSessionLocal, engine
+from app.core.metrics import request_metrics
+from app.core.security import create_access_token
+from app.models.user import Block, ExecutionEvent, User
+from app.services.rollover import sweep_overdue_blocks
+from benchmarks.datagen import FIRST_DAY, NOW, PASSWORD, DatasetSpec, email, generate
+
+SCENARIOS = ("login_storm", "block_listing", "sync_pull", "sync_push", "rollover")
+PUSH_BATCH_SIZE = 20
+
+# Metric -> True when higher is better; compared across runs by --compare
+COMPARED_METRICS = {
+    "operations_per_second": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "db_queries_per_request": False,
+    "blocks_per_second": True,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))]
+
+
+class RequestCounter:
+    """httpx request hook counting the HTTP requests a scenario sends"""
+
+    def __init__(self):
+        self.count = 0
+
+    async def __call__(self, request: httpx.Request):
+        self.count += 1
+
+
+request_counter = RequestCounter()
+
+
+async def drive(jobs: Iterable[Callable[[], Awaitable[int]]], concurrency: int) -> dict:
+    """Run jobs on `concurrency` workers.
+
+    A job is one client operation (a login, a full pull, ...) of one or more
+    requests, returning the status code of the operation; latencies are per
+    operation, query counts per HTTP request.
+    """
+    jobs = iter(jobs)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    requests_before, queries_before = request_counter.count, request_metrics.queries_total
+
+    async def worker():
+        for job in jobs:
+            started = time.perf_counter()
+            try:
+                status = str(await job())
+            except Exception as exc:
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    http_requests = request_counter.count - requests_before
+    return {
+        "operations": len(latencies),
+        "http_requests": http_requests,
+        "errors": sum(count for status, count in statuses.items() if not status.startswith(("2", "3"))),
+        "statuses": statuses,
+        "concurrency": concurrency,
+        "seconds": round(seconds, 3),
+        "operations_per_second": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "db_queries_per_request": (
+            round((request_metrics.queries_total - queries_before) / http_requests, 2) if http_requests else 0.0
+        ),
+    }
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+
+async def login_storm(client: httpx.AsyncClient, users: List[int], concurrency: int) -> dict:
+    async def login(user_id):
+        response = await client.post("/api/auth/login", json={"email": email(user_id), "password": PASSWORD})
+        return response.status_code
+
+    return await drive((lambda user_id=user_id: login(user_id) for user_id in users), concurrency)
+
+
+async def block_listing(client: httpx.AsyncClient, users: List[int], concurrency: int) -> dict:
+    day_from = (FIRST_DAY + timedelta(days=14)).isoformat()
+    day_to = (FIRST_DAY + timedelta(days=20)).isoformat()
+    rows = 0
+
+    async def list_week(user_id):
+        nonlocal rows
+        headers, cursor = auth(user_id), None
+        while True:
+            params = {"day_from": day_from, "day_to": day_to, "limit": 200, **({"cursor": cursor} if cursor else {})}
+            response = await client.get("/api/blocks/", params=params, headers=headers)
+            if response.status_code != 200:
+                return response.status_code
+            page = response.json()
+            rows += len(page["blocks"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                return 200
+
+    result = await drive((lambda user_id=user_id: list_week(user_id) for user_id in users), concurrency)
+    return {**result, "rows": rows}
+
+
+async def sync_pull(client: httpx.AsyncClient, users: List[int], concurrency: int) -> dict:
+    rows = 0
+    not_modified = 0
+
+    async def pull_all(user_id):
+        nonlocal rows, not_modified
+        headers, cursor = auth(user_id), 0
+        while True:
+            response = await client.get("/api/sync/pull", params={"cursor": cursor, "limit": 500}, headers=headers)
+            if response.status_code != 200:
+                return response.status_code
+            page = response.json()
+            rows += sum(len(page[key]) for key in ("goals", "cycles", "blocks", "events"))
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        # Caught up: the next poll returns an empty page, and polls after it revalidate with its ETag
+        response = await client.get("/api/sync/pull", params={"cursor": cursor, "limit": 500}, headers=headers)
+        response = await client.get(
+            "/api/sync/pull", params={"cursor": cursor, "limit": 500},
+            headers={**headers, "If-None-Match": response.headers["etag"]},
+        )
+        not_modified += response.status_code == 304
+        return response.status_code
+
+    result = await drive((lambda user_id=user_id: pull_all(user_id) for user_id in users), concurrency)
+    return {**result, "rows": rows, "not_modified": not_modified}
+
+
+async def sync_push(client: httpx.AsyncClient, users: List[int], concurrency: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        blocks = (await db.execute(
+            select(Block.user_id, Block.id, Block.cycle_id, Block.day_key, Block.duration_minutes)
+            .where(Block.user_id.in_(users))
+            .order_by(Block.user_id, Block.id)
+        )).all()
+    by_user: Dict[int, list] = {}
+    for block in blocks:
+        by_user.setdefault(block.user_id, []).append(block)
+    accepted = 0
+
+    async def push(user_id):
+        nonlocal accepted
+        events = [
+            {
+                "event_type": "complete",
+                "block_id": block.id,
+                "cycle_id": block.cycle_id,
+                "event_data": {
+                    "id": f"bench-push-{block.id}", "kind": "complete", "completed": True,
+                    "minutes": block.duration_minutes, "dateISO": block.day_key,
+                },
+            }
+            for block in by_user.get(user_id, [])[:PUSH_BATCH_SIZE]
+        ]
+        response = await client.post("/api/sync/push", json={"events": events}, headers=auth(user_id))
+        if response.status_code == 200:
+            accepted += response.json()["accepted"]
+        return response.status_code
+
+    result = await drive((lambda user_id=user_id: push(user_id) for user_id in users), concurrency)
+    return {**result, "events_accepted": accepted}
+
+
+async def rollover(client: httpx.AsyncClient, users: List[int], concurrency: int) -> dict:
+    return await sweep_overdue_blocks(now=NOW)
+
+
+async def run_scenarios(names: List[str], spec: DatasetSpec, sample: int, concurrency: int, login_concurrency: int) -> dict:
+    rng = random.Random(spec.seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None, event_hooks={"request": [request_counter]},
+    ) as client:
+        for name in names:
+            users = rng.sample(range(1, spec.users + 1), min(sample, spec.users))
+            workers = login_concurrency if name == "login_storm" else concurrency
+            results[name] = await globals()[name](client, users, workers)
+    return results
+
+
+def dataset_counts() -> dict:
+    with engine.connect() as conn:
+        return {
+            "users": conn.execute(select(func.count()).select_from(User)).scalar_one(),
+            "events": conn.execute(select(func.count()).select_from(ExecutionEvent)).scalar_one(),
+        }
+
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(("git", *args), capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[dict]:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)"""
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {})
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({
+                    "scenario": name, "metric": metric, "baseline": old, "current": new,
+                    "change": round(change, 3),
+                })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios and write JSON results")
+    parser.add_argument("--users", type=int, default=DatasetSpec.users)
+    parser.add_argument("--events", type=int, default=DatasetSpec.events)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the dataset already in the database")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset, run in suite order")
+    parser.add_argument("--sample", type=int, default=1000, help="Users exercised per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--output", help="Write results to this file as well as stdout")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression, as a fraction")
+    args = parser.parse_args(argv)
+
+    names = [name for name in SCENARIOS if name in args.scenarios.split(",")]
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    spec = DatasetSpec(args.users, args.events, args.seed)
+    if args.skip_seed:
+        dataset = {"spec": vars(spec), "seeded": False, "counts": dataset_counts()}
+    else:
+        dataset = {**generate(spec), "seeded": True}
+
+    results = {
+        "suite": "benchmarks.suite",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **git_revision(),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "dataset": dataset,
+        "settings": {"sample": args.sample, "concurrency": args.concurrency, "login_concurrency": args.login_concurrency},
+        "scenarios": asyncio.run(
+            run_scenarios(names, spec, args.sample, args.concurrency, args.login_concurrency)
+        ),
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        results["comparison"] = {
+            "baseline_commit": baseline.get("commit"),
+            "tolerance": args.tolerance,
+            "regressions": compare(results, baseline, args.tolerance),
+        }
+        status = 1 if results["comparison"]["regressions"] else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Idle-connection benchmark for the /api/sync/ws push channel.
+
+Opens N WebSocket sessions in-process (ASGI, no network), spread over U users,
+and reports the memory held per idle connection (tracemalloc), connect
+throughput, and how long one committed change per user takes to reach every
+socket.
+
+Usage:
+    python -m benchmarks.sync_push_connections --connections 10000 --users 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from main import app
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services.sync_push import publish_sync_changes, sync_hub
+
+BENCH_EMAIL = "bench-push-{}@example.com"
+
+
+def seed_users(count: int) -> list:
+    """Ensure `count` benchmark users exist and return their ids"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        existing = {user.email: user.id for user in db.query(User).filter(User.email.like("bench-push-%"))}
+        missing = [BENCH_EMAIL.format(n) for n in range(count) if BENCH_EMAIL.format(n) not in existing]
+        db.add_all(User(email=email, password_hash="bench") for email in missing)
+        db.commit()
+        return [user.id for user in db.query(User).filter(User.email.like("bench-push-%")).order_by(User.id)][:count]
+    finally:
+        db.close()
+
+
+class IdleSocket:
+    """ASGI websocket peer that connects, counts what it is sent, and stays idle until closed"""
+
+    def __init__(self, user_id: int, token: str):
+        self.scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "http_version": "1.1",
+            "path": "/api/sync/ws", "raw_path": b"/api/sync/ws", "root_path": "",
+            "query_string": f"token={token}".encode(), "headers": [], "subprotocols": [],
+            "client": ("bench", user_id), "server": ("bench", 80),
+        }
+        self.connected = False
+        self.accepted = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.messages = 0
+        self.on_message = None
+
+    async def receive(self):
+        if not self.connected:
+            self.connected = True
+            return {"type": "websocket.connect"}
+        await self.closed.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(self, message):
+        if message["type"] == "websocket.send":
+            self.messages += 1
+            if json.loads(message["text"])["type"] == "hello":
+                self.accepted.set()
+            elif self.on_message is not None:
+                self.on_message()
+        elif message["type"] == "websocket.close":
+            self.accepted.set()
+
+
+async def run(connections: int, users: int) -> dict:
+    user_ids = seed_users(users)
+    tokens = {user_id: create_access_token(data={"sub": str(user_id)}) for user_id in user_ids}
+    sockets = [IdleSocket(user_ids[n % len(user_ids)], tokens[user_ids[n % len(user_ids)]]) for n in range(connections)]
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    tasks = []
+    for batch_start in range(0, connections, 500):
+        batch = sockets[batch_start:batch_start + 500]
+        tasks.extend(asyncio.create_task(app(s.scope, s.receive, s.send)) for s in batch)
+        await asyncio.gather(*(s.accepted.wait() for s in batch))
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(0.1)
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    remaining = [connections]
+    delivered = asyncio.Event()
+
+    def count():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            delivered.set()
+
+    for socket in sockets:
+        socket.on_message = count
+    started = time.perf_counter()
+    publish_sync_changes({user_id: 1 for user_id in user_ids})
+    await asyncio.wait_for(delivered.wait(), timeout=60)
+    fanout_seconds = time.perf_counter() - started
+    stats = sync_hub.stats()
+
+    for socket in sockets:
+        socket.closed.set()
+    await asyncio.gather(*tasks)
+    return {
+        "connections": connections,
+        "users": len(user_ids),
+        "open_connections": stats["connections"],
+        "connect_per_second": round(connections / connect_seconds),
+        "bytes_per_idle_connection": round(held / connections),
+        "fanout_ms": round(fanout_seconds * 1000, 1),
+        "fanout_per_second": round(connections / fanout_seconds),
+        "hub": stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.connections, args.users)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
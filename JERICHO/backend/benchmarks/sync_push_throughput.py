@@ -0,0 +1,116 @@
+"""
+Throughput benchmark for bulk execution-event ingest (/api/sync/push).
+
+Measures events/second for the ingest service directly and through the HTTP
+route (which adds JSON parsing and request validation).
+
+Usage:
+    python -m benchmarks.sync_push_throughput --events 100000 --blocks 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from main import app
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models.user import Block, Cycle, Goal, User
+from app.services.events import ingest_events
+
+
+def seed(blocks: int) -> dict:
+    """Create a fresh user with one goal/cycle and `blocks` blocks"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench-push@example.com", password_hash="hash")
+        db.add(user)
+        db.flush()
+        goal = Goal(user_id=user.id, title="Bench Goal", goal_execution_contract="{}", admission_status="admitted")
+        db.add(goal)
+        db.flush()
+        cycle = Cycle(user_id=user.id, goal_id=goal.id, status="active")
+        db.add(cycle)
+        db.flush()
+        block_rows = [
+            Block(
+                user_id=user.id, goal_id=goal.id, cycle_id=cycle.id, day_key="2026-01-15",
+                practice="Creation", title=f"Block {i}", duration_minutes=30,
+            )
+            for i in range(blocks)
+        ]
+        db.add_all(block_rows)
+        db.commit()
+        return {"user_id": user.id, "cycle_id": cycle.id, "block_ids": [block.id for block in block_rows]}
+    finally:
+        db.close()
+
+
+def make_events(fixture: dict, count: int, offset: int = 0) -> list:
+    """Events shaped like artifacts/certification/executionEvents.json"""
+    block_ids = fixture["block_ids"]
+    return [
+        {
+            "event_type": "complete",
+            "block_id": block_ids[i % len(block_ids)],
+            "cycle_id": fixture["cycle_id"],
+            "event_data": {
+                "id": f"evt-{offset + i}",
+                "kind": "complete",
+                "minutes": 30,
+                "domain": "CREATION",
+                "startISO": "2026-01-15T06:00:00.000Z",
+                "endISO": "2026-01-15T06:30:00.000Z",
+                "completed": True,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+async def bench_service(fixture: dict, count: int) -> dict:
+    events = make_events(fixture, count)
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        result = await ingest_events(db, fixture["user_id"], events)
+        seconds = time.perf_counter() - started
+    return {"events": count, "accepted": result["accepted"], "seconds": round(seconds, 3),
+            "events_per_second": round(count / seconds)}
+
+
+async def bench_http(fixture: dict, count: int) -> dict:
+    body = json.dumps({"events": make_events(fixture, count, offset=count)})
+    headers = {
+        "Authorization": f"Bearer {create_access_token(data={'sub': str(fixture['user_id'])})}",
+        "Content-Type": "application/json",
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        response = await client.post("/api/sync/push", content=body, headers=headers)
+        seconds = time.perf_counter() - started
+    return {"events": count, "accepted": response.json()["accepted"], "seconds": round(seconds, 3),
+            "events_per_second": round(count / seconds)}
+
+
+async def main(count: int, blocks: int) -> dict:
+    fixture = seed(blocks)
+    return {
+        "benchmark": "sync_push_throughput",
+        "service": await bench_service(fixture, count),
+        "http": await bench_http(fixture, count),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk ingest throughput for /api/sync/push")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--blocks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.events, args.blocks)), indent=2))
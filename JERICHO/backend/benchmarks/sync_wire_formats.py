@@ -0,0 +1,96 @@
+"""
+Microbenchmark: size and encode/decode cost of a /api/sync/pull page per wire format.
+
+Builds a page of --rows blocks and execution events shaped like a real pull
+and encodes it as JSON, gzipped JSON, MessagePack and gzipped MessagePack,
+the way app.core.wire does. Reports bytes on the wire, server encode time
+and client decode time for each. The MessagePack figures are for whichever
+codec app.core.msgpack_codec uses here (the msgpack package when installed,
+the pure-Python fallback otherwise), reported as "msgpack_codec".
+
+Usage:
+    python -m benchmarks.sync_wire_formats --rows 5000 --level 6
+"""
+
+import argparse
+import gzip
+import json
+import time
+
+from app.core import msgpack_codec
+from app.core.msgpack_codec import packb, unpackb
+from app.core.responses import dumps
+
+
+def make_page(rows: int) -> dict:
+    blocks = [
+        {
+            "id": i, "user_id": 1, "goal_id": 1, "cycle_id": 1, "day_key": f"2026-01-{i % 28 + 1:02d}",
+            "practice": ("Creation", "Study", "Rest")[i % 3], "title": f"Block {i}", "duration_minutes": 30,
+            "status": "completed" if i % 2 else "scheduled", "start_iso": "2026-01-15T06:00:00.000Z",
+            "completion_iso": None, "created_at": "2026-01-15T06:00:12.345678Z", "updated_at": None,
+            "block_data": {"kind": "focus", "index": i}, "sync_seq": i + 1,
+        }
+        for i in range(rows)
+    ]
+    events = [
+        {
+            "id": i, "user_id": 1, "block_id": i, "cycle_id": 1, "event_type": "complete",
+            "event_data": {"id": f"evt-{i}", "kind": "complete", "completed": True},
+            "created_at": "2026-01-15T06:30:00.000000Z", "sync_seq": rows + i + 1,
+        }
+        for i in range(rows)
+    ]
+    return {"cursor": 2 * rows, "has_more": False, "goals": [], "cycles": [], "blocks": blocks, "events": events}
+
+
+def timed(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, round(best * 1000, 2)
+
+
+def measure(encode, decode, repeat: int) -> dict:
+    body, encode_ms = timed(encode, repeat)
+    _, decode_ms = timed(lambda: decode(body), repeat)
+    return {"bytes": len(body), "encode_ms": encode_ms, "decode_ms": decode_ms}
+
+
+def main(rows: int, level: int, repeat: int) -> dict:
+    page = make_page(rows)
+    assert unpackb(packb(page)) == json.loads(dumps(page))
+    formats = {
+        "json": measure(lambda: dumps(page), json.loads, repeat),
+        "json_gzip": measure(
+            lambda: gzip.compress(dumps(page), compresslevel=level, mtime=0),
+            lambda body: json.loads(gzip.decompress(body)), repeat,
+        ),
+        "msgpack": measure(lambda: packb(page), unpackb, repeat),
+        "msgpack_gzip": measure(
+            lambda: gzip.compress(packb(page), compresslevel=level, mtime=0),
+            lambda body: unpackb(gzip.decompress(body)), repeat,
+        ),
+    }
+    baseline = formats["json"]["bytes"]
+    for result in formats.values():
+        result["size_ratio"] = round(result["bytes"] / baseline, 3)
+    return {
+        "benchmark": "sync_wire_formats",
+        "rows": 2 * rows,
+        "gzip_level": level,
+        "msgpack_codec": "msgpack" if msgpack_codec.msgpack is not None else "pure-python",
+        "formats": formats,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sync pull wire formats")
+    parser.add_argument("--rows", type=int, default=5000, help="Blocks and events each")
+    parser.add_argument("--level", type=int, default=6, help="gzip compression level")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.rows, args.level, args.repeat), indent=2))
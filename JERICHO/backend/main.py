@@ -4,61 +4,196 @@ JERICHO Backend - FastAPI Application
 Production-ready backend for goal planning and execution system.
 """
 
-from fastapi import FastAPI, Depends
+import importlib
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer
 import uvicorn
 
-from app.core.config import settings
-from app.api import auth, goals, blocks, sync
-from app.core.database import engine, Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.core import config
+from app.core.config import DATABASE_SETTINGS, Settings
+from app.core.limits import LoadSheddingMiddleware
+from app.core.metrics import MetricsMiddleware, request_metrics
+from app.core.responses import FastJSONResponse
+from app.core.routing import LazyRouter, load_lazy_routers
+from app.services.auth_limits import AuthLimits
 
-app = FastAPI(
-    title="JERICHO Backend API",
-    description="Production backend for goal planning and execution system",
-    version="1.0.0"
+# (module, prefix, tag) for each API router
+ROUTERS = (
+    ("app.api.auth", "/api/auth", "authentication"),
+    ("app.api.goals", "/api/goals", "goals"),
+    ("app.api.blocks", "/api/blocks", "blocks"),
+    ("app.api.sync", "/api/sync", "synchronization"),
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Include routers
-app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
-app.include_router(goals.router, prefix="/api/goals", tags=["goals"])
-app.include_router(blocks.router, prefix="/api/blocks", tags=["blocks"])
-app.include_router(sync.router, prefix="/api/sync", tags=["synchronization"])
+def lifespan_for(settings: Settings):
+    """Lifespan starting the push hub and enabled background jobs, and releasing pools on exit"""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        from app.services.sync_push import sync_hub
+
+        # A preforking server runs the background jobs in one worker only (app.server)
+        run_jobs = getattr(app.state, "background_jobs", True)
+        jobs = []
+        if run_jobs and settings.rollover_enabled:
+            from app.services.rollover import rollover_scheduler
+            jobs.append(rollover_scheduler)
+        if run_jobs and settings.rollup_compaction_enabled:
+            from app.services.rollups import rollup_compactor
+            jobs.append(rollup_compactor)
+
+        await sync_hub.start()
+        for job in jobs:
+            job.start()
+        try:
+            yield
+        finally:
+            from app.core.database import async_engine, engine
+            from app.core.workers import shutdown_worker_pools
+
+            for job in jobs:
+                await job.stop()
+            await sync_hub.stop()
+            await app.state.auth_limits.close()
+            shutdown_worker_pools()
+            engine.dispose()
+            await async_engine.dispose()
+
+    return lifespan
+
+
+def create_app(settings: Optional[Settings] = None, lazy_routers: Optional[bool] = None) -> FastAPI:
+    """Build the API application.
+
+    Nothing here touches the database: engines connect on first use and the
+    schema is created by migrations or `python -m app.cli create-schema`.
+    The engines are shared by the whole process and built from the
+    environment, so `settings` may not change the database URL, pool or
+    SQLite options (config.DATABASE_SETTINGS); it configures CORS, metrics,
+    background jobs and auth limits. With lazy_routers (default
+    settings.lazy_routers) each API router is imported on the first request
+    under its prefix.
+    """
+    settings = settings or config.settings
+    changed = [name for name in DATABASE_SETTINGS if getattr(settings, name) != getattr(config.settings, name)]
+    if changed:
+        raise ValueError(
+            f"create_app cannot change the process-wide database settings ({', '.join(changed)}); "
+            "set them in the environment before starting the app"
+        )
+    if lazy_routers is None:
+        lazy_routers = settings.lazy_routers
+
+    app = FastAPI(
+        title="JERICHO Backend API",
+        description="Production backend for goal planning and execution system",
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan_for(settings),
+    )
+
+    # Auth admission control: innermost, so shed responses still get CORS headers and are counted in metrics
+    app.state.auth_limits = AuthLimits(settings)
+    app.add_middleware(LoadSheddingMiddleware, **app.state.auth_limits.middleware_options())
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request metrics wrap everything else, so CORS preflights and errors are counted too
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware, registry=request_metrics)
+
+    # Include routers
+    for module, prefix, tag in ROUTERS:
+        if lazy_routers:
+            app.router.routes.append(LazyRouter(app, module, prefix, tags=[tag]))
+        else:
+            app.include_router(importlib.import_module(module).router, prefix=prefix, tags=[tag])
+
+    if lazy_routers:
+        def openapi():
+            load_lazy_routers(app)
+            return FastAPI.openapi(app)
+
+        app.openapi = openapi
+
+    @app.get("/")
+    async def root():
+        return {"message": "JERICHO Backend API", "status": "healthy"}
+
+    @app.get("/health")
+    async def health_check():
+        from app.core.database import async_engine, engine, pool_status
+        from app.core.principals import principal_cache
+        from app.core.security import password_pool
+        from app.services.admission import admission_pool
+        from app.services.rollover import rollover_scheduler
+        from app.services.rollups import rollup_compactor
+        from app.services.sync_push import sync_hub
+
+        return {
+            "status": "healthy",
+            "version": "1.0.0",
+            "environment": settings.environment,
+            "password_hashing": password_pool.stats(),
+            "goal_admission": admission_pool.stats(),
+            "principal_cache": principal_cache.stats(),
+            "rollover": rollover_scheduler.stats(),
+            "rollup_compaction": rollup_compactor.stats(),
+            "sync_push": sync_hub.stats(),
+            "auth_limits": app.state.auth_limits.stats(),
+            "metrics": request_metrics.stats(),
+            "database": {
+                "sync": pool_status(engine),
+                "async": pool_status(async_engine.sync_engine)
+            }
+        }
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint"""
+        from app.core.database import async_engine, engine, pool_status
+        from app.core.principals import principal_cache
+        from app.services.sync_push import sync_hub
+
+        sync_pool, async_pool = pool_status(engine), pool_status(async_engine.sync_engine)
+        gauges = {
+            "jericho_db_sync_pool_checked_out": sync_pool.get("checkedout", 0),
+            "jericho_db_async_pool_checked_out": async_pool.get("checkedout", 0),
+            "jericho_sync_push_connections": sync_hub.connections,
+            "jericho_principal_cache_entries": len(principal_cache),
+        }
+        return Response(request_metrics.render(gauges), media_type="text/plain; version=0.0.4; charset=utf-8")
 
-# Security
-security = HTTPBearer()
+    return app
 
 
-@app.get("/")
-async def root():
-    return {"message": "JERICHO Backend API", "status": "healthy"}
+_app: Optional[FastAPI] = None
 
 
-@app.get("/health")
-async def health_check():
-    return {
-        "status": "healthy",
-        "version": "1.0.0",
-        "environment": settings.environment
-    }
+def __getattr__(name: str):
+    # `main:app` (uvicorn, tests) is built on first access, so importing main for create_app stays cheap
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.environment == "development"
-    )
\ No newline at end of file
+    if config.settings.environment == "development":
+        uvicorn.run("main:create_app", factory=True, host="0.0.0.0", port=8000, reload=True)
+    else:
+        from app.server import serve
+        raise SystemExit(serve())
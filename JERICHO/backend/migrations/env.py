@@ -0,0 +1,72 @@
+"""Alembic environment: migrates settings.database_url (or the URL set on the config)"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models.user  # noqa: F401 - registers the models on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """GIN indexes only exist on PostgreSQL; don't report them missing elsewhere"""
+    if type_ == "index" and not reflected and obj.dialect_kwargs.get("postgresql_using") == "gin":
+        return context.get_context().dialect.name == "postgresql"
+    return True
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.database_url
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of connecting"""
+    url = database_url()
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # Callers (tests, the app) may hand over an open connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        do_run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
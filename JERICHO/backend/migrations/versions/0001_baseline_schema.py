@@ -0,0 +1,123 @@
+"""baseline schema
+
+The original schema, before the sync, ledger and JSON column changes.
+Databases created by the app at that point can be adopted with
+`alembic stamp 0001`; 0002 then brings them up to date.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 23:10:48.727305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'])
+
+    op.create_table('goals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('goal_execution_contract', sa.Text(), nullable=True),
+    sa.Column('goal_governance_contract', sa.Text(), nullable=True),
+    sa.Column('admission_status', sa.String(), nullable=True),
+    sa.Column('admission_reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_goals_id', 'goals', ['id'])
+    op.create_index('ix_goals_user_id', 'goals', ['user_id'])
+
+    op.create_table('cycles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('goal_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('cycle_data', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['goal_id'], ['goals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cycles_id', 'cycles', ['id'])
+    op.create_index('ix_cycles_user_id', 'cycles', ['user_id'])
+    op.create_index('ix_cycles_goal_id', 'cycles', ['goal_id'])
+
+    op.create_table('blocks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('goal_id', sa.Integer(), nullable=False),
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('day_key', sa.String(), nullable=False),
+    sa.Column('practice', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('start_iso', sa.String(), nullable=True),
+    sa.Column('completion_iso', sa.String(), nullable=True),
+    sa.Column('block_data', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.ForeignKeyConstraint(['goal_id'], ['goals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_blocks_id', 'blocks', ['id'])
+    op.create_index('ix_blocks_user_id', 'blocks', ['user_id'])
+    op.create_index('ix_blocks_goal_id', 'blocks', ['goal_id'])
+    op.create_index('ix_blocks_cycle_id', 'blocks', ['cycle_id'])
+    op.create_index('ix_blocks_day_key', 'blocks', ['day_key'])
+
+    op.create_table('execution_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('block_id', sa.Integer(), nullable=False),
+    sa.Column('event_data', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('event_hash', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['block_id'], ['blocks.id'], ),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_execution_events_id', 'execution_events', ['id'])
+    op.create_index('ix_execution_events_user_id', 'execution_events', ['user_id'])
+    op.create_index('ix_execution_events_cycle_id', 'execution_events', ['cycle_id'])
+    op.create_index('ix_execution_events_block_id', 'execution_events', ['block_id'])
+    op.create_index('ix_execution_events_event_hash', 'execution_events', ['event_hash'])
+
+
+def downgrade() -> None:
+    op.drop_table('execution_events')
+    op.drop_table('blocks')
+    op.drop_table('cycles')
+    op.drop_table('goals')
+    op.drop_table('users')
@@ -0,0 +1,209 @@
+"""sync sequence, hash chain and JSON payload columns
+
+Brings a baseline (0001) database up to the schema the sync, ledger and JSON
+column work introduced:
+
+- contract and payload columns become JSON (JSONB on PostgreSQL), with empty
+  strings cleared to NULL first
+- goals get generated deadline columns for indexed deadline filters
+- goals, cycles, blocks and execution events get sync_seq, numbered per user
+  in id order, with user_sync_state holding each user's last number
+- execution events get chain_hash, linked per cycle in id order
+- the projection and ledger checkpoint tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:20:41.503118
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_PAYLOAD = sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql')
+
+JSON_COLUMNS = [
+    ('goals', 'goal_execution_contract'),
+    ('goals', 'goal_governance_contract'),
+    ('cycles', 'cycle_data'),
+    ('blocks', 'block_data'),
+    ('execution_events', 'event_data'),
+]
+SYNCED_TABLES = ['goals', 'cycles', 'blocks', 'execution_events']
+GENESIS_CHAIN_HASH = '0' * 64
+
+DEADLINE_DAY_KEY_SQL = {
+    'sqlite': "json_extract(goal_execution_contract, '$.deadline.dayKey')",
+    'postgresql': "(goal_execution_contract #>> '{deadline,dayKey}')",
+}
+DEADLINE_TYPE_SQL = {
+    'sqlite': (
+        "coalesce(json_extract(goal_execution_contract, '$.deadlineType'), "
+        "CASE json_extract(goal_execution_contract, '$.deadline.isHardDeadline') "
+        "WHEN 1 THEN 'HARD' WHEN 0 THEN 'SOFT' END)"
+    ),
+    'postgresql': (
+        "coalesce(goal_execution_contract ->> 'deadlineType', "
+        "CASE goal_execution_contract #>> '{deadline,isHardDeadline}' "
+        "WHEN 'true' THEN 'HARD' WHEN 'false' THEN 'SOFT' END)"
+    ),
+}
+GIN_COLUMNS = [
+    ('goals', 'goal_execution_contract'),
+    ('goals', 'goal_governance_contract'),
+    ('cycles', 'cycle_data'),
+    ('blocks', 'block_data'),
+]
+
+
+def backfill_sync_seqs(connection) -> None:
+    """Number each user's existing rows in table then id order, and record the last number"""
+    last_seqs = {}
+    for table in SYNCED_TABLES:
+        updates = []
+        for row_id, user_id in connection.execute(sa.text(f'SELECT id, user_id FROM {table} ORDER BY id')):
+            last_seqs[user_id] = last_seqs.get(user_id, 0) + 1
+            updates.append({'id': row_id, 'seq': last_seqs[user_id]})
+        if updates:
+            connection.execute(sa.text(f'UPDATE {table} SET sync_seq = :seq WHERE id = :id'), updates)
+    if last_seqs:
+        connection.execute(
+            sa.text('INSERT INTO user_sync_state (user_id, last_seq) VALUES (:user_id, :last_seq)'),
+            [{'user_id': user_id, 'last_seq': last_seq} for user_id, last_seq in last_seqs.items()],
+        )
+
+
+def backfill_chain_hashes(connection) -> None:
+    """Link existing events into per-cycle chains (app.models.user.compute_chain_hash, frozen here)"""
+    tails, updates = {}, []
+    rows = connection.execute(sa.text('SELECT id, cycle_id, event_hash FROM execution_events ORDER BY cycle_id, id'))
+    for event_id, cycle_id, event_hash in rows:
+        previous = tails.get(cycle_id, GENESIS_CHAIN_HASH)
+        tails[cycle_id] = hashlib.sha256(f'{previous}|{event_hash}'.encode('utf-8')).hexdigest()
+        updates.append({'id': event_id, 'chain_hash': tails[cycle_id]})
+    if updates:
+        connection.execute(sa.text('UPDATE execution_events SET chain_hash = :chain_hash WHERE id = :id'), updates)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+
+    op.create_table('user_sync_state',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    for table, column in JSON_COLUMNS:
+        op.execute(f"UPDATE {table} SET {column} = NULL WHERE {column} = ''")
+    for table in SYNCED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for json_table, column in JSON_COLUMNS:
+                if json_table == table:
+                    batch_op.alter_column(
+                        column, existing_type=sa.Text(), type_=JSON_PAYLOAD,
+                        postgresql_using=f'{column}::jsonb',
+                    )
+            batch_op.add_column(sa.Column('sync_seq', sa.BigInteger(), nullable=False, server_default='0'))
+            if table == 'execution_events':
+                batch_op.add_column(
+                    sa.Column('chain_hash', sa.String(length=64), nullable=False, server_default=GENESIS_CHAIN_HASH)
+                )
+
+    backfill_sync_seqs(connection)
+    backfill_chain_hashes(connection)
+
+    for table in SYNCED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('sync_seq', existing_type=sa.BigInteger(), server_default=None)
+            if table == 'execution_events':
+                batch_op.alter_column('chain_hash', existing_type=sa.String(length=64), server_default=None)
+        op.create_index(f'ix_{table}_user_sync_seq', table, ['user_id', 'sync_seq'])
+
+    # Added after the batch copies above, which would have to recreate generated columns
+    op.add_column('goals', sa.Column('deadline_day_key', sa.String(), sa.Computed(DEADLINE_DAY_KEY_SQL[dialect]), nullable=True))
+    op.add_column('goals', sa.Column('deadline_type', sa.String(), sa.Computed(DEADLINE_TYPE_SQL[dialect]), nullable=True))
+    op.create_index('ix_goals_user_deadline', 'goals', ['user_id', 'deadline_type', 'deadline_day_key'])
+
+    op.create_index('ix_blocks_user_day_id', 'blocks', ['user_id', 'day_key', 'id'])
+    op.create_index('ix_blocks_user_cycle_day_id', 'blocks', ['user_id', 'cycle_id', 'day_key', 'id'])
+    op.create_index('ix_execution_events_cycle_id_id', 'execution_events', ['cycle_id', 'id'])
+
+    op.create_table('cycle_projection_checkpoints',
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.Column('state', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('cycle_id')
+    )
+    op.create_index('ix_cycle_projection_checkpoints_user_id', 'cycle_projection_checkpoints', ['user_id'])
+
+    op.create_table('ledger_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_event_id', sa.Integer(), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.Column('chain_hash', sa.String(length=64), nullable=False),
+    sa.Column('merkle_root', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_checkpoints_id', 'ledger_checkpoints', ['id'])
+    op.create_index('ix_ledger_checkpoints_user_id', 'ledger_checkpoints', ['user_id'])
+    op.create_index('ix_ledger_checkpoints_cycle_event_count', 'ledger_checkpoints', ['cycle_id', 'event_count'], unique=True)
+
+    if dialect == 'postgresql':
+        for table, column in GIN_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}_gin', table, [column],
+                postgresql_using='gin', postgresql_ops={column: 'jsonb_path_ops'},
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, column in GIN_COLUMNS:
+            op.drop_index(f'ix_{table}_{column}_gin', table_name=table)
+
+    op.drop_table('ledger_checkpoints')
+    op.drop_table('cycle_projection_checkpoints')
+    op.drop_index('ix_execution_events_cycle_id_id', table_name='execution_events')
+    op.drop_index('ix_blocks_user_cycle_day_id', table_name='blocks')
+    op.drop_index('ix_blocks_user_day_id', table_name='blocks')
+    op.drop_index('ix_goals_user_deadline', table_name='goals')
+
+    for table in SYNCED_TABLES:
+        op.drop_index(f'ix_{table}_user_sync_seq', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            if table == 'goals':
+                batch_op.drop_column('deadline_type')
+                batch_op.drop_column('deadline_day_key')
+            if table == 'execution_events':
+                batch_op.drop_column('chain_hash')
+            batch_op.drop_column('sync_seq')
+            for json_table, column in JSON_COLUMNS:
+                if json_table == table:
+                    batch_op.alter_column(
+                        column, existing_type=JSON_PAYLOAD, type_=sa.Text(), postgresql_using=f'{column}::text',
+                    )
+
+    op.drop_table('user_sync_state')
@@ -0,0 +1,30 @@
+"""composite indexes for hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 23:40:12.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_execution_events_cycle_timestamp', 'execution_events', ['cycle_id', 'timestamp'])
+    op.create_index(
+        'ix_blocks_user_status_day', 'blocks', ['user_id', 'status', 'day_key'],
+        postgresql_include=['cycle_id', 'duration_minutes'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blocks_user_status_day', table_name='blocks')
+    op.drop_index('ix_execution_events_cycle_timestamp', table_name='execution_events')
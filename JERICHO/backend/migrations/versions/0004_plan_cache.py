@@ -0,0 +1,36 @@
+"""plan cache table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 23:58:31.402671
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_PAYLOAD = sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True), 'postgresql')
+
+
+def upgrade() -> None:
+    op.create_table('plan_cache',
+    sa.Column('plan_hash', sa.String(length=64), nullable=False),
+    sa.Column('generator_version', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('plan', JSON_PAYLOAD, nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('plan_hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('plan_cache')
@@ -0,0 +1,55 @@
+"""cycle summary tables
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 09:12:47.518302
+
+Existing data is backfilled with `python -m app.cli rebuild-summaries`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_COUNTERS = (
+    'blocks_total', 'blocks_scheduled', 'blocks_started', 'blocks_completed', 'blocks_skipped', 'blocks_missed',
+    'blocks_other', 'planned_minutes', 'completed_minutes', 'event_count', 'create_events', 'completion_events',
+    'last_event_id',
+)
+
+
+def upgrade() -> None:
+    op.create_table('cycle_summaries',
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    *[sa.Column(name, sa.Integer(), nullable=False) for name in SUMMARY_COUNTERS],
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('cycle_id')
+    )
+    op.create_index('ix_cycle_summaries_user_id', 'cycle_summaries', ['user_id'])
+
+    op.create_table('cycle_practice_totals',
+    sa.Column('cycle_id', sa.Integer(), nullable=False),
+    sa.Column('practice', sa.String(), nullable=False),
+    sa.Column('blocks', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('completed_blocks', sa.Integer(), nullable=False),
+    sa.Column('completed_minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_id'], ['cycles.id'], ),
+    sa.PrimaryKeyConstraint('cycle_id', 'practice')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cycle_practice_totals')
+    op.drop_index('ix_cycle_summaries_user_id', table_name='cycle_summaries')
+    op.drop_table('cycle_summaries')
@@ -0,0 +1,61 @@
+"""daily rollup and bucket tables
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 14:03:22.846105
+
+Existing data is backfilled with `python -m app.cli rebuild-rollups`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_COUNTERS = (
+    'planned_blocks', 'planned_minutes', 'open_blocks', 'completed_blocks', 'completed_minutes',
+    'events', 'complete_events',
+)
+
+
+def upgrade() -> None:
+    op.create_table('daily_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('goal_id', sa.Integer(), nullable=False),
+    sa.Column('day_key', sa.String(), nullable=False),
+    sa.Column('practice', sa.String(), nullable=False),
+    *[sa.Column(name, sa.Integer(), nullable=False) for name in ROLLUP_COUNTERS],
+    sa.Column('dirty', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['goal_id'], ['goals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'goal_id', 'day_key', 'practice')
+    )
+    op.create_index('ix_daily_rollups_user_day', 'daily_rollups', ['user_id', 'day_key'])
+    op.create_index('ix_daily_rollups_dirty', 'daily_rollups', ['dirty'])
+
+    op.create_table('rollup_buckets',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('goal_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('period_start', sa.String(), nullable=False),
+    sa.Column('practice', sa.String(), nullable=False),
+    *[sa.Column(name, sa.Integer(), nullable=False) for name in ROLLUP_COUNTERS],
+    sa.ForeignKeyConstraint(['goal_id'], ['goals.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'goal_id', 'period', 'period_start', 'practice')
+    )
+    op.create_index('ix_rollup_buckets_user_period', 'rollup_buckets', ['user_id', 'period', 'period_start'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rollup_buckets_user_period', table_name='rollup_buckets')
+    op.drop_table('rollup_buckets')
+    op.drop_index('ix_daily_rollups_dirty', table_name='daily_rollups')
+    op.drop_index('ix_daily_rollups_user_day', table_name='daily_rollups')
+    op.drop_table('daily_rollups')
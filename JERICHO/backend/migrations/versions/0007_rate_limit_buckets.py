@@ -0,0 +1,34 @@
+"""rate limit bucket table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 10:12:48.517390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.Column('allowed', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_rate_limit_buckets_updated_at', 'rate_limit_buckets', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rate_limit_buckets_updated_at', table_name='rate_limit_buckets')
+    op.drop_table('rate_limit_buckets')
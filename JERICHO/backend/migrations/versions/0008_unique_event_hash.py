@@ -0,0 +1,36 @@
+"""unique event content hash per user
+
+Pushes deduplicate events on (user_id, event_hash); the unique index makes the
+database enforce it. Duplicates stored by concurrent pushes before this
+revision make the upgrade fail; find them with
+
+    SELECT user_id, event_hash, count(*) FROM execution_events
+    GROUP BY user_id, event_hash HAVING count(*) > 1
+
+and resolve them (and re-verify the affected cycles' ledgers) first.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 11:02:17.864230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_execution_events_user_event_hash', 'execution_events', ['user_id', 'event_hash'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_execution_events_user_event_hash', table_name='execution_events')